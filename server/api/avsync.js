@@ -7,6 +7,7 @@ import express from 'express';
 import multer from 'multer';
 import path from 'path';
 import fs from 'fs/promises';
+import { createReadStream } from 'fs';
 import fetch from 'node-fetch';
 import { fileURLToPath } from 'url';
 import { dirname } from 'path';
@@ -103,16 +104,33 @@ router.post('/score', upload.single('video'), async (req, res) => {
 
     console.log(`[AVSync] Forwarding to Python service: ${pythonServiceURL}`);
 
-    const pythonResponse = await fetch(`${pythonServiceURL}/score`, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({
-        video_path: file.path,
-        session_id: session_id,
-      }),
-    });
+    // PYTHON_UPLOAD_MODE=stream sends the video bytes to /score/upload so the
+    // Python service does not need to share this filesystem
+    const streamUpload = process.env.PYTHON_UPLOAD_MODE === 'stream';
+
+    const pythonResponse = streamUpload
+      ? await fetch(
+          `${pythonServiceURL}/score/upload?session_id=${encodeURIComponent(session_id)}`,
+          {
+            method: 'POST',
+            headers: {
+              'Content-Type': file.mimetype || 'application/octet-stream',
+              'Content-Length': String(file.size),
+              'X-Filename': file.originalname || file.filename,
+            },
+            body: createReadStream(file.path),
+          }
+        )
+      : await fetch(`${pythonServiceURL}/score`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({
+            video_path: file.path,
+            session_id: session_id,
+          }),
+        });
 
     if (!pythonResponse.ok) {
       const errorData = await pythonResponse.json().catch(() => ({}));
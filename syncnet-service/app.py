@@ -4,43 +4,67 @@ Provides REST API for deepfake detection via audio-visual synchronization
 UPDATED: 2025-11-03 - Integrated EfficientNet Detector + Vision Transformer v2
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
+import json
+import base64
 import logging
 import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# [NUEVO] Import Ensemble Orchestrator
-try:
-    from ensemble.orchestrator import EnsembleOrchestrator
-    from ensemble.efficientnet_detector import EfficientNetDetector
-    from ensemble.vit_detector import ViTDetector
-    from ensemble.efficientnetv2_detector import EfficientNetV2Detector
-    ENSEMBLE_AVAILABLE = True
-    VIT_AVAILABLE = True
-    EFFICIENTNETV2_AVAILABLE = True
-except ImportError as e:
-    ENSEMBLE_AVAILABLE = False
-    VIT_AVAILABLE = False
-    EFFICIENTNETV2_AVAILABLE = False
-    logging.warning(f"Ensemble not available - running in legacy mode: {e}")
-
-# [EXISTENTE] Import SyncNet wrapper
+# [ACTUALIZADO] Ensemble Orchestrator; detector modules (torch, timm, transformers,
+# cv2) are imported on demand in get_ensemble() only for enabled detectors
+from ensemble.orchestrator import EnsembleOrchestrator
+from ensemble import registry as detector_registry
+
+# [NUEVO] Background job executor
+from utils.jobs import JobManager, JobQueueFull
+
+# [NUEVO] Streaming uploads (/score/upload)
+from utils.uploads import (
+    StreamingUploadRequest, UploadTooLarge, default_spool_dir, spool_stream, suffix_for
+)
+
+# [NUEVO] Per-request scratch spaces (uploads + SyncNet pipeline)
+from utils.scratch import (
+    ScratchManager, ScratchQuotaExceeded, ScratchSpace, default_scratch_root, release_outcome
+)
+
+# [NUEVO] WebSocket live scoring (opcional)
 try:
-    from syncnet_wrapper import SyncNetWrapper
-    SYNCNET_AVAILABLE = True
+    from flask_sock import Sock
+    from ensemble.streaming import StreamingSession
+    WEBSOCKET_AVAILABLE = True
 except ImportError:
-    SYNCNET_AVAILABLE = False
-    logging.warning("SyncNet wrapper not available - running in demo mode")
+    WEBSOCKET_AVAILABLE = False
+    logging.warning("flask-sock not available - /stream disabled")
+
+# [NUEVO] Prometheus metrics
+from utils.metrics import (
+    REGISTRY, DEMO_FALLBACKS, INFLIGHT_REQUESTS, MODEL_MEMORY_BYTES, PREFLIGHT_REJECTIONS, STAGE_SECONDS,
+    MultiprocessCollector
+)
+
+# [NUEVO] Opt-in per-request profiling
+from utils.profiling import ProfileCapture, choose_profile_mode
+
+# [NUEVO] Per-request deadlines and cancellation
+from utils.deadline import Deadline, DeadlineExceeded, client_disconnected
 
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = StreamingUploadRequest
 CORS(app)
+sock = Sock(app) if WEBSOCKET_AVAILABLE else None
 
 # Configure logging
 log_level = os.getenv('LOG_LEVEL', 'INFO')
@@ -59,10 +83,24 @@ CONFIG = {
     'syncnet_enabled': os.getenv('SYNCNET_ENABLED', 'true').lower() == 'true',
     'model_path': os.getenv('MODEL_PATH', str(BASE_DIR / 'models' / 'syncnet_v2.model')),
     'detector_path': os.getenv('DETECTOR_PATH', str(BASE_DIR / 'models' / 'sfd_face.pth')),
+    # [NUEVO] 'inprocess' = resident S3FD + SyncNet (syncnet_engine), 'subprocess' = run_pipeline.py per video
+    'syncnet_engine': os.getenv('SYNCNET_ENGINE', 'inprocess').lower(),
+    'syncnet_device': os.getenv('SYNCNET_DEVICE', 'cpu'),
+    'syncnet_face_detector': os.getenv('SYNCNET_FACE_DETECTOR', 's3fd'),  # s3fd | yunet | opencv_dnn | haar
+    'syncnet_face_detector_path': os.getenv('SYNCNET_FACE_DETECTOR_PATH'),  # yunet .onnx / opencv_dnn weights
+    'syncnet_face_detector_config': os.getenv('SYNCNET_FACE_DETECTOR_CONFIG'),  # opencv_dnn deploy.prototxt / .pbtxt
+    'syncnet_detect_stride': int(os.getenv('SYNCNET_DETECT_STRIDE', '5')),  # 1 = S3FD on every frame
+    'syncnet_detect_scale': float(os.getenv('SYNCNET_DETECT_SCALE', '1.0')),
+    'syncnet_vshift': int(os.getenv('SYNCNET_VSHIFT', '15')),
+    'syncnet_max_vshift': int(os.getenv('SYNCNET_MAX_VSHIFT', '0')) or None,  # > vshift = adaptive window
+    'syncnet_early_stop_confidence': float(os.getenv('SYNCNET_EARLY_STOP_CONFIDENCE', '0')) or None,  # skip other tracks
+    'syncnet_fast_mode': os.getenv('SYNCNET_FAST_MODE', 'false').lower() == 'true',  # short single-person clips
+    'syncnet_debug_crops_dir': os.getenv('SYNCNET_DEBUG_CROPS_DIR') or None,  # debug .avi per face track
+    'syncnet_min_speech_coverage': float(os.getenv('SYNCNET_MIN_SPEECH_COVERAGE', '0.1')),  # 0 = no speech gate
     'tmp_dir': os.getenv('TMP_DIR', str(BASE_DIR / 'tmp')),
     'upload_dir': os.getenv('UPLOAD_DIR', str(BASE_DIR / 'tmp' / 'uploads')),
     'max_video_size_mb': int(os.getenv('MAX_VIDEO_SIZE_MB', '10')),
-    'processing_timeout': int(os.getenv('PROCESSING_TIMEOUT_SECONDS', '30')),
+    'processing_timeout': int(os.getenv('PROCESSING_TIMEOUT_SECONDS', '30')),  # [NUEVO] enforced per job, 0 = no limit
 
     # [NUEVO] EfficientNet configuration
     'efficientnet_enabled': os.getenv('EFFICIENTNET_ENABLED', 'false').lower() == 'true',
@@ -88,93 +126,722 @@ CONFIG = {
     'efficientnetv2_device': os.getenv('EFFICIENTNETV2_DEVICE', 'cpu'),
     'efficientnetv2_max_frames': int(os.getenv('EFFICIENTNETV2_MAX_FRAMES', '20')),
 
+    # [NUEVO] AV sync pre-detector (mouth motion vs audio energy, no neural network)
+    'avsync_enabled': os.getenv('AVSYNC_ENABLED', 'false').lower() == 'true',
+    'avsync_face_detector': os.getenv('AVSYNC_FACE_DETECTOR', 'haar'),  # haar | yunet | opencv_dnn (SYNCNET_FACE_DETECTOR_PATH)
+    'avsync_max_seconds': float(os.getenv('AVSYNC_MAX_SECONDS', '10')),
+    'avsync_min_speech_coverage': float(os.getenv('AVSYNC_MIN_SPEECH_COVERAGE', '0.1')),  # 0 = no speech gate
+
+    # [NUEVO] Face presence preflight (/score, /score/upload, /jobs, /score/batch): reject faceless videos before the ensemble
+    'face_preflight_enabled': os.getenv('FACE_PREFLIGHT_ENABLED', 'true').lower() == 'true',
+    'face_preflight_detector': os.getenv('FACE_PREFLIGHT_DETECTOR', 'haar'),  # haar | yunet | opencv_dnn
+    'face_preflight_detector_path': os.getenv('FACE_PREFLIGHT_DETECTOR_PATH'),  # None = bundled Haar cascade
+    'face_preflight_samples': int(os.getenv('FACE_PREFLIGHT_SAMPLES', '5')),
+    'face_preflight_max_side': int(os.getenv('FACE_PREFLIGHT_MAX_SIDE', '320')),
+    'face_preflight_budget_ms': float(os.getenv('FACE_PREFLIGHT_BUDGET_MS', '200')),
+
     # [NUEVO] Ensemble weights (updated for 4 detectors)
     'ensemble_weight_syncnet': float(os.getenv('ENSEMBLE_WEIGHT_SYNCNET', '0.0')),
     'ensemble_weight_efficientnet': float(os.getenv('ENSEMBLE_WEIGHT_EFFICIENTNET', '0.0')),
     'ensemble_weight_vit': float(os.getenv('ENSEMBLE_WEIGHT_VIT', '0.0')),
     'ensemble_weight_efficientnetv2': float(os.getenv('ENSEMBLE_WEIGHT_EFFICIENTNETV2', '1.0')),
+    'ensemble_weight_avsync': float(os.getenv('ENSEMBLE_WEIGHT_AVSYNC', '0.0')),
+
+    # [NUEVO] Startup warm-up (/readyz turns 200 once done)
+    'warmup_on_start': os.getenv('WARMUP_ON_START', 'true').lower() == 'true',
+    'warmup_batch_sizes': [
+        int(size) for size in os.getenv('WARMUP_BATCH_SIZES', '1,20').split(',') if size.strip()
+    ],
+
+    # [NUEVO] Random-weight detectors (load testing only: no downloads, meaningless scores)
+    'detectors_random_weights': os.getenv('DETECTORS_RANDOM_WEIGHTS', 'false').lower() == 'true',
+
+    # [NUEVO] Async job API
+    # Cross-request micro-batches need > 1 analysis per process: default 2 with INFERENCE_BATCHING
+    'job_workers': int(os.getenv('JOB_WORKERS') or (
+        '2' if os.getenv('INFERENCE_BATCHING', 'true').lower() == 'true' else '1'
+    )),
+    'job_max_pending': int(os.getenv('JOB_MAX_PENDING', '4')),
+    'job_ttl_seconds': int(os.getenv('JOB_TTL_SECONDS', '900')),
+    'job_store_dir': os.getenv('JOB_STORE_DIR', str(BASE_DIR / 'tmp' / 'jobs')),
+    'score_wait_timeout': int(os.getenv('SCORE_WAIT_TIMEOUT_SECONDS', '110')),  # < gunicorn timeout
+
+    # [NUEVO] Dynamic micro-batching (shared forward passes across in-flight requests)
+    'inference_batching': os.getenv('INFERENCE_BATCHING', 'true').lower() == 'true',
+    'inference_max_batch_size': int(os.getenv('INFERENCE_MAX_BATCH_SIZE', '32')),
+    'inference_max_wait_ms': float(os.getenv('INFERENCE_MAX_WAIT_MS', '5')),
+
+    # [NUEVO] Streaming uploads (tmpfs spool by default)
+    'upload_spool_dir': os.getenv(
+        'UPLOAD_SPOOL_DIR',
+        default_spool_dir(str(BASE_DIR / 'tmp' / 'uploads'))
+    ),
+
+    # [NUEVO] Per-request scratch spaces: tmpfs when it fits the quota, LRU eviction of kept spaces
+    'scratch_quota_mb': int(os.getenv('SCRATCH_QUOTA_MB', '1024')),
+    'scratch_dir': os.getenv('SCRATCH_DIR') or default_scratch_root(
+        str(BASE_DIR / 'tmp' / 'scratch'),
+        int(os.getenv('SCRATCH_QUOTA_MB', '1024')) * 1024 * 1024
+    ),
+    'scratch_max_age_seconds': int(os.getenv('SCRATCH_MAX_AGE_SECONDS', '900')),
+    'scratch_keep_on_error': os.getenv('SCRATCH_KEEP_ON_ERROR', 'false').lower() == 'true',
+
+    # [NUEVO] Live incremental scoring (/stream WebSocket)
+    'stream_frame_stride': int(os.getenv('STREAM_FRAME_STRIDE', '3')),
+    'stream_update_every': int(os.getenv('STREAM_UPDATE_EVERY', '5')),
+    'stream_window_frames': int(os.getenv('STREAM_WINDOW_FRAMES', '30')),
+    'stream_min_frames': int(os.getenv('STREAM_MIN_FRAMES', '10')),
+    'stream_stable_updates': int(os.getenv('STREAM_STABLE_UPDATES', '3')),
+    'stream_max_frames': int(os.getenv('STREAM_MAX_FRAMES', '300')),
+    'stream_idle_timeout': int(os.getenv('STREAM_IDLE_TIMEOUT_SECONDS', '10')),
+
+    # [NUEVO] Batch scoring (/score/batch)
+    'batch_max_items': int(os.getenv('BATCH_MAX_ITEMS', '100')),
+    'batch_concurrency': int(os.getenv('BATCH_CONCURRENCY', '4')),
+
+    # [NUEVO] Per-request profiling (X-Profile header or sampling rate)
+    'profile_sample_rate': float(os.getenv('PROFILE_SAMPLE_RATE', '0.0')),
+    'profile_dir': os.getenv('PROFILE_DIR', str(BASE_DIR / 'tmp' / 'profiles')),
+    'profile_max_files': int(os.getenv('PROFILE_MAX_FILES', '50')),
+    'profile_interval_ms': float(os.getenv('PROFILE_INTERVAL_MS', '5')),
+
+    # [NUEVO] /metrics across gunicorn workers (set by gunicorn_config.py when workers > 1; '' = this process only)
+    'metrics_multiproc_dir': os.getenv('METRICS_MULTIPROC_DIR', ''),
+    'metrics_flush_interval': float(os.getenv('METRICS_FLUSH_INTERVAL_SECONDS', '5')),
 }
 
+# [NUEVO] Share this worker's metrics with the others (gunicorn multi-worker)
+metrics_collector = None
+if CONFIG['metrics_multiproc_dir']:
+    metrics_collector = MultiprocessCollector(
+        REGISTRY, CONFIG['metrics_multiproc_dir'], interval=CONFIG['metrics_flush_interval']
+    )
+    metrics_collector.start()
+
+# Bound WebSocket messages (one JPEG frame or audio chunk each)
+app.config['SOCK_SERVER_OPTIONS'] = {'max_message_size': 2 * 1024 * 1024}
+
+# Multipart parts are spooled with the same limits as raw uploads
+StreamingUploadRequest.spool_dir = CONFIG['upload_spool_dir']
+StreamingUploadRequest.max_upload_bytes = CONFIG['max_video_size_mb'] * 1024 * 1024
+
 # [NUEVO] Initialize Ensemble Orchestrator (lazy loading)
 ensemble_orchestrator = None
+_ensemble_lock = threading.Lock()
+
+# Detector construction time (ms), reported by /readyz and benchmarks/startup_profile.py
+model_load_ms = {}
+
+
+def _enabled_detector_class(name: str):
+    """Import a detector class only if it is enabled in CONFIG (None otherwise)"""
+    if not CONFIG[f'{name}_enabled']:
+        return None
+    return detector_registry.load_detector_class(name)
+
+
+@contextmanager
+def _timed_model_load(name: str):
+    start = time.perf_counter()
+    yield
+    model_load_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def _syncnet_face_detector_options() -> dict:
+    """SyncNet engine face detector backend (S3FD keeps DETECTOR_PATH)"""
+    backend = CONFIG['syncnet_face_detector']
+    if backend == 's3fd':
+        return {'detector_backend': backend}
+    if not CONFIG['syncnet_face_detector_path']:
+        raise ValueError(f"SYNCNET_FACE_DETECTOR={backend} requires SYNCNET_FACE_DETECTOR_PATH")
+    return {
+        'detector_backend': backend,
+        'detector_path': CONFIG['syncnet_face_detector_path'],
+        'detector_config_path': CONFIG['syncnet_face_detector_config'],
+    }
+
 
 def get_ensemble():
     """Lazy initialization of Ensemble Orchestrator"""
     global ensemble_orchestrator
 
     if ensemble_orchestrator is None:
-        try:
-            logger.info("[App] Initializing Ensemble Orchestrator...")
-
-            # Initialize SyncNet (if enabled)
-            syncnet = None
-            if CONFIG['syncnet_enabled'] and SYNCNET_AVAILABLE:
-                syncnet = SyncNetWrapper(
-                    model_path=CONFIG['model_path'],
-                    detector_path=CONFIG['detector_path'],
-                    tmp_dir=CONFIG['tmp_dir']
-                )
-                logger.info("[App] SyncNet initialized ✓")
-            else:
-                logger.info("[App] SyncNet disabled or not available ✗")
-
-            # Initialize EfficientNet (if enabled)
-            efficientnet = None
-            if CONFIG['efficientnet_enabled'] and ENSEMBLE_AVAILABLE:
-                efficientnet = EfficientNetDetector(
-                    model_path=CONFIG['efficientnet_model_path'],
-                    device=CONFIG['efficientnet_device']
+        # Warm-up thread and first request may race; build the models once
+        with _ensemble_lock:
+            if ensemble_orchestrator is not None:
+                return ensemble_orchestrator
+
+            try:
+                logger.info("[App] Initializing Ensemble Orchestrator...")
+
+                # Initialize SyncNet (if enabled)
+                syncnet = None
+                SyncNetWrapper = _enabled_detector_class('syncnet')
+                if SyncNetWrapper is not None:
+                    with _timed_model_load('syncnet'):
+                        syncnet = SyncNetWrapper(
+                            model_path=CONFIG['model_path'],
+                            detector_path=CONFIG['detector_path'],
+                            tmp_dir=CONFIG['tmp_dir'],
+                            scratch=get_scratch_manager(),
+                            min_speech_coverage=CONFIG['syncnet_min_speech_coverage'],
+                            engine=CONFIG['syncnet_engine'],
+                            device=CONFIG['syncnet_device'],
+                            engine_options={
+                                **_syncnet_face_detector_options(),
+                                'detect_stride': CONFIG['syncnet_detect_stride'],
+                                'detect_scale': CONFIG['syncnet_detect_scale'],
+                                'vshift': CONFIG['syncnet_vshift'],
+                                'max_vshift': CONFIG['syncnet_max_vshift'],
+                                'early_stop_confidence': CONFIG['syncnet_early_stop_confidence'],
+                                'fast_mode': CONFIG['syncnet_fast_mode'],
+                                'debug_crops_dir': CONFIG['syncnet_debug_crops_dir'],
+                            }
+                        )
+                    logger.info("[App] SyncNet initialized ✓")
+                else:
+                    logger.info("[App] SyncNet disabled or not available ✗")
+
+                random_weights = CONFIG['detectors_random_weights']
+                if random_weights:
+                    logger.warning("[App] DETECTORS_RANDOM_WEIGHTS=true - scores are meaningless (load testing only)")
+
+                # Initialize EfficientNet (if enabled)
+                efficientnet = None
+                EfficientNetDetector = _enabled_detector_class('efficientnet')
+                if EfficientNetDetector is not None:
+                    with _timed_model_load('efficientnet'):
+                        efficientnet = EfficientNetDetector(
+                            model_path=None if random_weights else CONFIG['efficientnet_model_path'],
+                            device=CONFIG['efficientnet_device'],
+                            use_pretrained=not random_weights
+                        )
+                    logger.info("[App] EfficientNet initialized ✓")
+                else:
+                    logger.info("[App] EfficientNet disabled or not available ✗")
+
+                # Initialize ViT v2 (if enabled)
+                vit = None
+                ViTDetector = _enabled_detector_class('vit')
+                if ViTDetector is not None:
+                    logger.info("[App] Initializing ViT v2 (this may take a moment to download the model)...")
+                    with _timed_model_load('vit'):
+                        vit = ViTDetector(
+                            model_name=CONFIG['vit_model_name'],
+                            device=CONFIG['vit_device'],
+                            use_pretrained=not random_weights
+                        )
+                    logger.info("[App] ViT v2 initialized ✓")
+                else:
+                    logger.info("[App] ViT v2 disabled or not available ✗")
+
+                # Initialize EfficientNetV2-B2 (if enabled)
+                efficientnetv2 = None
+                EfficientNetV2Detector = _enabled_detector_class('efficientnetv2')
+                if EfficientNetV2Detector is not None:
+                    logger.info("[App] Initializing EfficientNetV2-B2 (downloading pretrained model if needed)...")
+                    with _timed_model_load('efficientnetv2'):
+                        efficientnetv2 = EfficientNetV2Detector(
+                            model_path=None if random_weights else CONFIG['efficientnetv2_model_path'],
+                            device=CONFIG['efficientnetv2_device'],
+                            use_pretrained=not random_weights  # Use ImageNet pretrained if no fine-tuned model
+                        )
+                    logger.info("[App] EfficientNetV2-B2 initialized ✓")
+                else:
+                    logger.info("[App] EfficientNetV2-B2 disabled or not available ✗")
+
+                # Initialize AV sync pre-detector (if enabled)
+                avsync = None
+                AVSyncDetector = _enabled_detector_class('avsync')
+                if AVSyncDetector is not None:
+                    backend = CONFIG['avsync_face_detector']
+                    with _timed_model_load('avsync'):
+                        avsync = AVSyncDetector(
+                            max_seconds=CONFIG['avsync_max_seconds'],
+                            min_speech_coverage=CONFIG['avsync_min_speech_coverage'],
+                            face_detector_backend=backend,
+                            face_detector_path=None if backend == 'haar' else CONFIG['syncnet_face_detector_path'],
+                            face_detector_config=CONFIG['syncnet_face_detector_config']
+                        )
+                    logger.info("[App] AV Sync initialized ✓")
+                else:
+                    logger.info("[App] AV Sync disabled or not available ✗")
+
+                # Share forward passes across concurrent requests (per-model inference server)
+                if CONFIG['inference_batching']:
+                    for detector in (efficientnet, vit, efficientnetv2):
+                        if detector is not None:
+                            detector.enable_batching(
+                                max_batch_size=CONFIG['inference_max_batch_size'],
+                                max_wait_ms=CONFIG['inference_max_wait_ms']
+                            )
+                    logger.info("[App] Dynamic micro-batching enabled ✓")
+
+                # Create orchestrator with all 4 detectors
+                ensemble_orchestrator = EnsembleOrchestrator(
+                    syncnet_wrapper=syncnet,
+                    efficientnet_detector=efficientnet,
+                    vit_detector=vit,
+                    efficientnetv2_detector=efficientnetv2,
+                    avsync_detector=avsync,
+                    weights={
+                        'syncnet': CONFIG['ensemble_weight_syncnet'],
+                        'efficientnet': CONFIG['ensemble_weight_efficientnet'],
+                        'vit': CONFIG['ensemble_weight_vit'],
+                        'efficientnetv2': CONFIG['ensemble_weight_efficientnetv2'],
+                        'avsync': CONFIG['ensemble_weight_avsync']
+                    }
                 )
-                logger.info("[App] EfficientNet initialized ✓")
-            else:
-                logger.info("[App] EfficientNet disabled or not available ✗")
-
-            # Initialize ViT v2 (if enabled)
-            vit = None
-            if CONFIG['vit_enabled'] and VIT_AVAILABLE:
-                logger.info("[App] Initializing ViT v2 (this may take a moment to download the model)...")
-                vit = ViTDetector(
-                    model_name=CONFIG['vit_model_name'],
-                    device=CONFIG['vit_device']
+
+                # Export loaded model memory (parameters + buffers)
+                for name, detector in (
+                    ('efficientnet', efficientnet),
+                    ('vit', vit),
+                    ('efficientnetv2', efficientnetv2)
+                ):
+                    if detector is not None:
+                        MODEL_MEMORY_BYTES.labels(detector=name).set(_model_memory_bytes(detector.model))
+
+                logger.info("[App] Ensemble Orchestrator initialized successfully")
+
+            except Exception as e:
+                logger.error(f"[App] Failed to initialize Ensemble: {str(e)}")
+                return None
+
+    return ensemble_orchestrator
+
+
+# [NUEVO] Warm-up / readiness state (per worker process)
+warmup_state = {
+    'status': 'pending',  # pending | warming_up | ready | failed
+    'warmup_ms': None,
+    'model_load_ms': {},
+    'detectors_ms': {},
+    'error': None,
+}
+_warmup_thread = None
+
+
+def run_warmup():
+    """Build every enabled detector and run dummy batches at production shapes"""
+    warmup_state['status'] = 'warming_up'
+    start = time.perf_counter()
+
+    ensemble = get_ensemble()
+    warmup_state['model_load_ms'] = dict(model_load_ms)
+    if ensemble is None:
+        warmup_state.update(status='failed', error='Ensemble failed to initialize (see logs)')
+        return
+
+    try:
+        warmup_state['detectors_ms'] = ensemble.warmup(CONFIG['warmup_batch_sizes'])
+        get_face_preflight()  # first /score should not pay the face detector import
+    except Exception as e:
+        logger.error(f"[App] Warm-up failed: {e}", exc_info=True)
+        warmup_state.update(status='failed', error=str(e))
+        return
+
+    warmup_state.update(status='ready', warmup_ms=int((time.perf_counter() - start) * 1000))
+    logger.info(f"[App] Worker ready (warm-up {warmup_state['warmup_ms']} ms)")
+
+
+def start_warmup():
+    """Run the warm-up in a background thread so /livez answers immediately"""
+    global _warmup_thread
+
+    if _warmup_thread is None:
+        _warmup_thread = threading.Thread(target=run_warmup, name='warmup', daemon=True)
+        _warmup_thread.start()
+
+    return _warmup_thread
+
+
+# [NUEVO] Initialize Scratch Manager (lazy loading)
+scratch_manager = None
+
+def get_scratch_manager():
+    """Lazy initialization of the per-request scratch space manager"""
+    global scratch_manager
+
+    if scratch_manager is None:
+        scratch_manager = ScratchManager(
+            CONFIG['scratch_dir'],
+            quota_bytes=CONFIG['scratch_quota_mb'] * 1024 * 1024,
+            max_age_seconds=CONFIG['scratch_max_age_seconds'],
+            keep_on_error=CONFIG['scratch_keep_on_error']
+        )
+
+    return scratch_manager
+
+
+# [NUEVO] Initialize Face Presence Preflight (lazy loading; False = unavailable)
+face_preflight = None
+
+def get_face_preflight():
+    """Lazy initialization of the face presence check (None when disabled or unavailable)"""
+    global face_preflight
+
+    if face_preflight is None:
+        if not CONFIG['face_preflight_enabled']:
+            face_preflight = False
+        else:
+            try:
+                from ensemble.preflight import build_face_presence_check  # cv2, only when enabled
+                face_preflight = build_face_presence_check(
+                    CONFIG['face_preflight_detector'],
+                    CONFIG['face_preflight_detector_path'],
+                    num_samples=CONFIG['face_preflight_samples'],
+                    max_side=CONFIG['face_preflight_max_side'],
+                    time_budget_ms=CONFIG['face_preflight_budget_ms']
                 )
-                logger.info("[App] ViT v2 initialized ✓")
+                logger.info(f"[App] Face preflight initialized ({CONFIG['face_preflight_detector']}) ✓")
+            except Exception as e:
+                logger.warning(f"[App] Face preflight unavailable, requests go straight to the ensemble: {e}")
+                face_preflight = False
+
+    return face_preflight or None
+
+
+# [NUEVO] Initialize Job Manager (lazy loading)
+job_manager = None
+
+def get_job_manager():
+    """Lazy initialization of the background Job Manager"""
+    global job_manager
+
+    if job_manager is None:
+        job_manager = JobManager(
+            store_dir=CONFIG['job_store_dir'],
+            max_workers=CONFIG['job_workers'],
+            max_pending=CONFIG['job_max_pending'],
+            ttl_seconds=CONFIG['job_ttl_seconds']
+        )
+
+    return job_manager
+
+
+# [NUEVO] Job slots shared by every /score/batch request (lazy loading)
+batch_slots = None
+_batch_slots_lock = threading.Lock()
+
+def get_batch_slots():
+    """
+    Semaphore of JOB_MAX_PENDING - 1 job slots for all batches together, so
+    concurrent batches never take the last slot /score needs
+    """
+    global batch_slots
+
+    with _batch_slots_lock:
+        if batch_slots is None:
+            batch_slots = threading.BoundedSemaphore(max(1, CONFIG['job_max_pending'] - 1))
+
+    return batch_slots
+
+
+def _model_memory_bytes(model) -> int:
+    """Bytes held by a torch model's parameters and buffers"""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def _get_demo_result():
+    """Demo result returned when the Ensemble could not be initialized"""
+    DEMO_FALLBACKS.labels(source='app').inc()
+    return {
+        'offset_frames': 2,
+        'confidence': 9.5,
+        'min_dist': 5.8,
+        'score': 0.88,
+        'combined_score': 0.88,
+        'lag_ms': 80.0,
+        'decision': 'ALLOW',
+        'processing_time_ms': 1000,
+        'demo_mode': True,
+        'debug': {
+            'message': 'Ensemble not initialized - demo mode active'
+        }
+    }
+
+
+def _parse_score_request():
+    """
+    Parse and validate a /score-style JSON body
+
+    Returns:
+        (params, None) on success, (None, (response, status)) on error
+    """
+    data = request.get_json(silent=True)
+
+    if not data:
+        return None, (jsonify({'error': 'Request body must be JSON'}), 400)
+
+    video_path = data.get('video_path')
+    session_id = data.get('session_id', 'unknown')
+
+    # Validate
+    if not video_path:
+        return None, (jsonify({'error': 'video_path is required'}), 400)
+
+    if not os.path.exists(video_path):
+        return None, (jsonify({'error': f'Video file not found: {video_path}'}), 404)
+
+    # Check file size
+    file_size_mb = os.path.getsize(video_path) / (1024 * 1024)
+    if file_size_mb > CONFIG['max_video_size_mb']:
+        return None, (jsonify({
+            'error': f'Video file too large: {file_size_mb:.2f} MB (max: {CONFIG["max_video_size_mb"]} MB)'
+        }), 400)
+
+    return {
+        'video_path': video_path,
+        'session_id': session_id,
+        'file_size_mb': file_size_mb,
+    }, None
+
+
+def _face_preflight(video_path: str, session_id: str, extra_fields: Optional[dict] = None):
+    """
+    Run the face presence check before the ensemble
+
+    Returns:
+        None to continue, or (response, 422) for a video without a visible face
+        / that cannot be decoded. Errors in the check itself let the request through.
+    """
+    rejection = _preflight_rejection(video_path, session_id)
+    if rejection is None:
+        return None
+    return jsonify({**rejection, **(extra_fields or {})}), 422
+
+
+def _preflight_rejection(video_path: str, session_id: str) -> Optional[dict]:
+    """Face presence check shared by /score, /jobs and /score/batch: None to continue, else the rejection"""
+    check = get_face_preflight()
+    if check is None:
+        return None
+
+    try:
+        with STAGE_SECONDS.labels(stage='preflight').time():
+            result = check.check(video_path)
+    except Exception as e:
+        logger.warning(f'[{session_id}] Face preflight failed, skipping: {e}')
+        return None
+
+    if result['passed']:
+        return None
+
+    PREFLIGHT_REJECTIONS.labels(reason=result['reason']).inc()
+    logger.info(f'[{session_id}] Rejected by face preflight: {result}')
+    return {
+        'error': 'No face detected' if result['reason'] == 'no_face' else 'Video could not be decoded',
+        'reason': result['reason'],
+        'session_id': session_id,
+        'preflight': result,
+    }
+
+
+def _profile_mode() -> Optional[str]:
+    """Profiling mode for the current request (X-Profile header or sampling)"""
+    return choose_profile_mode(request.headers.get('X-Profile'), CONFIG['profile_sample_rate'])
+
+
+def _submit_score_job(
+    ensemble,
+    video_path: str,
+    session_id: str,
+    scratch: Optional[ScratchSpace] = None,
+    profile_mode: Optional[str] = None,
+    deadline: Optional[Deadline] = None
+) -> str:
+    """
+    Schedule ensemble.analyze_video on the background executor
+
+    scratch (the upload's per-request space) is released when the job
+    finishes, whether it succeeds, fails or times out.
+    With profile_mode the job runs inside a ProfileCapture and the result
+    gets a "profile" field (artifact paths + stage timing tree).
+    deadline bounds the analysis (default: processing_timeout from job start);
+    detectors that do not finish in time are reported in a partial result.
+    """
+    def analyze(report_partial):
+        return ensemble.analyze_video(
+            video_path,
+            session_id,
+            progress_callback=report_partial,
+            deadline=deadline or Deadline(CONFIG['processing_timeout'])
+        )
+
+    def run(report_partial):
+        start_time = time.time()
+        capture = None
+        error = None
+        try:
+            if profile_mode is None:
+                result = analyze(report_partial)
             else:
-                logger.info("[App] ViT v2 disabled or not available ✗")
-
-            # Initialize EfficientNetV2-B2 (if enabled)
-            efficientnetv2 = None
-            if CONFIG['efficientnetv2_enabled'] and EFFICIENTNETV2_AVAILABLE:
-                logger.info("[App] Initializing EfficientNetV2-B2 (downloading pretrained model if needed)...")
-                efficientnetv2 = EfficientNetV2Detector(
-                    model_path=CONFIG['efficientnetv2_model_path'],
-                    device=CONFIG['efficientnetv2_device'],
-                    use_pretrained=True  # Use ImageNet pretrained if no fine-tuned model
+                capture = ProfileCapture(
+                    profile_mode,
+                    CONFIG['profile_dir'],
+                    max_profiles=CONFIG['profile_max_files'],
+                    interval_ms=CONFIG['profile_interval_ms']
                 )
-                logger.info("[App] EfficientNetV2-B2 initialized ✓")
-            else:
-                logger.info("[App] EfficientNetV2-B2 disabled or not available ✗")
-
-            # Create orchestrator with all 4 detectors
-            ensemble_orchestrator = EnsembleOrchestrator(
-                syncnet_wrapper=syncnet,
-                efficientnet_detector=efficientnet,
-                vit_detector=vit,
-                efficientnetv2_detector=efficientnetv2,
-                weights={
-                    'syncnet': CONFIG['ensemble_weight_syncnet'],
-                    'efficientnet': CONFIG['ensemble_weight_efficientnet'],
-                    'vit': CONFIG['ensemble_weight_vit'],
-                    'efficientnetv2': CONFIG['ensemble_weight_efficientnetv2']
-                }
-            )
+                with capture:
+                    result = analyze(report_partial)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if scratch is not None:
+                scratch.release(release_outcome(error))
+        result['processing_time_ms'] = int((time.time() - start_time) * 1000)
+        if capture is not None:
+            result['profile'] = capture.summary()
+            logger.info(f'[{session_id}] Profile stored: {capture.profile_id} ({profile_mode})')
+        return result
+
+    return get_job_manager().submit(run, metadata={
+        'session_id': session_id,
+        'video_path': video_path,
+    })
 
-            logger.info("[App] Ensemble Orchestrator initialized successfully")
 
-        except Exception as e:
-            logger.error(f"[App] Failed to initialize Ensemble: {str(e)}")
-            return None
+def _score_and_respond(
+    ensemble,
+    video_path: str,
+    session_id: str,
+    start_time: float,
+    scratch: Optional[ScratchSpace] = None,
+    extra_fields: Optional[dict] = None
+):
+    """
+    Submit a scoring job, wait up to score_wait_timeout and build the response
 
-    return ensemble_orchestrator
+    The job's deadline (processing_timeout) starts at submission, so time spent
+    queued counts. A client that disconnects cancels the job (499); a job that
+    produced no result in time answers 408.
+    """
+    deadline = Deadline(CONFIG['processing_timeout'])
+    try:
+        job_id = _submit_score_job(
+            ensemble, video_path, session_id, scratch, profile_mode=_profile_mode(), deadline=deadline
+        )
+    except JobQueueFull as e:
+        if scratch is not None:
+            scratch.release('error')
+        logger.warning(f'[{session_id}] {e}')
+        return jsonify({
+            'error': 'Service busy',
+            'message': str(e)
+        }), 503, {'Retry-After': '5'}
+
+    try:
+        result = _wait_for_job(job_id, deadline, request.environ)
+    except DeadlineExceeded as e:
+        logger.warning(f'[{session_id}] {e}')
+        if e.reason == 'client_disconnected':
+            return jsonify({'error': 'Client disconnected', 'job_id': job_id}), 499
+        return jsonify({
+            'error': 'Processing timeout',
+            'message': f'No detector finished within {CONFIG["processing_timeout"]}s',
+            'reason': e.reason,
+            'job_id': job_id
+        }), 408
+    except TimeoutError:
+        logger.error(f'[{session_id}] Processing timeout')
+        return jsonify({
+            'error': 'Processing timeout',
+            'message': f'Video processing exceeded {CONFIG["score_wait_timeout"]}s limit',
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}'
+        }), 408
+
+    processing_time_ms = int((time.time() - start_time) * 1000)
+    result['processing_time_ms'] = processing_time_ms
+    if extra_fields:
+        result.update(extra_fields)
+
+    logger.info(
+        f'[{session_id}] Result: score={result["combined_score"]:.3f}, '
+        f'decision={result["decision"]}, time={processing_time_ms}ms'
+    )
+
+    return jsonify(result)
+
+
+def _wait_for_job(job_id: str, deadline: Deadline, environ: Optional[dict] = None) -> dict:
+    """
+    JobManager.wait up to score_wait_timeout, cancelling the job's deadline as
+    soon as the client disconnects (raises DeadlineExceeded, reason client_disconnected)
+
+    environ is the WSGI environ of the waiting request (None: no disconnect check)
+    """
+    jm = get_job_manager()
+    give_up_at = time.monotonic() + CONFIG['score_wait_timeout']
+
+    while True:
+        try:
+            return jm.wait(job_id, timeout=min(0.5, max(0.0, give_up_at - time.monotonic())))
+        except TimeoutError:
+            if jm.done(job_id):
+                raise   # raised by the job itself (e.g. DeadlineExceeded), not the wait
+            if environ is not None and client_disconnected(environ):
+                deadline.cancel('client_disconnected')
+                raise DeadlineExceeded(f'Job {job_id} cancelled: client disconnected', 'client_disconnected')
+            if time.monotonic() >= give_up_at:
+                raise
+
+
+# Endpoints counted in the inflight_requests gauge
+SCORING_ENDPOINTS = {'score_video', 'score_upload', 'score_batch'}
+
+
+@app.before_request
+def _track_inflight_start():
+    if request.endpoint in SCORING_ENDPOINTS:
+        INFLIGHT_REQUESTS.inc()
+
+
+@app.teardown_request
+def _track_inflight_end(error=None):
+    if request.endpoint in SCORING_ENDPOINTS:
+        INFLIGHT_REQUESTS.dec()
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus metrics (text exposition format)
+
+    With METRICS_MULTIPROC_DIR (gunicorn with several workers) counters and
+    histograms are summed over every worker, including exited ones, and gauges
+    get a `pid` label; without it, only the worker that answered is reported
+    """
+    if metrics_collector is not None:
+        return Response(metrics_collector.render(), mimetype='text/plain; version=0.0.4')
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/livez', methods=['GET'])
+def livez():
+    """Liveness probe: the process answers HTTP (no model access)"""
+    return jsonify({'status': 'alive'})
+
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness probe: 200 only after models are built and warmed up
+
+    Response JSON:
+    {
+        "status": "pending" | "warming_up" | "ready" | "failed",
+        "warmup_ms": 8421,
+        "model_load_ms": {"efficientnetv2": 6120.4},
+        "detectors_ms": {"efficientnetv2": 950.2},
+        "error": null
+    }
+    """
+    status_code = 200 if warmup_state['status'] == 'ready' else 503
+    return jsonify(warmup_state), status_code
 
 
 @app.route('/health', methods=['GET'])
@@ -189,28 +856,35 @@ def health():
         'detectors': {
             'syncnet': {
                 'enabled': CONFIG['syncnet_enabled'],
-                'available': SYNCNET_AVAILABLE and CONFIG['syncnet_enabled']
+                'available': CONFIG['syncnet_enabled'] and detector_registry.is_available('syncnet')
             },
             'efficientnet_b0': {
                 'enabled': CONFIG['efficientnet_enabled'],
-                'available': CONFIG['efficientnet_enabled'] and ENSEMBLE_AVAILABLE
+                'available': CONFIG['efficientnet_enabled'] and detector_registry.is_available('efficientnet')
             },
             'vit_v2': {
                 'enabled': CONFIG['vit_enabled'],
-                'available': CONFIG['vit_enabled'] and VIT_AVAILABLE,
+                'available': CONFIG['vit_enabled'] and detector_registry.is_available('vit'),
                 'model': CONFIG['vit_model_name']
             },
             'efficientnetv2_b2': {
                 'enabled': CONFIG['efficientnetv2_enabled'],
-                'available': CONFIG['efficientnetv2_enabled'] and EFFICIENTNETV2_AVAILABLE,
+                'available': CONFIG['efficientnetv2_enabled'] and detector_registry.is_available('efficientnetv2'),
                 'model': 'tf_efficientnetv2_b2'
+            },
+            'avsync': {
+                'enabled': CONFIG['avsync_enabled'],
+                'available': CONFIG['avsync_enabled'] and detector_registry.is_available('avsync'),
+                'face_detector': CONFIG['avsync_face_detector']
             }
         },
         'ensemble_available': ensemble is not None,
+        'readiness': warmup_state['status'],
         'config': {
             'max_video_size_mb': CONFIG['max_video_size_mb'],
             'processing_timeout': CONFIG['processing_timeout'],
             'efficientnet_max_frames': CONFIG['efficientnet_max_frames'],
+            'face_preflight': CONFIG['face_preflight_enabled'],
         }
     })
 
@@ -229,35 +903,33 @@ def score_video():
         "session_id": "sess_xyz"
     }
 
+    Optional header `X-Profile: 1 | sampling | pstats` adds a "profile"
+    field (stage timing tree + artifact paths under PROFILE_DIR)
+
     Response JSON: Compatible con anterior + nuevos campos
+
+    422 {"error", "reason": "no_face" | "unreadable", "preflight": {...}} when the
+    face presence preflight finds no face in the sampled frames
+
+    Detectors that do not finish within PROCESSING_TIMEOUT_SECONDS are left out
+    ("partial": true, "incomplete_detectors"); 408 when none finished
     """
     start_time = time.time()
 
     try:
-        # Parse request
-        data = request.get_json()
-
-        if not data:
-            return jsonify({'error': 'Request body must be JSON'}), 400
-
-        video_path = data.get('video_path')
-        session_id = data.get('session_id', 'unknown')
-
-        # Validate
-        if not video_path:
-            return jsonify({'error': 'video_path is required'}), 400
+        params, error_response = _parse_score_request()
+        if error_response:
+            return error_response
 
-        if not os.path.exists(video_path):
-            return jsonify({'error': f'Video file not found: {video_path}'}), 404
+        video_path = params['video_path']
+        session_id = params['session_id']
 
-        # Check file size
-        file_size_mb = os.path.getsize(video_path) / (1024 * 1024)
-        if file_size_mb > CONFIG['max_video_size_mb']:
-            return jsonify({
-                'error': f'Video file too large: {file_size_mb:.2f} MB (max: {CONFIG["max_video_size_mb"]} MB)'
-            }), 400
+        logger.info(f'[{session_id}] Processing video: {video_path} ({params["file_size_mb"]:.2f} MB)')
 
-        logger.info(f'[{session_id}] Processing video: {video_path} ({file_size_mb:.2f} MB)')
+        # [NUEVO] Reject faceless / undecodable videos before touching the ensemble
+        rejection = _face_preflight(video_path, session_id)
+        if rejection:
+            return rejection
 
         # [MODIFICADO] Get Ensemble Orchestrator
         ensemble = get_ensemble()
@@ -265,44 +937,117 @@ def score_video():
         if ensemble is None:
             # [FALLBACK] Demo mode
             logger.warning(f'[{session_id}] Ensemble not available - returning demo data')
-            return jsonify({
-                'offset_frames': 2,
-                'confidence': 9.5,
-                'min_dist': 5.8,
-                'score': 0.88,
-                'combined_score': 0.88,
-                'lag_ms': 80.0,
-                'decision': 'ALLOW',
-                'processing_time_ms': 1000,
-                'demo_mode': True,
-                'debug': {
-                    'message': 'Ensemble not initialized - demo mode active'
-                }
-            })
-
-        # [NUEVO] Process video with Ensemble
+            return jsonify(_get_demo_result())
+
+        # [MODIFICADO] Run on the job executor and wait (thin wrapper over /jobs)
+        return _score_and_respond(ensemble, video_path, session_id, start_time)
+
+    except Exception as e:
+        logger.error(f'Error processing video: {str(e)}', exc_info=True)
+        return jsonify({
+            'error': 'Internal server error',
+            'message': str(e),
+            'type': type(e).__name__
+        }), 500
+
+
+@app.route('/score/upload', methods=['POST'])
+def score_upload():
+    """
+    Analyze a video sent in the request body (no shared filesystem needed)
+
+    Accepts either:
+    - multipart/form-data with a `video` file part (+ optional `session_id` field)
+    - raw body (video/webm, video/mp4, application/octet-stream) with the
+      session id in `?session_id=` or the `X-Session-Id` header
+
+    The body is streamed into the request's own scratch space (tmpfs when it
+    fits SCRATCH_QUOTA_MB) while its sha256 and size are computed; uploads over
+    max_video_size_mb are rejected with 413 as soon as the limit is crossed.
+    The scratch space is removed when scoring finishes, fails or is rejected.
+
+    Response JSON: same as /score + "upload": {"sha256", "size_bytes"}
+    """
+    start_time = time.time()
+    max_bytes = CONFIG['max_video_size_mb'] * 1024 * 1024
+
+    try:
+        scratch = get_scratch_manager().allocate('upload')
+    except ScratchQuotaExceeded as e:
+        logger.warning(f'[Scratch] {e}')
+        return jsonify({'error': 'Service busy', 'message': str(e)}), 503, {'Retry-After': '5'}
+
+    try:
+        mimetype = request.mimetype or ''
+        # Multipart file parts are spooled straight into this request's scratch space
+        request.spool_dir = str(scratch.path)
+        request.max_upload_bytes = max_bytes
+
         try:
-            result = ensemble.analyze_video(video_path, session_id)
+            if mimetype == 'multipart/form-data':
+                video = request.files.get('video')
+                # Discard any other spooled file parts
+                for name, storage in request.files.items(multi=True):
+                    if storage is not video:
+                        storage.stream.discard()
+                if video is None:
+                    scratch.release('error')
+                    return jsonify({'error': 'video file part is required'}), 400
+                spool = video.stream
+                spool.finish()
+                session_id = request.form.get('session_id', 'unknown')
+            else:
+                if request.content_length and request.content_length > max_bytes:
+                    raise UploadTooLarge(
+                        f'Video file too large: {request.content_length / (1024 * 1024):.2f} MB '
+                        f'(max: {CONFIG["max_video_size_mb"]} MB)'
+                    )
+                spool = spool_stream(
+                    request.stream,
+                    str(scratch.path),
+                    max_bytes,
+                    suffix_for(mimetype, request.headers.get('X-Filename'))
+                )
+                session_id = request.args.get('session_id') or request.headers.get('X-Session-Id', 'unknown')
+        except UploadTooLarge as e:
+            scratch.release('error')
+            return jsonify({'error': e.description}), 413
 
-            processing_time_ms = int((time.time() - start_time) * 1000)
-            result['processing_time_ms'] = processing_time_ms
+        if spool.size == 0:
+            scratch.release('error')
+            return jsonify({'error': 'Empty video upload'}), 400
 
-            logger.info(
-                f'[{session_id}] Result: score={result["combined_score"]:.3f}, '
-                f'decision={result["decision"]}, time={processing_time_ms}ms'
-            )
+        upload_info = {'sha256': spool.sha256, 'size_bytes': spool.size}
+        logger.info(
+            f'[{session_id}] Received upload: {spool.size / (1024 * 1024):.2f} MB '
+            f'sha256={spool.sha256[:12]} -> {spool.path}'
+        )
 
-            return jsonify(result)
+        rejection = _face_preflight(str(spool.path), session_id, extra_fields={'upload': upload_info})
+        if rejection:
+            scratch.release('error')
+            return rejection
 
-        except TimeoutError:
-            logger.error(f'[{session_id}] Processing timeout')
-            return jsonify({
-                'error': 'Processing timeout',
-                'message': f'Video processing exceeded {CONFIG["processing_timeout"]}s limit'
-            }), 408
+        ensemble = get_ensemble()
+
+        if ensemble is None:
+            # [FALLBACK] Demo mode
+            scratch.release('success')
+            logger.warning(f'[{session_id}] Ensemble not available - returning demo data')
+            return jsonify({**_get_demo_result(), 'upload': upload_info})
+
+        return _score_and_respond(
+            ensemble,
+            str(spool.path),
+            session_id,
+            start_time,
+            scratch=scratch,
+            extra_fields={'upload': upload_info}
+        )
 
     except Exception as e:
-        logger.error(f'Error processing video: {str(e)}', exc_info=True)
+        scratch.release('error')
+        logger.error(f'Error processing upload: {str(e)}', exc_info=True)
         return jsonify({
             'error': 'Internal server error',
             'message': str(e),
@@ -310,6 +1055,347 @@ def score_video():
         }), 500
 
 
+def _resolve_batch_item(item) -> Tuple[str, str]:
+    """
+    Resolve one /score/batch item to (video_path, session_id)
+
+    Items can be a path string, {"video_path": ...} or {"video_id": ...}
+    (file named <video_id>.* inside upload_dir)
+    """
+    if isinstance(item, str):
+        item = {'video_path': item}
+    if not isinstance(item, dict):
+        raise ValueError('Item must be a path string or an object')
+
+    video_path = item.get('video_path')
+    video_id = item.get('video_id')
+
+    if not video_path and video_id:
+        if not all(c.isalnum() or c in '-_.' for c in str(video_id)):
+            raise ValueError(f'Invalid video_id: {video_id}')
+        matches = sorted(Path(CONFIG['upload_dir']).glob(f'{video_id}.*'))
+        if not matches:
+            raise FileNotFoundError(f'Video id not found: {video_id}')
+        video_path = str(matches[0])
+
+    if not video_path:
+        raise ValueError('video_path or video_id is required')
+
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f'Video file not found: {video_path}')
+
+    file_size_mb = os.path.getsize(video_path) / (1024 * 1024)
+    if file_size_mb > CONFIG['max_video_size_mb']:
+        raise ValueError(
+            f'Video file too large: {file_size_mb:.2f} MB (max: {CONFIG["max_video_size_mb"]} MB)'
+        )
+
+    return video_path, item.get('session_id') or video_id or Path(video_path).stem
+
+
+@app.route('/score/batch', methods=['POST'])
+def score_batch():
+    """
+    Score many videos in one call
+
+    Request JSON:
+    {
+        "items": ["/path/a.webm", {"video_path": "/path/b.mp4", "session_id": "s2"}, {"video_id": "abc"}]
+    }
+
+    Response: application/x-ndjson, one line per video in completion order
+    {"type": "result", "index": 1, "video_path": "...", "session_id": "...", "status": "ok", "result": {...}}
+    {"type": "result", "index": 2, ..., "status": "rejected", "reason": "no_face", "preflight": {...}}
+    {"type": "result", "index": 0, ..., "status": "error", "error": {"message": "...", "type": "..."}}
+    {"type": "summary", "total": 3, "succeeded": 1, "rejected": 1, "failed": 1, "processing_time_ms": 5230}
+
+    Each item goes through the same face preflight as /score and runs as a job
+    on the shared job executor (JOB_WORKERS), with its own processing_timeout
+    deadline. At most BATCH_CONCURRENCY items per batch hold a job slot at a
+    time, and all batches together hold at most JOB_MAX_PENDING - 1, always
+    leaving one free for /score. SyncNet and the other
+    non thread-safe stages take turns; detectors behind an InferenceServer
+    share micro-batches across items. A failing item never affects the others.
+    """
+    start_time = time.time()
+    data = request.get_json(silent=True)
+
+    if not isinstance(data, dict) or not isinstance(data.get('items'), list) or not data['items']:
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+
+    items = data['items']
+    if len(items) > CONFIG['batch_max_items']:
+        return jsonify({
+            'error': f'Too many items: {len(items)} (max: {CONFIG["batch_max_items"]})'
+        }), 400
+
+    ensemble = get_ensemble()
+
+    if ensemble is None:
+        return jsonify({'error': 'Ensemble not available'}), 503
+
+    concurrency = min(CONFIG['batch_concurrency'], len(items), max(1, CONFIG['job_max_pending'] - 1))
+    slots = get_batch_slots()
+    running = {}                  # index -> deadline of items whose job is in flight
+    stopped = threading.Event()   # set when the client goes away
+
+    def acquire_slot(give_up_at: float):
+        """Wait for one of the job slots shared by all batches"""
+        while not slots.acquire(timeout=0.25):
+            if stopped.is_set() or time.monotonic() >= give_up_at:
+                raise JobQueueFull('No batch job slot available')
+
+    def submit(video_path: str, session_id: str, give_up_at: float) -> Tuple[str, Deadline]:
+        """Submit to the job executor, waiting until give_up_at for a free slot"""
+        while True:
+            deadline = Deadline(CONFIG['processing_timeout'])
+            try:
+                return _submit_score_job(ensemble, video_path, session_id, deadline=deadline), deadline
+            except JobQueueFull:
+                if stopped.is_set() or time.monotonic() >= give_up_at:
+                    raise
+                time.sleep(0.25)
+
+    def score_item(index: int, item) -> dict:
+        line = {'type': 'result', 'index': index}
+        try:
+            video_path, session_id = _resolve_batch_item(item)
+            line.update({'video_path': video_path, 'session_id': session_id})
+
+            item_start = time.time()
+            rejection = _preflight_rejection(video_path, session_id)
+            if rejection is not None:
+                line.update({'status': 'rejected', 'reason': rejection['reason'], 'preflight': rejection['preflight']})
+                return line
+
+            give_up_at = time.monotonic() + CONFIG['score_wait_timeout']
+            acquire_slot(give_up_at)
+            try:
+                job_id, deadline = submit(video_path, session_id, give_up_at)
+                running[index] = deadline
+                if stopped.is_set():
+                    deadline.cancel('client_disconnected')
+                try:
+                    result = _wait_for_job(job_id, deadline)
+                finally:
+                    running.pop(index, None)
+            finally:
+                slots.release()
+            result['processing_time_ms'] = int((time.time() - item_start) * 1000)
+
+            line.update({'status': 'ok', 'result': result})
+        except Exception as e:
+            logger.error(f'[Batch] Item {index} failed: {e}')
+            line.update({'status': 'error', 'error': {'message': str(e), 'type': type(e).__name__}})
+        return line
+
+    def generate():
+        counts = {'ok': 0, 'rejected': 0, 'error': 0}
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='score-batch')
+        try:
+            futures = [executor.submit(score_item, i, item) for i, item in enumerate(items)]
+            for future in as_completed(futures):
+                line = future.result()
+                counts[line['status']] += 1
+                yield json.dumps(line, default=str) + '\n'
+        except GeneratorExit:
+            # Client went away: stop the items in flight (finished ones keep their result)
+            stopped.set()
+            for deadline in list(running.values()):
+                deadline.cancel('client_disconnected')
+            raise
+        finally:
+            # Drop items that have not started yet
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        yield json.dumps({
+            'type': 'summary',
+            'total': len(items),
+            'succeeded': counts['ok'],
+            'rejected': counts['rejected'],
+            'failed': counts['error'],
+            'processing_time_ms': int((time.time() - start_time) * 1000),
+        }) + '\n'
+
+    logger.info(f'[Batch] Scoring {len(items)} videos (concurrency={concurrency})')
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Schedule video analysis in the background
+
+    Request JSON: same as /score
+
+    Response JSON (202):
+    {
+        "job_id": "3f2a...",
+        "status": "queued",
+        "status_url": "/jobs/3f2a..."
+    }
+
+    422 (same body as /score) when the face presence preflight rejects the video
+    """
+    params, error_response = _parse_score_request()
+    if error_response:
+        return error_response
+
+    session_id = params['session_id']
+
+    # Same preflight as /score: faceless videos never become jobs
+    rejection = _face_preflight(params['video_path'], session_id)
+    if rejection:
+        return rejection
+
+    ensemble = get_ensemble()
+
+    try:
+        if ensemble is None:
+            # [FALLBACK] Demo mode
+            logger.warning(f'[{session_id}] Ensemble not available - demo job')
+            job_id = get_job_manager().submit(
+                lambda report_partial: _get_demo_result(),
+                metadata={'session_id': session_id, 'video_path': params['video_path']}
+            )
+        else:
+            job_id = _submit_score_job(
+                ensemble, params['video_path'], session_id, profile_mode=_profile_mode()
+            )
+    except JobQueueFull as e:
+        logger.warning(f'[{session_id}] {e}')
+        return jsonify({
+            'error': 'Service busy',
+            'message': str(e)
+        }), 503, {'Retry-After': '5'}
+
+    logger.info(f'[{session_id}] Job {job_id} created for {params["video_path"]}')
+
+    return jsonify({
+        'job_id': job_id,
+        'status': JobManager.STATUS_QUEUED,
+        'status_url': f'/jobs/{job_id}'
+    }), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get job status and partial or final results
+
+    Response JSON:
+    {
+        "job_id": "3f2a...",
+        "status": "queued" | "running" | "succeeded" | "failed",
+        "partial": {...} | null,   # scores of detectors finished so far
+        "result": {...} | null,    # same payload as /score when succeeded
+        "error": {...} | null
+    }
+    """
+    state = get_job_manager().get(job_id)
+
+    if state is None:
+        return jsonify({'error': f'Job not found or expired: {job_id}'}), 404
+
+    return jsonify(state)
+
+
+STREAM_FRAME = 0x01
+STREAM_AUDIO = 0x02
+
+
+def stream_session(ws):
+    """
+    Live incremental scoring over a WebSocket
+
+    Client -> server:
+    - {"type": "start", "session_id": "...", "sample_rate": 16000}
+    - binary 0x01 + JPEG bytes   (or {"type": "frame", "data": "<base64 jpeg>"})
+    - binary 0x02 + PCM16 mono   (or {"type": "audio", "data": "<base64 pcm>"})
+    - {"type": "end"}
+
+    Server -> client:
+    - {"type": "ready"}
+    - {"type": "interim", "combined_score", "decision", "frames_scored", "stable", ...}
+    - {"type": "final", ..., "early_exit": true|false}  (then the socket closes)
+    - {"type": "error", "error": "..."}
+    """
+    ensemble = get_ensemble()
+
+    if ensemble is None:
+        ws.send(json.dumps({'type': 'error', 'error': 'Ensemble not available'}))
+        return
+
+    def new_session(session_id: str, sample_rate: Optional[int] = None):
+        session = StreamingSession(
+            ensemble,
+            session_id,
+            frame_stride=CONFIG['stream_frame_stride'],
+            update_every=CONFIG['stream_update_every'],
+            window_frames=CONFIG['stream_window_frames'],
+            min_frames=CONFIG['stream_min_frames'],
+            stable_updates=CONFIG['stream_stable_updates'],
+            max_frames=CONFIG['stream_max_frames']
+        )
+        if sample_rate:
+            session.sample_rate = sample_rate
+        return session
+
+    session = None
+    ws.send(json.dumps({'type': 'ready'}))
+
+    try:
+        while True:
+            message = ws.receive(timeout=CONFIG['stream_idle_timeout'])
+            if message is None:
+                ws.send(json.dumps({'type': 'error', 'error': 'Idle timeout'}))
+                return
+
+            update = None
+            finished = False
+
+            if isinstance(message, (bytes, bytearray)):
+                if not message:
+                    raise ValueError('Empty binary message')
+                kind, payload = message[0], bytes(message[1:])
+            else:
+                data = json.loads(message)
+                msg_type = data.get('type')
+                kind = {'frame': STREAM_FRAME, 'audio': STREAM_AUDIO}.get(msg_type)
+                payload = base64.b64decode(data['data']) if kind else None
+
+                if msg_type == 'start':
+                    session = new_session(data.get('session_id', 'unknown'), data.get('sample_rate'))
+                    continue
+                if msg_type == 'end':
+                    finished = True
+
+            if session is None:
+                session = new_session('unknown')
+
+            if kind == STREAM_FRAME:
+                update = session.add_frame(payload)
+            elif kind == STREAM_AUDIO:
+                session.add_audio(payload)
+
+            if update is not None:
+                ws.send(json.dumps(update))
+
+            if finished or session.is_stable() or session.is_full():
+                early_exit = not finished
+                ws.send(json.dumps(session.finalize(early_exit=early_exit)))
+                return
+
+    except (ValueError, KeyError, RuntimeError) as e:
+        logger.error(f'[Streaming] Session error: {e}')
+        ws.send(json.dumps({'type': 'error', 'error': str(e)}))
+
+
+if sock is not None:
+    sock.route('/stream')(stream_session)
+
+
 @app.route('/test', methods=['GET'])
 def test():
     """Test endpoint to verify server is running"""
@@ -347,4 +1433,7 @@ if __name__ == '__main__':
     Path(CONFIG['tmp_dir']).mkdir(parents=True, exist_ok=True)
     Path(CONFIG['upload_dir']).mkdir(parents=True, exist_ok=True)
 
+    if CONFIG['warmup_on_start']:
+        start_warmup()
+
     app.run(host='0.0.0.0', port=port, debug=debug)
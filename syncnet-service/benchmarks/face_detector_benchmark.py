@@ -0,0 +1,160 @@
+"""
+Face Detector Benchmark
+Compara backends de detección de caras del engine de SyncNet (S3FD, YuNet,
+OpenCV DNN) sobre un corpus local: recall contra S3FD (referencia) y latencia
+por frame
+
+Usage:
+    python benchmarks/face_detector_benchmark.py --corpus /path/to/clips \\
+        --yunet models/face_detection_yunet_2023mar.onnx
+    python benchmarks/face_detector_benchmark.py --corpus /path/to/clips \\
+        --opencv-dnn models/res10_300x300_ssd_iter_140000.caffemodel --opencv-dnn-config models/deploy.prototxt
+    python benchmarks/face_detector_benchmark.py --reference synthetic   # synthetic corpus, no S3FD weights
+
+A reference face counts as recalled when a candidate box overlaps it with
+IoU >= --iou (box conventions differ between detectors, hence the 0.4 default).
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from syncnet_engine.face_detectors import build_face_detector
+from syncnet_engine.tracking import match_boxes
+from utils.synthetic_corpus import SkinColorFaceDetector, build_corpus
+
+SERVICE_DIR = Path(__file__).parent.parent.absolute()
+DEFAULT_OUTPUT = Path(__file__).parent.absolute() / 'results' / 'face_detectors.json'
+
+VIDEO_EXTENSIONS = {'.mp4', '.webm', '.avi', '.mov', '.mkv'}
+
+CORPUS_SPECS = [
+    {'name': 'faces_1', 'container': 'avi', 'duration_sec': 3.0, 'num_faces': 1},
+    {'name': 'faces_2', 'container': 'avi', 'duration_sec': 3.0, 'num_faces': 2},
+]
+
+
+def sample_frames(corpus: str, work_dir: str, every: int) -> List[np.ndarray]:
+    """Every `every`-th frame of each clip (synthetic corpus when corpus is None)"""
+    if corpus is None:
+        paths = [clip['path'] for clip in build_corpus(work_dir, CORPUS_SPECS)]
+    else:
+        paths = [str(p) for p in sorted(Path(corpus).iterdir()) if p.suffix.lower() in VIDEO_EXTENSIONS]
+
+    frames = []
+    for path in paths:
+        cap = cv2.VideoCapture(path)
+        index = 0
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if index % every == 0:
+                frames.append(frame)
+            index += 1
+        cap.release()
+    return frames
+
+
+def build_detectors(args) -> Dict[str, object]:
+    """Reference first, then every candidate backend with a model file"""
+    detectors = {}
+    if args.reference == 's3fd':
+        detectors['s3fd'] = build_face_detector(
+            's3fd', args.s3fd, syncnet_repo_path=str(SERVICE_DIR / 'syncnet_python'), device=args.device
+        )
+    else:
+        detectors['synthetic'] = SkinColorFaceDetector()
+
+    if args.yunet:
+        detectors['yunet'] = build_face_detector('yunet', args.yunet)
+    if args.opencv_dnn:
+        detectors['opencv_dnn'] = build_face_detector('opencv_dnn', args.opencv_dnn, config_path=args.opencv_dnn_config)
+    return detectors
+
+
+def run_detector(detector, frames: List[np.ndarray], warmup: int = 3) -> Dict:
+    for frame in frames[:warmup]:
+        detector.detect(frame)
+
+    boxes, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        boxes.append(detector.detect(frame))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {'boxes': boxes, 'latency_ms': np.array(latencies)}
+
+
+def recall(reference: List[np.ndarray], candidate: List[np.ndarray], iou: float) -> Dict:
+    expected = sum(len(boxes) for boxes in reference)
+    matched = sum(len(match_boxes(ref, cand, iou)) for ref, cand in zip(reference, candidate))
+    extra = sum(max(0, len(cand) - len(ref)) for ref, cand in zip(reference, candidate))
+    return {
+        'recall': round(matched / expected, 4) if expected else None,
+        'reference_faces': expected,
+        'matched_faces': matched,
+        'extra_detections': extra,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SyncNet face detector backends')
+    parser.add_argument('--corpus', default=None, help='Folder of videos (default: synthetic corpus)')
+    parser.add_argument('--reference', choices=['s3fd', 'synthetic'], default='s3fd')
+    parser.add_argument('--s3fd', default=str(SERVICE_DIR / 'models' / 'sfd_face.pth'))
+    parser.add_argument('--yunet', default=None, help='YuNet .onnx')
+    parser.add_argument('--opencv-dnn', default=None, help='res10 .caffemodel / opencv_face_detector_uint8.pb')
+    parser.add_argument('--opencv-dnn-config', default=None, help='deploy.prototxt / .pbtxt')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--every', type=int, default=5, help='Use every Nth frame')
+    parser.add_argument('--iou', type=float, default=0.4)
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT))
+    args = parser.parse_args()
+
+    detectors = build_detectors(args)
+    with tempfile.TemporaryDirectory() as work_dir:
+        frames = sample_frames(args.corpus, work_dir, args.every)
+    if not frames:
+        print("[FaceDetectors] No frames found")
+        return 1
+
+    runs = {name: run_detector(detector, frames) for name, detector in detectors.items()}
+    reference_name = next(iter(runs))
+    reference = runs[reference_name]['boxes']
+
+    report = {'frames': len(frames), 'reference': reference_name, 'iou': args.iou, 'backends': {}}
+    print(f"\n[FaceDetectors] {len(frames)} frames, reference: {reference_name}, IoU >= {args.iou}")
+    print(f"{'backend':>12} {'recall':>8} {'extra':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, run in runs.items():
+        latency = run['latency_ms']
+        row = {
+            'latency_ms_p50': round(float(np.percentile(latency, 50)), 2),
+            'latency_ms_p95': round(float(np.percentile(latency, 95)), 2),
+            'latency_ms_mean': round(float(latency.mean()), 2),
+            **recall(reference, run['boxes'], args.iou),
+        }
+        report['backends'][name] = row
+        recall_text = f"{row['recall']:.3f}" if row['recall'] is not None else 'n/a'
+        print(
+            f"{name:>12} {recall_text:>8} {row['extra_detections']:>6} "
+            f"{row['latency_ms_p50']:>8.2f} {row['latency_ms_p95']:>8.2f}"
+        )
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\n[FaceDetectors] Report written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
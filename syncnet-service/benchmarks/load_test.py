@@ -0,0 +1,448 @@
+"""
+Load-Testing Harness
+Levanta el servicio con gunicorn (detectores con pesos aleatorios, sin descargas),
+lanza /score sobre un corpus sintético con un barrido de concurrencia y reporta
+throughput, percentiles de latencia, tasas de error/timeout y CPU/RSS por worker
+para comparar configuraciones de workers/threads lado a lado
+
+Usage:
+    python benchmarks/load_test.py --configs 2x1,1x2,2x2 --concurrency 1,2,4 --duration 30
+    python benchmarks/load_test.py --arrival poisson --rate 2 --concurrency 4
+    python benchmarks/load_test.py --url http://localhost:5000   # existing server (no CPU/RSS)
+
+Config "WxT" = W gunicorn workers x T threads (gthread when T > 1).
+The face preflight is off unless --face-preflight: synthetic faces are not what the
+Haar cascade looks for, and 422 rejections would not measure the ensemble.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import signal
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.synthetic_corpus import build_corpus
+
+SERVICE_DIR = Path(__file__).parent.parent.absolute()
+DEFAULT_OUTPUT = Path(__file__).parent.absolute() / 'results' / 'load_test.json'
+
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+CORPUS_SPECS = [
+    {'name': 'load_mp4', 'container': 'mp4', 'duration_sec': 3.0},
+    {'name': 'load_webm', 'container': 'webm', 'duration_sec': 3.0},
+    {'name': 'load_broken_webm', 'container': 'webm', 'duration_sec': 3.0, 'broken_frame_count': True},
+    {'name': 'load_two_faces', 'container': 'mp4', 'duration_sec': 3.0, 'num_faces': 2},
+]
+
+
+def parse_config(config: str) -> Dict[str, int]:
+    """'WxT' -> {'workers': W, 'threads': T} (ValueError if malformed or < 1)"""
+    try:
+        workers, threads = (int(part) for part in config.strip().lower().split('x'))
+    except ValueError:
+        raise ValueError(f"Invalid config {config!r} (expected WORKERSxTHREADS, e.g. 2x1)")
+    if workers < 1 or threads < 1:
+        raise ValueError(f"Invalid config {config!r} (workers and threads must be >= 1)")
+    return {'workers': workers, 'threads': threads}
+
+
+def parse_concurrency(levels: str) -> List[int]:
+    """'1,2,4' -> [1, 2, 4] (ValueError if a level is not a positive integer)"""
+    try:
+        parsed = [int(level) for level in levels.split(',')]
+    except ValueError:
+        raise ValueError(f"Invalid concurrency {levels!r} (expected e.g. 1,2,4)")
+    if any(level < 1 for level in parsed):
+        raise ValueError(f"Invalid concurrency {levels!r} (levels must be >= 1)")
+    return parsed
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Server:
+    """gunicorn running app:app with the given worker/thread config"""
+
+    def __init__(self, workers: int, threads: int, log_path: Path, extra_env: Optional[dict] = None):
+        self.port = free_port()
+        self.url = f'http://127.0.0.1:{self.port}'
+        self.workers = workers
+        self.threads = threads
+
+        env = dict(os.environ)
+        env.update({
+            'PORT': str(self.port),
+            'GUNICORN_WORKERS': str(workers),
+            'GUNICORN_THREADS': str(threads),
+            'DETECTORS_RANDOM_WEIGHTS': 'true',
+            'HF_HUB_OFFLINE': '1',
+            'SYNCNET_ENABLED': 'false',
+            'JOB_WORKERS': str(threads),
+            'JOB_MAX_PENDING': str(max(4, threads * 4)),
+            'FACE_PREFLIGHT_ENABLED': 'false',
+            'LOG_LEVEL': 'WARNING',
+        })
+        env.update(extra_env or {})
+
+        self._log = open(log_path, 'w')
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', 'app:app'],
+            cwd=str(SERVICE_DIR),
+            env=env,
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+
+    def wait_ready(self, timeout: float):
+        """Poll /readyz until a worker has built and warmed up its models"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(f'{self.url}/readyz', timeout=10) as response:
+                    if response.status == 200:
+                        return
+            except urllib.error.HTTPError as e:
+                if json.loads(e.read() or b'{}').get('status') == 'failed':
+                    raise RuntimeError("Worker warm-up failed (see gunicorn log)")
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass
+            time.sleep(1.0)
+        raise TimeoutError(f"Server not ready after {timeout}s")
+
+    def worker_pids(self) -> List[int]:
+        pids = []
+        for stat in Path('/proc').glob('[0-9]*/stat'):
+            try:
+                fields = stat.read_text().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == self.process.pid:
+                pids.append(int(stat.parent.name))
+        return sorted(pids)
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=40)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._log.close()
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU% and RSS of each worker from /proc every `interval` seconds"""
+
+    def __init__(self, pids: List[int], interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.pids = pids
+        self.interval = interval
+        self.samples: Dict[int, Dict[str, list]] = {pid: {'cpu': [], 'rss': []} for pid in pids}
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _read(pid: int):
+        fields = Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()
+        ticks = int(fields[11]) + int(fields[12])  # utime + stime
+        rss_pages = int(Path(f'/proc/{pid}/statm').read_text().split()[1])
+        return ticks, rss_pages * PAGE_SIZE
+
+    def run(self):
+        previous = {}
+        last = time.perf_counter()
+        for pid in self.pids:
+            try:
+                previous[pid] = self._read(pid)[0]
+            except OSError:
+                pass
+
+        while not self._stop_event.wait(self.interval):
+            now = time.perf_counter()
+            elapsed = now - last
+            last = now
+            for pid in self.pids:
+                try:
+                    ticks, rss = self._read(pid)
+                except OSError:
+                    continue  # worker restarted (max_requests)
+                if pid in previous:
+                    cpu = (ticks - previous[pid]) / CLK_TCK / elapsed * 100
+                    self.samples[pid]['cpu'].append(cpu)
+                previous[pid] = ticks
+                self.samples[pid]['rss'].append(rss)
+
+    def stop(self) -> Dict[str, dict]:
+        self._stop_event.set()
+        self.join(timeout=2)
+        summary = {}
+        for pid, series in self.samples.items():
+            if not series['rss']:
+                continue
+            summary[str(pid)] = {
+                'cpu_mean_pct': round(float(np.mean(series['cpu'])) if series['cpu'] else 0.0, 1),
+                'cpu_max_pct': round(float(np.max(series['cpu'])) if series['cpu'] else 0.0, 1),
+                'rss_max_mb': round(max(series['rss']) / (1024 * 1024), 1),
+            }
+        return summary
+
+
+def send_score(url: str, video_path: str, session_id: str, timeout: float) -> str:
+    """
+    POST /score and classify the outcome: ok | rejected (422, face preflight) |
+    timeout (408 deadline/wait, 504 gateway, client timeout) | busy (503) | error
+    """
+    body = json.dumps({'video_path': video_path, 'session_id': session_id}).encode()
+    request = urllib.request.Request(
+        f'{url}/score', data=body, headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return 'ok'
+    except urllib.error.HTTPError as e:
+        return {408: 'timeout', 422: 'rejected', 503: 'busy', 504: 'timeout'}.get(e.code, 'error')
+    except (socket.timeout, TimeoutError):
+        return 'timeout'
+    except (urllib.error.URLError, ConnectionError):
+        return 'error'
+
+
+def run_step(
+    url: str,
+    clips: List[str],
+    concurrency: int,
+    duration: float,
+    arrival: str,
+    rate: float,
+    request_timeout: float,
+    seed: int = 0
+) -> dict:
+    """
+    One load step
+
+    closed: `concurrency` clients send back-to-back for `duration` seconds
+    poisson: open-loop arrivals at `rate` req/s served by `concurrency` clients;
+             latency counts from the scheduled arrival (includes client queueing)
+    """
+    records = []
+    lock = threading.Lock()
+    counter = iter(range(10 ** 9))
+
+    def one(scheduled: float):
+        index = next(counter)
+        outcome = send_score(url, clips[index % len(clips)], f'load_{index}', request_timeout)
+        with lock:
+            records.append((outcome, time.perf_counter() - scheduled))
+
+    start = time.perf_counter()
+    end = start + duration
+
+    if arrival == 'closed':
+        def client():
+            while time.perf_counter() < end:
+                one(time.perf_counter())
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        rng = np.random.default_rng(seed)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            next_arrival = start
+            while True:
+                next_arrival += rng.exponential(1.0 / rate)
+                if next_arrival >= end:
+                    break
+                time.sleep(max(0.0, next_arrival - time.perf_counter()))
+                pool.submit(one, next_arrival)
+
+    step = summarize(records, time.perf_counter() - start)
+    step.update({
+        'concurrency': concurrency,
+        'arrival': arrival,
+        'offered_rate': rate if arrival == 'poisson' else None,
+    })
+    return step
+
+
+def summarize(records: List[tuple], wall: float) -> dict:
+    """
+    Aggregate (outcome, latency_seconds) records of one step
+
+    Throughput and latency percentiles count successful requests only;
+    error/timeout/busy/rejected rates are fractions of all requests.
+    """
+    total = len(records)
+    latencies = np.array([lat for outcome, lat in records if outcome == 'ok']) * 1000
+
+    def rate_of(kind):
+        return round(sum(1 for outcome, _ in records if outcome == kind) / total, 4) if total else 0.0
+
+    def pct(q):
+        return round(float(np.percentile(latencies, q)), 1) if len(latencies) else None
+
+    return {
+        'requests': total,
+        'wall_seconds': round(wall, 2),
+        'throughput_rps': round(len(latencies) / wall, 3) if wall > 0 else 0.0,
+        'latency_ms': {'p50': pct(50), 'p90': pct(90), 'p95': pct(95), 'p99': pct(99),
+                       'max': round(float(latencies.max()), 1) if len(latencies) else None},
+        'error_rate': rate_of('error'),
+        'timeout_rate': rate_of('timeout'),
+        'busy_rate': rate_of('busy'),
+        'rejected_rate': rate_of('rejected'),
+    }
+
+
+def print_report(runs: List[dict]):
+    """Side-by-side table of every config x concurrency step"""
+    header = (f"{'config':>8} {'conc':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'err%':>6} {'tmo%':>6} {'busy%':>6} {'rej%':>6} {'cpu%/wkr':>9} {'rss MB':>8}")
+    print('\n' + header)
+    print('-' * len(header))
+    for run in runs:
+        workers = run.get('workers_resources') or {}
+        cpu = np.mean([w['cpu_mean_pct'] for w in workers.values()]) if workers else float('nan')
+        rss = max((w['rss_max_mb'] for w in workers.values()), default=float('nan'))
+        lat = run['latency_ms']
+        print(
+            f"{run['config']:>8} {run['concurrency']:>5} {run['throughput_rps']:>7.2f} "
+            f"{lat['p50'] or 0:>8.0f} {lat['p95'] or 0:>8.0f} {lat['p99'] or 0:>8.0f} "
+            f"{run['error_rate'] * 100:>6.1f} {run['timeout_rate'] * 100:>6.1f} "
+            f"{run['busy_rate'] * 100:>6.1f} {run.get('rejected_rate', 0.0) * 100:>6.1f} "
+            f"{cpu:>9.0f} {rss:>8.0f}"
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line options; --configs and --concurrency are validated and parsed"""
+    parser = argparse.ArgumentParser(description='Load-test /score under gunicorn')
+    parser.add_argument('--configs', default='2x1,1x2,2x2', help='Comma-separated WORKERSxTHREADS')
+    parser.add_argument('--concurrency', default='1,2,4', help='Comma-separated client concurrency sweep')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per concurrency step')
+    parser.add_argument('--arrival', choices=['closed', 'poisson'], default='closed')
+    parser.add_argument('--rate', type=float, default=1.0, help='Poisson arrival rate (req/s)')
+    parser.add_argument('--request-timeout', type=float, default=130.0)
+    parser.add_argument('--startup-timeout', type=float, default=300.0)
+    parser.add_argument('--warmup-requests', type=int, default=2, help='Per worker, before measuring')
+    parser.add_argument('--url', default=None, help='Use an already running server (skips gunicorn)')
+    parser.add_argument('--corpus-dir', default=None, help='Reuse a corpus (default: temporary)')
+    parser.add_argument('--face-preflight', action='store_true',
+                        help='Keep the face preflight on (422s are reported as rejected)')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT))
+    args = parser.parse_args(argv)
+
+    try:
+        args.concurrency_levels = parse_concurrency(args.concurrency)
+        args.config_list = [] if args.url else args.configs.split(',')
+        for config in args.config_list:
+            parse_config(config)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.duration <= 0:
+        parser.error('--duration must be > 0')
+    if args.arrival == 'poisson' and args.rate <= 0:
+        parser.error('--rate must be > 0 with --arrival poisson')
+
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    concurrency_levels = args.concurrency_levels
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(args.corpus_dir or tmp) / 'corpus'
+        print(f"[LoadTest] Building corpus in {corpus_dir}")
+        clips = [clip['path'] for clip in build_corpus(str(corpus_dir), CORPUS_SPECS)]
+
+        configs = ['external'] if args.url else args.config_list
+        runs = []
+
+        for config in configs:
+            server = None
+            pids: List[int] = []
+            if args.url:
+                url = args.url
+            else:
+                shape = parse_config(config)
+                log_path = output.parent / f'gunicorn_{config}.log'
+                print(f"\n[LoadTest] Starting gunicorn {config} (log: {log_path})")
+                server = Server(
+                    shape['workers'], shape['threads'], log_path,
+                    extra_env={'FACE_PREFLIGHT_ENABLED': 'true'} if args.face_preflight else None
+                )
+                url = server.url
+
+            try:
+                if server is not None:
+                    server.wait_ready(args.startup_timeout)
+                    pids = server.worker_pids()
+                    warmup = args.warmup_requests * max(1, len(pids))
+                    for i in range(warmup):
+                        send_score(url, clips[i % len(clips)], f'warmup_{i}', args.request_timeout)
+
+                for concurrency in concurrency_levels:
+                    print(f"[LoadTest] {config}: concurrency={concurrency} ({args.arrival}, {args.duration:.0f}s)")
+                    sampler = ResourceSampler(pids) if pids else None
+                    if sampler:
+                        sampler.start()
+
+                    step = run_step(
+                        url, clips, concurrency, args.duration,
+                        args.arrival, args.rate, args.request_timeout
+                    )
+                    step['config'] = config
+                    step['workers_resources'] = sampler.stop() if sampler else None
+                    runs.append(step)
+                    print(f"  -> {step['throughput_rps']:.2f} req/s, p95={step['latency_ms']['p95']} ms")
+            finally:
+                if server is not None:
+                    server.stop()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'cpu_count': os.cpu_count(),
+            'arrival': args.arrival,
+            'duration_per_step': args.duration,
+            'face_preflight': args.face_preflight if not args.url else None,
+            'corpus': [spec['name'] for spec in CORPUS_SPECS],
+        },
+        'runs': runs,
+    }
+    output.write_text(json.dumps(report, indent=2))
+
+    print_report(runs)
+    print(f"\n[LoadTest] Report written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
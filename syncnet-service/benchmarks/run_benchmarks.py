@@ -0,0 +1,289 @@
+"""
+Offline Microbenchmark Suite
+Mide extracción de frames, preprocesamiento, predict_frames por detector y
+_calculate_ensemble con modelos de pesos aleatorios (misma arquitectura,
+sin descargas), escribe JSON y compara contra un baseline guardado
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # full matrix -> benchmarks/results/latest.json
+    python benchmarks/run_benchmarks.py --quick              # smaller matrix (CI)
+    python benchmarks/run_benchmarks.py --save-baseline      # also write benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.25
+
+Exit code 1 when any benchmark's median is more than `threshold` slower than baseline.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+
+from ensemble.frame_extractor import FrameExtractor
+from utils.synthetic_corpus import generate_clip
+
+BENCH_DIR = Path(__file__).parent.absolute()
+DEFAULT_OUTPUT = BENCH_DIR / 'results' / 'latest.json'
+DEFAULT_BASELINE = BENCH_DIR / 'baseline.json'
+
+# (container, broken frame count) - broken webm exercises the sequential decode path
+CONTAINERS = [('mp4', False), ('avi', False), ('webm', False), ('webm', True)]
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720)]
+SAMPLING_METHODS = ['uniform', 'random']
+DETECTORS = ['efficientnet', 'efficientnetv2', 'vit']
+BATCH_SIZES = [1, 4, 16]
+THREAD_COUNTS = [1, 2, 4]
+
+
+def time_call(fn: Callable[[], object], repeat: int = 5, warmup: int = 1) -> dict:
+    """Run fn warmup+repeat times and summarize wall times (ms)"""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p90_ms': round(samples[min(len(samples) - 1, int(0.9 * len(samples)))], 3),
+        'min_ms': round(samples[0], 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'repeat': repeat,
+    }
+
+
+def bench_extraction(workdir: Path, resolutions, repeat: int) -> Dict[str, dict]:
+    results = {}
+    for container, broken in CONTAINERS:
+        label = container + ('-nocount' if broken else '')
+        for width, height in resolutions:
+            clip = generate_clip(
+                str(workdir / f'clip_{label}_{width}x{height}.{container}'),
+                width=width, height=height, duration_sec=2.0,
+                container=container, audio=False, broken_frame_count=broken
+            )['path']
+
+            for method in SAMPLING_METHODS:
+                extractor = FrameExtractor(max_frames=20, sampling_method=method)
+                name = f'extract/{label}/{width}x{height}/{method}'
+                results[name] = time_call(lambda: extractor.extract_frames(clip), repeat)
+                print(f"  {name}: {results[name]['median_ms']:.1f} ms")
+    return results
+
+
+def build_detectors(names: List[str]) -> Dict[str, object]:
+    """Randomly initialized detectors (same architectures as production)"""
+    detectors = {}
+    for name in names:
+        try:
+            if name == 'efficientnet':
+                from ensemble.efficientnet_detector import EfficientNetDetector
+                detectors[name] = EfficientNetDetector(model_path=None, use_pretrained=False)
+            elif name == 'efficientnetv2':
+                from ensemble.efficientnetv2_detector import EfficientNetV2Detector
+                detectors[name] = EfficientNetV2Detector(model_path=None, use_pretrained=False)
+            elif name == 'vit':
+                from ensemble.vit_detector import ViTDetector
+                detectors[name] = ViTDetector(use_pretrained=False)
+            else:
+                raise ValueError(f"Unknown detector: {name}")
+        except ImportError as e:
+            print(f"  skip {name}: {e}")
+    return detectors
+
+
+def make_frames(count: int, width: int = 640, height: int = 480) -> List[Image.Image]:
+    rng = np.random.default_rng(0)
+    return [
+        Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+        for _ in range(count)
+    ]
+
+
+def bench_preprocessing(detectors: Dict[str, object], repeat: int) -> Dict[str, dict]:
+    frames = make_frames(16)
+    results = {}
+    for name, detector in detectors.items():
+        preprocess = detector._preprocess if hasattr(detector, '_preprocess') else detector.transform
+        key = f'preprocess/{name}/16_frames'
+        results[key] = time_call(lambda: [preprocess(f) for f in frames], repeat)
+        print(f"  {key}: {results[key]['median_ms']:.1f} ms")
+    return results
+
+
+def bench_predict(detectors: Dict[str, object], batch_sizes, thread_counts, repeat: int) -> Dict[str, dict]:
+    frames = make_frames(max(batch_sizes))
+    original_threads = torch.get_num_threads()
+    results = {}
+    try:
+        for threads in thread_counts:
+            torch.set_num_threads(threads)
+            for name, detector in detectors.items():
+                for batch_size in batch_sizes:
+                    key = f'predict_frames/{name}/b{batch_size}/t{threads}'
+                    batch = frames[:batch_size]
+                    stats = time_call(lambda: detector.predict_frames(batch), repeat)
+                    stats['per_frame_ms'] = round(stats['median_ms'] / batch_size, 3)
+                    results[key] = stats
+                    print(f"  {key}: {stats['median_ms']:.1f} ms ({stats['per_frame_ms']:.1f} ms/frame)")
+    finally:
+        torch.set_num_threads(original_threads)
+    return results
+
+
+def bench_ensemble(repeat: int) -> Dict[str, dict]:
+    from ensemble.orchestrator import EnsembleOrchestrator
+
+    orchestrator = EnsembleOrchestrator(weights={
+        'syncnet': 0.1, 'efficientnet': 0.2, 'vit': 0.3, 'efficientnetv2': 0.4
+    })
+    rng = random.Random(0)
+    results_input = {
+        'syncnet': {'score': 0.8, 'offset_frames': 1, 'confidence': 9.5, 'min_dist': 6.2, 'lag_ms': 40},
+        'efficientnet': {'score': 0.7, 'confidence': 0.6, 'consistency': 0.9, 'num_frames': 20},
+        'vit': {'score': 0.9, 'confidence': 0.8, 'consistency': 0.95, 'num_frames': 20},
+        'efficientnetv2': {'score': 0.95, 'confidence': 0.9, 'consistency': 0.97, 'num_frames': 20},
+    }
+
+    def run():
+        for _ in range(100):
+            results_input['vit']['score'] = rng.random()
+            orchestrator._calculate_ensemble(results_input, {})
+
+    key = 'ensemble/calculate_x100'
+    stats = time_call(run, repeat)
+    print(f"  {key}: {stats['median_ms']:.2f} ms")
+    return {key: stats}
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[dict]:
+    """Benchmarks whose median regressed by more than threshold (fraction)"""
+    regressions = []
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if not base or base['median_ms'] <= 0:
+            continue
+        ratio = stats['median_ms'] / base['median_ms']
+        if ratio > 1.0 + threshold:
+            regressions.append({
+                'name': name,
+                'baseline_ms': base['median_ms'],
+                'current_ms': stats['median_ms'],
+                'ratio': round(ratio, 3),
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline microbenchmarks (random-weight models)')
+    parser.add_argument('--quick', action='store_true', help='Smaller matrix and fewer repeats')
+    parser.add_argument('--only', default='extract,preprocess,predict,ensemble',
+                        help='Comma-separated groups: extract, preprocess, predict, ensemble')
+    parser.add_argument('--detectors', default=','.join(DETECTORS))
+    parser.add_argument('--repeat', type=int, default=None)
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT))
+    parser.add_argument('--baseline', default=None, help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown vs baseline (0.25 = +25%%)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f'Also write results to {DEFAULT_BASELINE} '
+                             '(after the --baseline comparison, only if it passed)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    torch.manual_seed(0)
+
+    groups = set(args.only.split(','))
+    repeat = args.repeat or (3 if args.quick else 7)
+    resolutions = RESOLUTIONS[:2] if args.quick else RESOLUTIONS
+    batch_sizes = [1, 8] if args.quick else BATCH_SIZES
+    cpu_count = os.cpu_count() or 1
+    thread_counts = [1] if args.quick else [t for t in THREAD_COUNTS if t <= cpu_count]
+
+    results: Dict[str, dict] = {}
+
+    if 'extract' in groups:
+        print("\n[Benchmark] FrameExtractor")
+        with tempfile.TemporaryDirectory() as workdir:
+            results.update(bench_extraction(Path(workdir), resolutions, repeat))
+
+    if groups & {'preprocess', 'predict'}:
+        print("\n[Benchmark] Building random-weight detectors")
+        detectors = build_detectors(args.detectors.split(','))
+
+        if 'preprocess' in groups:
+            print("\n[Benchmark] Preprocessing")
+            results.update(bench_preprocessing(detectors, repeat))
+
+        if 'predict' in groups:
+            print("\n[Benchmark] predict_frames")
+            results.update(bench_predict(detectors, batch_sizes, thread_counts, repeat))
+
+    if 'ensemble' in groups:
+        print("\n[Benchmark] _calculate_ensemble")
+        results.update(bench_ensemble(repeat))
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': cpu_count,
+            'torch': torch.__version__,
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'quick': args.quick,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n[Benchmark] Results written to {output}")
+
+    # Compare before saving: --save-baseline must not overwrite the file --baseline reads
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())['results']
+        regressions = compare(results, baseline, args.threshold)
+        report['regressions'] = regressions
+        output.write_text(json.dumps(report, indent=2))
+
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) over +{args.threshold:.0%}:")
+            for r in regressions:
+                print(f"  {r['name']}: {r['baseline_ms']:.1f} -> {r['current_ms']:.1f} ms (x{r['ratio']:.2f})")
+            if args.save_baseline:
+                print(f"[Benchmark] Baseline not saved: {DEFAULT_BASELINE} is unchanged")
+            return 1
+
+        print(f"\n✓ No regressions over +{args.threshold:.0%} vs {args.baseline}")
+
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(json.dumps(report, indent=2))
+        print(f"[Benchmark] Baseline saved to {DEFAULT_BASELINE}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
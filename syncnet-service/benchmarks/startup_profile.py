@@ -0,0 +1,135 @@
+"""
+Startup Profiler
+Reporta cuánto tarda un worker en arrancar:
+1. `import app` con `python -X importtime` (módulos más lentos, acumulado)
+2. Construcción de cada detector habilitado (model_load_ms) y warm-up
+
+Usage:
+    python benchmarks/startup_profile.py                    # imports only
+    python benchmarks/startup_profile.py --load-models      # + model load / warm-up per detector
+    DETECTORS_RANDOM_WEIGHTS=true VIT_ENABLED=true python benchmarks/startup_profile.py --load-models
+    python benchmarks/startup_profile.py --json benchmarks/results/startup.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List
+
+SERVICE_DIR = Path(__file__).parent.parent.absolute()
+
+HEAVY_MODULES = ('torch', 'torchvision', 'timm', 'transformers', 'cv2')
+
+_IMPORT_SCRIPT = '''
+import sys, json, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'import_seconds': elapsed,
+    'heavy_modules_loaded': [m for m in %r if m in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+_MODELS_SCRIPT = '''
+import sys, json, time
+import app
+start = time.perf_counter()
+app.run_warmup()
+print(json.dumps({
+    'startup_seconds': time.perf_counter() - start,
+    'import_seconds': {k: round(v * 1000, 1) for k, v in app.detector_registry.IMPORT_SECONDS.items()},
+    'warmup': app.warmup_state,
+}))
+'''
+
+
+def _run(script: str, extra_args: List[str] = ()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *extra_args, '-c', script],
+        cwd=str(SERVICE_DIR),
+        env=dict(os.environ, WARMUP_ON_START='false'),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse `-X importtime` lines: self/cumulative microseconds per module"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+    return rows
+
+
+def profile_imports() -> Dict:
+    """Import app in a fresh interpreter and collect per-module import times"""
+    timing = _run(_IMPORT_SCRIPT)
+    importtime = _run(_IMPORT_SCRIPT, ['-X', 'importtime'])
+    rows = parse_importtime(importtime.stderr)
+
+    result = json.loads(timing.stdout.strip().splitlines()[-1])
+    result['modules'] = sorted(rows, key=lambda r: r['cumulative_ms'], reverse=True)
+    return result
+
+
+def profile_models() -> Dict:
+    """Build and warm up every enabled detector in a fresh interpreter"""
+    completed = _run(_MODELS_SCRIPT)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile service startup (imports + model loading)')
+    parser.add_argument('--top', type=int, default=20, help='Slowest top-level imports to show')
+    parser.add_argument('--load-models', action='store_true', help='Also build and warm up enabled detectors')
+    parser.add_argument('--json', default=None, help='Write the full report to this file')
+    args = parser.parse_args()
+
+    report = {'imports': profile_imports()}
+    imports = report['imports']
+
+    print(f"\n[Startup] import app: {imports['import_seconds'] * 1000:.0f} ms")
+    print(f"[Startup] heavy modules loaded at import: {imports['heavy_modules_loaded'] or 'none'}")
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module (direct imports of app and below, depth <= 2)")
+    shown = [r for r in imports['modules'] if r['depth'] <= 2][:args.top]
+    for row in shown:
+        print(f"{row['cumulative_ms']:>14.1f} {row['self_ms']:>9.1f}  {'  ' * row['depth']}{row['module']}")
+
+    if args.load_models:
+        models = profile_models()
+        report['models'] = models
+        warmup = models['warmup']
+
+        print(f"\n[Startup] models: status={warmup['status']}, total {models['startup_seconds'] * 1000:.0f} ms")
+        for module, ms in models['import_seconds'].items():
+            print(f"  import {module:<40} {ms:>9.1f} ms")
+        for name, ms in warmup['model_load_ms'].items():
+            print(f"  load   {name:<40} {ms:>9.1f} ms")
+        for name, ms in warmup['detectors_ms'].items():
+            print(f"  warmup {name:<40} {ms:>9.1f} ms")
+        if warmup['error']:
+            print(f"  error: {warmup['error']}")
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\n[Startup] Report written to {args.json}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+SyncNet Fast-Mode Parity Check
+Corre el engine de SyncNet en modo completo (escenas, todos los tracks, 25 fps)
+y en modo rápido (una cara dominante, fps nativo con alineación por timestamps)
+sobre un corpus local y compara offset, confianza y tiempo por clip
+
+Usage:
+    python benchmarks/syncnet_fast_parity.py                       # synthetic webcam corpus
+    python benchmarks/syncnet_fast_parity.py --corpus tmp/corpus   # manifest.json or a folder of videos
+    python benchmarks/syncnet_fast_parity.py --detector s3fd --model models/syncnet_v2.model
+
+Exits 1 when fewer than --min-agreement of the clips get the same offset
+(within --max-offset-diff frames) in both modes. Clips the full pipeline drops
+(shorter than --min_track) are listed as fast_only and not counted.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+
+from syncnet_engine.engine import SyncNetEngine
+from utils.synthetic_corpus import SkinColorFaceDetector, build_corpus
+
+SERVICE_DIR = Path(__file__).parent.parent.absolute()
+DEFAULT_OUTPUT = Path(__file__).parent.absolute() / 'results' / 'syncnet_fast_parity.json'
+
+VIDEO_EXTENSIONS = {'.mp4', '.webm', '.avi', '.mov', '.mkv'}
+MARKS = {True: '✓', False: '✗', None: '(fast only)'}
+
+# 2-10 s single-person webcam-like clips at common camera rates
+CORPUS_SPECS = [
+    {'name': 'webcam_25fps_2s', 'container': 'avi', 'fps': 25, 'duration_sec': 2.0},
+    {'name': 'webcam_30fps_3s', 'container': 'avi', 'fps': 30, 'duration_sec': 3.0, 'audio_offset_ms': 80},
+    {'name': 'webcam_24fps_4s', 'container': 'avi', 'fps': 24, 'duration_sec': 4.0, 'audio_offset_ms': -120},
+    {'name': 'webcam_30fps_6s', 'container': 'avi', 'fps': 30, 'duration_sec': 6.0},
+    {'name': 'webcam_15fps_5s', 'container': 'avi', 'fps': 15, 'duration_sec': 5.0, 'audio_offset_ms': 200},
+    {'name': 'webcam_25fps_10s', 'container': 'avi', 'fps': 25, 'duration_sec': 10.0, 'audio_offset_ms': 40},
+]
+
+
+def load_corpus(corpus: Optional[str], work_dir: str) -> List[Dict]:
+    """Clips as {name, path, audio_path}: synthetic corpus, a manifest.json or a folder of videos"""
+    if corpus is None:
+        clips = build_corpus(work_dir, CORPUS_SPECS)
+    elif (Path(corpus) / 'manifest.json').exists():
+        clips = json.loads((Path(corpus) / 'manifest.json').read_text())
+    else:
+        clips = [
+            {'name': path.stem, 'path': str(path), 'audio_path': None, 'audio_muxed': True}
+            for path in sorted(Path(corpus).iterdir()) if path.suffix.lower() in VIDEO_EXTENSIONS
+        ]
+
+    return [
+        {
+            'name': clip['name'],
+            'path': clip['path'],
+            # Sidecar WAV only when the clip has no muxed audio (no ffmpeg at build time)
+            'audio_path': None if clip.get('audio_muxed', True) else clip.get('audio_path'),
+        }
+        for clip in clips
+    ]
+
+
+def build_engine(args) -> SyncNetEngine:
+    model_path = args.model if args.model and Path(args.model).exists() else None
+    if model_path is None:
+        print("[Parity] No SyncNet weights: random weights (checks pipeline parity, not accuracy)")
+        torch.manual_seed(0)
+
+    options = {'model_path': model_path, 'detect_stride': args.detect_stride}
+    if args.detector == 's3fd':
+        options.update(
+            detector_path=args.detector_path,
+            syncnet_repo_path=str(SERVICE_DIR / 'syncnet_python')
+        )
+    else:
+        options['face_detector'] = SkinColorFaceDetector()
+        options['min_face_size'] = 50
+
+    return SyncNetEngine(**options).load()
+
+
+def best_track(output: Dict) -> Optional[Dict]:
+    scored = [track for track in output['tracks'] if track['status'] == 'scored']
+    return max(scored, key=lambda track: track['confidence']) if scored else None
+
+
+def run_mode(engine: SyncNetEngine, clip: Dict, fast: bool) -> Dict:
+    # Fresh MFCC cache per run so both modes pay for audio decoding
+    engine.audio_cache._entries.clear()
+    start = time.perf_counter()
+    output = engine.process_video(clip['path'], audio_path=clip['audio_path'], fast=fast)
+    elapsed = time.perf_counter() - start
+
+    best = best_track(output)
+    return {
+        'seconds': round(elapsed, 3),
+        'offset_frames': best['offset_frames'] if best else None,
+        'confidence': round(best['confidence'], 3) if best else None,
+        'min_dist': round(best['min_dist'], 3) if best else None,
+        'num_tracks': len(output['tracks']),
+        'detector_calls': output['detector_calls'],
+        'timings_ms': output['timings_ms'],
+    }
+
+
+def compare(full: Dict, fast: Dict, max_offset_diff: int) -> Dict:
+    """agree is None when the full pipeline finds no track (e.g. clip shorter than min_track)"""
+    if full['offset_frames'] is None:
+        return {'agree': None if fast['offset_frames'] is not None else True}
+    if fast['offset_frames'] is None:
+        return {'agree': False}
+    return {
+        'agree': abs(full['offset_frames'] - fast['offset_frames']) <= max_offset_diff,
+        'offset_diff': fast['offset_frames'] - full['offset_frames'],
+        'confidence_diff': round(fast['confidence'] - full['confidence'], 3),
+        'speedup': round(full['seconds'] / max(fast['seconds'], 1e-6), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare SyncNet fast mode against the full pipeline')
+    parser.add_argument('--corpus', default=None, help='manifest.json folder or folder of videos (default: synthetic)')
+    parser.add_argument('--detector', choices=['synthetic', 's3fd'], default='synthetic')
+    parser.add_argument('--model', default=str(SERVICE_DIR / 'models' / 'syncnet_v2.model'))
+    parser.add_argument('--detector-path', default=str(SERVICE_DIR / 'models' / 'sfd_face.pth'))
+    parser.add_argument('--detect-stride', type=int, default=5)
+    parser.add_argument('--max-offset-diff', type=int, default=1, help='Frames of offset disagreement tolerated')
+    parser.add_argument('--min-agreement', type=float, default=0.9, help='Fraction of clips that must agree')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT))
+    args = parser.parse_args()
+
+    engine = build_engine(args)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for clip in load_corpus(args.corpus, work_dir):
+            full = run_mode(engine, clip, fast=False)
+            fast = run_mode(engine, clip, fast=True)
+            row = {'name': clip['name'], 'full': full, 'fast': fast, **compare(full, fast, args.max_offset_diff)}
+            rows.append(row)
+
+            print(
+                f"[Parity] {clip['name']:>20}: offset {full['offset_frames']} vs {fast['offset_frames']}, "
+                f"conf {full['confidence']} vs {fast['confidence']}, "
+                f"{full['seconds'] * 1000:.0f} ms vs {fast['seconds'] * 1000:.0f} ms "
+                f"{MARKS[row['agree']]}"
+            )
+
+    if not rows:
+        print("[Parity] No clips found")
+        return 1
+
+    compared = [row for row in rows if row['agree'] is not None]
+    agreement = sum(row['agree'] for row in compared) / len(compared) if compared else 0.0
+    speedups = [row['speedup'] for row in rows if 'speedup' in row]
+    conf_diffs = [abs(row['confidence_diff']) for row in rows if 'confidence_diff' in row]
+    summary = {
+        'clips': len(rows),
+        'compared': len(compared),
+        'fast_only': [row['name'] for row in rows if row['agree'] is None],
+        'agreement': round(agreement, 3),
+        'median_speedup': round(float(np.median(speedups)), 2) if speedups else None,
+        'mean_abs_confidence_diff': round(float(np.mean(conf_diffs)), 3) if conf_diffs else None,
+    }
+
+    print(
+        f"\n[Parity] {len(compared)}/{len(rows)} clips comparable: {agreement:.0%} offset agreement (±{args.max_offset_diff} frame), "
+        f"median speedup {summary['median_speedup']}x, "
+        f"mean |Δconfidence| {summary['mean_abs_confidence_diff']}"
+    )
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps({'summary': summary, 'clips': rows}, indent=2))
+    print(f"[Parity] Results written to {args.output}")
+
+    return 0 if agreement >= args.min_agreement else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Audio-Visual Sync Detector (lightweight)
+Pre-detector de sincronía labios/audio sin redes profundas: correlaciona el
+movimiento de la región de la boca con la envolvente de energía del audio
+(NumPy) y estima el desfase y la fuerza de la sincronía. Devuelve los mismos
+campos que SyncNetWrapper (offset_frames, lag_ms, score) a una fracción del costo
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from syncnet_engine.audio import SAMPLE_RATE, load_audio
+from syncnet_engine.face_detectors import build_face_detector
+from syncnet_engine.vad import speech_coverage
+from syncnet_engine.video import read_video
+
+logger = logging.getLogger(__name__)
+
+# Mouth region inside a face box (fractions of width / height)
+MOUTH_X = (0.25, 0.75)
+MOUTH_Y = (0.60, 0.95)
+MOUTH_SIZE = (32, 16)   # ROI resampled to this (w, h) before differencing
+
+
+def cross_correlation(video_signal: np.ndarray, audio_signal: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    Pearson correlation of video[i] with audio[i + lag] for lag = -max_lag..+max_lag
+
+    Returns:
+        (2 * max_lag + 1,) correlations (0 where the overlap is too short)
+    """
+    n = min(len(video_signal), len(audio_signal))
+    video_signal = np.asarray(video_signal[:n], dtype=np.float64)
+    audio_signal = np.asarray(audio_signal[:n], dtype=np.float64)
+
+    corr = np.zeros(2 * max_lag + 1)
+    for k, lag in enumerate(range(-max_lag, max_lag + 1)):
+        v = video_signal[max(0, -lag):n - max(0, lag)]
+        a = audio_signal[max(0, lag):n - max(0, -lag)]
+        if len(v) < 10 or v.std() == 0 or a.std() == 0:
+            continue
+        corr[k] = np.mean((v - v.mean()) * (a - a.mean())) / (v.std() * a.std())
+    return corr
+
+
+class AVSyncDetector:
+    """
+    Lip-sync check from mouth motion vs audio energy
+
+    1. Face boxes on a few sampled frames (any face_detectors backend, Haar by
+       default), interpolated to every frame; the mouth is the lower-middle part.
+    2. Video signal: mean absolute frame difference of the mouth ROI.
+    3. Audio signal: |change| of log RMS energy in a window centred on each frame.
+    4. Cross-correlation over +/- max_offset_frames: the peak gives the offset and
+       the sync strength.
+
+    offset_frames follows SyncNet's sign (negative = audio lags the video).
+    Silent audio or a flat correlation (no positive peak) gives no offset to
+    measure: the clip is skipped with reason 'no_speech' instead of scored.
+    """
+
+    def __init__(
+        self,
+        frame_rate: float = 25.0,
+        max_offset_frames: int = 15,
+        sync_tolerance_frames: int = 2,
+        strong_correlation: float = 0.5,
+        face_samples: int = 8,
+        max_seconds: float = 10.0,
+        min_speech_coverage: float = 0.1,
+        face_detector=None,
+        face_detector_backend: str = 'haar',
+        face_detector_path: Optional[str] = None,
+        face_detector_config: Optional[str] = None
+    ):
+        """
+        Args:
+            frame_rate: Analysis frame rate
+            max_offset_frames: Largest offset searched (15 = SyncNet's vshift)
+            sync_tolerance_frames: Offsets up to this are considered in sync
+            strong_correlation: Peak correlation that maps to a full sync strength
+            face_samples: Frames the face detector runs on
+            max_seconds: Only the first max_seconds of the video (and audio) are decoded
+            min_speech_coverage: Skip (reason 'no_speech') below this voiced fraction (0 = off)
+            face_detector: Object with detect(frame_bgr) -> (N, 5); overrides the backend
+            face_detector_backend: 'haar', 'yunet', 'opencv_dnn' or 's3fd' (see face_detectors)
+            face_detector_path: Model file for the backend (None = bundled Haar cascade)
+            face_detector_config: Network description (opencv_dnn only)
+        """
+        self.frame_rate = frame_rate
+        self.max_offset_frames = max_offset_frames
+        self.sync_tolerance_frames = sync_tolerance_frames
+        self.strong_correlation = strong_correlation
+        self.face_samples = face_samples
+        self.max_seconds = max_seconds
+        self.min_speech_coverage = min_speech_coverage
+
+        self.face_detector = face_detector or build_face_detector(
+            face_detector_backend, face_detector_path, config_path=face_detector_config
+        )
+
+        logger.info(
+            f"[AVSync] Initialized (face detector: {getattr(self.face_detector, 'name', type(self.face_detector).__name__)}, "
+            f"max offset: {max_offset_frames} frames)"
+        )
+
+    def warmup(self, batch_sizes: Sequence[int] = (1,)):
+        """Run the face detector once (batch sizes do not apply)"""
+        self.face_detector.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+
+    def mouth_boxes(self, frames: List[np.ndarray]) -> np.ndarray:
+        """
+        Mouth ROI (x1, y1, x2, y2) per frame from the dominant face on sampled frames
+
+        Raises:
+            ValueError: no face in any sampled frame
+        """
+        samples = np.unique(np.linspace(0, len(frames) - 1, self.face_samples).astype(int))
+        found, faces = [], []
+        for index in samples:
+            boxes = self.face_detector.detect(frames[index])
+            if len(boxes):
+                areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+                found.append(index)
+                faces.append(boxes[int(np.argmax(areas)), :4])
+        if not found:
+            raise ValueError("No face found for AV sync analysis")
+
+        faces = np.stack(faces).astype(np.float64)
+        all_frames = np.arange(len(frames))
+        x1, y1, x2, y2 = (np.interp(all_frames, found, faces[:, k]) for k in range(4))
+        w, h = x2 - x1, y2 - y1
+        return np.stack([
+            x1 + MOUTH_X[0] * w, y1 + MOUTH_Y[0] * h, x1 + MOUTH_X[1] * w, y1 + MOUTH_Y[1] * h
+        ], axis=1)
+
+    @staticmethod
+    def mouth_motion(frames: List[np.ndarray], boxes: np.ndarray) -> np.ndarray:
+        """(T,) mouth motion energy; frame k is the change from frame k - 1 (0 for the first)"""
+        rois = []
+        for frame, box in zip(frames, boxes):
+            height, width = frame.shape[:2]
+            x1, y1, x2, y2 = np.clip(np.round(box), 0, [width - 1, height - 1, width, height]).astype(int)
+            roi = frame[y1:max(y2, y1 + 1), x1:max(x2, x1 + 1)]
+            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+            rois.append(cv2.resize(gray, MOUTH_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32))
+
+        rois = np.stack(rois)
+        return np.concatenate([[0.0], np.abs(np.diff(rois, axis=0)).mean(axis=(1, 2))])
+
+    def audio_energy_change(self, audio: np.ndarray, num_frames: int) -> np.ndarray:
+        """(T,) |change| of log RMS energy, windows centred on each frame time"""
+        audio = np.asarray(audio, dtype=np.float64)
+        hop = SAMPLE_RATE / self.frame_rate
+        centres = (np.arange(num_frames) * hop).astype(int)
+        half = int(hop // 2)
+
+        padded = np.pad(audio, (half, half + int(hop)))
+        windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half)[centres]
+        log_energy = np.log1p(np.sqrt(np.mean(windows ** 2, axis=1)))
+        return np.concatenate([[0.0], np.abs(np.diff(log_energy))])
+
+    def _score(self, correlation: float, offset_frames: int) -> float:
+        """Sync strength scaled by an offset penalty (1 inside the tolerance, 0 at max offset)"""
+        strength = float(np.clip(correlation / self.strong_correlation, 0.0, 1.0))
+        excess = max(0, abs(offset_frames) - self.sync_tolerance_frames)
+        span = max(1, self.max_offset_frames - self.sync_tolerance_frames)
+        return strength * max(0.0, 1.0 - excess / span)
+
+    def process_video(
+        self,
+        video_path: str,
+        session_id: Optional[str] = None,
+        audio_path: Optional[str] = None
+    ) -> Dict:
+        """
+        Estimate audio/video offset and sync strength
+
+        Args:
+            video_path: Video file (audio decoded from it unless audio_path is given)
+            session_id: Only used for logging
+            audio_path: Optional separate WAV track
+
+        Returns:
+            dict with score (0-1), offset_frames, lag_ms, confidence (peak - median
+            correlation), correlation (peak), num_frames, processing_time_ms;
+            or {'skipped': True, 'reason': 'no_speech', ...} for silent audio
+        """
+        start = time.perf_counter()
+
+        audio = load_audio(video_path, audio_path, max_seconds=self.max_seconds)
+        coverage = speech_coverage(audio)
+        if coverage < self.min_speech_coverage:
+            return self._skip(session_id or video_path, start, speech_coverage=round(coverage, 3))
+
+        frames, _ = read_video(video_path, self.frame_rate, max_frames=int(self.max_seconds * self.frame_rate))
+        audio = audio[:int(len(frames) / self.frame_rate * SAMPLE_RATE)]
+
+        motion = self.mouth_motion(frames, self.mouth_boxes(frames))
+        energy = self.audio_energy_change(audio, len(frames))
+
+        correlation = cross_correlation(motion, energy, self.max_offset_frames)
+        best = int(np.argmax(correlation))
+        offset_frames = -(best - self.max_offset_frames)
+        peak = float(correlation[best])
+        if peak <= 0:
+            # Flat audio energy (or no positive peak): argmax would be an arbitrary offset
+            return self._skip(session_id or video_path, start, speech_coverage=round(coverage, 3), correlation=round(peak, 4))
+
+        result = {
+            'score': round(self._score(peak, offset_frames), 4),
+            'offset_frames': offset_frames,
+            'lag_ms': round(offset_frames / self.frame_rate * 1000, 1),
+            'confidence': round(peak - float(np.median(correlation)), 4),
+            'correlation': round(peak, 4),
+            'num_frames': len(frames),
+            'processing_time_ms': round((time.perf_counter() - start) * 1000, 1),
+        }
+
+        logger.info(
+            f"[AVSync] {session_id or video_path}: offset {offset_frames} frames "
+            f"({result['lag_ms']} ms), correlation {peak:.3f}, score {result['score']:.3f} "
+            f"in {result['processing_time_ms']:.0f} ms"
+        )
+        return result
+
+    @staticmethod
+    def _skip(reference: str, start: float, **details) -> Dict:
+        logger.info(f"[AVSync] {reference}: skipped, no speech to align ({details})")
+        return {
+            'skipped': True,
+            'reason': 'no_speech',
+            **details,
+            'processing_time_ms': round((time.perf_counter() - start) * 1000, 1),
+        }
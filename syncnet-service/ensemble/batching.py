@@ -0,0 +1,141 @@
+"""
+Dynamic Micro-Batching
+Servidor de inferencia por modelo dentro del worker: agrupa tensores de frames
+de todos los requests en curso y ejecuta un solo forward pass por batch
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import torch
+
+from utils.metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_SIZE_HISTOGRAM = histogram(
+    'inference_batch_size',
+    'Number of frames per forward pass',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+    labelnames=('model',)
+)
+
+QUEUE_WAIT_HISTOGRAM = histogram(
+    'inference_queue_wait_seconds',
+    'Time a frame waits in the inference queue before its forward pass',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+    labelnames=('model',)
+)
+
+
+class InferenceServer:
+    """
+    Per-model dynamic batcher
+
+    Características:
+    - submit() encola un tensor (C, H, W) y devuelve un Future
+    - Un thread daemon forma batches de hasta max_batch_size, esperando como
+      máximo max_wait_ms desde que llega el primer tensor
+    - Un forward pass por batch; cada Future recibe su fila del output
+    """
+
+    def __init__(
+        self,
+        forward_fn: Callable[[torch.Tensor], torch.Tensor],
+        name: str,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Initialize inference server
+
+        Args:
+            forward_fn: Batched forward (N, ...) -> (N, ...)
+            name: Model name (metrics label)
+            max_batch_size: Maximum tensors per forward pass
+            max_wait_ms: Maximum time to wait for a batch to fill
+        """
+        self.forward_fn = forward_fn
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name=f'inference-{name}',
+            daemon=True
+        )
+        self._thread.start()
+
+        self._batch_size_metric = BATCH_SIZE_HISTOGRAM.labels(model=name)
+        self._queue_wait_metric = QUEUE_WAIT_HISTOGRAM.labels(model=name)
+
+        logger.info(
+            f"[InferenceServer] {name} started "
+            f"(max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms})"
+        )
+
+    def submit(self, tensor: torch.Tensor) -> Future:
+        """Queue one input tensor, returns a Future with its output row"""
+        future = Future()
+        self._queue.put((tensor, future, time.perf_counter()))
+        return future
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            batch_deadline = batch[0][2] + self.max_wait
+
+            # Fill the batch until it is full or the first item waited max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = batch_deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[tuple]):
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self._queue_wait_metric.observe(started - enqueued)
+        self._batch_size_metric.observe(len(batch))
+
+        try:
+            outputs = self.forward_fn(torch.stack([item[0] for item in batch]))
+        except Exception as e:
+            logger.error(f"[InferenceServer] {self.name} batch of {len(batch)} failed: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for idx, (_, future, _) in enumerate(batch):
+            future.set_result(outputs[idx])
+
+
+def forward_in_batches(
+    tensors: List[torch.Tensor],
+    forward_fn: Callable[[torch.Tensor], torch.Tensor],
+    server: Optional[InferenceServer] = None
+) -> torch.Tensor:
+    """
+    Run forward_fn over a list of input tensors
+
+    With a server, tensors are shared with other in-flight requests;
+    otherwise they are stacked into a single local batch.
+    """
+    if server is None:
+        return forward_fn(torch.stack(tensors))
+
+    futures = [server.submit(t) for t in tensors]
+    return torch.stack([f.result() for f in futures])
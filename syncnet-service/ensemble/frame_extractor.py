@@ -3,6 +3,8 @@ Video Frame Extraction Utilities
 Extrae frames de videos para análisis con EfficientNet
 """
 
+import time
+
 import cv2
 import numpy as np
 from PIL import Image
@@ -10,6 +12,8 @@ from pathlib import Path
 from typing import List, Optional
 import logging
 
+from utils.metrics import STAGE_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,6 +64,10 @@ class FrameExtractor:
         if not video_path.exists():
             raise FileNotFoundError(f"Video not found: {video_path}")
 
+        # Stage timing: 'sampling' = frame conversion/resize, 'decode' = everything else
+        start_time = time.perf_counter()
+        sampling_time = 0.0
+
         # Open video
         cap = cv2.VideoCapture(str(video_path))
 
@@ -111,6 +119,7 @@ class FrameExtractor:
             step = max(1, len(all_frames) // self.max_frames)
             sampled_indices = list(range(0, len(all_frames), step))[:self.max_frames]
 
+            convert_start = time.perf_counter()
             for idx in sampled_indices:
                 frame = all_frames[idx]
                 # Convert BGR to RGB
@@ -120,6 +129,7 @@ class FrameExtractor:
                 if resize:
                     pil_image = pil_image.resize(resize, Image.BICUBIC)
                 frames.append(pil_image)
+            sampling_time += time.perf_counter() - convert_start
 
             logger.info(f"[FrameExtractor] Read {len(all_frames)} total frames, sampled {len(frames)}")
 
@@ -142,6 +152,7 @@ class FrameExtractor:
                     break
 
                 if current_frame in frame_indices:
+                    convert_start = time.perf_counter()
                     # Convert BGR to RGB
                     frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                     # Convert to PIL Image
@@ -150,11 +161,16 @@ class FrameExtractor:
                     if resize:
                         pil_image = pil_image.resize(resize, Image.BICUBIC)
                     frames.append(pil_image)
+                    sampling_time += time.perf_counter() - convert_start
 
                 current_frame += 1
 
             cap.release()
 
+        total_time = time.perf_counter() - start_time
+        STAGE_SECONDS.labels(stage='decode').observe(total_time - sampling_time)
+        STAGE_SECONDS.labels(stage='sampling').observe(sampling_time)
+
         logger.info(f"[FrameExtractor] Extracted {len(frames)} frames")
 
         if not frames:
@@ -8,39 +8,23 @@ UPDATED: 2025-11-03 - Added Vision Transformer v2 (92% accuracy)
 
 import time
 import logging
-from typing import Dict, Optional, Union
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Sequence, Union
 from pathlib import Path
 
-# Importar detectores
-try:
+# Detectores: solo para type hints; app.py los importa bajo demanda (ensemble.registry)
+if TYPE_CHECKING:
     from syncnet_wrapper import SyncNetWrapper
-    SYNCNET_AVAILABLE = True
-except ImportError:
-    SYNCNET_AVAILABLE = False
-    logging.warning("[Orchestrator] SyncNet not available")
-
-try:
     from ensemble.efficientnet_detector import EfficientNetDetector
-    from ensemble.frame_extractor import FrameExtractor
-    EFFICIENTNET_AVAILABLE = True
-except ImportError:
-    EFFICIENTNET_AVAILABLE = False
-    logging.warning("[Orchestrator] EfficientNet not available")
-
-try:
     from ensemble.vit_detector import ViTDetector
-    from ensemble.frame_extractor import FrameExtractor
-    VIT_AVAILABLE = True
-except ImportError:
-    VIT_AVAILABLE = False
-    logging.warning("[Orchestrator] ViT not available")
-
-try:
     from ensemble.efficientnetv2_detector import EfficientNetV2Detector
-    EFFICIENTNETV2_AVAILABLE = True
-except ImportError:
-    EFFICIENTNETV2_AVAILABLE = False
-    logging.warning("[Orchestrator] EfficientNetV2 not available")
+    from ensemble.avsync_detector import AVSyncDetector
+
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.metrics import (
+    CACHE_HITS, CACHE_MISSES, DEADLINE_EXCEEDED, DETECTOR_ERRORS, DETECTOR_SKIPS, STAGE_SECONDS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -58,10 +42,11 @@ class EnsembleOrchestrator:
 
     def __init__(
         self,
-        syncnet_wrapper: Optional[SyncNetWrapper] = None,
-        efficientnet_detector: Optional[EfficientNetDetector] = None,
-        vit_detector: Optional[ViTDetector] = None,
+        syncnet_wrapper: Optional['SyncNetWrapper'] = None,
+        efficientnet_detector: Optional['EfficientNetDetector'] = None,
+        vit_detector: Optional['ViTDetector'] = None,
         efficientnetv2_detector: Optional['EfficientNetV2Detector'] = None,
+        avsync_detector: Optional['AVSyncDetector'] = None,
         weights: Optional[Dict[str, float]] = None
     ):
         """
@@ -72,12 +57,18 @@ class EnsembleOrchestrator:
             efficientnet_detector: Instance of EfficientNetDetector (opcional)
             vit_detector: Instance of ViTDetector (opcional)
             efficientnetv2_detector: Instance of EfficientNetV2Detector (opcional)
+            avsync_detector: Instance of AVSyncDetector (opcional, sincronía labios/audio ligera)
             weights: Dict con pesos {'syncnet': 0.0, 'efficientnet': 0.0, 'vit': 0.0, 'efficientnetv2': 1.0}
         """
         self.syncnet = syncnet_wrapper
         self.efficientnet = efficientnet_detector
         self.vit = vit_detector
         self.efficientnetv2 = efficientnetv2_detector
+        self.avsync = avsync_detector
+
+        # SyncNet, AV sync and frame detectors without an InferenceServer are not
+        # thread-safe: concurrent videos (jobs, /score/batch) take turns on them
+        self._stage_lock = threading.Lock()
 
         # Default weights (ajustados según investigación)
         # EfficientNetV2-B2 tiene 99.885% accuracy, es el más preciso
@@ -86,6 +77,7 @@ class EnsembleOrchestrator:
             'efficientnet': 0.0,  # Desactivado (baja precisión ~70%)
             'vit': 0.0,          # Desactivado (92% accuracy pero no el mejor)
             'efficientnetv2': 1.0,  # ACTIVO (99.885% accuracy, MEJOR detector)
+            'avsync': 0.0,        # Desactivado (pre-detector de sincronía sin red neuronal)
         }
 
         # Validate weights sum to 1.0
@@ -102,11 +94,38 @@ class EnsembleOrchestrator:
         logger.info(f"[Orchestrator] EfficientNet-B0: {'✓' if self.efficientnet else '✗'}")
         logger.info(f"[Orchestrator] ViT v2: {'✓' if self.vit else '✗'}")
         logger.info(f"[Orchestrator] EfficientNetV2-B2: {'✓' if self.efficientnetv2 else '✗'}")
+        logger.info(f"[Orchestrator] AV Sync: {'✓' if self.avsync else '✗'}")
+
+    def warmup(self, batch_sizes: Sequence[int] = (1,)) -> Dict[str, float]:
+        """
+        Load the SyncNet engine and run dummy batches through every loaded detector
+
+        Returns:
+            Warm-up time per detector (ms)
+        """
+        timings = {}
+        if self.syncnet is not None:
+            start = time.perf_counter()
+            self.syncnet.warmup()
+            timings['syncnet'] = round((time.perf_counter() - start) * 1000, 1)
+
+        for name in ('efficientnet', 'vit', 'efficientnetv2', 'avsync'):
+            detector = getattr(self, name)
+            if detector is None:
+                continue
+            start = time.perf_counter()
+            detector.warmup(batch_sizes)
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+        logger.info(f"[Orchestrator] Warm-up timings (ms): {timings}")
+        return timings
 
     def analyze_video(
         self,
         video_path: str,
-        session_id: str
+        session_id: str,
+        progress_callback: Optional[Callable[[dict], None]] = None,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Union[float, str, dict, bool]]:
         """
         Analiza video usando ensemble de detectores
@@ -114,6 +133,10 @@ class EnsembleOrchestrator:
         Args:
             video_path: Path to video file
             session_id: Session identifier
+            progress_callback: Opcional, recibe resultados parciales después de cada detector
+            deadline: Opcional, presupuesto del request. Los detectores que no llegan
+                a correr (o se cortan) quedan en incomplete_detectors y el resultado
+                se marca partial; sin ningún resultado se lanza DeadlineExceeded
 
         Returns:
             dict con estructura COMPATIBLE con API actual + nuevos campos
@@ -125,78 +148,139 @@ class EnsembleOrchestrator:
         # Resultados individuales
         results = {}
         errors = {}
+        skipped = {}  # detectores omitidos por un pre-check (p. ej. SyncNet sin voz)
+        incomplete = []  # detectores sin correr o cortados por el deadline
+        frames_cache = {}
 
         # 1. Run SyncNet (si disponible)
-        if self.syncnet:
+        if self.syncnet and self._has_time(deadline, 'syncnet', incomplete):
             try:
-                syncnet_result = self.syncnet.process_video(video_path, session_id)
-                results['syncnet'] = syncnet_result
-                logger.info(f"[Orchestrator] SyncNet score: {syncnet_result.get('score', 'N/A')}")
+                with self._serialized('syncnet', self.syncnet, deadline):
+                    syncnet_result = self.syncnet.process_video(video_path, session_id, deadline=deadline)
+                if syncnet_result.get('skipped'):
+                    # Sin voz: no cuenta como error y su peso se reparte entre los demás
+                    self._record_skip('syncnet', syncnet_result, skipped)
+                else:
+                    results['syncnet'] = syncnet_result
+                    logger.info(f"[Orchestrator] SyncNet score: {syncnet_result.get('score', 'N/A')}")
+            except DeadlineExceeded as e:
+                logger.warning(f"[Orchestrator] SyncNet cut short: {e}")
+                incomplete.append('syncnet')
             except Exception as e:
                 logger.error(f"[Orchestrator] SyncNet failed: {e}")
                 errors['syncnet'] = str(e)
+                DETECTOR_ERRORS.labels(detector='syncnet').inc()
+            self._report_progress(progress_callback, results, errors, skipped)
+
+        # 1b. Run AV sync pre-detector (si disponible)
+        if self.avsync and self._has_time(deadline, 'avsync', incomplete):
+            try:
+                with self._serialized('avsync', self.avsync, deadline):
+                    avsync_result = self.avsync.process_video(video_path, session_id)
+                if avsync_result.get('skipped'):
+                    self._record_skip('avsync', avsync_result, skipped)
+                else:
+                    results['avsync'] = avsync_result
+                    logger.info(f"[Orchestrator] AV Sync score: {avsync_result.get('score', 'N/A')}")
+            except DeadlineExceeded as e:
+                logger.warning(f"[Orchestrator] AV Sync cut short: {e}")
+                incomplete.append('avsync')
+            except Exception as e:
+                logger.error(f"[Orchestrator] AV Sync failed: {e}")
+                errors['avsync'] = str(e)
+                DETECTOR_ERRORS.labels(detector='avsync').inc()
+            self._report_progress(progress_callback, results, errors, skipped)
 
         # 2. Run EfficientNet (si disponible)
-        if self.efficientnet:
+        if self.efficientnet and self._has_time(deadline, 'efficientnet', incomplete):
             try:
-                # Extract frames
-                extractor = FrameExtractor(max_frames=20, sampling_method='uniform')
-                frames = extractor.extract_frames(video_path)
+                # Extract frames (shared by all frame detectors)
+                frames = self._get_frames(video_path, frames_cache)
 
                 # Run detector
-                efficientnet_result = self.efficientnet.predict_frames(
-                    frames,
-                    aggregate_method='mean'
-                )
+                with self._serialized('efficientnet', self.efficientnet, deadline):
+                    efficientnet_result = self.efficientnet.predict_frames(
+                        frames,
+                        aggregate_method='mean'
+                    )
                 results['efficientnet'] = efficientnet_result
                 logger.info(f"[Orchestrator] EfficientNet score: {efficientnet_result.get('score', 'N/A')}")
+            except DeadlineExceeded as e:
+                logger.warning(f"[Orchestrator] EfficientNet cut short: {e}")
+                incomplete.append('efficientnet')
             except Exception as e:
                 logger.error(f"[Orchestrator] EfficientNet failed: {e}")
                 errors['efficientnet'] = str(e)
+                DETECTOR_ERRORS.labels(detector='efficientnet').inc()
+            self._report_progress(progress_callback, results, errors, skipped)
 
         # 3. Run ViT v2 (si disponible)
-        if self.vit:
+        if self.vit and self._has_time(deadline, 'vit', incomplete):
             try:
-                # Extract frames (reuse extractor or create new one)
-                extractor = FrameExtractor(max_frames=20, sampling_method='uniform')
-                frames = extractor.extract_frames(video_path)
+                # Extract frames (shared by all frame detectors)
+                frames = self._get_frames(video_path, frames_cache)
 
                 # Run detector
-                vit_result = self.vit.predict_frames(
-                    frames,
-                    aggregate_method='mean'
-                )
+                with self._serialized('vit', self.vit, deadline):
+                    vit_result = self.vit.predict_frames(
+                        frames,
+                        aggregate_method='mean'
+                    )
                 results['vit'] = vit_result
                 logger.info(f"[Orchestrator] ViT v2 score: {vit_result.get('score', 'N/A')}")
+            except DeadlineExceeded as e:
+                logger.warning(f"[Orchestrator] ViT v2 cut short: {e}")
+                incomplete.append('vit')
             except Exception as e:
                 logger.error(f"[Orchestrator] ViT v2 failed: {e}")
                 errors['vit'] = str(e)
+                DETECTOR_ERRORS.labels(detector='vit').inc()
+            self._report_progress(progress_callback, results, errors, skipped)
 
         # 4. Run EfficientNetV2-B2 (si disponible)
-        if self.efficientnetv2:
+        if self.efficientnetv2 and self._has_time(deadline, 'efficientnetv2', incomplete):
             try:
-                # Extract frames
-                extractor = FrameExtractor(max_frames=20, sampling_method='uniform')
-                frames = extractor.extract_frames(video_path)
+                # Extract frames (shared by all frame detectors)
+                frames = self._get_frames(video_path, frames_cache)
 
                 # Run detector
-                efficientnetv2_result = self.efficientnetv2.predict_frames(
-                    frames,
-                    aggregate_method='mean'
-                )
+                with self._serialized('efficientnetv2', self.efficientnetv2, deadline):
+                    efficientnetv2_result = self.efficientnetv2.predict_frames(
+                        frames,
+                        aggregate_method='mean'
+                    )
                 results['efficientnetv2'] = efficientnetv2_result
                 logger.info(f"[Orchestrator] EfficientNetV2-B2 score: {efficientnetv2_result.get('score', 'N/A'):.4f}")
+            except DeadlineExceeded as e:
+                logger.warning(f"[Orchestrator] EfficientNetV2-B2 cut short: {e}")
+                incomplete.append('efficientnetv2')
             except Exception as e:
                 logger.error(f"[Orchestrator] EfficientNetV2-B2 failed: {e}")
                 errors['efficientnetv2'] = str(e)
+                DETECTOR_ERRORS.labels(detector='efficientnetv2').inc()
+            self._report_progress(progress_callback, results, errors, skipped)
+
+        if incomplete:
+            DEADLINE_EXCEEDED.labels(reason=deadline.reason or 'deadline').inc()
+            if not results:
+                raise DeadlineExceeded(
+                    f"No detector finished before the {deadline.reason or 'deadline'} "
+                    f"(incomplete: {incomplete})",
+                    deadline.reason or 'deadline'
+                )
 
         # 4. Calcular ensemble score
-        ensemble_result = self._calculate_ensemble(results, errors)
+        with STAGE_SECONDS.labels(stage='fusion').time():
+            ensemble_result = self._calculate_ensemble(results, errors, skipped)
 
         # 4. Agregar metadata
         processing_time_ms = int((time.time() - start_time) * 1000)
         ensemble_result['processing_time_ms'] = processing_time_ms
         ensemble_result['session_id'] = session_id
+        ensemble_result['partial'] = bool(incomplete)
+        ensemble_result['incomplete_detectors'] = incomplete or None
+        if deadline is not None:
+            ensemble_result['deadline'] = deadline.summary()
 
         logger.info(
             f"[Orchestrator] Final score: {ensemble_result['combined_score']:.3f} "
@@ -205,23 +289,100 @@ class EnsembleOrchestrator:
 
         return ensemble_result
 
+    @staticmethod
+    def _has_time(deadline: Optional[Deadline], detector: str, incomplete: list) -> bool:
+        """False (y el detector queda en incomplete) si el deadline ya se agotó o se canceló"""
+        if deadline is None or not deadline.expired:
+            return True
+        logger.warning(f"[Orchestrator] Skipping {detector}: {deadline.reason}")
+        incomplete.append(detector)
+        return False
+
+    @contextmanager
+    def _serialized(self, name: str, detector, deadline: Optional[Deadline] = None):
+        """
+        Run a detector stage one video at a time
+
+        Detectors served by an InferenceServer are thread-safe and run concurrently
+        (their frames share micro-batches). Waiting for the turn is bounded by the
+        deadline (DeadlineExceeded: the detector counts as incomplete).
+        """
+        if getattr(detector, 'inference_server', None) is not None:
+            yield
+            return
+
+        timeout = deadline.timeout() if deadline is not None else None
+        if not self._stage_lock.acquire(timeout=-1 if timeout is None else timeout):
+            reason = deadline.reason or 'deadline'
+            raise DeadlineExceeded(f"{name}: {reason} while waiting for another video", reason)
+        try:
+            yield
+        finally:
+            self._stage_lock.release()
+
+    @staticmethod
+    def _record_skip(name: str, result: dict, skipped: dict):
+        """Detector omitido por un pre-check (p. ej. sin voz): sin score ni error"""
+        skipped[name] = {k: v for k, v in result.items() if k in ('reason', 'speech_coverage')}
+        DETECTOR_SKIPS.labels(detector=name, reason=result['reason']).inc()
+        logger.info(f"[Orchestrator] {name} skipped: {result['reason']}")
+
+    def _get_frames(self, video_path: str, frames_cache: dict) -> list:
+        """Extrae frames una sola vez por video y los reutiliza entre detectores"""
+        key = (20, 'uniform')
+
+        if key in frames_cache:
+            CACHE_HITS.labels(cache='frames').inc()
+            return frames_cache[key]
+
+        CACHE_MISSES.labels(cache='frames').inc()
+        from ensemble.frame_extractor import FrameExtractor  # cv2, only when a frame detector runs
+        extractor = FrameExtractor(max_frames=20, sampling_method='uniform')
+        frames_cache[key] = extractor.extract_frames(video_path)
+        return frames_cache[key]
+
+    def _report_progress(
+        self,
+        progress_callback: Optional[Callable[[dict], None]],
+        results: Dict[str, dict],
+        errors: Dict[str, str],
+        skipped: Optional[Dict[str, dict]] = None
+    ):
+        """Envía resultados parciales (scores por detector) al callback"""
+        if progress_callback is None:
+            return
+
+        skipped = skipped or {}
+        try:
+            progress_callback({
+                'detectors_completed': list(results.keys()) + list(errors.keys()) + list(skipped.keys()),
+                'scores': {k: round(v.get('score', 0), 4) for k, v in results.items()},
+                'errors': dict(errors) if errors else None,
+                'skipped': {k: v['reason'] for k, v in skipped.items()} if skipped else None,
+            })
+        except Exception as e:
+            logger.warning(f"[Orchestrator] Progress callback failed: {e}")
+
     def _calculate_ensemble(
         self,
         results: Dict[str, dict],
-        errors: Dict[str, str]
+        errors: Dict[str, str],
+        skipped: Optional[Dict[str, dict]] = None
     ) -> Dict[str, Union[float, str, dict, bool]]:
         """
         Combina resultados de múltiples detectores
 
         Estrategia:
         - Calcula weighted average de todos los detectores disponibles
-        - Normaliza pesos basado en detectores activos
+        - Normaliza pesos basado en detectores activos (los omitidos, p. ej.
+          SyncNet con reason 'no_speech', no cuentan)
         - Si NINGUNO disponible: error
         """
         # Check si tenemos al menos un resultado
         if not results:
             raise RuntimeError(
                 f"All detectors failed. Errors: {errors}"
+                + (f", skipped: {skipped}" if skipped else "")
             )
 
         # Calculate weighted average con normalización dinámica
@@ -261,6 +422,16 @@ class EnsembleOrchestrator:
                 'lag_ms': results['syncnet'].get('lag_ms'),
             }
 
+        # AV Sync details (si disponible)
+        if 'avsync' in results:
+            detectors_detail['avsync'] = {
+                'score': round(results['avsync']['score'], 4),
+                'offset_frames': results['avsync'].get('offset_frames'),
+                'confidence': results['avsync'].get('confidence'),
+                'correlation': results['avsync'].get('correlation'),
+                'lag_ms': results['avsync'].get('lag_ms'),
+            }
+
         # EfficientNet details (si disponible)
         if 'efficientnet' in results:
             detectors_detail['efficientnet'] = {
@@ -293,10 +464,11 @@ class EnsembleOrchestrator:
         # Decision basado en score combinado
         decision = self._make_decision(combined_score, results)
 
-        # Retrocompatibilidad con campos de SyncNet
-        syncnet_offset = results['syncnet'].get('offset_frames', 0) if 'syncnet' in results else 0
+        # Retrocompatibilidad con campos de SyncNet (AV Sync como respaldo para offset/lag)
+        sync_source = results.get('syncnet') or results.get('avsync') or {}
+        syncnet_offset = sync_source.get('offset_frames', 0)
         syncnet_min_dist = results['syncnet'].get('min_dist', 0) if 'syncnet' in results else 0
-        syncnet_lag_ms = results['syncnet'].get('lag_ms', 0) if 'syncnet' in results else 0
+        syncnet_lag_ms = sync_source.get('lag_ms', 0)
 
         # Determinar modo de ensemble
         if len(available_detectors) >= 3:
@@ -328,7 +500,8 @@ class EnsembleOrchestrator:
             # Metadata
             'ensemble_mode': ensemble_mode,
             'detectors_used': available_detectors,
-            'errors': errors if errors else None
+            'errors': errors if errors else None,
+            'skipped': skipped if skipped else None
         }
 
     def _make_decision(
@@ -0,0 +1,128 @@
+"""
+Face Presence Preflight
+Chequeo rápido antes del ensemble: decodifica unos pocos frames, los reduce a
+baja resolución y busca una cara. Si ningún frame muestreado tiene cara (o el
+video no se puede leer) /score rechaza el request sin cargar ni correr los
+detectores. Tiene presupuesto de tiempo estricto: si se agota, deja pasar
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FacePresenceCheck:
+    """
+    Rejects videos without a visible face in a few sampled frames
+
+    Frames are spread over the clip (seeking when the container reports a frame
+    count, sequential reads otherwise, e.g. MediaRecorder WebM). The check stops
+    at the first frame with a face. Only a clip whose sampled frames were all
+    checked without a face is rejected; running out of time_budget_ms lets the
+    request through.
+    """
+
+    def __init__(
+        self,
+        face_detector,
+        num_samples: int = 5,
+        max_side: int = 320,
+        time_budget_ms: float = 200.0,
+        max_scan_frames: int = 150
+    ):
+        """
+        Args:
+            face_detector: Object with detect(frame_bgr) -> (N, 5) (see syncnet_engine.face_detectors)
+            num_samples: Frames checked at most
+            max_side: Frames are downscaled so their longer side is at most this
+            time_budget_ms: Total time allowed, decode included
+            max_scan_frames: Frames read sequentially when the frame count is unknown
+        """
+        self.face_detector = face_detector
+        self.num_samples = num_samples
+        self.max_side = max_side
+        self.time_budget_ms = time_budget_ms
+        self.max_scan_frames = max_scan_frames
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        scale = self.max_side / max(height, width)
+        if scale >= 1.0:
+            return frame
+        return cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    def _sample_indices(self, frame_count: int) -> List[int]:
+        """Middle of the clip first (most likely to show the speaker), then outwards"""
+        positions = np.linspace(0, frame_count - 1, self.num_samples + 2)[1:-1].astype(int)
+        order = np.argsort(np.abs(positions - (frame_count - 1) / 2), kind='stable')
+        return list(dict.fromkeys(positions[order].tolist()))
+
+    def _frames(self, cap: cv2.VideoCapture):
+        """Yield sampled frames (seek when the frame count is known)"""
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count > 0:
+            for index in self._sample_indices(frame_count):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ok, frame = cap.read()
+                if ok:
+                    yield frame
+            return
+
+        stride = max(1, self.max_scan_frames // self.num_samples)
+        for index in range(self.max_scan_frames):
+            if not cap.grab():
+                return
+            if index % stride == stride // 2:
+                ok, frame = cap.retrieve()
+                if ok:
+                    yield frame
+
+    def check(self, video_path: str) -> Dict:
+        """
+        Returns:
+            dict with passed (bool), reason ('no_face', 'unreadable' or None),
+            frames_checked, face_found, timed_out and elapsed_ms
+        """
+        start = time.perf_counter()
+        result = {'passed': True, 'reason': None, 'frames_checked': 0, 'face_found': False, 'timed_out': False}
+
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            if not cap.isOpened():
+                result.update(passed=False, reason='unreadable')
+            else:
+                for frame in self._frames(cap):
+                    result['frames_checked'] += 1
+                    if len(self.face_detector.detect(self._downscale(frame))):
+                        result['face_found'] = True
+                        break
+                    if (time.perf_counter() - start) * 1000 > self.time_budget_ms:
+                        result['timed_out'] = True
+                        break
+
+                if result['frames_checked'] == 0:
+                    result.update(passed=False, reason='unreadable')
+                elif not result['face_found'] and not result['timed_out']:
+                    result.update(passed=False, reason='no_face')
+        finally:
+            cap.release()
+
+        result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+
+def build_face_presence_check(
+    backend: str = 'haar',
+    model_path: Optional[str] = None,
+    config_path: Optional[str] = None,
+    **kwargs
+) -> FacePresenceCheck:
+    """FacePresenceCheck with a face_detectors backend (Haar by default: no model file needed)"""
+    from syncnet_engine.face_detectors import build_face_detector
+    detector = build_face_detector(backend, model_path, config_path=config_path)
+    return FacePresenceCheck(detector, **kwargs)
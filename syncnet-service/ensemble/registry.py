@@ -0,0 +1,59 @@
+"""
+Lazy Detector Registry
+Importa cada detector (y torch / torchvision / timm / transformers / cv2) solo
+cuando se habilita, para que `import app` no pague dependencias de detectores
+desactivados. Registra el tiempo de import por módulo para el startup profiler
+"""
+
+import time
+import logging
+import importlib
+import importlib.util
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# name -> (module, class, third-party packages the module needs)
+DETECTORS: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    'syncnet': ('syncnet_wrapper', 'SyncNetWrapper', ('numpy',)),
+    'efficientnet': ('ensemble.efficientnet_detector', 'EfficientNetDetector', ('torch', 'torchvision', 'cv2')),
+    'vit': ('ensemble.vit_detector', 'ViTDetector', ('torch', 'transformers', 'cv2')),
+    'efficientnetv2': ('ensemble.efficientnetv2_detector', 'EfficientNetV2Detector', ('torch', 'timm', 'torchvision', 'cv2')),
+    'avsync': ('ensemble.avsync_detector', 'AVSyncDetector', ('numpy', 'scipy', 'cv2', 'torch')),
+}
+
+# Seconds spent importing each detector module (first import only)
+IMPORT_SECONDS: Dict[str, float] = {}
+
+
+def is_available(name: str) -> bool:
+    """True when the detector's dependencies are installed (checked without importing them)"""
+    module, _, requirements = DETECTORS[name]
+    try:
+        return all(importlib.util.find_spec(pkg) is not None for pkg in requirements + (module,))
+    except (ImportError, ValueError):
+        return False
+
+
+def load_detector_class(name: str) -> Optional[type]:
+    """
+    Import and return a detector class, or None if its dependencies are missing
+
+    Args:
+        name: 'syncnet', 'efficientnet', 'vit', 'efficientnetv2' or 'avsync'
+    """
+    module_name, class_name, _ = DETECTORS[name]
+
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        logger.warning(f"[Registry] {name} not available: {e}")
+        return None
+
+    if module_name not in IMPORT_SECONDS:
+        IMPORT_SECONDS[module_name] = time.perf_counter() - start
+        logger.info(f"[Registry] Imported {module_name} in {IMPORT_SECONDS[module_name] * 1000:.0f} ms")
+
+    return getattr(module, class_name)
@@ -0,0 +1,219 @@
+"""
+Live Incremental Scoring
+Puntúa frames mientras el usuario todavía está hablando (stream por WebSocket)
+Ejecuta los detectores de frames sobre una ventana móvil y emite
+combined_score/decision intermedios hasta que la decisión es estable
+"""
+
+import io
+import time
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+# Frame detectors that can score partial streams (SyncNet needs the full clip)
+FRAME_DETECTORS = ('efficientnet', 'vit', 'efficientnetv2')
+
+
+class StreamingSession:
+    """
+    Incremental scoring state for one live stream
+
+    Características:
+    - add_frame() decodifica JPEG y cada `frame_stride` frames guarda uno
+    - Cada `update_every` frames guardados, los detectores puntúan solo los nuevos
+    - El score intermedio usa los últimos `window_frames` scores por detector
+    - La sesión es estable cuando la decisión no cambia en `stable_updates`
+      actualizaciones seguidas con al menos `min_frames` frames puntuados
+    - Los detectores corren bajo el lock de etapas del orquestador (los mismos
+      modelos que usan /score y /jobs), salvo los servidos por InferenceServer
+    - El audio no se puntúa en vivo: solo se cuenta su duración (no se guarda)
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        session_id: str,
+        frame_stride: int = 3,
+        update_every: int = 5,
+        window_frames: int = 30,
+        min_frames: int = 10,
+        stable_updates: int = 3,
+        max_frames: int = 300
+    ):
+        """
+        Initialize streaming session
+
+        Args:
+            orchestrator: EnsembleOrchestrator (detectors + weights + decision logic)
+            session_id: Session identifier
+            frame_stride: Keep one of every N received frames (webcam ~25-30 FPS)
+            update_every: Kept frames per detector run / interim update
+            window_frames: Rolling window of frame scores used for the interim score
+            min_frames: Minimum scored frames before the decision can be stable
+            stable_updates: Consecutive identical decisions needed to finalize
+            max_frames: Hard cap of received frames (finalizes when reached)
+        """
+        self.orchestrator = orchestrator
+        self.session_id = session_id
+        self.frame_stride = max(1, frame_stride)
+        self.update_every = update_every
+        self.window_frames = window_frames
+        self.min_frames = min_frames
+        self.stable_updates = stable_updates
+        self.max_frames = max_frames
+
+        self.detectors = {
+            name: getattr(orchestrator, name)
+            for name in FRAME_DETECTORS
+            if getattr(orchestrator, name, None) is not None
+        }
+
+        self.frames_received = 0
+        self.frames_scored = 0
+        self._pending: List[Image.Image] = []
+        self._scores = {name: deque(maxlen=window_frames) for name in self.detectors}
+        self._confidences = {name: deque(maxlen=window_frames) for name in self.detectors}
+        self._errors: Dict[str, str] = {}
+
+        # Audio is not scored on live streams: only its duration is reported
+        self.sample_rate = 16000
+        self._audio_seconds = 0.0
+
+        self._decisions: deque = deque(maxlen=stable_updates)
+        self._last_update: Optional[dict] = None
+        self.start_time = time.time()
+
+        logger.info(
+            f"[Streaming] Session {session_id} started "
+            f"(detectors={list(self.detectors)}, stride={frame_stride}, window={window_frames})"
+        )
+
+    def add_frame(self, jpeg_bytes: bytes) -> Optional[dict]:
+        """
+        Add one encoded frame
+
+        Returns an interim update dict when the detectors ran, else None.
+        Raises ValueError if a kept frame cannot be decoded.
+        """
+        self.frames_received += 1
+        if (self.frames_received - 1) % self.frame_stride != 0:
+            return None
+
+        try:
+            image = Image.open(io.BytesIO(jpeg_bytes)).convert('RGB')
+        except OSError as e:  # PIL.UnidentifiedImageError, truncated JPEG
+            raise ValueError(f"Invalid frame {self.frames_received}: {e}")
+        self._pending.append(image)
+
+        if len(self._pending) < self.update_every:
+            return None
+
+        return self._score_pending()
+
+    def add_audio(self, pcm16_bytes: bytes, sample_rate: Optional[int] = None):
+        """
+        Count mono PCM16 little-endian audio (duration only, samples are dropped)
+
+        Raises ValueError if the chunk is not a whole number of samples.
+        """
+        if len(pcm16_bytes) % 2:
+            raise ValueError(f"Invalid audio chunk: {len(pcm16_bytes)} bytes is not PCM16")
+        if sample_rate:
+            self.sample_rate = sample_rate
+        self._audio_seconds += len(pcm16_bytes) / 2 / float(self.sample_rate)
+
+    @property
+    def audio_seconds(self) -> float:
+        return self._audio_seconds
+
+    def is_stable(self) -> bool:
+        """True when the decision did not change in the last stable_updates updates"""
+        return (
+            self.frames_scored >= self.min_frames and
+            len(self._decisions) == self.stable_updates and
+            len(set(self._decisions)) == 1
+        )
+
+    def is_full(self) -> bool:
+        return self.frames_received >= self.max_frames
+
+    def finalize(self, early_exit: bool = False) -> dict:
+        """Score remaining frames and return the final ensemble result"""
+        if self._pending:
+            self._score_pending()
+
+        if self._last_update is None:
+            raise RuntimeError("No frames received")
+
+        result = dict(self._last_update)
+        result.update({
+            'type': 'final',
+            'early_exit': early_exit,
+            'stream_time_ms': int((time.time() - self.start_time) * 1000),
+            'audio_seconds': round(self.audio_seconds, 3),
+            'session_id': self.session_id,
+        })
+
+        logger.info(
+            f"[Streaming] Session {self.session_id} final: "
+            f"score={result['combined_score']:.3f}, decision={result['decision']}, "
+            f"frames={self.frames_scored}, early_exit={early_exit}"
+        )
+
+        return result
+
+    def _score_pending(self) -> dict:
+        frames, self._pending = self._pending, []
+
+        for name, detector in self.detectors.items():
+            try:
+                # Same models as /score and /jobs: take the orchestrator's stage turn
+                with self.orchestrator._serialized(name, detector):
+                    prediction = detector.predict_frames(frames, aggregate_method='mean')
+                self._scores[name].extend(prediction['frame_scores'])
+                self._confidences[name].append(prediction['confidence'])
+                self._errors.pop(name, None)
+            except Exception as e:
+                logger.error(f"[Streaming] {name} failed: {e}")
+                self._errors[name] = str(e)
+
+        self.frames_scored += len(frames)
+        results = self._window_results()
+
+        ensemble_result = self.orchestrator._calculate_ensemble(results, dict(self._errors))
+        self._decisions.append(ensemble_result['decision'])
+
+        self._last_update = {
+            'type': 'interim',
+            'combined_score': ensemble_result['combined_score'],
+            'decision': ensemble_result['decision'],
+            'confidence': ensemble_result['confidence'],
+            'detectors': ensemble_result['detectors'],
+            'frames_received': self.frames_received,
+            'frames_scored': self.frames_scored,
+            'stable': self.is_stable(),
+        }
+        return self._last_update
+
+    def _window_results(self) -> Dict[str, dict]:
+        """Per-detector result dicts built from the rolling score window"""
+        results = {}
+        for name, scores in self._scores.items():
+            if not scores:
+                continue
+            window = np.array(scores)
+            std_score = float(np.std(window))
+            results[name] = {
+                'score': float(np.mean(window)),
+                'confidence': float(np.mean(self._confidences[name])),
+                'consistency': 1.0 - min(std_score * 2, 1.0),
+                'num_frames': len(window),
+            }
+        return results
@@ -6,11 +6,14 @@ Integrated: 2025-11-03
 """
 
 import torch
-from transformers import ViTForImageClassification, ViTImageProcessor
+from transformers import ViTConfig, ViTForImageClassification, ViTImageProcessor
 from PIL import Image
 import numpy as np
 import logging
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Sequence, Union
+
+from ensemble.batching import InferenceServer, forward_in_batches
+from utils.metrics import DETECTOR_INFERENCE_SECONDS, STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +30,8 @@ class ViTDetector:
         self,
         model_name: str = "prithivMLmods/Deep-Fake-Detector-v2-Model",
         device: str = 'cpu',
-        confidence_threshold: float = 0.5
+        confidence_threshold: float = 0.5,
+        use_pretrained: bool = True
     ):
         """
         Initialize ViT Detector
@@ -36,22 +40,38 @@ class ViTDetector:
             model_name: Hugging Face model name
             device: 'cuda' or 'cpu'
             confidence_threshold: Threshold for binary classification
+            use_pretrained: Download model_name weights (False = random init with the
+                same ViT-Base architecture and labels, for offline benchmarks/tests)
         """
         self.device = torch.device(device if torch.cuda.is_available() else 'cpu')
         self.confidence_threshold = confidence_threshold
         self.model_name = model_name
 
+        # Optional dynamic batcher shared by concurrent requests
+        self.inference_server: Optional[InferenceServer] = None
+
         logger.info(f"[ViT] Initializing Vision Transformer v2 on device: {self.device}")
         logger.info(f"[ViT] Loading model: {model_name}")
 
         try:
-            # Load model and processor from Hugging Face
-            self.model = ViTForImageClassification.from_pretrained(
-                model_name,
-                torch_dtype=torch.float32,
-                low_cpu_mem_usage=True
-            )
-            self.processor = ViTImageProcessor.from_pretrained(model_name)
+            if use_pretrained:
+                # Load model and processor from Hugging Face
+                self.model = ViTForImageClassification.from_pretrained(
+                    model_name,
+                    torch_dtype=torch.float32,
+                    low_cpu_mem_usage=True
+                )
+                self.processor = ViTImageProcessor.from_pretrained(model_name)
+            else:
+                # ViT-Base/16 @ 224 with the fine-tuned model's labels
+                config = ViTConfig(
+                    num_labels=2,
+                    id2label={0: "Realism", 1: "Deepfake"},
+                    label2id={"Realism": 0, "Deepfake": 1}
+                )
+                self.model = ViTForImageClassification(config)
+                self.processor = ViTImageProcessor()
+                logger.warning("[ViT] Using randomly initialized weights (benchmark/testing only)")
 
             # Move to device and set eval mode
             self.model.to(self.device)
@@ -79,45 +99,68 @@ class ViTDetector:
                 probabilities: dict - Class probabilities
                 class_label: str - "Realism" or "Deepfake"
         """
+        pixel_values = self._preprocess(image).unsqueeze(0)
+        probabilities = self._forward_batch(pixel_values)
+
+        return self._to_prediction(probabilities[0])
+
+    def _preprocess(self, image: Image.Image) -> torch.Tensor:
+        """PIL Image -> pixel_values tensor (3, 224, 224)"""
+        inputs = self.processor(images=image, return_tensors="pt")
+        return inputs['pixel_values'][0]
+
+    def _forward_batch(self, batch: torch.Tensor) -> torch.Tensor:
+        """Batched forward pass: pixel_values (N, 3, 224, 224) -> softmax probabilities (N, 2)"""
         with torch.no_grad():
-            # Preprocess image
-            inputs = self.processor(images=image, return_tensors="pt")
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
-            # Forward pass
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-
-            # Get probabilities
-            probabilities = torch.softmax(logits, dim=-1)[0]
-
-            # Get predicted class
-            predicted_class_idx = logits.argmax(-1).item()
-
-            # Model has 2 classes: 0="Realism", 1="Deepfake"
-            # Verified from model.config.id2label
-            class_labels = self.model.config.id2label
-            predicted_label = class_labels[predicted_class_idx]
-
-            # Extract probabilities
-            # IMPORTANT: Class 0 = "Realism" (Real), Class 1 = "Deepfake" (Fake)
-            real_prob = probabilities[0].item()  # Probability of REAL
-            fake_prob = probabilities[1].item()  # Probability of FAKE
-
-            # Classification decision
-            is_real = predicted_label == "Realism"
-            confidence = max(real_prob, fake_prob)
-
-            return {
-                'is_real': is_real,
-                'confidence': confidence,
-                'score': real_prob,  # Higher = more likely real
-                'probabilities': {
-                    'real': real_prob,
-                    'fake': fake_prob
-                },
-                'class_label': predicted_label
-            }
+            outputs = self.model(pixel_values=batch.to(self.device))
+            return torch.softmax(outputs.logits, dim=-1).cpu()
+
+    def _to_prediction(self, probabilities: torch.Tensor) -> Dict[str, Union[bool, float, dict]]:
+        """Convert one row of softmax probabilities into a prediction dict"""
+        # Get predicted class
+        predicted_class_idx = probabilities.argmax(-1).item()
+
+        # Model has 2 classes: 0="Realism", 1="Deepfake"
+        # Verified from model.config.id2label
+        class_labels = self.model.config.id2label
+        predicted_label = class_labels[predicted_class_idx]
+
+        # Extract probabilities
+        # IMPORTANT: Class 0 = "Realism" (Real), Class 1 = "Deepfake" (Fake)
+        real_prob = probabilities[0].item()  # Probability of REAL
+        fake_prob = probabilities[1].item()  # Probability of FAKE
+
+        # Classification decision
+        is_real = predicted_label == "Realism"
+        confidence = max(real_prob, fake_prob)
+
+        return {
+            'is_real': is_real,
+            'confidence': confidence,
+            'score': real_prob,  # Higher = more likely real
+            'probabilities': {
+                'real': real_prob,
+                'fake': fake_prob
+            },
+            'class_label': predicted_label
+        }
+
+    def warmup(self, batch_sizes: Sequence[int] = (1,)):
+        """Run dummy batches at the production input shape (allocator + kernel warm-up)"""
+        image = Image.new('RGB', (224, 224), color=(128, 128, 128))
+        self._preprocess(image)
+        for batch_size in batch_sizes:
+            self._forward_batch(torch.zeros(batch_size, 3, 224, 224))
+        logger.info(f"[ViT] Warm-up done (batch sizes: {list(batch_sizes)})")
+
+    def enable_batching(self, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """Share forward passes with concurrent requests via an InferenceServer"""
+        self.inference_server = InferenceServer(
+            self._forward_batch,
+            name='vit',
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        )
 
     def predict_frames(
         self,
@@ -146,18 +189,23 @@ class ViTDetector:
 
         logger.info(f"[ViT] Analyzing {len(frames)} frames")
 
-        predictions = []
-        for idx, frame in enumerate(frames):
-            try:
-                pred = self.predict_image(frame)
-                predictions.append(pred)
-            except Exception as e:
-                logger.error(f"[ViT] Error processing frame {idx}: {e}")
-                continue
-
-        if not predictions:
+        # Preprocess every frame, then run a single batched forward pass
+        tensors = []
+        with STAGE_SECONDS.labels(stage='preprocess').time():
+            for idx, frame in enumerate(frames):
+                try:
+                    tensors.append(self._preprocess(frame))
+                except Exception as e:
+                    logger.error(f"[ViT] Error processing frame {idx}: {e}")
+                    continue
+
+        if not tensors:
             raise RuntimeError("Failed to process any frames")
 
+        with DETECTOR_INFERENCE_SECONDS.labels(detector='vit').time():
+            probabilities = forward_in_batches(tensors, self._forward_batch, self.inference_server)
+        predictions = [self._to_prediction(probs) for probs in probabilities]
+
         # Extract scores
         scores = np.array([p['score'] for p in predictions])
         confidences = np.array([p['confidence'] for p in predictions])
@@ -4,17 +4,25 @@ Gunicorn configuration for SyncNet Flask service in production
 
 import multiprocessing
 import os
+import shutil
+import tempfile
 
 # Server socket
 bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
 
-# Worker processes
-workers = 2  # SyncNet es CPU-intensive, 2 workers es suficiente
-worker_class = "sync"  # Sync workers para procesamiento bloqueante
-threads = 1  # 1 thread por worker (SyncNet no es thread-safe)
+# Worker processes (override per deployment; size with benchmarks/load_test.py)
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))  # SyncNet es CPU-intensive, 2 workers es suficiente
+threads = int(os.getenv('GUNICORN_THREADS', '1'))  # 1 thread por worker (SyncNet no es thread-safe)
+# Sync workers para procesamiento bloqueante; gthread cuando threads > 1
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# /metrics sumado entre workers (cada worker vuelca su registro a este directorio)
+_metrics_dir_created = workers > 1 and not os.getenv('METRICS_MULTIPROC_DIR')
+if _metrics_dir_created:
+    os.environ['METRICS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), f'syncnet-metrics-{os.getpid()}')
 
 # Timeouts
-timeout = 120  # 2 minutos (SyncNet tarda 30-45s por video)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))  # 2 minutos (SyncNet tarda 30-45s por video)
 graceful_timeout = 30
 keepalive = 5
 
@@ -44,6 +52,18 @@ limit_request_line = 4096
 limit_request_fields = 100
 limit_request_field_size = 8190
 
+def on_starting(server):
+    """Called just before the master process is initialized"""
+    if os.getenv('METRICS_MULTIPROC_DIR'):
+        from utils.metrics import clear_multiproc_dir
+        clear_multiproc_dir(os.environ['METRICS_MULTIPROC_DIR'])
+        server.log.info(f"Metrics aggregated over workers in {os.environ['METRICS_MULTIPROC_DIR']}")
+
+def on_exit(server):
+    """Called just before the master process exits"""
+    if _metrics_dir_created:
+        shutil.rmtree(os.environ['METRICS_MULTIPROC_DIR'], ignore_errors=True)
+
 def pre_fork(server, worker):
     """Called just before a worker is forked"""
     pass
@@ -52,6 +72,14 @@ def post_fork(server, worker):
     """Called just after a worker has been forked"""
     server.log.info(f"Worker spawned (pid: {worker.pid})")
 
+def post_worker_init(worker):
+    """Called just after a worker has loaded the application"""
+    import app as service
+    if service.CONFIG['warmup_on_start']:
+        # Models build + dummy batches in the background; /readyz is 503 until done
+        service.start_warmup()
+        worker.log.info(f"Worker warm-up started (pid: {worker.pid})")
+
 def pre_exec(server):
     """Called just before a new master process is forked"""
     server.log.info("Forked child, re-executing.")
@@ -64,6 +92,18 @@ def worker_int(worker):
     """Called when a worker receives a SIGINT or SIGQUIT signal"""
     worker.log.info("Worker received INT or QUIT signal")
 
+def worker_exit(server, worker):
+    """Called in the worker just after it exited: write its final metrics"""
+    import app as service
+    if service.metrics_collector is not None:
+        service.metrics_collector.stop()
+
+def child_exit(server, worker):
+    """Called in the master after a worker exited: keep its counters, drop its gauges"""
+    if os.getenv('METRICS_MULTIPROC_DIR'):
+        from utils.metrics import mark_process_dead
+        mark_process_dead(worker.pid, os.environ['METRICS_MULTIPROC_DIR'])
+
 def worker_abort(worker):
     """Called when a worker receives a SIGABRT signal"""
     worker.log.info("Worker received SIGABRT signal")
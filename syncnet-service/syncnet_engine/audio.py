@@ -0,0 +1,279 @@
+"""
+Audio Features for the SyncNet Engine
+Decodifica el audio del contenedor directo a memoria (PyAV en proceso, o ffmpeg
+por pipe), lo remuestrea a 16 kHz mono y calcula los MFCC vectorizados una sola
+vez por video; cada track toma su ventana sin recalcular ni escribir WAVs
+"""
+
+import os
+import shutil
+import logging
+import threading
+import subprocess
+from collections import OrderedDict
+from functools import lru_cache
+from math import gcd
+from typing import Optional
+
+import numpy as np
+from scipy import signal
+from scipy.fft import dct
+from scipy.io import wavfile
+
+from syncnet_engine.vad import speech_coverage
+from utils.metrics import CACHE_HITS, CACHE_MISSES
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WINDOW_STEP = 0.01      # MFCC windows every 10 ms -> 100 Hz
+WINDOW_LENGTH = 0.025
+
+
+def resample(audio: np.ndarray, source_rate: int, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Polyphase resampling to `sample_rate` (float64 out)"""
+    audio = audio.astype(np.float64)
+    if source_rate == sample_rate:
+        return audio
+    common = gcd(int(source_rate), int(sample_rate))
+    return signal.resample_poly(audio, sample_rate // common, int(source_rate) // common)
+
+
+def _to_int16(audio: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(audio), -32768, 32767).astype(np.int16)
+
+
+def _decode_with_pyav(
+    video_path: str,
+    sample_rate: int,
+    max_samples: Optional[int] = None
+) -> Optional[np.ndarray]:
+    """
+    Decode + resample in-process with PyAV, stopping once max_samples are out;
+    None if PyAV is missing, empty if there is no audio stream
+    """
+    try:
+        import av
+    except ImportError:
+        return None
+
+    with av.open(str(video_path)) as container:
+        if not container.streams.audio:
+            return np.zeros(0, dtype=np.int16)
+        resampler = av.AudioResampler(format='s16', layout='mono', rate=sample_rate)
+        chunks, decoded = [], 0
+        for frame in container.decode(audio=0):
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+                decoded += len(chunks[-1])
+            if max_samples is not None and decoded >= max_samples:
+                break
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray().reshape(-1))
+
+    return np.concatenate(chunks).astype(np.int16) if chunks else np.zeros(0, dtype=np.int16)
+
+
+def _has_audio_stream(video_path: str) -> Optional[bool]:
+    """ffprobe the container for an audio stream; None if ffprobe is missing or fails"""
+    if shutil.which('ffprobe') is None:
+        return None
+
+    completed = subprocess.run(
+        [
+            'ffprobe', '-v', 'error', '-select_streams', 'a',
+            '-show_entries', 'stream=index', '-of', 'csv=p=0', str(video_path)
+        ],
+        capture_output=True,
+        timeout=30,
+        check=False
+    )
+    if completed.returncode != 0:
+        return None
+    return bool(completed.stdout.strip())
+
+
+def _decode_with_ffmpeg(video_path: str, sample_rate: int, max_seconds: Optional[float] = None) -> np.ndarray:
+    """Decode + resample with ffmpeg, raw PCM read from its stdout (no file); empty if there is no audio stream"""
+    if shutil.which('ffmpeg') is None:
+        raise RuntimeError("Cannot decode audio: install PyAV (`pip install av`) or ffmpeg")
+
+    # ffmpeg errors out on video-only input: that is silence, not a decode failure
+    if _has_audio_stream(video_path) is False:
+        return np.zeros(0, dtype=np.int16)
+
+    completed = subprocess.run(
+        [
+            'ffmpeg', '-nostdin', '-loglevel', 'error', '-i', str(video_path),
+            '-vn', '-ac', '1', '-ar', str(sample_rate),
+            *(['-t', f'{max_seconds:.3f}'] if max_seconds is not None else []),
+            '-f', 's16le', '-'
+        ],
+        capture_output=True,
+        timeout=60,
+        check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Audio decode failed: {completed.stderr.decode(errors='replace').strip()}")
+
+    return np.frombuffer(completed.stdout, dtype=np.int16)
+
+
+def load_audio(
+    video_path: str,
+    audio_path: Optional[str] = None,
+    sample_rate: int = SAMPLE_RATE,
+    max_seconds: Optional[float] = None
+) -> np.ndarray:
+    """
+    Decode audio as 16-bit mono samples at `sample_rate`, entirely in memory
+
+    Args:
+        video_path: Container to decode audio from
+        audio_path: Separate WAV file to use instead (e.g. a sidecar track)
+        sample_rate: Output sample rate
+        max_seconds: Only decode the first max_seconds (None = whole track)
+
+    Returns:
+        (num_samples,) int16 array, empty if the container has no audio stream
+
+    Raises:
+        RuntimeError: No decoder is installed or the audio cannot be decoded
+    """
+    if audio_path is not None:
+        source_rate, audio = wavfile.read(str(audio_path), mmap=max_seconds is not None)
+        if max_seconds is not None:
+            audio = audio[:int(max_seconds * source_rate)]
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        return _to_int16(resample(audio, source_rate, sample_rate))
+
+    max_samples = int(max_seconds * sample_rate) if max_seconds is not None else None
+    audio = _decode_with_pyav(video_path, sample_rate, max_samples)
+    if audio is None:
+        audio = _decode_with_ffmpeg(video_path, sample_rate, max_seconds)
+    return audio[:max_samples]
+
+
+def _hz_to_mel(hz):
+    return 2595 * np.log10(1 + hz / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700 * (10 ** (mel / 2595.0) - 1)
+
+
+@lru_cache(maxsize=8)
+def mel_filterbank(num_filters: int = 26, nfft: int = 512, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Triangular mel filterbank (num_filters, nfft // 2 + 1), python_speech_features layout"""
+    mel_points = np.linspace(_hz_to_mel(0), _hz_to_mel(sample_rate / 2), num_filters + 2)
+    bins = np.floor((nfft + 1) * _mel_to_hz(mel_points) / sample_rate)
+
+    fft_bins = np.arange(nfft // 2 + 1)[None, :]
+    left, centre, right = bins[:-2, None], bins[1:-1, None], bins[2:, None]
+    rising = (fft_bins - left) / np.maximum(centre - left, 1)
+    falling = (right - fft_bins) / np.maximum(right - centre, 1)
+
+    bank = np.where((fft_bins >= left) & (fft_bins < centre), rising, 0.0)
+    bank = np.where((fft_bins >= centre) & (fft_bins < right), falling, bank)
+    bank.setflags(write=False)
+    return bank
+
+
+def mfcc_features(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    num_ceps: int = 13,
+    num_filters: int = 26,
+    nfft: int = 512,
+    preemph: float = 0.97,
+    ceplifter: int = 22
+) -> np.ndarray:
+    """
+    Vectorized MFCCs, numerically equivalent to python_speech_features.mfcc defaults
+    (25 ms windows every 10 ms, 26 mel filters, log energy in c0)
+
+    Returns:
+        (num_ceps, num_windows) float32 array
+    """
+    audio = np.asarray(audio, dtype=np.float64)
+    if len(audio) == 0:
+        return np.zeros((num_ceps, 0), dtype=np.float32)
+
+    emphasized = np.append(audio[0], audio[1:] - preemph * audio[:-1])
+
+    frame_len = int(round(WINDOW_LENGTH * sample_rate))
+    frame_step = int(round(WINDOW_STEP * sample_rate))
+    num_frames = 1 + max(0, int(np.ceil((len(emphasized) - frame_len) / frame_step)))
+    padded = np.zeros((num_frames - 1) * frame_step + frame_len)
+    padded[:len(emphasized)] = emphasized
+    frames = np.lib.stride_tricks.sliding_window_view(padded, frame_len)[::frame_step]
+
+    power = np.square(np.abs(np.fft.rfft(frames, nfft))) / nfft
+    energy = power.sum(axis=1)
+    energy[energy == 0] = np.finfo(float).eps
+
+    filtered = power @ mel_filterbank(num_filters, nfft, sample_rate).T
+    filtered[filtered == 0] = np.finfo(float).eps
+
+    ceps = dct(np.log(filtered), type=2, axis=1, norm='ortho')[:, :num_ceps]
+    ceps *= 1 + (ceplifter / 2.0) * np.sin(np.pi * np.arange(num_ceps) / ceplifter)
+    ceps[:, 0] = np.log(energy)
+
+    return ceps.T.astype(np.float32)
+
+
+class AudioFeatures:
+    """
+    MFCCs of a whole video; tracks slice their window instead of recomputing.
+    speech_coverage (see vad) is measured on the same decoded samples.
+    """
+
+    def __init__(self, mfcc: np.ndarray, frame_rate: float = 25.0, speech_coverage: Optional[float] = None):
+        self.mfcc = mfcc
+        self.frame_rate = frame_rate
+        self.speech_coverage = speech_coverage
+        self.windows_per_frame = 1.0 / (frame_rate * WINDOW_STEP)
+
+    def window(self, first_frame: int, last_frame: int) -> np.ndarray:
+        """(13, W) MFCCs aligned with video frames first_frame..last_frame"""
+        start = int(round(first_frame * self.windows_per_frame))
+        end = int(round((last_frame + 1) * self.windows_per_frame))
+        return self.mfcc[:, start:end]
+
+
+class AudioFeatureCache:
+    """
+    Small LRU of AudioFeatures keyed by file identity (path, size, mtime), so
+    retries and repeated /score calls on the same file skip decode + MFCC
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[tuple, AudioFeatures]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(video_path: str, audio_path: Optional[str], frame_rate: float) -> tuple:
+        source = audio_path or video_path
+        stat = os.stat(source)
+        return (os.path.realpath(source), stat.st_size, stat.st_mtime_ns, frame_rate)
+
+    def get(self, video_path: str, audio_path: Optional[str] = None, frame_rate: float = 25.0) -> AudioFeatures:
+        key = self._key(video_path, audio_path, frame_rate)
+        with self._lock:
+            features = self._entries.get(key)
+            if features is not None:
+                self._entries.move_to_end(key)
+                CACHE_HITS.labels(cache='mfcc').inc()
+                return features
+
+        CACHE_MISSES.labels(cache='mfcc').inc()
+        audio = load_audio(video_path, audio_path)
+        features = AudioFeatures(mfcc_features(audio), frame_rate, speech_coverage(audio))
+
+        with self._lock:
+            self._entries[key] = features
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return features
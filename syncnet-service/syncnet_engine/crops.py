@@ -0,0 +1,82 @@
+"""
+Face Crops
+Recorta cada track a 224x224 centrado en la cara suavizada (como `crop_video`
+de run_pipeline.py) a un array uint8 en memoria, sin el .avi intermedio ni su
+recompresión; `write_crops_avi` queda solo como salida de depuración
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+from scipy import signal
+
+logger = logging.getLogger(__name__)
+
+CROP_SIZE = 224
+
+
+def crop_track(
+    frames: List[np.ndarray],
+    track: Dict[str, np.ndarray],
+    crop_scale: float = 0.4,
+    smooth_kernel: int = 13
+) -> np.ndarray:
+    """
+    Crop a face track from the decoded frames
+
+    Args:
+        frames: BGR frames of the whole video
+        track: {'frame': (T,), 'bbox': (T, 4)} from track_shot
+        crop_scale: Extra context around the face (run_pipeline.py --crop_scale)
+        smooth_kernel: Median filter size for box size/centre
+
+    Returns:
+        (T, 224, 224, 3) uint8 BGR crops (the pixels run_pipeline.py would encode)
+    """
+    boxes = track['bbox']
+    sizes = np.maximum(boxes[:, 3] - boxes[:, 1], boxes[:, 2] - boxes[:, 0]) / 2
+    centres_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    centres_x = (boxes[:, 0] + boxes[:, 2]) / 2
+
+    sizes = signal.medfilt(sizes, kernel_size=smooth_kernel)
+    centres_y = signal.medfilt(centres_y, kernel_size=smooth_kernel)
+    centres_x = signal.medfilt(centres_x, kernel_size=smooth_kernel)
+
+    crops = np.empty((len(track['frame']), CROP_SIZE, CROP_SIZE, 3), dtype=np.uint8)
+    for i, frame_index in enumerate(track['frame']):
+        bs = sizes[i]
+        pad = int(bs * (1 + 2 * crop_scale))
+        image = np.pad(
+            frames[frame_index], ((pad, pad), (pad, pad), (0, 0)),
+            mode='constant', constant_values=110
+        )
+        my = centres_y[i] + pad
+        mx = centres_x[i] + pad
+        face = image[
+            int(my - bs):int(my + bs * (1 + 2 * crop_scale)),
+            int(mx - bs * (1 + crop_scale)):int(mx + bs * (1 + crop_scale))
+        ]
+        crops[i] = cv2.resize(face, (CROP_SIZE, CROP_SIZE))
+
+    return crops
+
+
+def write_crops_avi(crops: np.ndarray, path: str, frame_rate: float = 25.0) -> str:
+    """
+    Debug output: write a track's crops as an MJPG .avi (video only)
+
+    Not used for scoring - SyncNet consumes the in-memory crops directly.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), frame_rate, (CROP_SIZE, CROP_SIZE))
+    try:
+        for crop in crops:
+            writer.write(crop)
+    finally:
+        writer.release()
+    logger.debug(f"[SyncNetEngine] Wrote debug crops {path}")
+    return str(path)
@@ -0,0 +1,359 @@
+"""
+SyncNet Engine
+Pipeline de SyncNet residente en el proceso: S3FD y SyncNet se cargan una vez
+por worker y detección, tracking, recortes, MFCC y búsqueda de desfase corren
+en memoria (sin `run_pipeline.py` / `run_syncnet.py` ni archivos intermedios)
+"""
+
+import time
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+
+from utils.deadline import Deadline
+from utils.metrics import SYNCNET_ENGINE_SECONDS
+from syncnet_engine.audio import AudioFeatureCache
+from syncnet_engine.crops import crop_track, write_crops_avi
+from syncnet_engine.model import load_syncnet_model
+from syncnet_engine.offsets import evaluate_tracks
+from syncnet_engine.tracking import detect_strided, track_dominant_face, track_shot
+from syncnet_engine.video import detect_scenes, frames_at, read_video, read_video_native
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _timed(step: str, timings: Dict[str, float]):
+    """Accumulate a stage's wall time (ms) and observe it in SYNCNET_ENGINE_SECONDS"""
+    start = time.perf_counter()
+    try:
+        with SYNCNET_ENGINE_SECONDS.labels(step=step).time():
+            yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        timings[step] = round(timings.get(step, 0.0) + elapsed, 1)
+
+
+def _check_deadline(deadline: Optional[Deadline], stage: str):
+    """Stop between stages once the request is out of time (DeadlineExceeded)"""
+    if deadline is not None:
+        deadline.check(f'syncnet/{stage}')
+
+
+class SyncNetEngine:
+    """
+    In-process SyncNet pipeline with resident models
+
+    Same stages and defaults as syncnet_python's run_pipeline.py + run_syncnet.py:
+    25 fps video, scene cuts, S3FD (every `detect_stride` frames), IoU tracking (--min_track),
+    224x224 crops, MFCC audio and offset search over +/- vshift frames.
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str],
+        detector_path: Optional[str] = None,
+        syncnet_repo_path: Optional[str] = None,
+        device: str = 'cpu',
+        face_detector=None,
+        detector_backend: str = 's3fd',
+        detector_config_path: Optional[str] = None,
+        frame_rate: float = 25.0,
+        min_track: int = 50,
+        min_face_size: float = 100,
+        facedet_scale: float = 0.25,
+        detect_stride: int = 5,
+        detect_scale: float = 1.0,
+        crop_scale: float = 0.4,
+        vshift: int = 15,
+        max_vshift: Optional[int] = None,
+        batch_size: int = 20,
+        early_stop_confidence: Optional[float] = None,
+        fast_mode: bool = False,
+        debug_crops_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            model_path: syncnet_v2.model (None = random weights, tests/benchmarks only)
+            detector_path: Face detector model file (sfd_face.pth for S3FD; ignored
+                when face_detector is given)
+            syncnet_repo_path: syncnet_python checkout providing the S3FD network
+            device: 'cpu' or 'cuda'
+            face_detector: Object with detect(frame_bgr) -> (N, 5); defaults to
+                build_face_detector(detector_backend, ...)
+            detector_backend: 's3fd', 'yunet' or 'opencv_dnn' (see face_detectors)
+            detector_config_path: Network description for 'opencv_dnn'
+            frame_rate: Analysis frame rate (SyncNet is trained at 25 fps)
+            min_track: Minimum face track length in frames
+            min_face_size: Minimum mean face size in pixels
+            facedet_scale: S3FD input downscale
+            detect_stride: Run the face detector every N frames and interpolate
+                boxes in between (1 = every frame, as run_pipeline.py)
+            detect_scale: Extra downscale applied before any face detector
+            crop_scale: Context around the face in crops
+            vshift: Largest audio/video offset searched, in frames
+            max_vshift: Adaptive search - widen up to this offset when the best
+                one lands on the +/- vshift edge (None = fixed window)
+            batch_size: 5-frame windows per SyncNet forward pass (shared across tracks)
+            early_stop_confidence: Skip the remaining tracks once one reaches this
+                confidence (None = score every track)
+            fast_mode: Use process_short_clip for every video (2-10 s single-person clips)
+            debug_crops_dir: Also write each track's crops as .avi here (debug only;
+                scoring always uses the in-memory uint8 crops)
+        """
+        self.model_path = model_path
+        self.detector_path = detector_path
+        self.syncnet_repo_path = syncnet_repo_path
+        self.device = device
+        self.face_detector = face_detector
+        self.detector_backend = detector_backend
+        self.detector_config_path = detector_config_path
+        self.frame_rate = frame_rate
+        self.min_track = min_track
+        self.min_face_size = min_face_size
+        self.facedet_scale = facedet_scale
+        self.detect_stride = detect_stride
+        self.detect_scale = detect_scale
+        self.crop_scale = crop_scale
+        self.vshift = vshift
+        self.max_vshift = max_vshift
+        self.batch_size = batch_size
+        self.early_stop_confidence = early_stop_confidence
+        self.fast_mode = fast_mode
+        self.debug_crops_dir = debug_crops_dir
+
+        self.model = None
+        self.audio_cache = AudioFeatureCache()
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None and self.face_detector is not None
+
+    def load(self) -> 'SyncNetEngine':
+        """Load SyncNet and the face detector (once per process)"""
+        if self.loaded:
+            return self
+
+        with self._load_lock:
+            if self.loaded:
+                return self
+
+            start = time.perf_counter()
+            if self.face_detector is None:
+                from syncnet_engine.face_detectors import build_face_detector
+                self.face_detector = build_face_detector(
+                    self.detector_backend,
+                    weights_path=self.detector_path,
+                    syncnet_repo_path=self.syncnet_repo_path,
+                    config_path=self.detector_config_path,
+                    device=self.device,
+                    scale=self.facedet_scale
+                )
+            if self.model is None:
+                self.model = load_syncnet_model(self.model_path, self.device)
+
+            logger.info(f"[SyncNetEngine] Models loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self
+
+    def warmup(self):
+        """Load models and run one dummy batch through both SyncNet streams and the detector"""
+        self.load()
+        with torch.no_grad():
+            self.model.forward_lip(torch.zeros(1, 3, 5, 224, 224, device=self.device))
+            self.model.forward_aud(torch.zeros(1, 1, 13, 20, device=self.device))
+        self.face_detector.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+
+    def speech_coverage(self, video_path: str, audio_path: Optional[str] = None) -> float:
+        """
+        Fraction of the audio with voice activity (0-1)
+
+        Decodes through the MFCC cache, so a following process_video reuses the
+        features instead of decoding again
+        """
+        return self.audio_cache.get(video_path, audio_path, self.frame_rate).speech_coverage
+
+    def process_video(
+        self,
+        video_path: str,
+        audio_path: Optional[str] = None,
+        fast: Optional[bool] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """
+        Run the SyncNet pipeline on one video
+
+        Args:
+            video_path: Video file (audio is decoded from it unless audio_path is given)
+            audio_path: Optional separate WAV track
+            fast: Short-clip mode (see process_short_clip); defaults to self.fast_mode
+            deadline: Request deadline, checked between stages (raises DeadlineExceeded)
+
+        Returns:
+            dict with:
+                - tracks: list of {status, start_frame, end_frame, num_windows} plus, when
+                  status is 'scored', offset_frames, confidence, min_dist, search_vshift
+                  ('too_short' and 'skipped' - early stop - tracks have no offset)
+                - mode ('full' or 'fast'), num_frames, source_fps, num_scenes, detector_calls
+                - timings_ms: wall time per stage
+        """
+        if self.fast_mode if fast is None else fast:
+            return self.process_short_clip(video_path, audio_path, deadline)
+
+        self.load()
+        timings = {}
+
+        with _timed('decode', timings):
+            frames, source_fps = read_video(video_path, self.frame_rate)
+        _check_deadline(deadline, 'decode')
+
+        with _timed('scenes', timings):
+            scenes = detect_scenes(frames)
+
+        tracks = []
+        detector_calls = 0
+        for start, end in scenes:
+            if end - start < self.min_track:
+                continue
+            _check_deadline(deadline, 'detect')
+
+            with _timed('detect', timings):
+                scene_faces, calls = detect_strided(
+                    frames[start:end], self.face_detector,
+                    stride=self.detect_stride, scale=self.detect_scale
+                )
+                detector_calls += calls
+
+            with _timed('track', timings):
+                tracks.extend(track_shot(
+                    scene_faces,
+                    first_frame=start,
+                    min_track=self.min_track,
+                    min_face_size=self.min_face_size
+                ))
+
+        results = self._score_tracks(video_path, audio_path, frames, tracks, timings, deadline)
+
+        logger.info(
+            f"[SyncNetEngine] {len(frames)} frames, {len(scenes)} scene(s), "
+            f"{len(tracks)} track(s), {detector_calls} detector call(s) - timings (ms): {timings}"
+        )
+
+        return {
+            'tracks': results,
+            'mode': 'full',
+            'num_frames': len(frames),
+            'source_fps': round(source_fps, 3),
+            'num_scenes': len(scenes),
+            'detector_calls': detector_calls,
+            'timings_ms': timings,
+        }
+
+    def process_short_clip(
+        self,
+        video_path: str,
+        audio_path: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """
+        Fast path for short single-person webcam clips
+
+        Assumes one shot and at most one dominant face: no scene detection, no
+        multi-face association and no min_track filter. Frames are decoded at the
+        native rate with their container timestamps; the 25 fps frames SyncNet needs
+        are picked by timestamp (frame on screen at k / 25 s), so audio windows line
+        up with real time even for variable frame rate recordings.
+
+        Returns:
+            Same dict as process_video (mode 'fast', at most one track)
+        """
+        self.load()
+        timings = {}
+
+        with _timed('decode', timings):
+            native, timestamps, source_fps = read_video_native(video_path)
+            frames = [native[index] for index in frames_at(timestamps, self.frame_rate, source_fps)]
+        _check_deadline(deadline, 'decode')
+
+        with _timed('detect', timings):
+            track, detector_calls = track_dominant_face(
+                frames, self.face_detector,
+                stride=self.detect_stride, scale=self.detect_scale,
+                min_face_size=self.min_face_size
+            )
+
+        tracks = [track] if track is not None else []
+        results = self._score_tracks(video_path, audio_path, frames, tracks, timings, deadline)
+
+        logger.info(
+            f"[SyncNetEngine] Fast mode: {len(native)} frames at {source_fps:.2f} fps -> "
+            f"{len(frames)} at {self.frame_rate:g} fps, {len(tracks)} track(s), "
+            f"{detector_calls} detector call(s) - timings (ms): {timings}"
+        )
+
+        return {
+            'tracks': results,
+            'mode': 'fast',
+            'num_frames': len(frames),
+            'source_fps': round(source_fps, 3),
+            'num_scenes': 1,
+            'detector_calls': detector_calls,
+            'timings_ms': timings,
+        }
+
+    def _score_tracks(
+        self,
+        video_path: str,
+        audio_path: Optional[str],
+        frames: List[np.ndarray],
+        tracks: List[Dict],
+        timings: Dict[str, float],
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict]:
+        """Crop every track and score them against the video's MFCCs in shared batches"""
+        results: List[Dict] = []
+        if not tracks:
+            return results
+        _check_deadline(deadline, 'track')
+
+        # MFCCs once per video, shared by every track
+        with _timed('audio', timings):
+            audio_features = self.audio_cache.get(video_path, audio_path, self.frame_rate)
+
+        inputs = []
+        for track in tracks:
+            first, last = int(track['frame'][0]), int(track['frame'][-1])
+            with _timed('crop', timings):
+                crops = crop_track(frames, track, crop_scale=self.crop_scale)
+            inputs.append((crops, audio_features.window(first, last)))
+            results.append({'start_frame': first, 'end_frame': last})
+
+            if self.debug_crops_dir:
+                results[-1]['debug_crops'] = write_crops_avi(
+                    crops,
+                    Path(self.debug_crops_dir) / f'{Path(video_path).stem}-{first:05d}-{last:05d}.avi',
+                    self.frame_rate
+                )
+
+        # Every track's windows share the same SyncNet batches
+        _check_deadline(deadline, 'crop')
+        with _timed('sync', timings):
+            scored = evaluate_tracks(
+                self.model, inputs,
+                vshift=self.vshift, batch_size=self.batch_size, device=self.device,
+                max_vshift=self.max_vshift, early_stop_confidence=self.early_stop_confidence
+            )
+        for result, sync in zip(results, scored):
+            result.update(sync)
+            if sync['status'] == 'too_short':
+                logger.warning(
+                    f"[SyncNetEngine] Skipping track {result['start_frame']}-{result['end_frame']}: "
+                    f"too short for SyncNet"
+                )
+
+        return results
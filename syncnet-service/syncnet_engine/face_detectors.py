@@ -0,0 +1,258 @@
+"""
+Face Detectors for the SyncNet Engine
+Backends intercambiables con la misma interfaz detect(frame_bgr) -> (N, 5):
+- s3fd: S3FD de syncnet_python cargado una sola vez por worker (preciso, pesado en CPU)
+- yunet: YuNet (cv2.FaceDetectorYN, ONNX local), muy liviano en CPU
+- opencv_dnn: SSD ResNet-10 de OpenCV (res10_300x300, Caffe o TensorFlow)
+- haar: cascada Haar de OpenCV (sin modelo externo si el paquete trae cv2.data)
+"""
+
+import sys
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class S3FDFaceDetector:
+    """
+    S3FD face detector from syncnet_python's `detectors` package
+
+    Returns detections as an (N, 5) array: x1, y1, x2, y2, confidence
+    (full-resolution pixel coordinates)
+    """
+
+    name = 's3fd'
+
+    def __init__(
+        self,
+        weights_path: str,
+        syncnet_repo_path: str,
+        device: str = 'cpu',
+        conf_th: float = 0.9,
+        scale: float = 0.25
+    ):
+        """
+        Args:
+            weights_path: Path to sfd_face.pth
+            syncnet_repo_path: syncnet_python checkout (provides `detectors.s3fd`)
+            device: 'cpu' or 'cuda'
+            conf_th: Detection confidence threshold (run_pipeline.py uses 0.9)
+            scale: Input downscale factor (run_pipeline.py --facedet_scale, 0.25)
+        """
+        repo = str(Path(syncnet_repo_path).absolute())
+        if repo not in sys.path:
+            sys.path.insert(0, repo)
+
+        from detectors.s3fd import S3FD
+        from detectors.s3fd.nets import S3FDNet
+
+        # S3FD.__init__ loads weights from a cwd-relative path; build the net ourselves
+        net = S3FDNet(device=device).to(device)
+        net.load_state_dict(torch.load(str(weights_path), map_location=device))
+        net.eval()
+
+        self._s3fd = S3FD.__new__(S3FD)
+        self._s3fd.device = device
+        self._s3fd.net = net
+
+        self.device = device
+        self.conf_th = conf_th
+        self.scale = scale
+        logger.info(f"[SyncNetEngine] S3FD loaded from {weights_path} (scale={scale})")
+
+    def detect(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Detect faces in one BGR frame"""
+        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        bboxes = self._s3fd.detect_faces(rgb, conf_th=self.conf_th, scales=[self.scale])
+        return np.asarray(bboxes, dtype=np.float32).reshape(-1, 5)
+
+
+def yunet_to_boxes(faces: Optional[np.ndarray], scale: float = 1.0) -> np.ndarray:
+    """cv2.FaceDetectorYN output (N, 15: x, y, w, h, 5 landmarks, score) -> (N, 5) x1, y1, x2, y2, score"""
+    if faces is None or not len(faces):
+        return np.zeros((0, 5), dtype=np.float32)
+    faces = np.asarray(faces, dtype=np.float32)
+    boxes = np.stack([
+        faces[:, 0], faces[:, 1], faces[:, 0] + faces[:, 2], faces[:, 1] + faces[:, 3], faces[:, -1]
+    ], axis=1)
+    boxes[:, :4] /= scale
+    return boxes
+
+
+def ssd_to_boxes(output: np.ndarray, width: int, height: int, conf_th: float) -> np.ndarray:
+    """OpenCV SSD output (1, 1, N, 7: image, class, score, x1, y1, x2, y2 normalized) -> (N, 5) pixels"""
+    detections = np.asarray(output, dtype=np.float32).reshape(-1, 7)
+    detections = detections[detections[:, 2] >= conf_th]
+    boxes = np.empty((len(detections), 5), dtype=np.float32)
+    boxes[:, [0, 2]] = np.clip(detections[:, [3, 5]], 0.0, 1.0) * width
+    boxes[:, [1, 3]] = np.clip(detections[:, [4, 6]], 0.0, 1.0) * height
+    boxes[:, 4] = detections[:, 2]
+    return boxes
+
+
+class YuNetFaceDetector:
+    """
+    YuNet face detector (OpenCV Zoo `face_detection_yunet_*.onnx`) through
+    cv2.FaceDetectorYN; a few ms per frame on CPU
+    """
+
+    name = 'yunet'
+
+    def __init__(
+        self,
+        model_path: str,
+        conf_th: float = 0.6,
+        nms_th: float = 0.3,
+        scale: float = 1.0
+    ):
+        """
+        Args:
+            model_path: Local YuNet .onnx file
+            conf_th: Detection score threshold
+            nms_th: Non-maximum suppression IoU threshold
+            scale: Input downscale factor (boxes are returned at full resolution)
+        """
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"YuNet model not found at {model_path}")
+
+        self._detector = cv2.FaceDetectorYN.create(str(model_path), '', (320, 320), conf_th, nms_th)
+        self._lock = threading.Lock()   # OpenCV DNN nets are not thread-safe
+        self.conf_th = conf_th
+        self.scale = scale
+        logger.info(f"[SyncNetEngine] YuNet loaded from {model_path} (scale={scale})")
+
+    def detect(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Detect faces in one BGR frame"""
+        if self.scale != 1.0:
+            frame_bgr = cv2.resize(frame_bgr, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        height, width = frame_bgr.shape[:2]
+        with self._lock:
+            self._detector.setInputSize((width, height))
+            _, faces = self._detector.detect(frame_bgr)
+        return yunet_to_boxes(faces, self.scale)
+
+
+class OpenCVDNNFaceDetector:
+    """
+    OpenCV's ResNet-10 SSD face detector via cv2.dnn: Caffe
+    (`res10_300x300_ssd_iter_140000.caffemodel` + `deploy.prototxt`) or
+    TensorFlow (`opencv_face_detector_uint8.pb` + `.pbtxt`)
+    """
+
+    name = 'opencv_dnn'
+
+    def __init__(
+        self,
+        model_path: str,
+        config_path: Optional[str] = None,
+        conf_th: float = 0.6,
+        input_size: int = 300
+    ):
+        """
+        Args:
+            model_path: Weights (.caffemodel / .pb)
+            config_path: Network description (deploy.prototxt / .pbtxt)
+            conf_th: Detection confidence threshold
+            input_size: Square network input size (trained at 300)
+        """
+        for path in (model_path, config_path):
+            if path and not Path(path).exists():
+                raise FileNotFoundError(f"OpenCV DNN face model file not found: {path}")
+
+        self._net = cv2.dnn.readNet(str(model_path), str(config_path) if config_path else '')
+        self._lock = threading.Lock()   # cv2.dnn.Net is not thread-safe
+        self.conf_th = conf_th
+        self.input_size = input_size
+        logger.info(f"[SyncNetEngine] OpenCV DNN face detector loaded from {model_path}")
+
+    def detect(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Detect faces in one BGR frame"""
+        height, width = frame_bgr.shape[:2]
+        blob = cv2.dnn.blobFromImage(
+            frame_bgr, 1.0, (self.input_size, self.input_size), (104.0, 177.0, 123.0)
+        )
+        with self._lock:
+            self._net.setInput(blob)
+            output = self._net.forward()
+        return ssd_to_boxes(output, width, height, self.conf_th)
+
+
+class HaarFaceDetector:
+    """
+    OpenCV Haar cascade (frontal faces); the cheapest backend, less accurate
+    than the DNN ones. Detections have confidence 1.0.
+    """
+
+    name = 'haar'
+
+    def __init__(self, cascade_path: Optional[str] = None, scale: float = 0.5, min_size: int = 40):
+        """
+        Args:
+            cascade_path: Cascade XML (default: haarcascade_frontalface_default.xml from cv2.data)
+            scale: Input downscale factor (boxes are returned at full resolution)
+            min_size: Minimum face size in pixels, at full resolution
+        """
+        if cascade_path is None:
+            cascade_dir = getattr(getattr(cv2, 'data', None), 'haarcascades', '')
+            cascade_path = str(Path(cascade_dir) / 'haarcascade_frontalface_default.xml')
+        if not Path(cascade_path).exists():
+            raise FileNotFoundError(f"Haar cascade not found at {cascade_path}")
+
+        self._cascade = cv2.CascadeClassifier(str(cascade_path))
+        self.scale = scale
+        self.min_size = min_size
+
+    def detect(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Detect faces in one BGR frame"""
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        min_size = max(1, int(self.min_size * self.scale))
+        faces = self._cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_size, min_size))
+        if not len(faces):
+            return np.zeros((0, 5), dtype=np.float32)
+        faces = np.asarray(faces, dtype=np.float32) / self.scale
+        return np.column_stack([
+            faces[:, 0], faces[:, 1], faces[:, 0] + faces[:, 2], faces[:, 1] + faces[:, 3], np.ones(len(faces))
+        ]).astype(np.float32)
+
+
+FACE_DETECTOR_BACKENDS = ('s3fd', 'yunet', 'opencv_dnn', 'haar')
+
+
+def build_face_detector(
+    backend: str,
+    weights_path: Optional[str],
+    syncnet_repo_path: Optional[str] = None,
+    config_path: Optional[str] = None,
+    device: str = 'cpu',
+    scale: float = 0.25
+):
+    """
+    Face detector for SyncNet preprocessing by backend name
+
+    Args:
+        backend: 's3fd', 'yunet', 'opencv_dnn' or 'haar'
+        weights_path: Model file of the backend (sfd_face.pth / .onnx / .caffemodel or .pb /
+            cascade .xml; None = OpenCV's bundled cascade for 'haar')
+        syncnet_repo_path: syncnet_python checkout (s3fd only)
+        config_path: Network description (opencv_dnn only)
+        device: Torch device (s3fd only; OpenCV backends run on CPU)
+        scale: S3FD input downscale (--facedet_scale)
+    """
+    if backend == 's3fd':
+        return S3FDFaceDetector(weights_path, syncnet_repo_path, device=device, scale=scale)
+    if backend == 'yunet':
+        return YuNetFaceDetector(weights_path)
+    if backend == 'opencv_dnn':
+        return OpenCVDNNFaceDetector(weights_path, config_path)
+    if backend == 'haar':
+        return HaarFaceDetector(weights_path)
+    raise ValueError(f"Unknown face detector backend: {backend} (expected one of {FACE_DETECTOR_BACKENDS})")
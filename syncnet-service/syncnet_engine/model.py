@@ -0,0 +1,129 @@
+"""
+SyncNet Model
+Arquitectura de SyncNet v2 (Chung & Zisserman, 2016) con los mismos nombres de
+capas que `SyncNetModel.S` de syncnet_python, para cargar `syncnet_v2.model`
+sin importar el repositorio ni lanzar subprocesos
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+import torch
+import torch.nn as nn
+
+logger = logging.getLogger(__name__)
+
+
+class SyncNetModel(nn.Module):
+    """
+    Two-stream SyncNet: lip stream over 5 x 224 x 224 crops, audio stream over
+    13 x 20 MFCC windows (0.2 s), both projected to the same embedding space
+    """
+
+    def __init__(self, num_layers_in_fc_layers: int = 1024):
+        super().__init__()
+
+        self.netcnnaud = nn.Sequential(
+            nn.Conv2d(1, 64, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1)),
+            nn.BatchNorm2d(64),
+            nn.ReLU(inplace=True),
+            nn.MaxPool2d(kernel_size=(1, 1), stride=(1, 1)),
+
+            nn.Conv2d(64, 192, kernel_size=(3, 3), stride=(1, 1), padding=(1, 1)),
+            nn.BatchNorm2d(192),
+            nn.ReLU(inplace=True),
+            nn.MaxPool2d(kernel_size=(3, 3), stride=(1, 2)),
+
+            nn.Conv2d(192, 384, kernel_size=(3, 3), padding=(1, 1)),
+            nn.BatchNorm2d(384),
+            nn.ReLU(inplace=True),
+
+            nn.Conv2d(384, 256, kernel_size=(3, 3), padding=(1, 1)),
+            nn.BatchNorm2d(256),
+            nn.ReLU(inplace=True),
+
+            nn.Conv2d(256, 256, kernel_size=(3, 3), padding=(1, 1)),
+            nn.BatchNorm2d(256),
+            nn.ReLU(inplace=True),
+            nn.MaxPool2d(kernel_size=(3, 3), stride=(2, 2)),
+
+            nn.Conv2d(256, 512, kernel_size=(5, 4), padding=(0, 0)),
+            nn.BatchNorm2d(512),
+            nn.ReLU(),
+        )
+
+        self.netfcaud = nn.Sequential(
+            nn.Linear(512, 512),
+            nn.BatchNorm1d(512),
+            nn.ReLU(),
+            nn.Linear(512, num_layers_in_fc_layers),
+        )
+
+        self.netfclip = nn.Sequential(
+            nn.Linear(512, 512),
+            nn.BatchNorm1d(512),
+            nn.ReLU(),
+            nn.Linear(512, num_layers_in_fc_layers),
+        )
+
+        self.netcnnlip = nn.Sequential(
+            nn.Conv3d(3, 96, kernel_size=(5, 7, 7), stride=(1, 2, 2), padding=0),
+            nn.BatchNorm3d(96),
+            nn.ReLU(inplace=True),
+            nn.MaxPool3d(kernel_size=(1, 3, 3), stride=(1, 2, 2)),
+
+            nn.Conv3d(96, 256, kernel_size=(1, 5, 5), stride=(1, 2, 2), padding=(0, 1, 1)),
+            nn.BatchNorm3d(256),
+            nn.ReLU(inplace=True),
+            nn.MaxPool3d(kernel_size=(1, 3, 3), stride=(1, 2, 2), padding=(0, 1, 1)),
+
+            nn.Conv3d(256, 256, kernel_size=(1, 3, 3), padding=(0, 1, 1)),
+            nn.BatchNorm3d(256),
+            nn.ReLU(inplace=True),
+
+            nn.Conv3d(256, 256, kernel_size=(1, 3, 3), padding=(0, 1, 1)),
+            nn.BatchNorm3d(256),
+            nn.ReLU(inplace=True),
+
+            nn.Conv3d(256, 256, kernel_size=(1, 3, 3), padding=(0, 1, 1)),
+            nn.BatchNorm3d(256),
+            nn.ReLU(inplace=True),
+            nn.MaxPool3d(kernel_size=(1, 3, 3), stride=(1, 2, 2)),
+
+            nn.Conv3d(256, 512, kernel_size=(1, 6, 6), padding=0),
+            nn.BatchNorm3d(512),
+            nn.ReLU(inplace=True),
+        )
+
+    def forward_aud(self, x: torch.Tensor) -> torch.Tensor:
+        """(N, 1, 13, 20) MFCC windows -> (N, 1024) embeddings"""
+        mid = self.netcnnaud(x)
+        return self.netfcaud(mid.view(mid.size(0), -1))
+
+    def forward_lip(self, x: torch.Tensor) -> torch.Tensor:
+        """(N, 3, 5, 224, 224) BGR crops (0-255) -> (N, 1024) embeddings"""
+        mid = self.netcnnlip(x)
+        return self.netfclip(mid.view(mid.size(0), -1))
+
+
+def load_syncnet_model(model_path: Optional[str], device: str = 'cpu') -> SyncNetModel:
+    """
+    Build SyncNet and load `syncnet_v2.model` weights once
+
+    Args:
+        model_path: Path to syncnet_v2.model, or None for random weights (benchmarks/tests)
+        device: 'cpu' or 'cuda'
+    """
+    model = SyncNetModel(num_layers_in_fc_layers=1024)
+
+    if model_path is not None:
+        loaded_state = torch.load(str(Path(model_path)), map_location='cpu')
+        own_state = model.state_dict()
+        for name, param in loaded_state.items():
+            own_state[name].copy_(param)
+        logger.info(f"[SyncNetEngine] SyncNet weights loaded from {model_path}")
+    else:
+        logger.warning("[SyncNetEngine] SyncNet with random weights (scores are meaningless)")
+
+    return model.to(device).eval()
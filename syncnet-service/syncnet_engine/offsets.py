@@ -0,0 +1,213 @@
+"""
+Offset Search
+Embeddings de labios/audio por ventanas de 5 frames y búsqueda del desfase con
+distancia mínima (calc_pdist / evaluate de SyncNetInstance, en memoria); todas
+las distancias por desfase salen de una sola operación batched, con ventana
+adaptativa opcional
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+# MFCC windows per video frame: 100 Hz features / 25 fps
+MFCC_PER_FRAME = 4
+
+
+def calc_pdist(feat1: torch.Tensor, feat2: torch.Tensor, vshift: int = 15) -> torch.Tensor:
+    """
+    Distances between each video embedding and audio embeddings shifted by -vshift..+vshift
+
+    Batched equivalent of SyncNetInstance.calc_pdist: the zero-padded audio
+    embeddings are unfolded into a (T, D, 2 * vshift + 1) view and every offset's
+    dot products come from one bmm, so no per-frame loop and no (T, win, D) copy.
+    Squared norms are expanded in float64 and the eps of F.pairwise_distance is
+    kept, which reproduces the loop's values to float32 precision.
+
+    Returns:
+        (T, 2 * vshift + 1) tensor; column k is the offset vshift - k
+    """
+    win_size = vshift * 2 + 1
+    feat1 = feat1.double() + 1e-6
+    feat2p = F.pad(feat2.double(), (0, 0, vshift, vshift))
+
+    windows = feat2p.unfold(0, win_size, 1)[:len(feat1)]
+    dots = torch.bmm(feat1[:, None, :], windows).squeeze(1)
+    sq_audio = (feat2p * feat2p).sum(dim=1).unfold(0, win_size, 1)[:len(feat1)]
+    sq_video = (feat1 * feat1).sum(dim=1, keepdim=True)
+
+    return (sq_video + sq_audio - 2 * dots).clamp_min(0).sqrt().float()
+
+
+def search_offset(
+    im_feat: torch.Tensor,
+    cc_feat: torch.Tensor,
+    vshift: int = 15,
+    max_vshift: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Best offset of a track from its lip and audio embeddings
+
+    With max_vshift > vshift the search is adaptive: it starts at +/- vshift and
+    doubles the window (up to max_vshift) only while the minimum sits on its edge,
+    so a true offset beyond the initial window is still found. Confidence is
+    median - min over the final window, as in offsets.txt.
+    """
+    max_vshift = max(vshift, max_vshift or vshift)
+    while True:
+        mean_dists = calc_pdist(im_feat, cc_feat, vshift=vshift).mean(dim=0)
+        min_dist, min_index = torch.min(mean_dists, 0)
+        on_edge = int(min_index) in (0, len(mean_dists) - 1)
+        if not on_edge or vshift >= max_vshift:
+            break
+        vshift = min(vshift * 2, max_vshift)
+
+    return {
+        'offset_frames': int(vshift - min_index),
+        'confidence': float(torch.median(mean_dists) - min_dist),
+        'min_dist': float(min_dist),
+        'search_vshift': vshift,
+    }
+
+
+def _num_windows(crops: np.ndarray, mfcc: np.ndarray) -> int:
+    """5-frame windows SyncNet can embed for a track (<= 0 = too short)"""
+    return min(len(crops), mfcc.shape[1] // MFCC_PER_FRAME) - 5
+
+
+@torch.no_grad()
+def evaluate_tracks(
+    model,
+    tracks: List[Tuple[np.ndarray, np.ndarray]],
+    vshift: int = 15,
+    batch_size: int = 20,
+    device: str = 'cpu',
+    max_vshift: Optional[int] = None,
+    early_stop_confidence: Optional[float] = None
+) -> List[Dict]:
+    """
+    Offset, confidence and minimum distance for several face tracks at once
+
+    The 5-frame windows of all tracks share the same forward passes (a batch
+    may span the end of one track and the start of the next), so short tracks
+    don't each pay for a partly empty batch. Tracks are embedded longest first;
+    each one is searched as soon as its last window is embedded, and with
+    `early_stop_confidence` the remaining tracks are skipped once one reaches it.
+
+    Args:
+        model: SyncNetModel
+        tracks: (crops, mfcc) per track - (T, 224, 224, 3) uint8 BGR crops and
+            (13, W) MFCC windows aligned with crops[0]
+        vshift: Largest offset searched, in frames
+        batch_size: Windows per forward pass
+        max_vshift: Widen the search up to this offset when the best one is
+            on the window edge (see search_offset)
+        early_stop_confidence: Stop once a track's confidence reaches this value
+
+    Returns:
+        One dict per track, in input order, with status 'scored' (plus
+        offset_frames, confidence, min_dist, search_vshift, num_windows),
+        'too_short' or 'skipped' (early stop)
+    """
+    results: List[Dict] = [{'status': 'too_short', 'num_windows': 0} for _ in tracks]
+
+    # uint8 crops stay uint8 until each batch: (3, T - 4, 224, 224, 5) views of all 5-frame windows
+    videos, audios, pending = {}, {}, []
+    for index, (crops, mfcc) in enumerate(tracks):
+        num_windows = _num_windows(crops, mfcc)
+        if num_windows <= 0:
+            continue
+        videos[index] = torch.from_numpy(np.ascontiguousarray(crops)).permute(3, 0, 1, 2).unfold(1, 5, 1)
+        audios[index] = torch.from_numpy(np.ascontiguousarray(mfcc)).float()
+        results[index] = {'status': 'skipped', 'num_windows': num_windows}
+        pending.append(index)
+    pending.sort(key=lambda index: -results[index]['num_windows'])
+
+    # (track, first window, last window) segments of every forward pass
+    segments = []
+    for index in pending:
+        for start in range(0, results[index]['num_windows'], batch_size):
+            segments.append((index, start, min(results[index]['num_windows'], start + batch_size)))
+
+    im_feat = {index: [] for index in pending}
+    cc_feat = {index: [] for index in pending}
+    position = 0
+    while position < len(segments):
+        batch, size = [], 0
+        while position < len(segments) and size < batch_size:
+            index, start, end = segments[position]
+            take = min(end - start, batch_size - size)
+            batch.append((index, start, start + take))
+            size += take
+            if start + take == end:
+                position += 1
+            else:
+                segments[position] = (index, start + take, end)
+
+        im_batch = torch.cat(
+            [videos[index][:, start:end].permute(1, 0, 4, 2, 3) for index, start, end in batch]
+        ).to(device).float()
+        cc_batch = torch.stack([
+            audios[index][:, f * MFCC_PER_FRAME:f * MFCC_PER_FRAME + 20]
+            for index, start, end in batch for f in range(start, end)
+        ])[:, None]
+
+        im_out = model.forward_lip(im_batch).cpu()
+        cc_out = model.forward_aud(cc_batch.to(device)).cpu()
+
+        offset, stop = 0, False
+        for index, start, end in batch:
+            im_feat[index].append(im_out[offset:offset + end - start])
+            cc_feat[index].append(cc_out[offset:offset + end - start])
+            offset += end - start
+            if end < results[index]['num_windows']:
+                continue
+
+            result = search_offset(
+                torch.cat(im_feat.pop(index)), torch.cat(cc_feat.pop(index)),
+                vshift=vshift, max_vshift=max_vshift
+            )
+            results[index].update(result, status='scored')
+            if early_stop_confidence is not None and result['confidence'] >= early_stop_confidence:
+                stop = True
+        if stop:
+            break
+
+    return results
+
+
+def evaluate_track(
+    model,
+    crops: np.ndarray,
+    mfcc: np.ndarray,
+    vshift: int = 15,
+    batch_size: int = 20,
+    device: str = 'cpu',
+    max_vshift: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Offset, confidence and minimum distance for one face track
+
+    Args:
+        model: SyncNetModel
+        crops: (T, 224, 224, 3) uint8 BGR crops of the track (converted to float per batch)
+        mfcc: (13, W) MFCC windows aligned with crops[0]
+        vshift: Largest offset searched, in frames
+        batch_size: Windows per forward pass
+        max_vshift: Widen the search up to this offset when the best one is
+            on the window edge (see search_offset)
+
+    Returns:
+        dict with offset_frames, confidence, min_dist, search_vshift, num_windows
+    """
+    if _num_windows(crops, mfcc) <= 0:
+        raise ValueError(f"Track too short for SyncNet ({_num_windows(crops, mfcc) + 5} frames)")
+
+    result = evaluate_tracks(
+        model, [(crops, mfcc)], vshift=vshift, batch_size=batch_size,
+        device=device, max_vshift=max_vshift
+    )[0]
+    del result['status']
+    return result
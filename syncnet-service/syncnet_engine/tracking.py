@@ -0,0 +1,246 @@
+"""
+Face Tracking
+Agrupa detecciones por frame en tracks (IoU entre frames consecutivos) e
+interpola las cajas en los huecos, como `track_shot` de run_pipeline.py.
+`detect_strided` corre el detector solo cada N frames y rellena el resto
+interpolando cajas emparejadas por IoU; `track_dominant_face` sigue solo la
+cara principal (modo rápido para clips cortos de webcam)
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def bbox_iou(box_a: np.ndarray, box_b: np.ndarray) -> float:
+    """Intersection over union of two x1, y1, x2, y2 boxes"""
+    x_a = max(box_a[0], box_b[0])
+    y_a = max(box_a[1], box_b[1])
+    x_b = min(box_a[2], box_b[2])
+    y_b = min(box_a[3], box_b[3])
+
+    inter = max(0.0, x_b - x_a) * max(0.0, y_b - y_a)
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+    union = area_a + area_b - inter
+    return float(inter / union) if union > 0 else 0.0
+
+
+def track_shot(
+    scene_faces: List[np.ndarray],
+    first_frame: int = 0,
+    iou_threshold: float = 0.5,
+    num_failed_det: int = 25,
+    min_track: int = 50,
+    min_face_size: float = 100
+) -> List[Dict[str, np.ndarray]]:
+    """
+    Link per-frame detections of one scene into face tracks
+
+    Args:
+        scene_faces: Detections per frame of the scene, (N, 5) arrays
+        first_frame: Video frame index of scene_faces[0]
+        iou_threshold: Minimum IoU to extend a track
+        num_failed_det: Frames a track may go without a matching detection
+        min_track: Minimum track length in frames
+        min_face_size: Minimum mean face width/height in pixels
+
+    Returns:
+        Tracks as {'frame': (T,) int frame indices, 'bbox': (T, 4) interpolated boxes}
+    """
+    remaining = [[box for box in faces] for faces in scene_faces]
+    tracks = []
+
+    while True:
+        track_frames, track_boxes = [], []
+        for offset, faces in enumerate(remaining):
+            frame = first_frame + offset
+            if track_frames and frame - track_frames[-1] > num_failed_det:
+                break
+            for i, box in enumerate(faces):
+                if not track_frames or bbox_iou(box, track_boxes[-1]) > iou_threshold:
+                    track_frames.append(frame)
+                    track_boxes.append(box[:4])
+                    del faces[i]
+                    break
+
+        if not track_frames:
+            break
+        if len(track_frames) <= min_track:
+            continue
+
+        frames = np.arange(track_frames[0], track_frames[-1] + 1)
+        boxes = np.stack(track_boxes).astype(np.float64)
+        interpolated = np.stack(
+            [np.interp(frames, track_frames, boxes[:, k]) for k in range(4)], axis=1
+        )
+
+        face_size = max(
+            np.mean(interpolated[:, 2] - interpolated[:, 0]),
+            np.mean(interpolated[:, 3] - interpolated[:, 1])
+        )
+        if face_size > min_face_size:
+            tracks.append({'frame': frames, 'bbox': interpolated})
+
+    return tracks
+
+
+def _detect_scaled(detector, frame: np.ndarray, scale: float) -> np.ndarray:
+    """Run the detector on a downscaled frame and map boxes back to full resolution"""
+    if scale == 1.0:
+        return detector.detect(frame)
+
+    small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    boxes = detector.detect(small).copy()
+    boxes[:, :4] /= scale
+    return boxes
+
+
+def match_boxes(boxes_a: np.ndarray, boxes_b: np.ndarray, iou_threshold: float) -> List[Tuple[int, int]]:
+    """Greedy one-to-one matching of two detection sets by IoU (best pairs first)"""
+    candidates = sorted(
+        ((bbox_iou(a, b), i, j) for i, a in enumerate(boxes_a) for j, b in enumerate(boxes_b)),
+        reverse=True
+    )
+    used_a, used_b, pairs = set(), set(), []
+    for iou, i, j in candidates:
+        if iou <= iou_threshold:
+            break
+        if i not in used_a and j not in used_b:
+            used_a.add(i)
+            used_b.add(j)
+            pairs.append((i, j))
+    return pairs
+
+
+def detect_strided(
+    frames: List[np.ndarray],
+    detector,
+    stride: int = 5,
+    scale: float = 1.0,
+    iou_threshold: float = 0.3
+) -> Tuple[List[np.ndarray], int]:
+    """
+    Per-frame detections from keyframe detection and IoU interpolation
+
+    The detector runs every `stride` frames (and on the last frame). When both
+    keyframes of a gap see the same faces (one-to-one IoU match), in-between
+    boxes are linearly interpolated; otherwise tracking is lost (a face entered,
+    left or moved too far) and every frame of the gap is re-detected.
+
+    Args:
+        frames: BGR frames (one scene)
+        detector: Object with detect(frame_bgr) -> (N, 5)
+        stride: Frames between detector calls (1 = every frame)
+        scale: Downscale factor applied before detection
+        iou_threshold: Minimum IoU to treat two keyframe boxes as the same face
+
+    Returns:
+        (detections per frame as (N, 5) arrays, number of detector calls)
+    """
+    faces: List[np.ndarray] = [None] * len(frames)
+    calls = 0
+
+    def detect(index: int) -> np.ndarray:
+        nonlocal calls
+        if faces[index] is None:
+            faces[index] = _detect_scaled(detector, frames[index], scale)
+            calls += 1
+        return faces[index]
+
+    if not frames:
+        return faces, calls
+
+    keyframes = list(range(0, len(frames), max(1, stride)))
+    if keyframes[-1] != len(frames) - 1:
+        keyframes.append(len(frames) - 1)
+
+    detect(keyframes[0])
+    for start, end in zip(keyframes, keyframes[1:]):
+        boxes_start, boxes_end = detect(start), detect(end)
+        if end - start <= 1:
+            continue
+
+        pairs = match_boxes(boxes_start, boxes_end, iou_threshold)
+        if len(pairs) == len(boxes_start) == len(boxes_end):
+            for index in range(start + 1, end):
+                w = (index - start) / (end - start)
+                faces[index] = np.array(
+                    [(1 - w) * boxes_start[i] + w * boxes_end[j] for i, j in pairs],
+                    dtype=np.float32
+                ).reshape(-1, 5)
+        else:
+            for index in range(start + 1, end):
+                detect(index)
+
+    return faces, calls
+
+
+def track_dominant_face(
+    frames: List[np.ndarray],
+    detector,
+    stride: int = 5,
+    scale: float = 1.0,
+    iou_threshold: float = 0.3,
+    min_face_size: float = 100
+) -> Tuple[Optional[Dict[str, np.ndarray]], int]:
+    """
+    Single track of the dominant face, from keyframe detections only
+
+    Short webcam clips are one shot with one person, so instead of linking every
+    face (track_shot) the detector runs only on keyframes. Each keyframe keeps the
+    box overlapping the previous pick (else the largest box), and boxes in between
+    are interpolated; there is no re-detection on mismatch.
+
+    Args:
+        frames: BGR frames (the whole clip)
+        detector: Object with detect(frame_bgr) -> (N, 5)
+        stride: Frames between detector calls
+        scale: Downscale factor applied before detection
+        iou_threshold: Minimum IoU to keep following the same face
+        min_face_size: Minimum mean face width/height in pixels
+
+    Returns:
+        ({'frame', 'bbox'} track or None, number of detector calls)
+    """
+    if not frames:
+        return None, 0
+
+    keyframes = list(range(0, len(frames), max(1, stride)))
+    if keyframes[-1] != len(frames) - 1:
+        keyframes.append(len(frames) - 1)
+
+    picked_frames, picked_boxes = [], []
+    for index in keyframes:
+        boxes = _detect_scaled(detector, frames[index], scale)
+        if not len(boxes):
+            continue
+        box = None
+        if picked_boxes:
+            ious = [bbox_iou(candidate, picked_boxes[-1]) for candidate in boxes]
+            if max(ious) > iou_threshold:
+                box = boxes[int(np.argmax(ious))]
+        if box is None:
+            areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+            box = boxes[int(np.argmax(areas))]
+        picked_frames.append(index)
+        picked_boxes.append(np.asarray(box[:4], dtype=np.float64))
+
+    if not picked_frames:
+        return None, len(keyframes)
+
+    frame_range = np.arange(picked_frames[0], picked_frames[-1] + 1)
+    boxes = np.stack(picked_boxes)
+    interpolated = np.stack(
+        [np.interp(frame_range, picked_frames, boxes[:, k]) for k in range(4)], axis=1
+    )
+
+    face_size = max(
+        np.mean(interpolated[:, 2] - interpolated[:, 0]),
+        np.mean(interpolated[:, 3] - interpolated[:, 1])
+    )
+    if face_size <= min_face_size:
+        return None, len(keyframes)
+
+    return {'frame': frame_range, 'bbox': interpolated}, len(keyframes)
@@ -0,0 +1,66 @@
+"""
+Voice Activity Detection
+VAD por energía y banda de voz (NumPy), para medir qué fracción del audio
+contiene habla antes de correr SyncNet: la confianza de SyncNet solo tiene
+sentido cuando hay voz
+"""
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+SPEECH_BAND_HZ = (80.0, 4000.0)   # voice fundamental + formants; excludes mains hum and hiss
+
+
+def speech_frames(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: float = FRAME_MS,
+    margin_db: float = 8.0,
+    min_energy_db: float = -50.0,
+    min_band_ratio: float = 0.6,
+    hangover_frames: int = 3
+) -> np.ndarray:
+    """
+    Per-frame voice activity
+
+    A frame is voiced when its energy is margin_db above the clip's noise floor
+    (10th percentile), above min_energy_db (dBFS) and mostly in the speech band.
+    Voiced runs are extended by hangover_frames to cover syllable gaps.
+
+    Args:
+        audio: int16 samples (or float in [-1, 1])
+        sample_rate: Sample rate of audio
+        frame_ms: Analysis frame length (non-overlapping)
+
+    Returns:
+        (num_frames,) bool array
+    """
+    audio = np.asarray(audio)
+    scale = 32768.0 if audio.dtype == np.int16 else 1.0
+    frame_len = int(sample_rate * frame_ms / 1000)
+    num_frames = len(audio) // frame_len
+    if num_frames == 0:
+        return np.zeros(0, dtype=bool)
+
+    frames = audio[:num_frames * frame_len].reshape(num_frames, frame_len).astype(np.float64) / scale
+    frames -= frames.mean(axis=1, keepdims=True)
+
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    threshold = max(np.percentile(energy_db, 10) + margin_db, min_energy_db)
+
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+    freqs = np.fft.rfftfreq(frame_len, 1.0 / sample_rate)
+    in_band = (freqs >= SPEECH_BAND_HZ[0]) & (freqs <= SPEECH_BAND_HZ[1])
+    band_ratio = power[:, in_band].sum(axis=1) / np.maximum(power.sum(axis=1), 1e-12)
+
+    voiced = (energy_db > threshold) & (band_ratio > min_band_ratio)
+    if hangover_frames > 0 and voiced.any():
+        voiced = np.convolve(voiced, np.ones(2 * hangover_frames + 1), mode='same') > 0
+    return voiced
+
+
+def speech_coverage(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, **kwargs) -> float:
+    """Fraction of the audio (0-1) with voice activity; 0.0 for empty audio"""
+    voiced = speech_frames(audio, sample_rate, **kwargs)
+    return float(voiced.mean()) if len(voiced) else 0.0
@@ -0,0 +1,149 @@
+"""
+Video Decoding and Scene Detection
+Decodifica el video a memoria a 25 fps (como la conversión con ffmpeg de
+run_pipeline.py) y separa escenas por diferencia de HSV entre frames; para el
+modo rápido decodifica a fps nativo con timestamps por frame y alinea por tiempo
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def read_video(
+    video_path: str,
+    frame_rate: float = 25.0,
+    max_frames: Optional[int] = None
+) -> Tuple[List[np.ndarray], float]:
+    """
+    Decode a video into BGR frames resampled to `frame_rate`
+
+    Output frame k shows the source frame on screen at t = k / frame_rate
+    (nearest-frame resampling, equivalent to `ffmpeg -r 25`). With max_frames,
+    decoding stops once that many output frames exist.
+
+    Returns:
+        (frames, source_fps)
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {video_path}")
+
+    source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    if not 1.0 <= source_fps <= 240.0:
+        source_fps = frame_rate
+
+    frames = []
+    source_index = 0
+    next_time = 0.0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame_end = (source_index + 1) / source_fps
+            # Repeat or drop source frames so output frames land every 1 / frame_rate s
+            while next_time < frame_end - 1e-9:
+                frames.append(frame)
+                next_time = len(frames) / frame_rate
+            source_index += 1
+            if max_frames is not None and len(frames) >= max_frames:
+                del frames[max_frames:]
+                break
+    finally:
+        cap.release()
+
+    if not frames:
+        raise ValueError(f"No frames decoded from {video_path}")
+
+    return frames, source_fps
+
+
+def read_video_native(video_path: str) -> Tuple[List[np.ndarray], np.ndarray, float]:
+    """
+    Decode every source frame with its presentation timestamp (no resampling)
+
+    Timestamps come from the container (CAP_PROP_POS_MSEC), which keeps
+    variable frame rate webcam recordings aligned; when the backend reports
+    none or non-increasing values they fall back to index / fps.
+
+    Returns:
+        (frames, timestamps in seconds, source_fps)
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {video_path}")
+
+    source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    if not 1.0 <= source_fps <= 240.0:
+        source_fps = 25.0
+
+    frames, timestamps = [], []
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+            timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+    finally:
+        cap.release()
+
+    if not frames:
+        raise ValueError(f"No frames decoded from {video_path}")
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if len(timestamps) > 1 and not np.all(np.diff(timestamps) > 0):
+        timestamps = np.arange(len(frames)) / source_fps
+    timestamps -= timestamps[0]
+
+    return frames, timestamps, source_fps
+
+
+def frames_at(timestamps: np.ndarray, frame_rate: float = 25.0, source_fps: float = 25.0) -> np.ndarray:
+    """
+    Source frame on screen at each analysis time k / frame_rate
+
+    Returns:
+        (K,) indices into the native frames (K analysis frames cover the clip)
+    """
+    duration = timestamps[-1] + 1.0 / source_fps
+    times = np.arange(int(np.floor(duration * frame_rate + 1e-6))) / frame_rate
+    return np.clip(np.searchsorted(timestamps, times + 1e-9, side='right') - 1, 0, len(timestamps) - 1)
+
+
+def detect_scenes(
+    frames: List[np.ndarray],
+    threshold: float = 30.0,
+    min_scene_len: int = 15
+) -> List[Tuple[int, int]]:
+    """
+    Split frames into scenes (PySceneDetect ContentDetector-style cuts)
+
+    Args:
+        frames: BGR frames
+        threshold: Mean HSV difference (0-255) that marks a cut
+        min_scene_len: Minimum frames between cuts
+
+    Returns:
+        (start, end) frame ranges, end exclusive
+    """
+    if not frames:
+        return []
+
+    # Score on small frames: the cut signal survives downscaling
+    small = [cv2.resize(f, (64, 36), interpolation=cv2.INTER_AREA) for f in frames]
+    hsv = np.stack([cv2.cvtColor(f, cv2.COLOR_BGR2HSV) for f in small]).astype(np.int16)
+    deltas = np.abs(np.diff(hsv, axis=0)).mean(axis=(1, 2, 3))
+
+    cuts = [0]
+    for i, delta in enumerate(deltas, start=1):
+        if delta >= threshold and i - cuts[-1] >= min_scene_len:
+            cuts.append(i)
+    cuts.append(len(frames))
+
+    return list(zip(cuts[:-1], cuts[1:]))
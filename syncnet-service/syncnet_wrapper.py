@@ -6,11 +6,18 @@ Provides a simplified interface to the SyncNet pipeline
 import os
 import sys
 import time
+import signal
+import threading
 import subprocess
 import numpy as np
 from pathlib import Path
+from typing import Optional
 import logging
 
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.metrics import DEMO_FALLBACKS, SYNCNET_SUBPROCESS_SECONDS
+from utils.scratch import ScratchManager
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
@@ -29,7 +36,17 @@ class SyncNetWrapper:
     - Score normalization
     """
 
-    def __init__(self, model_path: str, detector_path: str, tmp_dir: str = './tmp'):
+    def __init__(
+        self,
+        model_path: str,
+        detector_path: str,
+        tmp_dir: str = './tmp',
+        engine: str = 'inprocess',
+        device: str = 'cpu',
+        engine_options: Optional[dict] = None,
+        scratch: Optional[ScratchManager] = None,
+        min_speech_coverage: float = 0.0
+    ):
         """
         Initialize SyncNet wrapper
 
@@ -37,10 +54,26 @@ class SyncNetWrapper:
             model_path: Path to syncnet_v2.model
             detector_path: Path to sfd_face.pth (S3FD face detector)
             tmp_dir: Temporary directory for processing
+            engine: 'inprocess' (resident models, see syncnet_engine) or
+                'subprocess' (run_pipeline.py + run_syncnet.py per video)
+            device: Device for the in-process engine ('cpu' or 'cuda')
+            engine_options: Extra SyncNetEngine arguments (e.g. detect_stride)
+            scratch: Shared scratch manager (default: one under tmp_dir/scratch)
+            min_speech_coverage: Skip SyncNet (reason 'no_speech') when less than this
+                fraction of the audio has voice activity (0 = always run)
         """
+        if engine not in ('inprocess', 'subprocess'):
+            raise ValueError(f"Unknown SyncNet engine: {engine}")
+
         self.model_path = Path(model_path)
         self.detector_path = Path(detector_path)
         self.tmp_dir = Path(tmp_dir)
+        self.engine_mode = engine
+        self.device = device
+        self.engine_options = engine_options or {}
+        self.min_speech_coverage = min_speech_coverage
+        self._engine = None
+        self._engine_lock = threading.Lock()
 
         # Check if models exist
         if not self.model_path.exists():
@@ -50,13 +83,8 @@ class SyncNetWrapper:
         if not self.detector_path.exists():
             logger.warning(f"Face detector not found at {self.detector_path}")
 
-        # Create working directories
-        self.pywork_dir = self.tmp_dir / 'pywork'
-        self.pycrop_dir = self.tmp_dir / 'pycrop'
-        self.pyavi_dir = self.tmp_dir / 'pyavi'
-
-        for dir_path in [self.pywork_dir, self.pycrop_dir, self.pyavi_dir]:
-            dir_path.mkdir(parents=True, exist_ok=True)
+        # Per-request working directories (pywork/pycrop/pyavi live inside each one)
+        self.scratch = scratch or ScratchManager(str(self.tmp_dir / 'scratch'))
 
         # Path to syncnet_python repository
         self.syncnet_repo_path = Path(__file__).parent / 'syncnet_python'
@@ -72,15 +100,70 @@ class SyncNetWrapper:
             sys.path.insert(0, str(self.syncnet_repo_path))
             logger.info(f"SyncNet repository loaded from {self.syncnet_repo_path}")
 
-        logger.info(f"SyncNet wrapper initialized (available: {self.syncnet_available})")
+        logger.info(
+            f"SyncNet wrapper initialized (available: {self.syncnet_available}, engine: {self.engine_mode})"
+        )
 
-    def process_video(self, video_path: str, reference: str) -> dict:
+    def _get_engine(self):
+        """
+        Resident in-process engine, built once per worker
+
+        Returns None when the engine is disabled or the models / detector files are missing.
+        """
+        if self.engine_mode != 'inprocess':
+            return None
+
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    # engine_options may select another detector backend and its model files
+                    options = {'detector_path': str(self.detector_path), **self.engine_options}
+                    required = [self.model_path, Path(options['detector_path'])]
+                    if options.get('detector_backend', 's3fd') == 's3fd':
+                        required.append(self.syncnet_repo_path / 'detectors' / 's3fd')
+                    elif options.get('detector_config_path'):
+                        required.append(Path(options['detector_config_path']))
+
+                    missing = [str(path) for path in required if not path.exists()]
+                    if missing:
+                        logger.warning(f"In-process SyncNet engine unavailable, missing: {missing}")
+                        self._engine = False
+                    else:
+                        from syncnet_engine.engine import SyncNetEngine
+                        self._engine = SyncNetEngine(
+                            model_path=str(self.model_path),
+                            syncnet_repo_path=str(self.syncnet_repo_path),
+                            device=self.device,
+                            **options
+                        ).load()
+
+        return self._engine or None
+
+    def warmup(self):
+        """Load the in-process engine's models and run a dummy batch (no-op otherwise)"""
+        if not self.syncnet_available:
+            return
+
+        engine = self._get_engine()
+        if engine is not None:
+            engine.warmup()
+
+    def process_video(
+        self,
+        video_path: str,
+        reference: str,
+        audio_path: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> dict:
         """
         Process video and return synchronization metrics
 
         Args:
             video_path: Path to video file to analyze
             reference: Reference ID (e.g., session_id) for organizing outputs
+            audio_path: Optional separate WAV track (in-process engine and speech gate only)
+            deadline: Request deadline; stages stop and subprocesses are killed when it
+                runs out or is cancelled (raises DeadlineExceeded instead of demo data)
 
         Returns:
             dict with:
@@ -90,16 +173,22 @@ class SyncNetWrapper:
                 - score: float (normalized score 0-1)
                 - lag_ms: float (lag in milliseconds)
                 - debug: dict (debugging information)
+
+            or, when the speech gate skips the clip:
+                - skipped: True, reason: 'no_speech', speech_coverage: float
         """
         start_time = time.time()
 
         try:
             if not os.path.exists(video_path):
                 raise FileNotFoundError(f"Video file not found: {video_path}")
+            if deadline is not None:
+                deadline.check('syncnet')
 
             # If SyncNet is not available, return demo data immediately
             if not self.syncnet_available:
                 logger.warning(f"[DEMO MODE] SyncNet not available - returning mock data for {reference}")
+                DEMO_FALLBACKS.labels(source='syncnet').inc()
                 result = self._get_demo_result()
                 processing_time = int((time.time() - start_time) * 1000)
                 result['processing_time_ms'] = processing_time
@@ -107,167 +196,297 @@ class SyncNetWrapper:
 
             logger.info(f"Processing video: {video_path} (ref: {reference})")
 
-            # Strategy 1: Try using run_pipeline.py script (official way)
-            result = self._process_with_pipeline(video_path, reference)
+            # SyncNet confidence is only meaningful on speech: skip silent clips
+            coverage = self._speech_coverage(video_path, audio_path)
+            if coverage is not None and coverage < self.min_speech_coverage:
+                logger.info(
+                    f"Skipping SyncNet for {reference}: speech coverage {coverage:.2f} "
+                    f"< {self.min_speech_coverage:.2f}"
+                )
+                return {
+                    'skipped': True,
+                    'reason': 'no_speech',
+                    'speech_coverage': round(coverage, 3),
+                    'processing_time_ms': int((time.time() - start_time) * 1000),
+                }
 
-            if result is None:
-                # Strategy 2: Fallback to direct Python API
-                logger.info("Trying direct API approach...")
-                result = self._process_with_api(video_path, reference)
+            if self.engine_mode == 'inprocess':
+                # Strategy 1: Resident in-process engine (models loaded once per worker)
+                result = self._process_with_api(video_path, reference, audio_path, deadline)
+            else:
+                # Strategy 2: run_pipeline.py + run_syncnet.py subprocesses (official scripts)
+                result = self._process_with_pipeline(video_path, reference, deadline)
 
             if result is None:
-                # Strategy 3: Return demo data if both fail
-                logger.warning("All processing methods failed - returning demo data")
+                # Strategy 3: Return demo data if processing fails
+                logger.warning("SyncNet processing failed - returning demo data")
+                DEMO_FALLBACKS.labels(source='syncnet').inc()
                 result = self._get_demo_result()
 
             processing_time = int((time.time() - start_time) * 1000)
             result['processing_time_ms'] = processing_time
+            if coverage is not None:
+                result.setdefault('debug', {})['speech_coverage'] = round(coverage, 3)
 
             return result
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Error processing video: {str(e)}", exc_info=True)
             raise RuntimeError(f"Video processing failed: {str(e)}")
 
-    def _process_with_pipeline(self, video_path: str, reference: str) -> dict:
+    def _speech_coverage(self, video_path: str, audio_path: Optional[str] = None) -> Optional[float]:
+        """
+        Voice activity coverage of the clip's audio, or None when the gate is off
+        or the audio cannot be decoded (SyncNet then runs as usual). A clip
+        without an audio stream has coverage 0.0 and is skipped
+        """
+        if not self.min_speech_coverage:
+            return None
+
+        try:
+            engine = self._get_engine()
+            if engine is not None:
+                # Same decode as the engine's MFCCs (cached for the SyncNet run)
+                return engine.speech_coverage(video_path, audio_path)
+
+            from syncnet_engine.audio import load_audio
+            from syncnet_engine.vad import speech_coverage
+            return speech_coverage(load_audio(video_path, audio_path))
+        except Exception as e:
+            logger.warning(f"Speech gate skipped, audio decode failed: {e}")
+            return None
+
+    def _process_with_pipeline(
+        self,
+        video_path: str,
+        reference: str,
+        deadline: Optional[Deadline] = None
+    ) -> dict:
         """
         Process video using official run_pipeline.py script
 
-        This is the recommended approach from the SyncNet repository
+        This is the recommended approach from the SyncNet repository.
+        Each call gets its own scratch directory as --data_dir, removed on
+        success, error and timeout alike. Running out of the request deadline
+        raises DeadlineExceeded (the scripts are killed, no demo data).
         """
+        # Check if run_pipeline.py exists
+        pipeline_script = self.syncnet_repo_path / 'run_pipeline.py'
+        if not pipeline_script.exists():
+            logger.warning(f"run_pipeline.py not found at {pipeline_script}")
+            return None
+
         try:
-            # Use absolute path for data_dir
-            data_dir = str(self.tmp_dir.absolute())
+            with self.scratch.session(f'syncnet-{reference}') as space:
+                return self._run_pipeline_scripts(video_path, space.path.absolute(), deadline)
 
-            # Check if run_pipeline.py exists
-            pipeline_script = self.syncnet_repo_path / 'run_pipeline.py'
-            if not pipeline_script.exists():
-                logger.warning(f"run_pipeline.py not found at {pipeline_script}")
-                return None
+        except subprocess.TimeoutExpired:
+            if deadline is not None and deadline.expired:
+                deadline.check('syncnet')
+            logger.error("Pipeline execution timeout")
+            return None
+        except Exception as e:
+            logger.error(f"Pipeline processing failed: {str(e)}")
+            return None
 
-            # Build command with absolute paths
-            cmd = [
-                sys.executable,
-                str(pipeline_script),
-                '--videofile', os.path.abspath(video_path),
-                '--reference', reference,
-                '--data_dir', data_dir,
-                '--min_track', '50'  # Allow shorter videos (2 seconds at 25fps)
-            ]
+    @staticmethod
+    def _run_script(cmd: list, cwd: str, timeout: float, deadline: Optional[Deadline] = None):
+        """
+        subprocess.run(capture_output=True, text=True) that also stops at the deadline
 
-            logger.info(f"Running SyncNet pipeline: {' '.join(cmd)}")
+        The script runs in its own process group so the whole tree (including
+        workers it spawns) is killed on timeout, deadline or cancellation.
+        Raises subprocess.TimeoutExpired in all three cases.
+        """
+        started = time.monotonic()
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            cwd=cwd,
+            start_new_session=True
+        )
+        try:
+            while True:
+                try:
+                    stdout, stderr = process.communicate(timeout=0.25)
+                    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+                except subprocess.TimeoutExpired:
+                    out_of_time = time.monotonic() - started >= timeout
+                    if out_of_time or (deadline is not None and deadline.expired):
+                        raise subprocess.TimeoutExpired(cmd, time.monotonic() - started)
+        finally:
+            if process.poll() is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                process.communicate()
+
+    def _run_pipeline_scripts(self, video_path: str, data_dir: Path, deadline: Optional[Deadline] = None) -> dict:
+        """
+        run_pipeline.py + run_syncnet.py inside data_dir, then parse offsets.txt
 
-            # Execute pipeline (increased timeout for CPU processing)
-            result = subprocess.run(
+        Failures raise so the scratch session records them (and keeps the
+        directory when keep_on_error is set)
+        """
+        # The scripts name their folders after --reference; data_dir is already unique
+        script_reference = 'video'
+        pipeline_script = self.syncnet_repo_path / 'run_pipeline.py'
+
+        # Build command with absolute paths
+        cmd = [
+            sys.executable,
+            str(pipeline_script),
+            '--videofile', os.path.abspath(video_path),
+            '--reference', script_reference,
+            '--data_dir', str(data_dir),
+            '--min_track', '50'  # Allow shorter videos (2 seconds at 25fps)
+        ]
+
+        logger.info(f"Running SyncNet pipeline: {' '.join(cmd)}")
+
+        # Execute pipeline (increased timeout for CPU processing)
+        with SYNCNET_SUBPROCESS_SECONDS.labels(step='pipeline').time():
+            result = self._run_script(
                 cmd,
-                capture_output=True,
-                text=True,
+                cwd=str(self.syncnet_repo_path),
                 timeout=120,  # Increased to 2 minutes for CPU processing
-                cwd=str(self.syncnet_repo_path)
+                deadline=deadline
             )
 
-            # Log the output for debugging
-            logger.info(f"Pipeline stdout:\n{result.stdout}")
-            if result.stderr:
-                logger.info(f"Pipeline stderr:\n{result.stderr}")
-
-            if result.returncode != 0:
-                logger.error(f"Pipeline failed with code {result.returncode}")
-                logger.error(f"STDOUT: {result.stdout}")
-                logger.error(f"STDERR: {result.stderr}")
-                return None
-
-            logger.info("Pipeline completed successfully, now running SyncNet analysis...")
-
-            # Check if crops were generated
-            crop_dir = self.pycrop_dir / reference
-            if not crop_dir.exists() or not list(crop_dir.glob('*.avi')):
-                logger.warning(f"No video crops generated in {crop_dir}")
-                logger.warning("This usually means no face tracks were long enough")
-                return None
-
-            # Step 2: Run SyncNet analysis on the generated crops
-            syncnet_script = self.syncnet_repo_path / 'run_syncnet.py'
-            if not syncnet_script.exists():
-                logger.warning(f"run_syncnet.py not found at {syncnet_script}")
-                return None
+        # Log the output for debugging
+        logger.info(f"Pipeline stdout:\n{result.stdout}")
+        if result.stderr:
+            logger.info(f"Pipeline stderr:\n{result.stderr}")
+
+        if result.returncode != 0:
+            logger.error(f"Pipeline failed with code {result.returncode}")
+            logger.error(f"STDOUT: {result.stdout}")
+            logger.error(f"STDERR: {result.stderr}")
+            raise RuntimeError(f"run_pipeline.py exited with code {result.returncode}")
+
+        logger.info("Pipeline completed successfully, now running SyncNet analysis...")
+
+        # Check if crops were generated
+        crop_dir = data_dir / 'pycrop' / script_reference
+        if not crop_dir.exists() or not list(crop_dir.glob('*.avi')):
+            logger.warning(f"No video crops generated in {crop_dir}")
+            logger.warning("This usually means no face tracks were long enough")
+            raise RuntimeError("No face tracks long enough for SyncNet")
+
+        # Step 2: Run SyncNet analysis on the generated crops
+        syncnet_script = self.syncnet_repo_path / 'run_syncnet.py'
+        if not syncnet_script.exists():
+            logger.warning(f"run_syncnet.py not found at {syncnet_script}")
+            return None
 
-            # Use absolute path for model
-            abs_model_path = self.model_path if self.model_path.is_absolute() else (Path.cwd() / self.model_path)
-            abs_data_dir = data_dir if Path(data_dir).is_absolute() else str(Path.cwd() / data_dir)
+        # Use absolute path for model
+        abs_model_path = self.model_path if self.model_path.is_absolute() else (Path.cwd() / self.model_path)
 
-            syncnet_cmd = [
-                sys.executable,
-                str(syncnet_script),
-                '--initial_model', str(abs_model_path),
-                '--reference', reference,
-                '--data_dir', abs_data_dir
-            ]
+        syncnet_cmd = [
+            sys.executable,
+            str(syncnet_script),
+            '--initial_model', str(abs_model_path),
+            '--reference', script_reference,
+            '--data_dir', str(data_dir)
+        ]
 
-            logger.info(f"Running SyncNet analysis: {' '.join(syncnet_cmd)}")
+        logger.info(f"Running SyncNet analysis: {' '.join(syncnet_cmd)}")
 
-            syncnet_result = subprocess.run(
+        with SYNCNET_SUBPROCESS_SECONDS.labels(step='analysis').time():
+            syncnet_result = self._run_script(
                 syncnet_cmd,
-                capture_output=True,
-                text=True,
+                cwd=str(self.syncnet_repo_path),
                 timeout=180,  # SyncNet analysis can take up to 3 minutes on CPU
-                cwd=str(self.syncnet_repo_path)
+                deadline=deadline
             )
 
-            if syncnet_result.returncode != 0:
-                logger.error(f"SyncNet analysis failed with code {syncnet_result.returncode}")
-                logger.error(f"STDOUT: {syncnet_result.stdout}")
-                logger.error(f"STDERR: {syncnet_result.stderr}")
-                return None
+        if syncnet_result.returncode != 0:
+            logger.error(f"SyncNet analysis failed with code {syncnet_result.returncode}")
+            logger.error(f"STDOUT: {syncnet_result.stdout}")
+            logger.error(f"STDERR: {syncnet_result.stderr}")
+            raise RuntimeError(f"run_syncnet.py exited with code {syncnet_result.returncode}")
 
-            # Parse offsets.txt generated by run_syncnet.py
-            offsets_path = self.pywork_dir / reference / 'offsets.txt'
-
-            if not offsets_path.exists():
-                logger.error(f"offsets.txt not found at {offsets_path}")
-                return None
+        # Parse offsets.txt generated by run_syncnet.py
+        offsets_path = data_dir / 'pywork' / script_reference / 'offsets.txt'
 
-            return self._parse_offsets_file(offsets_path)
+        if not offsets_path.exists():
+            logger.error(f"offsets.txt not found at {offsets_path}")
+            raise RuntimeError("run_syncnet.py did not write offsets.txt")
 
-        except subprocess.TimeoutExpired:
-            logger.error("Pipeline execution timeout")
-            return None
-        except Exception as e:
-            logger.error(f"Pipeline processing failed: {str(e)}")
-            return None
+        return self._parse_offsets_file(offsets_path)
 
-    def _process_with_api(self, video_path: str, reference: str) -> dict:
+    def _process_with_api(
+        self,
+        video_path: str,
+        reference: str,
+        audio_path: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> dict:
         """
-        Process video using direct Python API
+        Process video with the resident in-process engine
 
-        This is a fallback if the pipeline script doesn't work
+        Same stages as run_pipeline.py + run_syncnet.py, without subprocesses,
+        model reloads or intermediate files
         """
         try:
-            # Try importing SyncNet classes
-            from SyncNetInstance import SyncNetInstance
-
-            # Initialize SyncNet
-            syncnet = SyncNetInstance()
-            syncnet.loadParameters(str(self.model_path))
-
-            # TODO: Implement direct API processing
-            # This would require:
-            # 1. Extract frames from video
-            # 2. Detect face with S3FD
-            # 3. Extract audio
-            # 4. Run SyncNet forward pass
-            # 5. Calculate offset and confidence
-
-            logger.warning("Direct API processing not yet implemented")
-            return None
+            engine = self._get_engine()
+            if engine is None:
+                return None
 
-        except ImportError as e:
-            logger.error(f"Failed to import SyncNet classes: {e}")
-            return None
+            output = engine.process_video(video_path, audio_path=audio_path, deadline=deadline)
+
+            scored = [track for track in output['tracks'] if track['status'] == 'scored']
+            if not scored:
+                logger.warning(f"No face tracks long enough in {video_path} (ref: {reference})")
+                return None
+
+            offsets_data = [
+                (track['offset_frames'], track['confidence'], track['min_dist'])
+                for track in scored
+            ]
+            result = self._build_result(offsets_data)
+            result['debug'].update({
+                'engine': 'inprocess',
+                'mode': output['mode'],
+                'tracks': [self._track_breakdown(track) for track in output['tracks']],
+                'num_frames': output['num_frames'],
+                'source_fps': output['source_fps'],
+                'detector_calls': output['detector_calls'],
+                'timings_ms': output['timings_ms'],
+            })
+            return result
+
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            logger.error(f"API processing failed: {str(e)}")
+            logger.error(f"In-process SyncNet engine failed: {str(e)}", exc_info=True)
             return None
 
+    @staticmethod
+    def _track_breakdown(track: dict) -> dict:
+        """Per-track debug entry (frames, status and, if scored, its SyncNet result)"""
+        entry = {
+            'start_frame': track['start_frame'],
+            'end_frame': track['end_frame'],
+            'status': track['status'],
+            'num_windows': track['num_windows'],
+        }
+        if track['status'] == 'scored':
+            entry.update({
+                'offset': track['offset_frames'],
+                'confidence': round(track['confidence'], 3),
+                'min_dist': round(track['min_dist'], 3),
+                'search_vshift': track['search_vshift'],
+            })
+        if 'debug_crops' in track:
+            entry['debug_crops'] = track['debug_crops']
+        return entry
+
     def _parse_offsets_file(self, offsets_path: Path) -> dict:
         """
         Parse offsets.txt file from SyncNet output
@@ -294,40 +513,46 @@ class SyncNetWrapper:
                 logger.error("offsets.txt is empty or invalid")
                 return None
 
-            # Take best result (highest confidence)
-            best = max(offsets_data, key=lambda x: x[1])
-            offset_frames, confidence, min_dist = best
-
-            # Calculate metrics
-            fps = 25.0  # Default FPS for SyncNet
-            lag_ms = (offset_frames / fps) * 1000
-
-            # Normalize to score 0-1
-            score = self._normalize_score(confidence, min_dist, offset_frames)
-
-            return {
-                'offset_frames': int(offset_frames),
-                'confidence': round(confidence, 3),
-                'min_dist': round(min_dist, 3),
-                'score': round(score, 4),
-                'lag_ms': round(lag_ms, 1),
-                'debug': {
-                    'num_results': len(offsets_data),
-                    'all_results': [
-                        {
-                            'offset': int(o),
-                            'confidence': round(c, 3),
-                            'min_dist': round(m, 3)
-                        }
-                        for o, c, m in offsets_data[:5]  # Top 5 results
-                    ]
-                }
-            }
+            return self._build_result(offsets_data)
 
         except Exception as e:
             logger.error(f"Failed to parse offsets file: {str(e)}")
             return None
 
+    def _build_result(self, offsets_data: list) -> dict:
+        """
+        Build the result dict from (offset, confidence, min_dist) per face track
+        """
+        # Take best result (highest confidence)
+        best = max(offsets_data, key=lambda x: x[1])
+        offset_frames, confidence, min_dist = best
+
+        # Calculate metrics
+        fps = 25.0  # Default FPS for SyncNet
+        lag_ms = (offset_frames / fps) * 1000
+
+        # Normalize to score 0-1
+        score = self._normalize_score(confidence, min_dist, offset_frames)
+
+        return {
+            'offset_frames': int(offset_frames),
+            'confidence': round(confidence, 3),
+            'min_dist': round(min_dist, 3),
+            'score': round(score, 4),
+            'lag_ms': round(lag_ms, 1),
+            'debug': {
+                'num_results': len(offsets_data),
+                'all_results': [
+                    {
+                        'offset': int(o),
+                        'confidence': round(c, 3),
+                        'min_dist': round(m, 3)
+                    }
+                    for o, c, m in offsets_data[:5]  # Top 5 results
+                ]
+            }
+        }
+
     def _normalize_score(
         self,
         confidence: float,
@@ -406,7 +631,8 @@ class SyncNetWrapper:
 
     def cleanup(self, reference: str):
         """
-        Clean up temporary files for a reference
+        Remove folders left by versions that shared tmp/pywork, tmp/pycrop and
+        tmp/pyavi across requests (per-request scratch spaces clean themselves)
 
         Args:
             reference: Reference ID to clean up
@@ -414,8 +640,8 @@ class SyncNetWrapper:
         try:
             import shutil
 
-            for base_dir in [self.pywork_dir, self.pycrop_dir, self.pyavi_dir]:
-                ref_dir = base_dir / reference
+            for base_dir in ('pywork', 'pycrop', 'pyavi'):
+                ref_dir = self.tmp_dir / base_dir / reference
                 if ref_dir.exists():
                     shutil.rmtree(ref_dir)
                     logger.info(f"Cleaned up {ref_dir}")
@@ -4,15 +4,15 @@ End-to-end test of Flask service with EfficientNetV2
 
 import requests
 import json
-import cv2
-import numpy as np
 import tempfile
 import os
 import time
 
+from utils.synthetic_corpus import generate_clip
+
 
 def create_test_video(duration_sec=3, fps=25):
-    """Create a test video with some content"""
+    """Create a test video with a face-like sprite and a synced audio track"""
     print(f"Creating test video: {duration_sec}s @ {fps}FPS")
 
     # Create temporary file
@@ -20,45 +20,13 @@ def create_test_video(duration_sec=3, fps=25):
     video_path = temp_file.name
     temp_file.close()
 
-    # Video properties
-    width, height = 640, 480
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(video_path, fourcc, fps, (width, height))
-
-    total_frames = duration_sec * fps
-
-    for i in range(total_frames):
-        # Create frame with animated content
-        frame = np.zeros((height, width, 3), dtype=np.uint8)
-
-        # Animated gradient
-        t = i / total_frames
-        for y in range(height):
-            for x in range(width):
-                frame[y, x] = [
-                    int((x / width) * 255 * (1 - t) + t * 128),
-                    int((y / height) * 255 * t + (1 - t) * 128),
-                    int(((x + y) / (width + height)) * 255)
-                ]
-
-        # Add text
-        cv2.putText(frame, f"Test Video - Frame {i+1}/{total_frames}",
-                   (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
-                   (255, 255, 255), 2)
-
-        # Add moving circle
-        cx = int(width * (0.5 + 0.3 * np.sin(2 * np.pi * t)))
-        cy = int(height * (0.5 + 0.3 * np.cos(2 * np.pi * t)))
-        cv2.circle(frame, (cx, cy), 30, (0, 255, 0), -1)
-
-        out.write(frame)
-
-    out.release()
+    clip = generate_clip(video_path, width=640, height=480, fps=fps, duration_sec=duration_sec)
 
     file_size = os.path.getsize(video_path) / 1024  # KB
     print(f"✓ Video created: {video_path}")
     print(f"  - Size: {file_size:.2f} KB")
-    print(f"  - Frames: {total_frames}")
+    print(f"  - Frames: {clip['num_frames']}")
+    print(f"  - Audio muxed: {clip['audio_muxed']}")
 
     return video_path
 
@@ -0,0 +1,179 @@
+"""
+Unit tests for the lightweight audio-visual sync detector
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+
+import numpy as np
+
+from ensemble.avsync_detector import AVSyncDetector, cross_correlation
+from ensemble.orchestrator import EnsembleOrchestrator
+from syncnet_engine.audio import load_audio
+from syncnet_engine.face_detectors import HaarFaceDetector
+from utils.synthetic_corpus import SkinColorFaceDetector, generate_clip, write_wav
+
+
+def make_clip(tmp, offset_ms, duration_sec=6.0):
+    return generate_clip(
+        os.path.join(tmp, f'offset_{offset_ms}.avi'), width=320, height=240, fps=25,
+        duration_sec=duration_sec, container='avi', audio_offset_ms=offset_ms
+    )
+
+
+def test_cross_correlation_lag():
+    """Test that the correlation peak sits at the lag between two signals"""
+    print("\n[Test 1] Testing cross-correlation lag...")
+
+    rng = np.random.default_rng(0)
+    signal = rng.random(200)
+    delayed = np.concatenate([np.zeros(4), signal[:-4]])
+
+    corr = cross_correlation(signal, delayed, max_lag=10)
+    assert corr.shape == (21,)
+    assert int(np.argmax(corr)) - 10 == 4, "Audio delayed by 4 frames -> lag +4"
+    assert corr.max() > 0.99
+
+    print("✓ Cross-correlation test passed")
+
+
+def test_offset_recovery_on_synthetic_clips():
+    """Test that known audio offsets are recovered (SyncNet sign) and scored"""
+    print("\n[Test 2] Testing offset recovery...")
+
+    detector = AVSyncDetector(face_detector=SkinColorFaceDetector())
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for offset_ms in (0, 120, -200, 400):
+            clip = make_clip(tmp, offset_ms)
+            results[offset_ms] = detector.process_video(clip['path'], audio_path=clip['audio_path'])
+
+    for offset_ms, result in results.items():
+        expected = -round(offset_ms / 40)
+        assert abs(result['offset_frames'] - expected) <= 1, f"{offset_ms} ms: {result['offset_frames']} frames"
+        assert abs(result['lag_ms'] - result['offset_frames'] * 40) < 1e-6
+        assert 0.0 <= result['score'] <= 1.0
+        assert result['num_frames'] == 150
+
+    assert results[0]['score'] > results[400]['score'], "In-sync clip should score higher"
+    assert results[0]['correlation'] > 0.3
+
+    print("✓ Offset recovery test passed")
+
+
+def test_orchestrator_integration():
+    """Test the detector as an ensemble member (details + SyncNet-compatible fields)"""
+    print("\n[Test 3] Testing orchestrator integration...")
+
+    orchestrator = EnsembleOrchestrator(
+        avsync_detector=AVSyncDetector(face_detector=SkinColorFaceDetector()),
+        weights={'avsync': 1.0}
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = make_clip(tmp, 200, duration_sec=4.0)
+        # No muxed audio without ffmpeg: point the detector at the sidecar WAV
+        if not clip['audio_muxed']:
+            process_video = orchestrator.avsync.process_video
+            orchestrator.avsync.process_video = lambda path, session_id=None: process_video(
+                path, session_id, audio_path=clip['audio_path']
+            )
+        result = orchestrator.analyze_video(clip['path'], 'avsync-test')
+
+    assert result['detectors_used'] == ['avsync']
+    detail = result['detectors']['avsync']
+    assert abs(detail['offset_frames'] + 5) <= 1
+    assert result['offset_frames'] == detail['offset_frames'], "Falls back to AV sync without SyncNet"
+    assert result['lag_ms'] == detail['lag_ms']
+    assert result['combined_score'] == detail['score']
+
+    print("✓ Orchestrator integration test passed")
+
+
+def test_no_face_and_missing_cascade():
+    """Test errors for faceless videos and a missing Haar cascade"""
+    print("\n[Test 4] Testing error handling...")
+
+    class NoFaces:
+        def detect(self, frame):
+            return np.zeros((0, 5), dtype=np.float32)
+
+    detector = AVSyncDetector(face_detector=NoFaces())
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = make_clip(tmp, 0, duration_sec=2.0)
+        try:
+            detector.process_video(clip['path'], audio_path=clip['audio_path'])
+            assert False, "Should raise ValueError"
+        except ValueError:
+            pass
+
+        try:
+            HaarFaceDetector(os.path.join(tmp, 'missing.xml'))
+            assert False, "Should raise FileNotFoundError"
+        except FileNotFoundError:
+            pass
+
+    print("✓ Error handling test passed")
+
+
+def test_silent_audio_is_skipped():
+    """Test that silent audio is a no_speech skip, not a confident out-of-sync score"""
+    print("\n[Test 5] Testing silent audio...")
+
+    class FixedSyncNet:
+        def process_video(self, video_path, session_id, deadline=None):
+            return {'score': 0.8, 'offset_frames': 0, 'lag_ms': 0.0, 'confidence': 6.0}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = make_clip(tmp, 0, duration_sec=2.0)
+        silent = os.path.join(tmp, 'silent.wav')
+        write_wav(silent, np.zeros(2 * 16000))
+
+        result = AVSyncDetector(face_detector=SkinColorFaceDetector()).process_video(clip['path'], audio_path=silent)
+        assert result['skipped'] is True and result['reason'] == 'no_speech'
+        assert result['speech_coverage'] == 0.0 and 'score' not in result
+
+        # Without the speech gate, the flat correlation is caught instead of argmax reporting a 15-frame offset
+        ungated = AVSyncDetector(face_detector=SkinColorFaceDetector(), min_speech_coverage=0.0)
+        result = ungated.process_video(clip['path'], audio_path=silent)
+        assert result['skipped'] is True and result['correlation'] == 0.0
+
+        avsync = AVSyncDetector(face_detector=SkinColorFaceDetector())
+        process_video = avsync.process_video
+        avsync.process_video = lambda path, session_id=None: process_video(path, session_id, audio_path=silent)
+        orchestrator = EnsembleOrchestrator(
+            syncnet_wrapper=FixedSyncNet(),
+            avsync_detector=avsync,
+            weights={'syncnet': 0.5, 'avsync': 0.5}
+        )
+        combined = orchestrator.analyze_video(clip['path'], 'silent-avsync')
+
+        # Only the first max_seconds are decoded
+        assert len(load_audio(clip['path'], clip['audio_path'], max_seconds=0.5)) == 8000
+
+    assert combined['skipped'] == {'avsync': {'reason': 'no_speech', 'speech_coverage': 0.0}}
+    assert combined['weights'] == {'syncnet': 1.0} and combined['combined_score'] == 0.8
+
+    print("✓ Silent audio test passed")
+
+
+def run_all_tests():
+    print("=" * 70)
+    print("AV Sync Detector Tests")
+    print("=" * 70)
+
+    test_cross_correlation_lag()
+    test_offset_recovery_on_synthetic_clips()
+    test_orchestrator_integration()
+    test_no_face_and_missing_cascade()
+    test_silent_audio_is_skipped()
+
+    print("\n" + "=" * 70)
+    print("✓ All AV sync detector tests passed")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
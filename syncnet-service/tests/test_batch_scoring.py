@@ -0,0 +1,379 @@
+"""
+Unit tests for /score/batch (NDJSON stream over the shared job executor)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Same environment as test_readiness (app reads CONFIG once per process)
+os.environ.update({
+    'DETECTORS_RANDOM_WEIGHTS': 'true',
+    'SYNCNET_ENABLED': 'false',
+    'EFFICIENTNET_ENABLED': 'false',
+    'VIT_ENABLED': 'false',
+    'EFFICIENTNETV2_ENABLED': 'true',
+    'INFERENCE_BATCHING': 'false',
+    'WARMUP_BATCH_SIZES': '1,4',
+})
+
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import app as service
+from ensemble.orchestrator import EnsembleOrchestrator
+from ensemble.preflight import FacePresenceCheck
+from utils.jobs import JobManager
+from utils.synthetic_corpus import SkinColorFaceDetector, generate_clip
+
+
+class StubEnsemble:
+    """analyze_video stand-in: fails on paths containing 'broken', records concurrency"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.deadlines = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def analyze_video(self, video_path, session_id, progress_callback=None, deadline=None):
+        with self._lock:
+            self.calls.append(video_path)
+            self.deadlines.append(deadline)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if 'broken' in video_path:
+                raise RuntimeError(f"All detectors failed for {video_path}")
+            return {'combined_score': 0.8, 'decision': 'ALLOW', 'session_id': session_id}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@contextmanager
+def batch_service(ensemble, preflight=False, job_workers=1, **config):
+    """Patch the ensemble, face preflight, a private job manager (and batch slots) and CONFIG values"""
+    originals = (service.get_ensemble, service.face_preflight, service.job_manager, service.batch_slots, dict(service.CONFIG))
+    with tempfile.TemporaryDirectory() as store_dir:
+        service.get_ensemble = lambda: ensemble
+        service.face_preflight = preflight
+        service.job_manager = JobManager(store_dir, max_workers=job_workers, max_pending=4, ttl_seconds=60)
+        service.batch_slots = None
+        service.CONFIG.update(config)
+        try:
+            yield service.app.test_client()
+        finally:
+            service.job_manager.shutdown(wait=True)
+            service.get_ensemble, service.face_preflight, service.job_manager, service.batch_slots = originals[:4]
+            service.CONFIG.clear()
+            service.CONFIG.update(originals[4])
+
+
+@contextmanager
+def video_files(*names):
+    """Placeholder files (items must exist; the stub ensemble never decodes them)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name in names:
+            paths.append(os.path.join(tmp, name))
+            with open(paths[-1], 'wb') as f:
+                f.write(b'\0' * 64)
+        yield paths
+
+
+def post_batch(client, items):
+    response = client.post('/score/batch', json={'items': items})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_ndjson_lines_and_summary():
+    """Test one result line per item in any order, then the summary"""
+    print("\n[Test 1] Testing NDJSON lines and summary...")
+
+    ensemble = StubEnsemble()
+    with video_files('a.mp4', 'b.mp4', 'c.mp4') as (a, b, c), batch_service(ensemble) as client:
+        lines = post_batch(client, [a, {'video_path': b, 'session_id': 's2'}, c])
+
+    results, summary = lines[:-1], lines[-1]
+    assert sorted(line['index'] for line in results) == [0, 1, 2]
+    for line in results:
+        assert line['type'] == 'result' and line['status'] == 'ok'
+        assert set(line) == {'type', 'index', 'video_path', 'session_id', 'status', 'result'}
+        assert line['result']['decision'] == 'ALLOW'
+        assert line['result']['processing_time_ms'] >= 0
+    by_index = {line['index']: line for line in results}
+    assert by_index[1]['session_id'] == 's2' and by_index[0]['session_id'] == 'a'
+
+    assert summary['type'] == 'summary'
+    assert (summary['total'], summary['succeeded'], summary['rejected'], summary['failed']) == (3, 3, 0, 0)
+    assert summary['processing_time_ms'] >= 0
+
+    print("✓ NDJSON lines and summary test passed")
+
+
+def test_failing_item_does_not_affect_others():
+    """Test that a failing analysis and an invalid item become error lines only"""
+    print("\n[Test 2] Testing error isolation...")
+
+    ensemble = StubEnsemble()
+    names = ('ok-1.mp4', 'broken.mp4', 'ok-2.mp4')
+    with video_files(*names) as (ok_1, broken, ok_2), batch_service(ensemble) as client:
+        lines = post_batch(client, [ok_1, broken, 42, {'video_id': '../etc'}, ok_2])
+
+    by_index = {line['index']: line for line in lines[:-1]}
+    assert [by_index[i]['status'] for i in range(5)] == ['ok', 'error', 'error', 'error', 'ok']
+    assert by_index[1]['error'] == {
+        'message': f'All detectors failed for {broken}', 'type': 'RuntimeError'
+    }
+    assert by_index[2]['error']['type'] == 'ValueError'
+    assert 'Invalid video_id' in by_index[3]['error']['message']
+    assert lines[-1]['succeeded'] == 2 and lines[-1]['failed'] == 3
+
+    # Finished items keep their deadline untouched (no spurious client_disconnected)
+    assert all(deadline.reason is None for deadline in ensemble.deadlines)
+    assert all(deadline.budget_seconds == service.CONFIG['processing_timeout'] for deadline in ensemble.deadlines)
+
+    print("✓ Error isolation test passed")
+
+
+def test_invalid_requests():
+    """Test 400 for missing, empty or invalid items and for too many items"""
+    print("\n[Test 3] Testing invalid batch requests...")
+
+    ensemble = StubEnsemble()
+    with batch_service(ensemble, batch_max_items=2) as client:
+        for body in ({}, {'items': []}, {'items': 'a.mp4'}, ['a.mp4']):
+            response = client.post('/score/batch', json=body)
+            assert response.status_code == 400, body
+            assert response.get_json()['error'] == 'items must be a non-empty list'
+
+        response = client.post('/score/batch', data='not json', content_type='application/json')
+        assert response.status_code == 400
+
+        response = client.post('/score/batch', json={'items': ['a.mp4', 'b.mp4', 'c.mp4']})
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Too many items: 3 (max: 2)'
+
+    assert ensemble.calls == [], "Invalid requests never reach the ensemble"
+    print("✓ Invalid batch requests test passed")
+
+
+def test_items_use_face_preflight():
+    """Test that faceless items are rejected like on /score, without running the ensemble"""
+    print("\n[Test 4] Testing face preflight on batch items...")
+
+    ensemble = StubEnsemble()
+    preflight = FacePresenceCheck(SkinColorFaceDetector(min_area=100))
+    with tempfile.TemporaryDirectory() as tmp:
+        face = generate_clip(os.path.join(tmp, 'face.avi'), duration_sec=2.0, container='avi', audio=False)
+        empty = generate_clip(os.path.join(tmp, 'empty.avi'), duration_sec=2.0, container='avi', num_faces=0, audio=False)
+
+        with batch_service(ensemble, preflight=preflight) as client:
+            lines = post_batch(client, [face['path'], empty['path']])
+
+    by_index = {line['index']: line for line in lines[:-1]}
+    assert by_index[0]['status'] == 'ok'
+    assert by_index[1]['status'] == 'rejected' and by_index[1]['reason'] == 'no_face'
+    assert by_index[1]['preflight']['frames_checked'] == 5
+    assert ensemble.calls == [face['path']]
+    assert (lines[-1]['succeeded'], lines[-1]['rejected'], lines[-1]['failed']) == (1, 1, 0)
+
+    print("✓ Face preflight on batch items test passed")
+
+
+def test_jobs_api_uses_face_preflight():
+    """Test that POST /jobs rejects faceless videos with the /score 422 body and creates no job"""
+    print("\n[Test 5] Testing face preflight on POST /jobs...")
+
+    ensemble = StubEnsemble()
+    preflight = FacePresenceCheck(SkinColorFaceDetector(min_area=100))
+    with tempfile.TemporaryDirectory() as tmp:
+        face = generate_clip(os.path.join(tmp, 'face.avi'), duration_sec=2.0, container='avi', audio=False)
+        empty = generate_clip(os.path.join(tmp, 'empty.avi'), duration_sec=2.0, container='avi', num_faces=0, audio=False)
+
+        with batch_service(ensemble, preflight=preflight) as client:
+            rejected = client.post('/jobs', json={'video_path': empty['path'], 'session_id': 'job-empty'})
+            scored = client.post('/score', json={'video_path': empty['path'], 'session_id': 'job-empty'})
+            assert not service.job_manager._futures, "No job for a rejected video"
+
+            accepted = client.post('/jobs', json={'video_path': face['path'], 'session_id': 'job-face'})
+            assert accepted.status_code == 202
+            result = service.job_manager.wait(accepted.get_json()['job_id'], timeout=5)
+
+    assert rejected.status_code == 422 and scored.status_code == 422
+    body = rejected.get_json()
+    assert set(body) == set(scored.get_json()) and body['error'] == scored.get_json()['error']
+    assert body['reason'] == 'no_face' and body['session_id'] == 'job-empty'
+    assert body['preflight']['frames_checked'] == 5
+    assert result['decision'] == 'ALLOW' and ensemble.calls == [face['path']]
+
+    print("✓ Face preflight on POST /jobs test passed")
+
+
+def test_items_share_the_job_executor():
+    """Test that items run as jobs: JOB_WORKERS bounds the concurrent analyses"""
+    print("\n[Test 6] Testing shared job executor...")
+
+    ensemble = StubEnsemble(delay=0.05)
+    with video_files(*[f'{i}.mp4' for i in range(6)]) as paths, \
+            batch_service(ensemble, job_workers=1, batch_concurrency=4) as client:
+        lines = post_batch(client, paths)
+        jobs = list(service.job_manager._futures)
+
+    assert lines[-1]['succeeded'] == 6
+    assert ensemble.max_active == 1, "Single job worker: one analysis at a time"
+    assert len(jobs) == 6, "Every item is a job"
+
+    print("✓ Shared job executor test passed")
+
+
+def test_disconnect_cancels_running_items():
+    """Test that closing the stream cancels only the items still running"""
+    print("\n[Test 7] Testing client disconnect...")
+
+    cancelled = threading.Event()
+
+    class SlowSecondItem(StubEnsemble):
+        def analyze_video(self, video_path, session_id, progress_callback=None, deadline=None):
+            if 'slow' in video_path:
+                self.slow_deadline = deadline
+                while not deadline.expired:
+                    time.sleep(0.01)
+                cancelled.set()
+                deadline.check('stub')
+            return super().analyze_video(video_path, session_id, progress_callback, deadline)
+
+    ensemble = SlowSecondItem()
+    with video_files('fast.mp4', 'slow.mp4') as paths, batch_service(ensemble, job_workers=2) as client:
+        response = client.post('/score/batch', json={'items': paths}, buffered=False)
+        first = json.loads(next(iter(response.response)))
+        assert first['status'] == 'ok' and first['index'] == 0
+        response.close()
+
+        assert cancelled.wait(5), "Running item must be cancelled"
+
+    assert ensemble.slow_deadline.reason == 'client_disconnected'
+    assert ensemble.calls == [paths[0]]
+    assert ensemble.deadlines[0].reason is None, "Finished items are not cancelled"
+
+    print("✓ Client disconnect test passed")
+
+
+def test_orchestrator_serializes_unsafe_stages():
+    """Test that SyncNet runs one video at a time while InferenceServer detectors overlap"""
+    print("\n[Test 8] Testing serialized detector stages...")
+
+    class Tracker:
+        def __init__(self):
+            self.active = 0
+            self.max_active = 0
+            self.lock = threading.Lock()
+
+        def run(self):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.1)
+            with self.lock:
+                self.active -= 1
+
+    syncnet_tracker, served_tracker = Tracker(), Tracker()
+
+    class SyncNetStub:
+        def process_video(self, video_path, session_id, deadline=None):
+            syncnet_tracker.run()
+            return {'score': 0.8, 'offset_frames': 0, 'lag_ms': 0.0, 'confidence': 5.0}
+
+    class AVSyncServed:
+        inference_server = object()   # thread-safe: not serialized
+
+        def process_video(self, video_path, session_id):
+            served_tracker.run()
+            return {'score': 0.6, 'offset_frames': 0, 'lag_ms': 0.0, 'confidence': 0.5}
+
+    orchestrator = EnsembleOrchestrator(
+        syncnet_wrapper=SyncNetStub(),
+        avsync_detector=AVSyncServed(),
+        weights={'syncnet': 0.5, 'avsync': 0.5}
+    )
+    threads = [
+        threading.Thread(target=orchestrator.analyze_video, args=(f'clip-{i}.mp4', f's{i}'))
+        for i in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert syncnet_tracker.max_active == 1
+    assert served_tracker.max_active > 1
+
+    print("✓ Serialized detector stages test passed")
+
+
+def test_concurrent_batches_leave_a_slot_for_score():
+    """Test that concurrent batches share JOB_MAX_PENDING - 1 job slots, so /score is not 503"""
+    print("\n[Test 9] Testing concurrent batches and /score...")
+
+    ensemble = StubEnsemble(delay=0.2)
+    names = [f'batch{i}.mp4' for i in range(8)] + ['single.mp4']
+    with video_files(*names) as paths, \
+            batch_service(ensemble, job_workers=4, batch_concurrency=4, job_max_pending=4) as client:
+        batches = [paths[:4], paths[4:8]]
+        lines = {}
+
+        def run_batch(i):
+            lines[i] = post_batch(service.app.test_client(), batches[i])
+
+        threads = [threading.Thread(target=run_batch, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+
+        give_up_at = time.monotonic() + 5
+        while ensemble.active < 3 and time.monotonic() < give_up_at:
+            time.sleep(0.01)
+        assert ensemble.active == 3, "Both batches together hold JOB_MAX_PENDING - 1 slots"
+
+        response = client.post('/score', json={'video_path': paths[8], 'session_id': 'single'})
+        for thread in threads:
+            thread.join()
+
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.get_json()['decision'] == 'ALLOW'
+    assert lines[0][-1]['succeeded'] == 4 and lines[1][-1]['succeeded'] == 4
+    assert ensemble.max_active == 4, "Three batch items plus the /score request"
+
+    print("✓ Concurrent batches test passed")
+
+
+def run_all_tests():
+    print("=" * 70)
+    print("Batch Scoring Tests")
+    print("=" * 70)
+
+    test_ndjson_lines_and_summary()
+    test_failing_item_does_not_affect_others()
+    test_invalid_requests()
+    test_items_use_face_preflight()
+    test_jobs_api_uses_face_preflight()
+    test_items_share_the_job_executor()
+    test_disconnect_cancels_running_items()
+    test_orchestrator_serializes_unsafe_stages()
+    test_concurrent_batches_leave_a_slot_for_score()
+
+    print("\n" + "=" * 70)
+    print("✓ All batch scoring tests passed")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
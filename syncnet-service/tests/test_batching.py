@@ -0,0 +1,170 @@
+"""
+Unit tests for dynamic micro-batching (InferenceServer)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import threading
+
+import torch
+from PIL import Image
+
+from ensemble.batching import InferenceServer, forward_in_batches, BATCH_SIZE_HISTOGRAM
+from ensemble.efficientnetv2_detector import EfficientNetV2Detector
+from ensemble.orchestrator import EnsembleOrchestrator
+from utils.jobs import JobManager
+from utils.synthetic_corpus import generate_clip
+
+
+def test_results_routed_to_each_caller():
+    """Test that concurrent callers get their own output rows"""
+    print("\n[Test 1] Testing result routing across concurrent requests...")
+
+    batch_sizes = []
+
+    def forward(batch):
+        batch_sizes.append(batch.shape[0])
+        return batch * 2
+
+    server = InferenceServer(forward, name='test_routing', max_batch_size=16, max_wait_ms=50)
+    outputs = {}
+    barrier = threading.Barrier(4)
+
+    def request(worker_id):
+        tensors = [torch.full((3,), float(worker_id * 10 + i)) for i in range(4)]
+        barrier.wait(5)
+        outputs[worker_id] = forward_in_batches(tensors, forward, server)
+
+    threads = [threading.Thread(target=request, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    for worker_id, result in outputs.items():
+        expected = torch.stack([torch.full((3,), float(worker_id * 10 + i)) * 2 for i in range(4)])
+        assert torch.equal(result, expected), f"Wrong rows for worker {worker_id}"
+
+    assert sum(batch_sizes) == 16, f"All 16 tensors should be processed, got {batch_sizes}"
+    assert max(batch_sizes) > 4, f"Requests should share batches, got {batch_sizes}"
+    assert max(batch_sizes) <= 16, "Batches should respect max_batch_size"
+
+    snapshot = BATCH_SIZE_HISTOGRAM.collect()[('test_routing',)]
+    assert snapshot['count'] == len(batch_sizes), "Batch-size histogram should record each batch"
+
+    print(f"  - batch sizes: {batch_sizes}")
+    print("✓ Result routing test passed")
+
+
+def test_forward_errors_propagate():
+    """Test that a failing forward pass fails every caller in the batch"""
+    print("\n[Test 2] Testing error propagation...")
+
+    def forward(batch):
+        raise ValueError("bad batch")
+
+    server = InferenceServer(forward, name='test_errors', max_batch_size=4, max_wait_ms=1)
+    future = server.submit(torch.zeros(2))
+
+    try:
+        future.result(timeout=5)
+        assert False, "Future should raise"
+    except ValueError as e:
+        assert 'bad batch' in str(e)
+
+    print("✓ Error propagation test passed")
+
+
+def test_detector_batched_matches_single_image():
+    """Test that batched predict_frames matches per-image predictions"""
+    print("\n[Test 3] Testing batched detector predictions...")
+
+    detector = EfficientNetV2Detector(model_path=None, device='cpu', use_pretrained=False)
+    frames = [Image.new('RGB', (260, 260), color=(40 * i, 90, 200 - 30 * i)) for i in range(3)]
+
+    single_scores = [detector.predict_image(f)['score'] for f in frames]
+
+    local = detector.predict_frames(frames)
+    detector.enable_batching(max_batch_size=8, max_wait_ms=2)
+    served = detector.predict_frames(frames)
+
+    for expected, got_local, got_served in zip(single_scores, local['frame_scores'], served['frame_scores']):
+        assert abs(expected - got_local) < 1e-4, "Local batch should match single-image score"
+        assert abs(expected - got_served) < 1e-4, "Served batch should match single-image score"
+
+    print("✓ Batched detector prediction test passed")
+
+
+def test_concurrent_videos_share_batches():
+    """Test that two analyze_video calls share forward passes only with JOB_WORKERS > 1"""
+    print("\n[Test 4] Testing cross-request batches through the job executor...")
+
+    detector = EfficientNetV2Detector(model_path=None, device='cpu', use_pretrained=False)
+    detector.enable_batching(max_batch_size=64, max_wait_ms=500)
+    server = detector.inference_server
+    batch_sizes = []
+    forward = server.forward_fn
+    server.forward_fn = lambda batch: batch_sizes.append(batch.shape[0]) or forward(batch)
+
+    orchestrator = EnsembleOrchestrator(efficientnetv2_detector=detector, weights={'efficientnetv2': 1.0})
+
+    def run_two(clips, job_workers):
+        batch_sizes.clear()
+        with tempfile.TemporaryDirectory() as store_dir:
+            manager = JobManager(store_dir, max_workers=job_workers, max_pending=4)
+            jobs = [
+                manager.submit(lambda report_partial, path=path: orchestrator.analyze_video(path, 'batch-test'))
+                for path in clips
+            ]
+            results = [manager.wait(job_id, timeout=60) for job_id in jobs]
+            manager.shutdown(wait=True)
+        return results, list(batch_sizes)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = [
+            generate_clip(os.path.join(tmp, f'clip_{i}.avi'), duration_sec=2.0, container='avi', audio=False)['path']
+            for i in range(2)
+        ]
+        serial, serial_batches = run_two(clips, job_workers=1)
+        shared, shared_batches = run_two(clips, job_workers=2)
+
+    frames_per_video = serial[0]['detectors']['efficientnetv2']['num_frames']
+    assert serial_batches == [frames_per_video, frames_per_video], f"One video at a time: {serial_batches}"
+    assert shared_batches == [2 * frames_per_video], f"Both videos in one forward pass: {shared_batches}"
+    for alone, batched in zip(serial, shared):
+        assert abs(alone['combined_score'] - batched['combined_score']) < 1e-4, "Batching must not change scores"
+
+    print(f"  - batch sizes: JOB_WORKERS=1 {serial_batches}, JOB_WORKERS=2 {shared_batches}")
+    print("✓ Cross-request batches test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Running Micro-Batching Unit Tests")
+    print("=" * 70)
+
+    try:
+        test_results_routed_to_each_caller()
+        test_forward_errors_propagate()
+        test_detector_batched_matches_single_image()
+        test_concurrent_videos_share_batches()
+
+        print("\n" + "=" * 70)
+        print("✓ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
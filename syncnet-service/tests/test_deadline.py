@@ -0,0 +1,267 @@
+"""
+Unit tests for per-request deadlines, cancellation and partial results
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Same environment as test_readiness (app reads CONFIG once per process)
+os.environ.update({
+    'DETECTORS_RANDOM_WEIGHTS': 'true',
+    'SYNCNET_ENABLED': 'false',
+    'EFFICIENTNET_ENABLED': 'false',
+    'VIT_ENABLED': 'false',
+    'EFFICIENTNETV2_ENABLED': 'true',
+    'INFERENCE_BATCHING': 'false',
+    'WARMUP_BATCH_SIZES': '1,4',
+})
+
+import time
+import signal
+import tempfile
+import subprocess
+from pathlib import Path
+
+import app as service
+from ensemble.orchestrator import EnsembleOrchestrator
+from syncnet_wrapper import SyncNetWrapper
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.metrics import DEADLINE_EXCEEDED
+
+# Spawns a grandchild and sleeps: killing only the direct child would leak it
+SLOW_SCRIPT = """
+import os, subprocess, sys, time
+child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+with open(sys.argv[1], 'w') as f:
+    f.write(str(child.pid))
+time.sleep(30)
+"""
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Reaped by init or still a zombie both count as dead
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().split()[2] != 'Z'
+    except OSError:
+        return True
+
+
+def test_deadline_budget_and_cancel():
+    """Test remaining time, check() and cancellation"""
+    print("\n[Test 1] Testing deadline budget and cancellation...")
+
+    deadline = Deadline(0.2)
+    assert 0 < deadline.remaining() <= 0.2 and deadline.reason is None
+    assert deadline.timeout(120) <= 0.2 and deadline.timeout(0.05) == 0.05
+    deadline.check('start')
+
+    time.sleep(0.25)
+    assert deadline.expired and deadline.reason == 'deadline'
+    try:
+        deadline.check('syncnet')
+        raise AssertionError("check() must raise once expired")
+    except DeadlineExceeded as e:
+        assert e.reason == 'deadline' and 'syncnet' in str(e)
+        assert isinstance(e, TimeoutError)
+
+    unlimited = Deadline(0)
+    assert unlimited.timeout() is None and not unlimited.expired
+    assert unlimited.summary()['budget_ms'] is None
+    unlimited.cancel('client_disconnected')
+    unlimited.cancel('deadline')
+    assert unlimited.expired and unlimited.reason == 'client_disconnected', "First reason wins"
+    assert unlimited.summary()['remaining_ms'] == 0
+
+    print("✓ Deadline budget and cancellation test passed")
+
+
+def test_subprocess_killed_at_deadline():
+    """Test that the SyncNet script runner kills the whole process group"""
+    print("\n[Test 2] Testing subprocess kill at deadline...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_file = Path(tmp) / 'grandchild.pid'
+        cmd = [sys.executable, '-c', SLOW_SCRIPT, str(pid_file)]
+
+        start = time.monotonic()
+        try:
+            SyncNetWrapper._run_script(cmd, cwd=tmp, timeout=120, deadline=Deadline(1.0))
+            raise AssertionError("Script must be stopped at the deadline")
+        except subprocess.TimeoutExpired:
+            pass
+        elapsed = time.monotonic() - start
+        assert elapsed < 3.0, f"Killed late: {elapsed:.2f}s"
+
+        grandchild = int(pid_file.read_text())
+        for _ in range(20):
+            if not process_alive(grandchild):
+                break
+            time.sleep(0.05)
+        else:
+            os.kill(grandchild, signal.SIGKILL)
+            raise AssertionError("Grandchild survived the deadline")
+
+        # Cancellation stops it as well, and fast scripts complete normally
+        deadline = Deadline(60)
+        deadline.cancel('client_disconnected')
+        try:
+            SyncNetWrapper._run_script(cmd, cwd=tmp, timeout=120, deadline=deadline)
+            raise AssertionError("Cancelled script must be stopped")
+        except subprocess.TimeoutExpired:
+            pass
+
+        done = SyncNetWrapper._run_script([sys.executable, '-c', 'print("ok")'], cwd=tmp, timeout=10)
+        assert done.returncode == 0 and done.stdout.strip() == 'ok'
+
+    print("✓ Subprocess kill test passed")
+
+
+def test_wrapper_raises_instead_of_demo_data():
+    """Test that a pipeline stopped by the deadline is not replaced by demo data"""
+    print("\n[Test 3] Testing SyncNet wrapper at deadline...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp) / 'syncnet_python'
+        repo.mkdir()
+        (repo / 'run_pipeline.py').write_text('import time\ntime.sleep(30)\n')
+        video = Path(tmp) / 'clip.mp4'
+        video.write_bytes(b'\0' * 1024)
+
+        wrapper = SyncNetWrapper(
+            model_path=os.path.join(tmp, 'missing.model'),
+            detector_path=os.path.join(tmp, 'missing.pth'),
+            tmp_dir=tmp,
+            engine='subprocess'
+        )
+        wrapper.syncnet_repo_path, wrapper.syncnet_available = repo, True
+
+        start = time.monotonic()
+        try:
+            wrapper.process_video(str(video), 'slow', deadline=Deadline(0.5))
+            raise AssertionError("Expected DeadlineExceeded")
+        except DeadlineExceeded as e:
+            assert e.reason == 'deadline'
+        assert time.monotonic() - start < 3.0
+        assert not wrapper.scratch._active, "Scratch released on timeout"
+
+    print("✓ SyncNet wrapper deadline test passed")
+
+
+def test_orchestrator_partial_result():
+    """Test that detectors finished in time are combined and the rest reported"""
+    print("\n[Test 4] Testing orchestrator partial result...")
+
+    class FastSyncNet:
+        def process_video(self, video_path, session_id, deadline=None):
+            return {'score': 0.9, 'offset_frames': 0, 'lag_ms': 0.0, 'confidence': 5.0, 'min_dist': 7.0}
+
+    class SlowAVSync:
+        def process_video(self, video_path, session_id):
+            time.sleep(0.3)
+            return {'score': 0.5, 'offset_frames': 1, 'lag_ms': 40.0, 'confidence': 0.3}
+
+    class NeverCalled:
+        def predict_frames(self, frames, aggregate_method='mean'):
+            raise AssertionError("Detector must not start after the deadline")
+
+    orchestrator = EnsembleOrchestrator(
+        syncnet_wrapper=FastSyncNet(),
+        avsync_detector=SlowAVSync(),
+        efficientnet_detector=NeverCalled(),
+        weights={'syncnet': 0.5, 'avsync': 0.5, 'efficientnet': 1.0}
+    )
+    exceeded = DEADLINE_EXCEEDED.labels(reason='deadline').get()
+
+    result = orchestrator.analyze_video('clip.mp4', 'partial', deadline=Deadline(0.2))
+    assert result['partial'] is True
+    assert result['incomplete_detectors'] == ['efficientnet']
+    assert result['detectors_used'] == ['syncnet', 'avsync']
+    assert result['weights'] == {'syncnet': 0.5, 'avsync': 0.5}
+    assert result['combined_score'] == 0.7
+    assert result['errors'] is None, "Running out of time is not an error"
+    assert result['deadline']['reason'] == 'deadline'
+    assert DEADLINE_EXCEEDED.labels(reason='deadline').get() == exceeded + 1
+
+    # A detector cut short mid-run is incomplete, not failed
+    class CutShortSyncNet:
+        def process_video(self, video_path, session_id, deadline=None):
+            raise DeadlineExceeded('syncnet: deadline', 'deadline')
+
+    orchestrator.syncnet, orchestrator.avsync = CutShortSyncNet(), FastSyncNet()
+    orchestrator.efficientnet = None
+    result = orchestrator.analyze_video('clip.mp4', 'cut', deadline=Deadline(30))
+    assert result['incomplete_detectors'] == ['syncnet'] and result['errors'] is None
+
+    # Without a deadline nothing changes
+    orchestrator.syncnet = FastSyncNet()
+    result = orchestrator.analyze_video('clip.mp4', 'full')
+    assert result['partial'] is False and 'deadline' not in result
+
+    # Nothing finished: DeadlineExceeded with the cancel reason
+    cancelled = Deadline(30)
+    cancelled.cancel('client_disconnected')
+    try:
+        orchestrator.analyze_video('clip.mp4', 'gone', deadline=cancelled)
+        raise AssertionError("Expected DeadlineExceeded")
+    except DeadlineExceeded as e:
+        assert e.reason == 'client_disconnected'
+
+    print("✓ Orchestrator partial result test passed")
+
+
+def test_score_returns_408_without_results():
+    """Test /score maps a job with no finished detector to 408"""
+    print("\n[Test 5] Testing /score deadline response...")
+
+    deadlines = []
+
+    class NothingInTime:
+        def analyze_video(self, video_path, session_id, progress_callback=None, deadline=None):
+            deadlines.append(deadline)
+            raise DeadlineExceeded('No detector finished before the deadline', 'deadline')
+
+    client = service.app.test_client()
+    original_ensemble, original_preflight = service.get_ensemble, service.face_preflight
+    service.get_ensemble = lambda: NothingInTime()
+    service.face_preflight = False   # unavailable -> skipped
+
+    try:
+        with tempfile.NamedTemporaryFile(suffix='.mp4') as video:
+            video.write(b'\0' * 1024)
+            video.flush()
+            response = client.post('/score', json={'video_path': video.name, 'session_id': 'late'})
+    finally:
+        service.get_ensemble, service.face_preflight = original_ensemble, original_preflight
+
+    body = response.get_json()
+    assert response.status_code == 408, body
+    assert body['reason'] == 'deadline' and body['job_id']
+    assert deadlines[0].budget_seconds == service.CONFIG['processing_timeout']
+
+    print("✓ /score deadline response test passed")
+
+
+def run_all_tests():
+    print("=" * 70)
+    print("Deadline Tests")
+    print("=" * 70)
+
+    test_deadline_budget_and_cancel()
+    test_subprocess_killed_at_deadline()
+    test_wrapper_raises_instead_of_demo_data()
+    test_orchestrator_partial_result()
+    test_score_returns_408_without_results()
+
+    print("\n" + "=" * 70)
+    print("✓ All deadline tests passed")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -8,9 +8,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ensemble.orchestrator import EnsembleOrchestrator
 from ensemble.efficientnetv2_detector import EfficientNetV2Detector
-import cv2
+from utils.synthetic_corpus import generate_clip
 import tempfile
-import numpy as np
 
 
 def create_test_video(duration_sec=2, fps=25):
@@ -22,37 +21,10 @@ def create_test_video(duration_sec=2, fps=25):
     video_path = temp_file.name
     temp_file.close()
 
-    # Video properties
-    width, height = 640, 480
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(video_path, fourcc, fps, (width, height))
+    clip = generate_clip(video_path, width=640, height=480, fps=fps, duration_sec=duration_sec)
 
-    total_frames = duration_sec * fps
-
-    # Generate frames with varying content
-    for i in range(total_frames):
-        # Create frame with color gradient
-        frame = np.zeros((height, width, 3), dtype=np.uint8)
-
-        # Add gradient
-        for y in range(height):
-            for x in range(width):
-                frame[y, x] = [
-                    int((x / width) * 255),
-                    int((y / height) * 255),
-                    int(((x + y) / (width + height)) * 255)
-                ]
-
-        # Add frame counter text
-        cv2.putText(frame, f"Frame {i+1}/{total_frames}",
-                   (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1,
-                   (255, 255, 255), 2)
-
-        out.write(frame)
-
-    out.release()
     print(f"  - Video created: {video_path}")
-    print(f"  - Total frames: {total_frames}")
+    print(f"  - Total frames: {clip['num_frames']}")
 
     return video_path
 
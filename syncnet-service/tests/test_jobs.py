@@ -0,0 +1,277 @@
+"""
+Unit tests for the background Job Manager (async /jobs API)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import subprocess
+import tempfile
+import threading
+import time
+
+from utils.jobs import JobManager, JobQueueFull
+
+
+def test_job_lifecycle_and_partial_results():
+    """Test queued -> running -> succeeded with partial results"""
+    print("\n[Test 1] Testing job lifecycle...")
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        manager = JobManager(store_dir, max_workers=1, max_pending=2, ttl_seconds=60)
+        release = threading.Event()
+
+        def work(report_partial):
+            report_partial({'detectors_completed': ['efficientnetv2']})
+            release.wait(5)
+            return {'combined_score': 0.5, 'decision': 'ALLOW'}
+
+        job_id = manager.submit(work, metadata={'session_id': 'sess_1'})
+
+        # Partial result becomes visible while the job is still running
+        deadline = time.time() + 5
+        state = manager.get(job_id)
+        while state['partial'] is None and time.time() < deadline:
+            time.sleep(0.01)
+            state = manager.get(job_id)
+
+        assert state['status'] == JobManager.STATUS_RUNNING, f"Got {state['status']}"
+        assert state['partial'] == {'detectors_completed': ['efficientnetv2']}
+        assert state['metadata']['session_id'] == 'sess_1'
+
+        release.set()
+        result = manager.wait(job_id, timeout=5)
+
+        assert result['decision'] == 'ALLOW'
+        state = manager.get(job_id)
+        assert state['status'] == JobManager.STATUS_SUCCEEDED
+        assert state['result']['combined_score'] == 0.5
+
+        manager.shutdown(wait=True)
+
+    print("✓ Job lifecycle test passed")
+
+
+def test_wait_timeout_and_failure():
+    """Test wait() timeout and error propagation"""
+    print("\n[Test 2] Testing wait timeout and failures...")
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        manager = JobManager(store_dir, max_workers=1, max_pending=4)
+        release = threading.Event()
+
+        slow_id = manager.submit(lambda report_partial: release.wait(5) and {})
+
+        try:
+            manager.wait(slow_id, timeout=0.05)
+            assert False, "wait() should time out"
+        except TimeoutError:
+            pass
+
+        release.set()
+
+        def broken(report_partial):
+            raise RuntimeError("All detectors failed")
+
+        failed_id = manager.submit(broken)
+
+        try:
+            manager.wait(failed_id, timeout=5)
+            assert False, "wait() should re-raise the job exception"
+        except RuntimeError as e:
+            assert 'All detectors failed' in str(e)
+
+        state = manager.get(failed_id)
+        assert state['status'] == JobManager.STATUS_FAILED
+        assert state['error']['type'] == 'RuntimeError'
+
+        manager.shutdown(wait=True)
+
+    print("✓ Wait timeout and failure test passed")
+
+
+def test_bounded_queue():
+    """Test that max_pending rejects extra jobs"""
+    print("\n[Test 3] Testing bounded queue...")
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        manager = JobManager(store_dir, max_workers=1, max_pending=2)
+        release = threading.Event()
+
+        manager.submit(lambda report_partial: release.wait(5))
+        manager.submit(lambda report_partial: release.wait(5))
+
+        try:
+            manager.submit(lambda report_partial: {})
+            assert False, "Third job should be rejected"
+        except JobQueueFull:
+            pass
+
+        release.set()
+        manager.shutdown(wait=True)
+
+    print("✓ Bounded queue test passed")
+
+
+def test_ttl_expiry():
+    """Test that expired jobs are purged"""
+    print("\n[Test 4] Testing TTL expiry...")
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        manager = JobManager(store_dir, max_workers=1, ttl_seconds=60)
+
+        job_id = manager.submit(lambda report_partial: {'score': 1.0})
+        manager.wait(job_id, timeout=5)
+        assert manager.get(job_id) is not None
+
+        # Force expiry
+        path = os.path.join(store_dir, f'{job_id}.json')
+        with open(path) as f:
+            state = json.load(f)
+        state['expires_at'] = time.time() - 1
+        with open(path, 'w') as f:
+            json.dump(state, f)
+
+        assert manager.get(job_id) is None, "Expired job should not be returned"
+        assert not os.path.exists(path), "Expired job file should be deleted"
+        assert manager.get('../../etc/passwd') is None, "Invalid ids are rejected"
+
+        manager.shutdown(wait=True)
+
+    print("✓ TTL expiry test passed")
+
+
+def test_long_job_outlives_ttl():
+    """Test that a job running longer than the TTL is kept until TTL after it finished"""
+    print("\n[Test 5] Testing job that outlives its TTL...")
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        manager = JobManager(store_dir, max_workers=1, ttl_seconds=0.3)
+        release = threading.Event()
+
+        job_id = manager.submit(lambda report_partial: release.wait(5) and {'score': 1.0})
+        time.sleep(0.5)
+
+        # Older than the TTL but still running: neither get() nor a purge drops it
+        manager.purge_expired()
+        assert manager.get(job_id)['status'] == JobManager.STATUS_RUNNING
+
+        release.set()
+        assert manager.wait(job_id, timeout=5) == {'score': 1.0}
+        state = manager.get(job_id)
+        assert state['status'] == JobManager.STATUS_SUCCEEDED
+        assert state['expires_at'] == state['finished_at'] + 0.3
+
+        time.sleep(0.4)
+        assert manager.get(job_id) is None, "Expires TTL after finishing"
+
+        manager.shutdown(wait=True)
+
+    print("✓ Long job TTL test passed")
+
+
+def test_purge_is_throttled():
+    """Test that submit() scans the store at most once per ttl_seconds / 10"""
+    print("\n[Test 6] Testing purge throttling...")
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        manager = JobManager(store_dir, max_workers=1, max_pending=8, ttl_seconds=60)
+        purges = []
+        original_purge = manager.purge_expired
+
+        def counting_purge():
+            purges.append(time.monotonic())
+            original_purge()
+
+        manager.purge_expired = counting_purge
+        for _ in range(3):
+            manager.submit(lambda report_partial: {})
+        assert len(purges) == 1, f"Purged {len(purges)} times"
+
+        manager._last_purge -= manager.purge_interval
+        manager.submit(lambda report_partial: {})
+        assert len(purges) == 2
+
+        manager.shutdown(wait=True)
+
+    print("✓ Purge throttling test passed")
+
+
+def test_orphaned_jobs_fail():
+    """Test that jobs left queued/running by a dead worker are failed, then expire"""
+    print("\n[Test 7] Testing orphaned jobs...")
+
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        manager = JobManager(store_dir, max_workers=1, ttl_seconds=0.3)
+        release = threading.Event()
+        live_id = manager.submit(lambda report_partial: release.wait(5) and {'score': 1.0})
+
+        def leftover(job_id, status, owner_pid):
+            now = time.time()
+            manager._write_state(job_id, {
+                'job_id': job_id, 'status': status, 'created_at': now, 'updated_at': now,
+                'expires_at': now + 0.3, 'owner_pid': owner_pid, 'metadata': {},
+                'partial': None, 'result': None, 'error': None,
+            })
+
+        leftover('a' * 32, JobManager.STATUS_RUNNING, dead.pid)
+        leftover('b' * 32, JobManager.STATUS_QUEUED, dead.pid)
+        leftover('c' * 32, JobManager.STATUS_RUNNING, os.getpid())   # same pid, no future here
+
+        state = manager.get('a' * 32)
+        assert state['status'] == JobManager.STATUS_FAILED
+        assert state['error']['type'] == 'orphaned' and str(dead.pid) in state['error']['message']
+        assert manager.get('c' * 32)['status'] == JobManager.STATUS_FAILED
+
+        # A purge fails the ones nobody polled; live jobs of this process are untouched
+        manager.purge_expired()
+        with open(os.path.join(store_dir, 'b' * 32 + '.json')) as f:
+            assert json.load(f)['error']['type'] == 'orphaned'
+        assert manager.get(live_id)['status'] == JobManager.STATUS_RUNNING
+
+        time.sleep(0.4)
+        manager.purge_expired()
+        assert sorted(os.listdir(store_dir)) == [f'{live_id}.json'], "Orphans expire after the TTL"
+
+        release.set()
+        manager.wait(live_id, timeout=5)
+        manager.shutdown(wait=True)
+
+    print("✓ Orphaned jobs test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Running Job Manager Unit Tests")
+    print("=" * 70)
+
+    try:
+        test_job_lifecycle_and_partial_results()
+        test_wait_timeout_and_failure()
+        test_bounded_queue()
+        test_ttl_expiry()
+        test_long_job_outlives_ttl()
+        test_purge_is_throttled()
+        test_orphaned_jobs_fail()
+
+        print("\n" + "=" * 70)
+        print("✓ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,174 @@
+"""
+Unit tests for the load-testing harness (aggregation and argument parsing)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import json
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import load_test
+
+
+def test_summarize_percentiles_and_rates():
+    """Test percentiles over successful requests and outcome rates over all requests"""
+    print("\n[Test 1] Testing step summary...")
+
+    # 100 ok requests at 1..100 ms, plus 2 errors, 1 timeout and 1 busy (latency ignored)
+    records = [('ok', ms / 1000) for ms in range(1, 101)]
+    records += [('error', 9.0), ('error', 9.0), ('timeout', 30.0), ('busy', 0.001)]
+
+    step = load_test.summarize(records, wall=10.0)
+
+    assert step['requests'] == 104
+    assert step['throughput_rps'] == 10.0, "Only successful requests count"
+    latency = step['latency_ms']
+    assert (latency['p50'], latency['p90'], latency['p95'], latency['p99']) == (50.5, 90.1, 95.0, 99.0), "0.1 ms resolution"
+    assert latency['max'] == 100.0
+    assert step['error_rate'] == round(2 / 104, 4)
+    assert step['timeout_rate'] == round(1 / 104, 4)
+    assert step['busy_rate'] == round(1 / 104, 4)
+    assert step['rejected_rate'] == 0.0
+
+    # Nothing succeeded / nothing sent
+    failed = load_test.summarize([('error', 1.0), ('timeout', 2.0)], wall=2.0)
+    assert failed['throughput_rps'] == 0.0 and failed['latency_ms']['p95'] is None
+    assert failed['error_rate'] == 0.5 and failed['timeout_rate'] == 0.5
+
+    empty = load_test.summarize([], wall=0.0)
+    assert empty['requests'] == 0 and empty['throughput_rps'] == 0.0
+    assert empty['error_rate'] == 0.0 and empty['latency_ms']['max'] is None
+
+    print("✓ Step summary test passed")
+
+
+def test_resource_summary_and_report():
+    """Test per-worker CPU/RSS aggregation and the side-by-side table"""
+    print("\n[Test 2] Testing resource summary and report...")
+
+    sampler = load_test.ResourceSampler([])
+    sampler.start()
+    sampler.samples = {
+        101: {'cpu': [50.0, 150.0], 'rss': [100 * 1024 * 1024, 300 * 1024 * 1024]},
+        102: {'cpu': [], 'rss': [64 * 1024 * 1024]},
+        103: {'cpu': [], 'rss': []},   # never sampled (restarted worker)
+    }
+    resources = sampler.stop()
+
+    assert resources == {
+        '101': {'cpu_mean_pct': 100.0, 'cpu_max_pct': 150.0, 'rss_max_mb': 300.0},
+        '102': {'cpu_mean_pct': 0.0, 'cpu_max_pct': 0.0, 'rss_max_mb': 64.0},
+    }
+
+    step = load_test.summarize([('ok', 0.2), ('ok', 0.4)], wall=1.0)
+    step.update({'config': '2x1', 'concurrency': 2, 'workers_resources': resources})
+    external = dict(step, config='external', workers_resources=None)
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+        load_test.print_report([step, external])
+    rows = output.getvalue().strip().splitlines()
+    assert rows[0].split()[:3] == ['config', 'conc', 'rps']
+    assert rows[2].split()[:3] == ['2x1', '2', '2.00']
+    assert rows[2].split()[-2:] == ['50', '300'], "Mean CPU across workers, max RSS"
+    assert rows[3].split()[-2:] == ['nan', 'nan'], "No resources for external servers"
+
+    print("✓ Resource summary and report test passed")
+
+
+def test_argument_parsing():
+    """Test defaults, config/concurrency parsing and rejection of bad values"""
+    print("\n[Test 3] Testing argument parsing...")
+
+    args = load_test.parse_args([])
+    assert args.config_list == ['2x1', '1x2', '2x2']
+    assert args.concurrency_levels == [1, 2, 4]
+    assert args.arrival == 'closed' and args.duration == 30.0
+    assert args.face_preflight is False, "Preflight off by default"
+
+    args = load_test.parse_args(['--configs', '4x2', '--concurrency', '8', '--arrival', 'poisson', '--rate', '2.5'])
+    assert args.config_list == ['4x2'] and args.concurrency_levels == [8] and args.rate == 2.5
+    assert load_test.parse_config(' 4X2 ') == {'workers': 4, 'threads': 2}
+
+    # An external server ignores --configs
+    assert load_test.parse_args(['--url', 'http://localhost:5000', '--configs', 'bogus']).config_list == []
+
+    invalid = [
+        ['--configs', '2'], ['--configs', '2x'], ['--configs', '0x1'], ['--configs', '2x1x1'],
+        ['--concurrency', '1,a'], ['--concurrency', '0'], ['--duration', '0'],
+        ['--arrival', 'poisson', '--rate', '0'], ['--arrival', 'burst'],
+    ]
+    for argv in invalid:
+        try:
+            with redirect_stderr(io.StringIO()):
+                load_test.parse_args(argv)
+            raise AssertionError(f"Accepted {argv}")
+        except SystemExit as e:
+            assert e.code == 2, argv
+
+    print("✓ Argument parsing test passed")
+
+
+def test_send_score_outcomes():
+    """Test that /score status codes map to outcomes (422 rejected, 408/504 timeout)"""
+    print("\n[Test 4] Testing /score outcome classification...")
+
+    class ScoreHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            status = int(body['session_id'])
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ScoreHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        outcomes = {
+            status: load_test.send_score(url, '/clip.mp4', str(status), timeout=5)
+            for status in (200, 400, 408, 422, 500, 503, 504)
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert outcomes == {
+        200: 'ok', 400: 'error', 408: 'timeout', 422: 'rejected',
+        500: 'error', 503: 'busy', 504: 'timeout',
+    }
+    assert load_test.send_score(url, '/clip.mp4', 'closed', timeout=1) == 'error', "Connection refused"
+
+    step = load_test.summarize([('ok', 0.1), ('rejected', 0.02), ('rejected', 0.02), ('timeout', 5.0)], wall=1.0)
+    assert step['rejected_rate'] == 0.5 and step['timeout_rate'] == 0.25 and step['error_rate'] == 0.0
+    assert step['latency_ms']['max'] == 100.0, "Rejections do not count as latency samples"
+
+    print("✓ /score outcome classification test passed")
+
+
+def run_all_tests():
+    print("=" * 70)
+    print("Load Test Harness Tests")
+    print("=" * 70)
+
+    test_summarize_percentiles_and_rates()
+    test_resource_summary_and_report()
+    test_argument_parsing()
+    test_send_score_outcomes()
+
+    print("\n" + "=" * 70)
+    print("✓ All load test harness tests passed")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,154 @@
+"""
+Unit tests for in-process metrics and Prometheus rendering
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+
+from utils.metrics import (
+    Counter, Gauge, Histogram, MetricsRegistry, MultiprocessCollector, clear_multiproc_dir, mark_process_dead
+)
+
+
+def worker_registry(errors: int, inflight: int, latencies=()):
+    """Registry with the same metrics a gunicorn worker defines"""
+    registry = MetricsRegistry()
+    registry.register(Counter('detector_errors_total', 'Errors', labelnames=('detector',))).labels(detector='vit').inc(errors)
+    registry.register(Gauge('inflight_requests', 'In flight')).set(inflight)
+    h = registry.register(Histogram('stage_duration_seconds', 'Stages', buckets=(1.0,), labelnames=('stage',)))
+    for value in latencies:
+        h.labels(stage='fusion').observe(value)
+    return registry
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test Prometheus histogram semantics"""
+    print("\n[Test 1] Testing histogram buckets...")
+
+    h = Histogram('stage_seconds', 'Stage time', buckets=(0.1, 1.0), labelnames=('stage',))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        h.labels(stage='decode').observe(value)
+
+    snapshot = h.collect()[('decode',)]
+    assert snapshot['buckets'] == [(0.1, 1), (1.0, 3), (float('inf'), 4)], snapshot['buckets']
+    assert snapshot['count'] == 4
+    assert abs(snapshot['sum'] - 6.05) < 1e-9
+
+    with h.labels(stage='fusion').time():
+        pass
+    assert h.collect()[('fusion',)]['count'] == 1, "time() should observe once"
+
+    print("✓ Histogram buckets test passed")
+
+
+def test_render_text_format():
+    """Test text exposition output"""
+    print("\n[Test 2] Testing text exposition format...")
+
+    registry = MetricsRegistry()
+    h = registry.register(Histogram('detector_inference_seconds', 'Inference', buckets=(1.0,), labelnames=('detector',)))
+    c = registry.register(Counter('detector_errors_total', 'Errors', labelnames=('detector',)))
+    g = registry.register(Gauge('inflight_requests', 'In flight'))
+
+    h.labels(detector='vit').observe(0.25)
+    c.labels(detector='syncnet').inc()
+    c.labels(detector='syncnet').inc()
+    with g.track_inprogress():
+        g.inc()
+    g.labels().set_function(lambda: 3)
+
+    text = registry.render()
+
+    assert '# TYPE detector_inference_seconds histogram' in text
+    assert 'detector_inference_seconds_bucket{detector="vit",le="1"} 1' in text
+    assert 'detector_inference_seconds_bucket{detector="vit",le="+Inf"} 1' in text
+    assert 'detector_inference_seconds_sum{detector="vit"} 0.25' in text
+    assert 'detector_inference_seconds_count{detector="vit"} 1' in text
+    assert '# TYPE detector_errors_total counter' in text
+    assert 'detector_errors_total{detector="syncnet"} 2' in text
+    assert 'inflight_requests 3' in text, "Gauge callback should be read at scrape time"
+
+    assert registry.register(Gauge('inflight_requests', 'dup')) is g, "Names are registered once"
+
+    print("✓ Text exposition test passed")
+
+
+def test_multiprocess_aggregation():
+    """Test /metrics merged over workers: sums, per-pid gauges and exited workers"""
+    print("\n[Test 3] Testing multiprocess aggregation...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        clear_multiproc_dir(directory)
+        other_pid = 999999
+        other = worker_registry(errors=3, inflight=2, latencies=(0.5, 2.0))
+        with open(os.path.join(directory, f'{other_pid}.json'), 'w') as f:
+            json.dump(other.snapshot(), f)
+
+        this = worker_registry(errors=1, inflight=1, latencies=(0.2,))
+        collector = MultiprocessCollector(this, directory, interval=60)
+        collector.start()
+        try:
+            text = collector.render()
+            assert 'detector_errors_total{detector="vit"} 4' in text, "Counters summed"
+            assert 'stage_duration_seconds_bucket{stage="fusion",le="1"} 2' in text
+            assert 'stage_duration_seconds_bucket{stage="fusion",le="+Inf"} 3' in text
+            assert 'stage_duration_seconds_count{stage="fusion"} 3' in text
+            assert f'inflight_requests{{pid="{os.getpid()}"}} 1' in text
+            assert f'inflight_requests{{pid="{other_pid}"}} 2' in text
+            assert text.count('# TYPE detector_errors_total counter') == 1
+            assert os.path.exists(os.path.join(directory, f'{os.getpid()}.json')), "Own snapshot shared"
+
+            # The other worker is recycled: its counters stay, its gauges go
+            mark_process_dead(other_pid, directory)
+            assert not os.path.exists(os.path.join(directory, f'{other_pid}.json'))
+            this.get('detector_errors_total').labels(detector='vit').inc()
+            text = collector.render()
+            assert 'detector_errors_total{detector="vit"} 5' in text, "Totals do not drop on restart"
+            assert 'stage_duration_seconds_count{stage="fusion"} 3' in text
+            assert f'pid="{other_pid}"' not in text
+
+            # A second exit folds into the same dead.json
+            mark_process_dead(os.getpid(), directory)
+            with open(os.path.join(directory, 'dead.json')) as f:
+                dead = json.load(f)
+            assert dead['detector_errors_total']['samples'] == [[['vit'], 5.0]]
+            assert 'inflight_requests' not in dead
+        finally:
+            collector._stop.set()
+
+        clear_multiproc_dir(directory)
+        assert os.listdir(directory) == []
+
+    print("✓ Multiprocess aggregation test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Running Metrics Unit Tests")
+    print("=" * 70)
+
+    try:
+        test_histogram_buckets_are_cumulative()
+        test_render_text_format()
+        test_multiprocess_aggregation()
+
+        print("\n" + "=" * 70)
+        print("✓ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
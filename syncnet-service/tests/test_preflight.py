@@ -0,0 +1,129 @@
+"""
+Unit tests for the face presence preflight in /score
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Same environment as test_readiness (app reads CONFIG once per process)
+os.environ.update({
+    'DETECTORS_RANDOM_WEIGHTS': 'true',
+    'SYNCNET_ENABLED': 'false',
+    'EFFICIENTNET_ENABLED': 'false',
+    'VIT_ENABLED': 'false',
+    'EFFICIENTNETV2_ENABLED': 'true',
+    'INFERENCE_BATCHING': 'false',
+    'WARMUP_BATCH_SIZES': '1,4',
+})
+
+import time
+import tempfile
+
+import numpy as np
+
+import app as service
+from ensemble.preflight import FacePresenceCheck
+from utils.metrics import PREFLIGHT_REJECTIONS
+from utils.synthetic_corpus import SkinColorFaceDetector, generate_clip
+
+
+def make_clips(tmp):
+    face = generate_clip(os.path.join(tmp, 'face.avi'), duration_sec=3.0, container='avi', audio=False)
+    empty = generate_clip(os.path.join(tmp, 'empty.avi'), duration_sec=3.0, container='avi', num_faces=0, audio=False)
+    junk = os.path.join(tmp, 'junk.mp4')
+    with open(junk, 'wb') as f:
+        f.write(os.urandom(4096))
+    return face['path'], empty['path'], junk
+
+
+def test_face_presence_check():
+    """Test pass on the first face, no_face after all samples and unreadable files"""
+    print("\n[Test 1] Testing face presence check...")
+
+    check = FacePresenceCheck(SkinColorFaceDetector(min_area=100), num_samples=5)
+    with tempfile.TemporaryDirectory() as tmp:
+        face, empty, junk = make_clips(tmp)
+
+        result = check.check(face)
+        assert result['passed'] and result['face_found']
+        assert result['frames_checked'] == 1, "Stops at the first face"
+
+        result = check.check(empty)
+        assert not result['passed'] and result['reason'] == 'no_face'
+        assert result['frames_checked'] == 5
+
+        result = check.check(junk)
+        assert not result['passed'] and result['reason'] == 'unreadable'
+
+    assert check._sample_indices(100)[0] in (49, 50), "Middle of the clip first"
+    print("✓ Face presence check test passed")
+
+
+def test_time_budget_lets_requests_through():
+    """Test that running out of time budget passes the video instead of rejecting it"""
+    print("\n[Test 2] Testing time budget...")
+
+    class SlowNoFaces:
+        def detect(self, frame):
+            time.sleep(0.08)
+            return np.zeros((0, 5), dtype=np.float32)
+
+    check = FacePresenceCheck(SlowNoFaces(), num_samples=5, time_budget_ms=100)
+    with tempfile.TemporaryDirectory() as tmp:
+        _, empty, _ = make_clips(tmp)
+        result = check.check(empty)
+
+    assert result['passed'] and result['timed_out']
+    assert result['frames_checked'] == 2
+    print("✓ Time budget test passed")
+
+
+def test_score_rejects_before_loading_ensemble():
+    """Test /score returns 422 for faceless videos without touching the ensemble"""
+    print("\n[Test 3] Testing /score preflight rejection...")
+
+    client = service.app.test_client()
+    calls = []
+    original_ensemble, original_preflight = service.get_ensemble, service.face_preflight
+    service.get_ensemble = lambda: calls.append('ensemble')   # None -> demo result
+    service.face_preflight = FacePresenceCheck(SkinColorFaceDetector(min_area=100))
+    rejections = PREFLIGHT_REJECTIONS.labels(reason='no_face').get()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            face, empty, _ = make_clips(tmp)
+
+            response = client.post('/score', json={'video_path': empty, 'session_id': 'no-face'})
+            body = response.get_json()
+            assert response.status_code == 422, body
+            assert body['reason'] == 'no_face' and body['session_id'] == 'no-face'
+            assert body['preflight']['frames_checked'] == 5
+            assert calls == [], "Ensemble must not be loaded for rejected videos"
+            assert PREFLIGHT_REJECTIONS.labels(reason='no_face').get() == rejections + 1
+
+            response = client.post('/score', json={'video_path': face, 'session_id': 'face'})
+            assert response.status_code == 200
+            assert calls == ['ensemble']
+    finally:
+        service.get_ensemble, service.face_preflight = original_ensemble, original_preflight
+
+    print("✓ /score preflight rejection test passed")
+
+
+def run_all_tests():
+    print("=" * 70)
+    print("Face Preflight Tests")
+    print("=" * 70)
+
+    test_face_presence_check()
+    test_time_budget_lets_requests_through()
+    test_score_rejects_before_loading_ensemble()
+
+    print("\n" + "=" * 70)
+    print("✓ All face preflight tests passed")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,156 @@
+"""
+Unit tests for opt-in per-request profiling
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import threading
+import tempfile
+import subprocess
+from pathlib import Path
+
+from utils.metrics import Histogram
+from utils.profiling import ProfileCapture, choose_profile_mode
+
+
+def test_profile_mode_selection():
+    """Test header parsing and sampling rate"""
+    print("\n[Test 1] Testing profile mode selection...")
+
+    assert choose_profile_mode('1') == 'sampling'
+    assert choose_profile_mode('pstats') == 'pstats'
+    assert choose_profile_mode(None) is None
+    assert choose_profile_mode('', sample_rate=1.0) == 'sampling'
+    assert choose_profile_mode('off', sample_rate=0.0) is None
+
+    print("✓ Profile mode selection test passed")
+
+
+def test_sampling_capture_with_stage_tree():
+    """Test collapsed stacks and nested spans from metrics timers"""
+    print("\n[Test 2] Testing sampling capture...")
+
+    h = Histogram('test_stage_seconds', 'Test stages', labelnames=('stage',))
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        with ProfileCapture('sampling', out_dir, interval_ms=1) as capture:
+            with h.labels(stage='outer').time():
+                with h.labels(stage='subprocess').time():
+                    subprocess.run(['sleep', '0.05'], check=True)
+                time.sleep(0.02)
+
+        summary = capture.summary()
+        outer = summary['stage_tree']['children'][0]
+        assert outer['name'] == 'test_stage_seconds{stage="outer"}', outer['name']
+        assert outer['children'][0]['name'] == 'test_stage_seconds{stage="subprocess"}'
+        assert outer['children'][0]['duration_ms'] >= 40, "Subprocess wait should be timed"
+        assert outer['duration_ms'] >= outer['children'][0]['duration_ms']
+
+        collapsed = Path(summary['files']['collapsed']).read_text()
+        assert summary['num_samples'] > 0, "Sampler should collect stacks"
+        assert 'test_profiling.py:test_sampling_capture_with_stage_tree' in collapsed
+
+        stages = json.loads(Path(summary['files']['stages']).read_text())
+        assert stages['children'][0]['name'] == outer['name']
+
+    # Timers outside a capture record no spans
+    with h.labels(stage='outer').time():
+        pass
+    assert h.collect()[('outer',)]['count'] == 2
+
+    print("✓ Sampling capture test passed")
+
+
+def test_pstats_capture_and_rotation():
+    """Test cProfile artifacts and rotation to max_profiles"""
+    print("\n[Test 3] Testing pstats capture and rotation...")
+
+    import pstats
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        ids = []
+        for i in range(3):
+            with ProfileCapture('pstats', out_dir, max_profiles=2, profile_id=f'p{i}') as capture:
+                sum(range(1000))
+            ids.append(capture.profile_id)
+            time.sleep(0.01)
+
+        stats = pstats.Stats(capture.summary()['files']['pstats'])
+        assert stats.total_calls > 0
+
+        remaining = {path.name.split('.', 1)[0] for path in Path(out_dir).iterdir()}
+        assert remaining == {'p1', 'p2'}, f"Oldest capture should be rotated out, got {remaining}"
+
+    print("✓ pstats capture and rotation test passed")
+
+
+def test_sampling_inference_threads():
+    """Test that busy InferenceServer threads are sampled and labelled per thread"""
+    print("\n[Test 4] Testing inference thread sampling...")
+
+    def forward_pass(stop):
+        while not stop.is_set():
+            sum(range(1000))
+
+    def idle_server(stop):
+        stop.wait()
+
+    stop = threading.Event()
+    busy = threading.Thread(target=forward_pass, args=(stop,), name='inference-test', daemon=True)
+    idle = threading.Thread(target=idle_server, args=(stop,), name='inference-idle', daemon=True)
+    other = threading.Thread(target=forward_pass, args=(stop,), name='unrelated', daemon=True)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        with ProfileCapture('sampling', out_dir, interval_ms=1) as capture:
+            for thread in (busy, idle, other):
+                thread.start()
+            time.sleep(0.1)   # request thread waiting on the forward pass
+            stop.set()
+        for thread in (busy, idle, other):
+            thread.join()
+
+        summary = capture.summary()
+        collapsed = Path(summary['files']['collapsed']).read_text()
+        roots = {line.split(';', 1)[0] for line in collapsed.splitlines()}
+
+    assert roots == {threading.current_thread().name, 'inference-test'}, roots
+    assert 'inference-test;threading.py:_bootstrap' in collapsed
+    assert 'test_profiling.py:forward_pass' in collapsed
+    assert summary['thread_samples']['inference-test'] > 0
+    assert summary['num_samples'] == summary['thread_samples'][threading.current_thread().name]
+    assert 'InferenceServer' in summary['note']
+
+    print("✓ Inference thread sampling test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Running Profiling Unit Tests")
+    print("=" * 70)
+
+    try:
+        test_profile_mode_selection()
+        test_sampling_capture_with_stage_tree()
+        test_pstats_capture_and_rotation()
+        test_sampling_inference_threads()
+
+        print("\n" + "=" * 70)
+        print("✓ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
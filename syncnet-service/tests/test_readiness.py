@@ -0,0 +1,92 @@
+"""
+Unit tests for startup warm-up and /livez, /readyz probes
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Random-weight EfficientNetV2 only (no downloads), no warm-up at import
+os.environ.update({
+    'DETECTORS_RANDOM_WEIGHTS': 'true',
+    'SYNCNET_ENABLED': 'false',
+    'EFFICIENTNET_ENABLED': 'false',
+    'VIT_ENABLED': 'false',
+    'EFFICIENTNETV2_ENABLED': 'true',
+    'INFERENCE_BATCHING': 'false',
+    'WARMUP_BATCH_SIZES': '1,4',
+})
+
+import app as service
+
+
+def test_probes_before_and_after_warmup():
+    """Test /livez is always up and /readyz flips to 200 after warm-up"""
+    print("\n[Test 1] Testing liveness/readiness probes...")
+
+    client = service.app.test_client()
+    service.warmup_state.update(status='pending', warmup_ms=None, model_load_ms={}, detectors_ms={}, error=None)
+
+    assert client.get('/livez').status_code == 200
+    response = client.get('/readyz')
+    assert response.status_code == 503, "Not ready before warm-up"
+    assert response.get_json()['status'] == 'pending'
+
+    service.run_warmup()
+
+    response = client.get('/readyz')
+    body = response.get_json()
+    assert response.status_code == 200, body
+    assert body['status'] == 'ready'
+    assert 'efficientnetv2' in body['detectors_ms'], "Enabled detector should be warmed up"
+    assert body['warmup_ms'] >= 0
+
+    print(f"  - warm-up: {body['warmup_ms']} ms {body['detectors_ms']}")
+    print("✓ Probes test passed")
+
+
+def test_failed_warmup_is_not_ready():
+    """Test that a failing warm-up keeps /readyz at 503 with the error"""
+    print("\n[Test 2] Testing failed warm-up...")
+
+    client = service.app.test_client()
+    original = service.get_ensemble
+    service.get_ensemble = lambda: None
+    try:
+        service.run_warmup()
+    finally:
+        service.get_ensemble = original
+
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'failed'
+    assert client.get('/livez').status_code == 200, "Liveness must not depend on models"
+
+    print("✓ Failed warm-up test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Running Readiness Unit Tests")
+    print("=" * 70)
+
+    try:
+        test_probes_before_and_after_warmup()
+        test_failed_warmup_is_not_ready()
+
+        print("\n" + "=" * 70)
+        print("✓ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,128 @@
+"""
+Unit tests for per-request scratch spaces
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import subprocess
+import tempfile
+from pathlib import Path
+
+from utils.metrics import SCRATCH_EVICTIONS, SCRATCH_RELEASES
+from utils.scratch import ScratchManager, ScratchQuotaExceeded
+
+
+def test_isolation_and_cleanup_on_every_outcome():
+    """Test unique directories per request and removal on success, error and timeout"""
+    print("\n[Test 1] Testing isolation and cleanup...")
+
+    with tempfile.TemporaryDirectory() as root:
+        scratch = ScratchManager(root)
+
+        with scratch.session('same-session') as a, scratch.session('same-session') as b:
+            assert a.path != b.path, "Same label must not share a directory"
+            (a.path / 'pywork').mkdir()
+            (a.path / 'pywork' / 'offsets.txt').write_text('0 5.0 7.0\n')
+            assert scratch.usage_bytes() > 0
+        assert not a.path.exists() and not b.path.exists()
+
+        before = {o: SCRATCH_RELEASES.labels(outcome=o).get() for o in ('error', 'timeout')}
+
+        try:
+            with scratch.session('fails') as space:
+                raise RuntimeError('pipeline crashed')
+        except RuntimeError:
+            pass
+        assert not space.path.exists(), "Space should be removed on error"
+
+        try:
+            with scratch.session('slow') as space:
+                raise subprocess.TimeoutExpired(['run_pipeline.py'], 120)
+        except subprocess.TimeoutExpired:
+            pass
+        assert not space.path.exists(), "Space should be removed on timeout"
+
+        assert SCRATCH_RELEASES.labels(outcome='error').get() == before['error'] + 1
+        assert SCRATCH_RELEASES.labels(outcome='timeout').get() == before['timeout'] + 1
+        assert os.listdir(root) == []
+
+    print("✓ Isolation and cleanup test passed")
+
+
+def test_quota_evicts_retained_spaces_lru():
+    """Test keep_on_error retention, LRU eviction over quota and quota rejection"""
+    print("\n[Test 2] Testing quota and LRU eviction...")
+
+    with tempfile.TemporaryDirectory() as root:
+        scratch = ScratchManager(root, quota_bytes=250_000, keep_on_error=True)
+        evictions = SCRATCH_EVICTIONS.labels(reason='quota').get()
+
+        kept = []
+        for name in ('first', 'second'):
+            space = scratch.allocate(name)
+            (space.path / 'crop.avi').write_bytes(b'\0' * 100_000)
+            space.release('error')
+            kept.append(space)
+        assert all(space.path.exists() for space in kept), "Failed requests should be kept"
+
+        # 200 KB retained + 100 KB new > 250 KB: the oldest retained space goes
+        active = scratch.allocate('third')
+        (active.path / 'upload.webm').write_bytes(b'\0' * 100_000)
+        scratch.enforce_quota()
+        assert not kept[0].path.exists() and kept[1].path.exists()
+        assert SCRATCH_EVICTIONS.labels(reason='quota').get() == evictions + 1
+
+        # Active spaces are never evicted: over quota with nothing left to evict -> rejected
+        (active.path / 'more.bin').write_bytes(b'\0' * 200_000)
+        try:
+            scratch.allocate('fourth')
+            assert False, "Should raise ScratchQuotaExceeded"
+        except ScratchQuotaExceeded:
+            pass
+        assert active.path.exists()
+
+        active.release('success')
+        scratch.close()
+        assert os.listdir(root) == []
+
+    print("✓ Quota and LRU eviction test passed")
+
+
+def test_orphans_from_dead_workers_are_removed():
+    """Test that spaces of dead worker pids are deleted at startup, live ones kept"""
+    print("\n[Test 3] Testing orphan cleanup...")
+
+    with tempfile.TemporaryDirectory() as root:
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+
+        orphan = Path(root) / f'{dead.pid}-abc123-upload'
+        orphan.mkdir()
+        live = Path(root) / f'{os.getppid()}-def456-upload'
+        live.mkdir()
+
+        ScratchManager(root)
+        assert not orphan.exists(), "Dead worker's space should be removed"
+        assert live.exists(), "Live worker's space should be kept"
+
+    print("✓ Orphan cleanup test passed")
+
+
+def run_all_tests():
+    print("=" * 70)
+    print("Scratch Space Tests")
+    print("=" * 70)
+
+    test_isolation_and_cleanup_on_every_outcome()
+    test_quota_evicts_retained_spaces_lru()
+    test_orphans_from_dead_workers_are_removed()
+
+    print("\n" + "=" * 70)
+    print("✓ All scratch space tests passed")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,104 @@
+"""
+Startup budget tests: lazy detector imports and `import app` time
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import subprocess
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds allowed for `import app` in a fresh interpreter (override on slow CI runners)
+STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', '2.0'))
+
+HEAVY_MODULES = ('torch', 'torchvision', 'timm', 'transformers', 'cv2')
+
+
+def run_fresh(script, **env):
+    """Run a snippet in a new interpreter and return its last JSON line"""
+    completed = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=SERVICE_DIR,
+        env=dict(os.environ, WARMUP_ON_START='false', HF_HUB_OFFLINE='1', **env),
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_import_app_within_budget():
+    """Test that importing app loads no detector dependencies and fits the budget"""
+    print("\n[Test 1] Testing import app startup budget...")
+
+    best = None
+    for _ in range(2):  # best of two: the first run may pay cold filesystem caches
+        result = run_fresh(
+            "import sys, json, time\n"
+            "t = time.perf_counter()\n"
+            "import app\n"
+            "print(json.dumps({'seconds': time.perf_counter() - t,\n"
+            f"    'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+        )
+        assert result['heavy'] == [], f"Heavy modules imported at startup: {result['heavy']}"
+        best = result['seconds'] if best is None else min(best, result['seconds'])
+
+    print(f"  - import app: {best * 1000:.0f} ms (budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms)")
+    assert best < STARTUP_BUDGET_SECONDS, \
+        f"import app took {best:.2f}s (budget {STARTUP_BUDGET_SECONDS:.2f}s)"
+
+    print("✓ Startup budget test passed")
+
+
+def test_only_enabled_detectors_are_imported():
+    """Test that building the ensemble skips disabled detectors' dependencies"""
+    print("\n[Test 2] Testing lazy detector imports...")
+
+    result = run_fresh(
+        "import sys, json\n"
+        "import app\n"
+        "assert app.get_ensemble() is not None\n"
+        "print(json.dumps({'loaded': list(app.model_load_ms),\n"
+        "    'transformers': 'transformers' in sys.modules}))",
+        DETECTORS_RANDOM_WEIGHTS='true',
+        SYNCNET_ENABLED='false',
+        EFFICIENTNET_ENABLED='false',
+        VIT_ENABLED='false',
+        EFFICIENTNETV2_ENABLED='true',
+    )
+
+    assert result['loaded'] == ['efficientnetv2'], result['loaded']
+    assert not result['transformers'], "ViT disabled: transformers should not be imported"
+
+    print("✓ Lazy detector import test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Running Startup Budget Tests")
+    print("=" * 70)
+
+    try:
+        test_import_app_within_budget()
+        test_only_enabled_detectors_are_imported()
+
+        print("\n" + "=" * 70)
+        print("✓ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
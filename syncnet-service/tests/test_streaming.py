@@ -0,0 +1,272 @@
+"""
+Unit tests for live incremental scoring (StreamingSession + /stream handler)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Same environment as test_readiness (app reads CONFIG once per process)
+os.environ.update({
+    'DETECTORS_RANDOM_WEIGHTS': 'true',
+    'SYNCNET_ENABLED': 'false',
+    'EFFICIENTNET_ENABLED': 'false',
+    'VIT_ENABLED': 'false',
+    'EFFICIENTNETV2_ENABLED': 'true',
+    'INFERENCE_BATCHING': 'false',
+    'WARMUP_BATCH_SIZES': '1,4',
+})
+
+import io
+import json
+import time
+import base64
+import threading
+
+from PIL import Image
+
+import app as service
+from ensemble.orchestrator import EnsembleOrchestrator
+from ensemble.streaming import StreamingSession
+
+
+def jpeg(color=(128, 100, 90)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class StubDetector:
+    """predict_frames returning fixed per-frame scores, recording batch sizes"""
+
+    def __init__(self, score=0.9):
+        self.score = score
+        self.batches = []
+
+    def predict_frames(self, frames, aggregate_method='mean'):
+        self.batches.append(len(frames))
+        return {'frame_scores': [self.score] * len(frames), 'confidence': 0.8}
+
+
+def make_session(detector, **kwargs):
+    orchestrator = EnsembleOrchestrator(efficientnetv2_detector=detector)
+    options = dict(frame_stride=3, update_every=2, window_frames=3, min_frames=4, stable_updates=2)
+    options.update(kwargs)
+    return StreamingSession(orchestrator, 'stream-test', **options)
+
+
+class FakeWebSocket:
+    """flask-sock style ws: receive() pops scripted messages, send() records"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+
+    def receive(self, timeout=None):
+        return self.messages.pop(0) if self.messages else None
+
+    def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+def run_handler(messages, detector=None):
+    orchestrator = EnsembleOrchestrator(efficientnetv2_detector=detector or StubDetector())
+    original = service.get_ensemble
+    service.get_ensemble = lambda: orchestrator
+    try:
+        ws = FakeWebSocket(messages)
+        service.stream_session(ws)
+    finally:
+        service.get_ensemble = original
+    return ws.sent
+
+
+def test_stride_and_interim_updates():
+    """Test that one of every frame_stride frames is kept and scored in chunks"""
+    print("\n[Test 1] Testing frame stride and interim updates...")
+
+    detector = StubDetector()
+    session = make_session(detector)
+
+    updates = [session.add_frame(jpeg()) for _ in range(6)]
+    # Kept: frames 1 and 4 -> detectors run once, on the 4th frame
+    assert updates[:3] == [None, None, None] and updates[4:] == [None, None]
+    update = updates[3]
+    assert update['type'] == 'interim'
+    assert update['frames_received'] == 4 and update['frames_scored'] == 2
+    assert update['decision'] == 'ALLOW' and update['combined_score'] == 0.9
+    assert update['stable'] is False
+    assert detector.batches == [2], "Only the new frames are scored"
+
+    # Rolling window: the detail reports at most window_frames scores
+    for _ in range(6):
+        session.add_frame(jpeg())
+    assert detector.batches == [2, 2]
+    assert session._last_update['detectors']['efficientnetv2']['num_frames'] == 3
+
+    print("✓ Frame stride and interim updates test passed")
+
+
+def test_stable_decision_early_exit():
+    """Test that identical decisions over stable_updates updates make the session stable"""
+    print("\n[Test 2] Testing stability early exit...")
+
+    session = make_session(StubDetector(), frame_stride=1)
+    session.add_frame(jpeg())
+    session.add_frame(jpeg())
+    assert not session.is_stable(), "Below min_frames"
+
+    session.add_frame(jpeg())
+    update = session.add_frame(jpeg())
+    assert update['stable'] is True and session.is_stable()
+
+    result = session.finalize(early_exit=True)
+    assert result['type'] == 'final' and result['early_exit'] is True
+    assert result['frames_scored'] == 4
+
+    # A decision that flips is never stable
+    flipping = StubDetector()
+    session = make_session(flipping, frame_stride=1, window_frames=2)
+    for score in (0.9, 0.1, 0.9):
+        flipping.score = score
+        session.add_frame(jpeg())
+        session.add_frame(jpeg())
+    assert not session.is_stable()
+
+    print("✓ Stability early exit test passed")
+
+
+def test_finalize_short_and_empty_streams():
+    """Test finalize() scoring leftover frames and rejecting empty streams"""
+    print("\n[Test 3] Testing finalize on short and empty streams...")
+
+    detector = StubDetector(score=0.2)
+    session = make_session(detector, update_every=5)
+    assert session.add_frame(jpeg()) is None
+    session.add_audio(b'\0\0' * 8000)
+
+    result = session.finalize()
+    assert detector.batches == [1], "Pending frames are scored on finalize"
+    assert result['type'] == 'final' and result['early_exit'] is False
+    assert result['decision'] == 'BLOCK' and result['frames_scored'] == 1
+    assert result['audio_seconds'] == 0.5 and result['session_id'] == 'stream-test'
+
+    try:
+        make_session(StubDetector()).finalize()
+        raise AssertionError("Empty stream must not produce a result")
+    except RuntimeError as e:
+        assert 'No frames received' in str(e)
+
+    print("✓ Finalize test passed")
+
+
+def test_handler_session_flow():
+    """Test ready -> interim -> final over the WebSocket handler"""
+    print("\n[Test 4] Testing /stream handler flow...")
+
+    frame = base64.b64encode(jpeg()).decode()
+    messages = [json.dumps({'type': 'start', 'session_id': 'ws-1', 'sample_rate': 16000})]
+    messages += [bytes([service.STREAM_FRAME]) + jpeg() for _ in range(3)]
+    messages += [json.dumps({'type': 'frame', 'data': frame})]
+    messages += [bytes([service.STREAM_AUDIO]) + b'\0\0' * 1600, json.dumps({'type': 'end'})]
+
+    original = dict(service.CONFIG)
+    service.CONFIG.update(stream_frame_stride=1, stream_update_every=2, stream_min_frames=10)
+    try:
+        sent = run_handler(messages)
+    finally:
+        service.CONFIG.clear()
+        service.CONFIG.update(original)
+
+    assert [m['type'] for m in sent] == ['ready', 'interim', 'interim', 'final']
+    assert sent[-1]['session_id'] == 'ws-1' and sent[-1]['early_exit'] is False
+    assert sent[-1]['frames_scored'] == 4 and sent[-1]['audio_seconds'] == 0.1
+
+    print("✓ /stream handler flow test passed")
+
+
+def test_handler_rejects_malformed_messages():
+    """Test error messages for undecodable frames and malformed JSON"""
+    print("\n[Test 5] Testing malformed messages...")
+
+    malformed = {
+        'garbage jpeg': bytes([service.STREAM_FRAME]) + b'not a jpeg',
+        'empty binary': b'',
+        'bad json': '{"type": ',
+        'bad base64': json.dumps({'type': 'frame', 'data': '###'}),
+        'missing data': json.dumps({'type': 'frame'}),
+    }
+    for name, message in malformed.items():
+        sent = run_handler([message])
+        assert sent[0]['type'] == 'ready', name
+        assert sent[-1]['type'] == 'error' and sent[-1]['error'], name
+    assert 'Invalid frame' in run_handler([malformed['garbage jpeg']])[-1]['error']
+
+    sent = run_handler([json.dumps({'type': 'start', 'session_id': 'empty'}), json.dumps({'type': 'end'})])
+    assert sent[-1] == {'type': 'error', 'error': 'No frames received'}
+
+    sent = run_handler([])
+    assert sent[-1] == {'type': 'error', 'error': 'Idle timeout'}
+
+    print("✓ Malformed messages test passed")
+
+
+def test_audio_is_counted_and_scoring_is_serialized():
+    """Test that audio is not buffered and stream scoring takes the orchestrator's stage lock"""
+    print("\n[Test 6] Testing audio accounting and serialized scoring...")
+
+    detector = StubDetector()
+    session = make_session(detector, frame_stride=1)
+    for _ in range(1000):
+        session.add_audio(b'\0\0' * 1600)
+    assert round(session.audio_seconds, 3) == 100.0
+    try:
+        session.add_audio(b'\0\0\0')
+        raise AssertionError("Odd-sized PCM16 chunk must be rejected")
+    except ValueError as e:
+        assert 'PCM16' in str(e)
+
+    # A /score job holds the stage lock: the stream update waits for its turn
+    session.add_frame(jpeg())
+    lock = session.orchestrator._stage_lock
+    lock.acquire()
+    updates = []
+    worker = threading.Thread(target=lambda: updates.append(session.add_frame(jpeg())))
+    worker.start()
+    time.sleep(0.2)
+    assert detector.batches == [] and worker.is_alive()
+    lock.release()
+    worker.join(5)
+    assert detector.batches == [2] and updates[0]['frames_scored'] == 2
+
+    # Detectors served by an InferenceServer are thread-safe and do not wait
+    detector.inference_server = object()
+    lock.acquire()
+    try:
+        session.add_frame(jpeg())
+        assert session.add_frame(jpeg())['frames_scored'] == 4
+    finally:
+        lock.release()
+
+    print("✓ Audio accounting and serialized scoring test passed")
+
+
+def run_all_tests():
+    print("=" * 70)
+    print("Streaming Tests")
+    print("=" * 70)
+
+    test_stride_and_interim_updates()
+    test_stable_decision_early_exit()
+    test_finalize_short_and_empty_streams()
+    test_handler_session_flow()
+    test_handler_rejects_malformed_messages()
+    test_audio_is_counted_and_scoring_is_serialized()
+
+    print("\n" + "=" * 70)
+    print("✓ All streaming tests passed")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
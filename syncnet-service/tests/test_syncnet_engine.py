@@ -0,0 +1,417 @@
+"""
+Unit tests for the in-process SyncNet engine
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import importlib.util
+
+import scipy.fft
+
+import cv2
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from syncnet_engine.audio import AudioFeatureCache, load_audio, mel_filterbank, mfcc_features
+from syncnet_engine.crops import CROP_SIZE, crop_track, write_crops_avi
+from syncnet_engine.face_detectors import build_face_detector, ssd_to_boxes, yunet_to_boxes
+from syncnet_engine.engine import SyncNetEngine
+from syncnet_engine.model import SyncNetModel, load_syncnet_model
+from syncnet_engine.offsets import calc_pdist, evaluate_track, evaluate_tracks, search_offset
+from syncnet_engine.tracking import bbox_iou, detect_strided, track_dominant_face, track_shot
+from syncnet_engine.video import frames_at, read_video, read_video_native
+from utils.metrics import CACHE_HITS
+from utils.synthetic_corpus import SkinColorFaceDetector, face_trajectories, generate_clip, synthesize_speech
+
+
+def read_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def test_model_shapes_and_weight_loading():
+    """Test embedding shapes and loading a syncnet_v2-style state dict"""
+    print("\n[Test 1] Testing SyncNet model shapes and weight loading...")
+
+    torch.manual_seed(0)
+    model = SyncNetModel().eval()
+    with torch.no_grad():
+        lip = model.forward_lip(torch.rand(2, 3, 5, 224, 224) * 255)
+        aud = model.forward_aud(torch.randn(2, 1, 13, 20))
+    assert lip.shape == (2, 1024) and aud.shape == (2, 1024)
+
+    # Same layer names as syncnet_python's SyncNetModel.S
+    keys = model.state_dict().keys()
+    assert 'netcnnaud.0.weight' in keys and 'netcnnlip.0.weight' in keys and 'netfclip.3.bias' in keys
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'syncnet_v2.model')
+        torch.save(model.state_dict(), path)
+        loaded = load_syncnet_model(path)
+
+    for name, tensor in model.state_dict().items():
+        assert torch.equal(tensor, loaded.state_dict()[name]), f"{name} not loaded"
+
+    print("✓ Model shapes and weight loading test passed")
+
+
+def test_track_shot_links_and_interpolates():
+    """Test that per-frame detections with gaps become one interpolated track per face"""
+    print("\n[Test 2] Testing face tracking...")
+
+    clip_boxes = face_trajectories(80, 640, 480, num_faces=2, seed=3)
+    scene_faces = []
+    for frame, boxes in enumerate(clip_boxes):
+        if frame % 7 == 3:
+            scene_faces.append(np.zeros((0, 5), dtype=np.float32))   # missed detection
+        else:
+            scene_faces.append(np.hstack([boxes, np.ones((len(boxes), 1))]).astype(np.float32))
+
+    tracks = track_shot(scene_faces, min_track=50, min_face_size=50)
+
+    assert len(tracks) == 2, f"Expected 2 tracks, got {len(tracks)}"
+    for track in tracks:
+        assert len(track['frame']) == 80 and track['frame'][0] == 0
+        face = int(np.argmin(np.abs(clip_boxes[0, :, 0] - track['bbox'][0, 0])))
+        error = np.abs(track['bbox'] - clip_boxes[:, face]).max()
+        assert error < 10, f"Interpolated boxes drift {error:.1f}px from ground truth"
+
+    short = track_shot(scene_faces[:40], min_track=50, min_face_size=50)
+    assert short == [], "Tracks shorter than min_track should be dropped"
+
+    print("✓ Face tracking test passed")
+
+
+def test_strided_detection_matches_per_frame():
+    """Test that strided detection yields the per-frame baseline's tracks with fewer detector calls"""
+    print("\n[Test 3] Testing strided detection track agreement...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        faces = read_frames(generate_clip(f'{tmp}/faces.avi', duration_sec=4, num_faces=2, seed=5)['path'])
+        empty = read_frames(generate_clip(f'{tmp}/empty.avi', duration_sec=4, num_faces=0, seed=5)['path'])
+
+    # Faces appear at frame 23 (between keyframes 20 and 25): forces a re-detection
+    frames = empty[:23] + faces[23:]
+
+    baseline_faces, baseline_calls = detect_strided(frames, SkinColorFaceDetector(), stride=1)
+    strided_faces, strided_calls = detect_strided(frames, SkinColorFaceDetector(), stride=5)
+    assert baseline_calls == len(frames) == 100
+    assert strided_calls <= baseline_calls * 0.35, f"{strided_calls} calls vs {baseline_calls}"
+
+    baseline = track_shot(baseline_faces, min_track=50, min_face_size=50)
+    strided = track_shot(strided_faces, min_track=50, min_face_size=50)
+    assert len(baseline) == len(strided) == 2, f"{len(baseline)} vs {len(strided)} tracks"
+
+    for expected in baseline:
+        track = min(strided, key=lambda t: abs(t['bbox'][0, 0] - expected['bbox'][0, 0]))
+        assert np.array_equal(track['frame'], expected['frame']), "Track extents should match"
+        assert track['frame'][0] == 23
+        ious = [bbox_iou(a, b) for a, b in zip(track['bbox'], expected['bbox'])]
+        assert min(ious) > 0.9, f"Interpolated boxes diverge (min IoU {min(ious):.3f})"
+
+    print(f"  detector calls: {strided_calls} strided vs {baseline_calls} per-frame")
+    print("✓ Strided detection track agreement test passed")
+
+
+def reference_mfcc(audio, sample_rate=16000):
+    """Frame-by-frame MFCC (python_speech_features.mfcc defaults), no vectorization"""
+    audio = audio.astype(np.float64)
+    emphasized = np.append(audio[0], audio[1:] - 0.97 * audio[:-1])
+    num_frames = 1 + int(np.ceil((len(emphasized) - 400) / 160))
+    padded = np.concatenate([emphasized, np.zeros((num_frames - 1) * 160 + 400 - len(emphasized))])
+    bank = mel_filterbank(26, 512, sample_rate)
+
+    rows = []
+    for k in range(num_frames):
+        power = np.abs(np.fft.rfft(padded[k * 160:k * 160 + 400], 512)) ** 2 / 512
+        ceps = scipy.fft.dct(np.log(bank @ power), type=2, norm='ortho')[:13]
+        ceps *= 1 + 11 * np.sin(np.pi * np.arange(13) / 22)
+        ceps[0] = np.log(power.sum())
+        rows.append(ceps)
+    return np.array(rows).T
+
+
+def test_mfcc_and_shared_audio_features():
+    """Test vectorized MFCCs, per-track windows and the per-file feature cache"""
+    print("\n[Test 4] Testing MFCC features...")
+
+    speech = synthesize_speech(2.0, 16000, offset_ms=0, seed=2)
+    audio = np.clip(speech * 32767, -32768, 32767).astype(np.int16)
+
+    mfcc = mfcc_features(audio)
+    assert mfcc.shape == (13, 199), f"Expected 25 ms windows every 10 ms, got {mfcc.shape}"
+    assert np.allclose(mfcc, reference_mfcc(audio), rtol=1e-4, atol=1e-3)
+
+    if importlib.util.find_spec('python_speech_features') is not None:
+        from python_speech_features import mfcc as psf_mfcc
+        assert np.allclose(mfcc, psf_mfcc(audio, 16000).T, rtol=1e-4, atol=1e-3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = generate_clip(f'{tmp}/talk.avi', duration_sec=3, seed=4)
+        cache = AudioFeatureCache()
+        features = cache.get(clip['path'], clip['audio_path'])
+
+        # A track's window equals MFCCs computed on its own audio segment (4 windows/frame)
+        segment = load_audio(clip['path'], clip['audio_path'])[20 * 640:60 * 640]
+        window = features.window(20, 59)
+        assert window.shape == (13, 160)
+        own = mfcc_features(segment)   # ends one window early (no audio past the segment)
+        assert np.allclose(window[:, 1:own.shape[1] - 2], own[:, 1:-2], atol=1e-3)
+
+        hits = CACHE_HITS.labels(cache='mfcc').get()
+        assert cache.get(clip['path'], clip['audio_path']) is features
+        assert CACHE_HITS.labels(cache='mfcc').get() == hits + 1
+
+    print("✓ MFCC features test passed")
+
+
+def reference_offsets(feat1, feat2, vshift=15):
+    """SyncNetInstance.calc_pdist + evaluate (the values written to offsets.txt), loop version"""
+    win_size = vshift * 2 + 1
+    feat2p = F.pad(feat2, (0, 0, vshift, vshift))
+    dists = [
+        F.pairwise_distance(feat1[[i], :].repeat(win_size, 1), feat2p[i:i + win_size, :])
+        for i in range(len(feat1))
+    ]
+    mean_dists = torch.mean(torch.stack(dists, 1), 1)
+    min_dist, min_index = torch.min(mean_dists, 0)
+    return torch.stack(dists), int(vshift - min_index), float(torch.median(mean_dists) - min_dist), float(min_dist)
+
+
+def test_vectorized_offset_search():
+    """Test batched offset distances against the loop implementation and the adaptive window"""
+    print("\n[Test 5] Testing vectorized offset search...")
+
+    torch.manual_seed(0)
+    for num_windows, vshift in ((70, 15), (12, 15), (40, 3)):
+        im_feat = torch.randn(num_windows, 1024)
+        cc_feat = torch.randn(num_windows, 1024)
+        cc_feat[:5] = im_feat[:5]   # near-zero distances: no cancellation error
+        expected, offset, confidence, min_dist = reference_offsets(im_feat, cc_feat, vshift)
+
+        assert torch.allclose(calc_pdist(im_feat, cc_feat, vshift), expected, atol=1e-4)
+        result = search_offset(im_feat, cc_feat, vshift=vshift)
+        assert result['offset_frames'] == offset
+        assert abs(result['confidence'] - confidence) < 1e-4
+        assert abs(result['min_dist'] - min_dist) < 1e-4
+
+    # Audio 20 frames late: a +/-15 window bottoms out on its edge, adaptive widening finds it
+    im_feat = torch.randn(100, 1024)
+    cc_feat = torch.roll(im_feat, shifts=20, dims=0) + 0.1 * torch.randn(100, 1024)
+
+    fixed = search_offset(im_feat, cc_feat, vshift=15)
+    assert fixed['offset_frames'] == -15 and fixed['search_vshift'] == 15
+    adaptive = search_offset(im_feat, cc_feat, vshift=15, max_vshift=30)
+    assert adaptive['offset_frames'] == -20 and adaptive['search_vshift'] == 30
+    assert adaptive['offset_frames'] == reference_offsets(im_feat, cc_feat, 30)[1]
+
+    # Best offset inside the window: no widening, identical to the fixed search
+    centred = search_offset(im_feat, torch.roll(im_feat, shifts=4, dims=0), vshift=15, max_vshift=30)
+    assert centred['offset_frames'] == -4 and centred['search_vshift'] == 15
+
+    print("✓ Vectorized offset search test passed")
+
+
+def test_in_memory_uint8_crops():
+    """Test uint8 crops scoring like float crops, and the optional debug .avi"""
+    print("\n[Test 6] Testing in-memory crops...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = generate_clip(f'{tmp}/talk.avi', duration_sec=2, seed=6)
+        frames = read_frames(clip['path'])
+        boxes = clip['face_boxes'][:, 0]
+        track = {'frame': np.arange(len(frames)), 'bbox': boxes.astype(np.float64)}
+
+        crops = crop_track(frames, track)
+        assert crops.dtype == np.uint8 and crops.shape == (len(frames), CROP_SIZE, CROP_SIZE, 3)
+
+        torch.manual_seed(0)
+        model = SyncNetModel().eval()
+        mfcc = np.random.RandomState(0).randn(13, 4 * len(frames)).astype(np.float32)
+        from_uint8 = evaluate_track(model, crops, mfcc, vshift=5, batch_size=8)
+        from_float = evaluate_track(model, crops.astype(np.float32), mfcc, vshift=5, batch_size=50)
+        assert from_uint8['offset_frames'] == from_float['offset_frames']
+        assert abs(from_uint8['min_dist'] - from_float['min_dist']) < 1e-3
+
+        path = write_crops_avi(crops, f'{tmp}/debug/track.avi')
+        written = read_frames(path)
+        assert len(written) == len(crops) and written[0].shape == (CROP_SIZE, CROP_SIZE, 3)
+
+    print("✓ In-memory crops test passed")
+
+
+class CountingModel:
+    """Counts SyncNet lip-stream forward passes"""
+
+    def __init__(self, model):
+        self.model = model
+        self.lip_calls = 0
+
+    def forward_lip(self, x):
+        self.lip_calls += 1
+        return self.model.forward_lip(x)
+
+    def forward_aud(self, x):
+        return self.model.forward_aud(x)
+
+
+def test_multi_track_batching_and_early_stop():
+    """Test shared batches across tracks match per-track scoring, plus early stop"""
+    print("\n[Test 7] Testing multi-track scoring...")
+
+    torch.manual_seed(0)
+    rng = np.random.RandomState(1)
+    model = CountingModel(SyncNetModel().eval())
+    tracks = [
+        (rng.randint(0, 255, (n, CROP_SIZE, CROP_SIZE, 3), dtype=np.uint8), rng.randn(13, 4 * n).astype(np.float32))
+        for n in (17, 30, 3)
+    ]
+
+    results = evaluate_tracks(model, tracks, vshift=4, batch_size=8)
+    # 12 + 25 windows in ceil(37 / 8) = 5 shared passes instead of 2 + 4
+    assert model.lip_calls == 5, f"{model.lip_calls} forward passes"
+    assert [r['status'] for r in results] == ['scored', 'scored', 'too_short']
+
+    for (crops, mfcc), result in zip(tracks[:2], results):
+        single = evaluate_track(model, crops, mfcc, vshift=4, batch_size=8)
+        assert single['offset_frames'] == result['offset_frames']
+        assert abs(single['confidence'] - result['confidence']) < 1e-4
+        assert abs(single['min_dist'] - result['min_dist']) < 1e-4
+
+    # Longest track is scored first; once it clears the threshold the others are skipped
+    model.lip_calls = 0
+    stopped = evaluate_tracks(model, tracks, vshift=4, batch_size=8, early_stop_confidence=-1.0)
+    assert [r['status'] for r in stopped] == ['skipped', 'scored', 'too_short']
+    assert stopped[1]['confidence'] == results[1]['confidence']
+    assert model.lip_calls == 4, "Early stop should skip the second track's passes"
+
+    print("✓ Multi-track scoring test passed")
+
+
+def test_engine_end_to_end():
+    """Test the full in-process pipeline with random SyncNet weights"""
+    print("\n[Test 8] Testing engine end to end...")
+
+    torch.manual_seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = generate_clip(f'{tmp}/talk.avi', duration_sec=3, fps=25, seed=1)
+        engine = SyncNetEngine(
+            model_path=None,
+            face_detector=SkinColorFaceDetector()
+        )
+        output = engine.process_video(clip['path'], audio_path=clip['audio_path'])
+
+    assert output['num_frames'] == 75
+    assert len(output['tracks']) == 1, f"Expected 1 track, got {output['tracks']}"
+    track = output['tracks'][0]
+    assert track['status'] == 'scored'
+    assert -15 <= track['offset_frames'] <= 15
+    assert track['confidence'] >= 0 and track['min_dist'] > 0
+    assert {'decode', 'detect', 'track', 'crop', 'audio', 'sync'} <= set(output['timings_ms'])
+    assert output['detector_calls'] < 75 / 3, "Strided detection should skip most frames"
+
+    print("✓ Engine end-to-end test passed")
+
+
+def test_short_clip_fast_mode():
+    """Test timestamp alignment, dominant-face tracking and fast vs full parity"""
+    print("\n[Test 9] Testing short-clip fast mode...")
+
+    # Frame on screen at k / 25 s, for constant and variable frame rates
+    assert list(frames_at(np.arange(6) / 30.0, 25.0, 30.0)) == [0, 1, 2, 3, 4]
+    vfr = np.array([0.0, 0.04, 0.12, 0.13, 0.2])
+    assert list(frames_at(vfr, 25.0, 25.0)) == [0, 1, 1, 2, 3, 4]
+
+    torch.manual_seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = generate_clip(f'{tmp}/webcam.avi', duration_sec=3, fps=30, seed=7)
+        two_seconds = generate_clip(f'{tmp}/short.avi', duration_sec=2, fps=25, seed=8)
+
+        native, timestamps, source_fps = read_video_native(clip['path'])
+        resampled, _ = read_video(clip['path'])
+        assert len(native) == 90 and source_fps == 30
+        indices = frames_at(timestamps, 25.0, source_fps)
+        assert all(np.array_equal(resampled[k], native[i]) for k, i in enumerate(indices))
+
+        frames = [native[i] for i in indices]
+        track, calls = track_dominant_face(frames, SkinColorFaceDetector(), stride=5, min_face_size=50)
+        assert calls == 16 and len(track['frame']) == 75
+        detector = SkinColorFaceDetector()
+        ious = [bbox_iou(box, detector.detect(frame)[0]) for box, frame in zip(track['bbox'], frames)]
+        assert min(ious) > 0.85, f"Keyframe interpolation drifts (min IoU {min(ious):.3f})"
+
+        engine = SyncNetEngine(model_path=None, face_detector=SkinColorFaceDetector(), min_face_size=50)
+        full = engine.process_video(clip['path'], audio_path=clip['audio_path'])
+        fast = engine.process_video(clip['path'], audio_path=clip['audio_path'], fast=True)
+        assert fast['mode'] == 'fast' and full['mode'] == 'full'
+        assert fast['num_frames'] == full['num_frames'] == 75
+        assert 'scenes' not in fast['timings_ms'] and fast['detector_calls'] <= full['detector_calls']
+        assert len(fast['tracks']) == 1
+        assert fast['tracks'][0]['offset_frames'] == full['tracks'][0]['offset_frames']
+        assert abs(fast['tracks'][0]['confidence'] - full['tracks'][0]['confidence']) < 0.05
+
+        # 50-frame clips don't pass --min_track in the full pipeline; fast mode scores them
+        assert engine.process_video(two_seconds['path'], audio_path=two_seconds['audio_path'])['tracks'] == []
+        short = engine.process_video(two_seconds['path'], audio_path=two_seconds['audio_path'], fast=True)
+        assert short['tracks'][0]['status'] == 'scored'
+
+    print("✓ Short-clip fast mode test passed")
+
+
+def test_face_detector_backends():
+    """Test backend selection and box conversion of the lightweight OpenCV detectors"""
+    print("\n[Test 10] Testing face detector backends...")
+
+    # YuNet rows: x, y, w, h, 5 landmarks (x, y), score; detected on a half-size frame
+    faces = np.array([[10, 20, 30, 40] + [0] * 10 + [0.9]], dtype=np.float32)
+    assert np.allclose(yunet_to_boxes(faces, scale=0.5), [[20, 40, 80, 120, 0.9]])
+    assert yunet_to_boxes(None).shape == (0, 5)
+
+    # SSD rows: image, class, score, normalized x1, y1, x2, y2 (out of range is clipped)
+    output = np.array([[[[0, 1, 0.95, 0.25, 0.5, 0.75, 1.2], [0, 1, 0.3, 0.1, 0.1, 0.2, 0.2]]]])
+    assert np.allclose(ssd_to_boxes(output, 640, 480, conf_th=0.6), [[160, 240, 480, 480, 0.95]])
+
+    for backend, error in (('yunet', FileNotFoundError), ('opencv_dnn', FileNotFoundError), ('mtcnn', ValueError)):
+        try:
+            build_face_detector(backend, '/nonexistent/model.onnx')
+            assert False, f"{backend} should raise {error.__name__}"
+        except error:
+            pass
+
+    print("✓ Face detector backends test passed")
+
+
+def run_all_tests():
+    print("=" * 70)
+    print("SyncNet Engine Tests")
+    print("=" * 70)
+
+    test_model_shapes_and_weight_loading()
+    test_track_shot_links_and_interpolates()
+    test_strided_detection_matches_per_frame()
+    test_mfcc_and_shared_audio_features()
+    test_vectorized_offset_search()
+    test_in_memory_uint8_crops()
+    test_multi_track_batching_and_early_stop()
+    test_engine_end_to_end()
+    test_short_clip_fast_mode()
+    test_face_detector_backends()
+
+    print("\n" + "=" * 70)
+    print("✓ All SyncNet engine tests passed")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,153 @@
+"""
+Unit tests for the synthetic video corpus generator
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import wave
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ensemble.frame_extractor import FrameExtractor
+from utils.synthetic_corpus import build_corpus, generate_clip, speech_envelope, synthesize_speech
+
+
+def read_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def test_clip_geometry_and_determinism():
+    """Test resolution, frame count, face boxes and same-seed determinism"""
+    print("\n[Test 1] Testing clip geometry and determinism...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        a = generate_clip(f'{tmp}/a.avi', width=320, height=240, fps=20, duration_sec=1.5, seed=7)
+        b = generate_clip(f'{tmp}/b.avi', width=320, height=240, fps=20, duration_sec=1.5, seed=7)
+
+        frames_a = read_frames(a['path'])
+        frames_b = read_frames(b['path'])
+
+        assert len(frames_a) == a['num_frames'] == 30, f"Expected 30 frames, got {len(frames_a)}"
+        assert frames_a[0].shape == (240, 320, 3)
+        assert a['face_boxes'].shape == (30, 1, 4)
+        assert np.array_equal(a['face_boxes'], b['face_boxes'])
+        assert all(np.array_equal(fa, fb) for fa, fb in zip(frames_a, frames_b)), \
+            "Same seed should produce identical frames"
+
+        x1, y1, x2, y2 = a['face_boxes'][0, 0]
+        assert 0 <= x1 < x2 <= 320 and 0 <= y1 < y2 <= 240, "Face box should stay in frame"
+
+    print("✓ Clip geometry and determinism test passed")
+
+
+def test_audio_offset_and_mouth_sync():
+    """Test that the audio envelope follows the mouth shifted by audio_offset_ms"""
+    print("\n[Test 2] Testing audio offset...")
+
+    sample_rate = 16000
+    offset_ms = 200.0
+    audio = synthesize_speech(3.0, sample_rate, offset_ms=offset_ms, seed=3)
+
+    # Frame-rate loudness of the audio vs the mouth envelope
+    hop = sample_rate // 100
+    loudness = np.sqrt(np.mean(audio[:len(audio) // hop * hop].reshape(-1, hop) ** 2, axis=1))
+    mouth = speech_envelope(np.arange(len(loudness)) / 100.0, seed=3)
+
+    lags = range(-40, 41)
+    corr = [np.corrcoef(loudness[40:-40], np.roll(mouth, lag)[40:-40])[0, 1] for lag in lags]
+    best_lag_ms = list(lags)[int(np.argmax(corr))] * 10
+
+    assert abs(best_lag_ms - offset_ms) <= 20, f"Expected ~{offset_ms} ms lag, got {best_lag_ms}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = generate_clip(f'{tmp}/s.mp4', duration_sec=1.0, audio_offset_ms=offset_ms)
+        with wave.open(clip['audio_path']) as f:
+            assert f.getframerate() == sample_rate and f.getnframes() == sample_rate
+
+    print(f"  - best lag: {best_lag_ms} ms")
+    print("✓ Audio offset test passed")
+
+
+def test_broken_webm_uses_sequential_mode():
+    """Test that broken_frame_count WebM forces FrameExtractor's sequential path"""
+    print("\n[Test 3] Testing WebM with broken frame count...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = generate_clip(
+            f'{tmp}/broken.webm', width=320, height=240, duration_sec=2.0,
+            audio=False, broken_frame_count=True
+        )
+
+        cap = cv2.VideoCapture(clip['path'])
+        reported = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        cap.release()
+        assert reported <= 0 or reported > 1000000, f"Frame count should be invalid, got {reported}"
+
+        frames = FrameExtractor(max_frames=10).extract_frames(clip['path'])
+        assert len(frames) == 10
+
+    print("✓ Broken WebM test passed")
+
+
+def test_build_corpus_manifest():
+    """Test corpus build with a manifest of JSON-serializable metadata"""
+    print("\n[Test 4] Testing corpus manifest...")
+
+    specs = [
+        {'name': 'two_faces', 'num_faces': 2, 'duration_sec': 0.5},
+        {'name': 'silent_webm', 'container': 'webm', 'audio': False, 'duration_sec': 0.5},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = build_corpus(tmp, specs)
+        manifest = json.loads((Path(tmp) / 'manifest.json').read_text())
+
+        assert [c['name'] for c in manifest] == ['two_faces', 'silent_webm']
+        assert np.array(manifest[0]['face_boxes']).shape == (clips[0]['num_frames'], 2, 4)
+        assert manifest[1]['audio_path'] is None
+        assert all(Path(c['path']).exists() for c in clips)
+
+    print("✓ Corpus manifest test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Running Synthetic Corpus Unit Tests")
+    print("=" * 70)
+
+    try:
+        test_clip_geometry_and_determinism()
+        test_audio_offset_and_mouth_sync()
+        test_broken_webm_uses_sequential_mode()
+        test_build_corpus_manifest()
+
+        print("\n" + "=" * 70)
+        print("✓ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
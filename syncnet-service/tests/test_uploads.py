@@ -0,0 +1,230 @@
+"""
+Unit tests for streaming upload spooling (/score/upload)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Same environment as test_readiness (app reads CONFIG once per process)
+os.environ.update({
+    'DETECTORS_RANDOM_WEIGHTS': 'true',
+    'SYNCNET_ENABLED': 'false',
+    'EFFICIENTNET_ENABLED': 'false',
+    'VIT_ENABLED': 'false',
+    'EFFICIENTNETV2_ENABLED': 'true',
+    'INFERENCE_BATCHING': 'false',
+    'WARMUP_BATCH_SIZES': '1,4',
+})
+
+import io
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import app as service
+from utils.jobs import JobManager
+from utils.scratch import ScratchManager
+from utils.uploads import UploadTooLarge, spool_stream, suffix_for
+
+
+class CountingStream(io.BytesIO):
+    """Request body that records how many bytes the server read"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def readline(self, size=-1):
+        data = super().readline(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class HashingEnsemble:
+    """analyze_video stand-in: hashes the spooled file it is given"""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze_video(self, video_path, session_id, progress_callback=None, deadline=None):
+        data = Path(video_path).read_bytes()
+        self.calls.append((video_path, session_id, hashlib.sha256(data).hexdigest()))
+        return {'combined_score': 0.8, 'decision': 'ALLOW', 'session_id': session_id}
+
+
+@contextmanager
+def upload_service(ensemble, **config):
+    """Patch the ensemble, face preflight (unavailable), job manager, scratch manager and CONFIG values"""
+    originals = (
+        service.get_ensemble, service.face_preflight, service.job_manager,
+        service.scratch_manager, dict(service.CONFIG)
+    )
+    with tempfile.TemporaryDirectory() as store_dir, tempfile.TemporaryDirectory() as scratch_dir:
+        service.get_ensemble = lambda: ensemble
+        service.face_preflight = False
+        service.job_manager = JobManager(store_dir, max_workers=1, max_pending=4, ttl_seconds=60)
+        service.scratch_manager = ScratchManager(scratch_dir)
+        service.CONFIG.update(config)
+        try:
+            yield service.app.test_client(), Path(scratch_dir)
+        finally:
+            service.job_manager.shutdown(wait=True)
+            (service.get_ensemble, service.face_preflight, service.job_manager,
+             service.scratch_manager) = originals[:4]
+            service.CONFIG.clear()
+            service.CONFIG.update(originals[4])
+
+
+def multipart_body(payload: bytes, boundary: str = 'syncnet-test') -> bytes:
+    """multipart/form-data body with a session_id field and a `video` file part"""
+    return (
+        f'--{boundary}\r\n'
+        'Content-Disposition: form-data; name="session_id"\r\n\r\n'
+        f'upload-test\r\n--{boundary}\r\n'
+        'Content-Disposition: form-data; name="video"; filename="clip.mp4"\r\n'
+        'Content-Type: video/mp4\r\n\r\n'
+    ).encode() + payload + f'\r\n--{boundary}--\r\n'.encode()
+
+
+def test_spool_hash_and_size():
+    """Test that spooling computes sha256 and size while writing"""
+    print("\n[Test 1] Testing spool hash and size...")
+
+    payload = os.urandom(300 * 1024)
+
+    with tempfile.TemporaryDirectory() as spool_dir:
+        spool = spool_stream(io.BytesIO(payload), spool_dir, max_bytes=1024 * 1024, suffix='.mp4')
+
+        assert spool.size == len(payload), "Size should match payload"
+        assert spool.sha256 == hashlib.sha256(payload).hexdigest(), "Hash should match payload"
+        assert spool.path.suffix == '.mp4'
+        assert spool.path.read_bytes() == payload, "Spooled bytes should match payload"
+
+        spool.discard()
+        assert not spool.path.exists(), "discard() should delete the spool file"
+
+    print("✓ Spool hash and size test passed")
+
+
+def test_spool_limit_aborts_stream():
+    """Test that the size limit aborts without reading the whole body"""
+    print("\n[Test 2] Testing size limit...")
+
+    class CountingStream(io.BytesIO):
+        bytes_read = 0
+
+        def read(self, size=-1):
+            data = super().read(size)
+            CountingStream.bytes_read += len(data)
+            return data
+
+    stream = CountingStream(b'\0' * (5 * 1024 * 1024))
+
+    with tempfile.TemporaryDirectory() as spool_dir:
+        try:
+            spool_stream(stream, spool_dir, max_bytes=1024 * 1024, chunk_size=64 * 1024)
+            assert False, "Oversized upload should raise UploadTooLarge"
+        except UploadTooLarge:
+            pass
+
+        assert CountingStream.bytes_read <= 1024 * 1024 + 64 * 1024, "Should stop reading at the limit"
+        assert os.listdir(spool_dir) == [], "Partial spool file should be deleted"
+
+    print("✓ Size limit test passed")
+
+
+def test_suffix_for():
+    """Test container suffix selection"""
+    print("\n[Test 3] Testing suffix selection...")
+
+    assert suffix_for('video/mp4') == '.mp4'
+    assert suffix_for('video/webm; codecs=vp8') == '.webm'
+    assert suffix_for('application/octet-stream', 'clip.MOV') == '.mov'
+    assert suffix_for(None) == '.webm'
+
+    print("✓ Suffix selection test passed")
+
+
+def test_score_upload_endpoint():
+    """Test /score/upload: multipart spooled, hashed and scored; 413 over the limit; scratch released"""
+    print("\n[Test 4] Testing /score/upload endpoint...")
+
+    payload = os.urandom(256 * 1024)
+    oversized = b'\0' * (5 * 1024 * 1024)
+    ensemble = HashingEnsemble()
+
+    with upload_service(ensemble, max_video_size_mb=1) as (client, scratch_dir):
+        response = client.post('/score/upload', data={
+            'session_id': 'upload-test',
+            'video': (io.BytesIO(payload), 'clip.mp4', 'video/mp4'),
+        }, content_type='multipart/form-data')
+
+        assert response.status_code == 200, response.get_data(as_text=True)
+        body = response.get_json()
+        sha256 = hashlib.sha256(payload).hexdigest()
+        assert body['upload'] == {'sha256': sha256, 'size_bytes': len(payload)}
+        assert body['decision'] == 'ALLOW' and body['session_id'] == 'upload-test'
+
+        video_path, session_id, scored_sha256 = ensemble.calls[0]
+        assert Path(video_path).parent.parent == scratch_dir, "Spooled into the request's scratch space"
+        assert Path(video_path).suffix == '.mp4'
+        assert (session_id, scored_sha256) == ('upload-test', sha256), "The ensemble scored the uploaded bytes"
+
+        # Oversized multipart and raw bodies: 413 once the limit is crossed, not after reading it all
+        for content_type, data in (
+            ('multipart/form-data; boundary=syncnet-test', multipart_body(oversized)),
+            ('video/mp4', oversized),
+        ):
+            stream = CountingStream(data)
+            # Chunked body (no Content-Length): only the spool's running size can stop it
+            response = client.post(
+                '/score/upload', input_stream=stream, content_type=content_type,
+                headers={'Transfer-Encoding': 'chunked'}, environ_overrides={'wsgi.input_terminated': True}
+            )
+            assert response.status_code == 413, (content_type, response.status_code)
+            assert 'too large' in response.get_json()['error']
+            assert stream.bytes_read <= 2 * 1024 * 1024, f"{content_type}: read {stream.bytes_read} bytes"
+
+        # Scratch spaces are released after success and rejection alike
+        assert list(scratch_dir.iterdir()) == [], "No scratch space left behind"
+        assert service.scratch_manager.usage_bytes() == 0
+
+    assert len(ensemble.calls) == 1, "Rejected uploads never reach the ensemble"
+
+    print("✓ /score/upload endpoint test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("=" * 70)
+    print("Running Upload Spooling Unit Tests")
+    print("=" * 70)
+
+    try:
+        test_spool_hash_and_size()
+        test_spool_limit_aborts_stream()
+        test_suffix_for()
+        test_score_upload_endpoint()
+
+        print("\n" + "=" * 70)
+        print("✓ ALL TESTS PASSED!")
+        print("=" * 70)
+        return True
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,114 @@
+"""
+Request Deadlines
+Presupuesto de tiempo por request que se propaga por el orquestador y los
+detectores: cada etapa consulta el tiempo restante, los subprocesos de SyncNet
+se matan al agotarse y la espera del cliente se cancela si éste se desconecta
+"""
+
+import math
+import time
+import select
+import socket
+import threading
+from typing import Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request runs out of time or is cancelled"""
+
+    def __init__(self, message: str, reason: str = 'deadline'):
+        super().__init__(message)
+        self.reason = reason
+
+
+class Deadline:
+    """
+    Time budget of one request (monotonic clock) plus a cancellation flag
+
+    Usage:
+        deadline = Deadline(30)
+        deadline.check('syncnet')          # raises DeadlineExceeded when expired/cancelled
+        subprocess.run(cmd, timeout=deadline.timeout(120))
+        deadline.cancel('client_disconnected')   # from another thread
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Args:
+            seconds: Budget from now (None or <= 0 = no time limit, cancellation only)
+        """
+        self.budget_seconds = seconds if seconds and seconds > 0 else None
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + self.budget_seconds if self.budget_seconds else math.inf
+        self._cancelled = threading.Event()
+        self._cancel_reason = None
+
+    def remaining(self) -> float:
+        """Seconds left (inf without a budget, 0 once cancelled)"""
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    @property
+    def reason(self) -> Optional[str]:
+        """'deadline', the cancel reason, or None while time is left"""
+        if self._cancelled.is_set():
+            return self._cancel_reason
+        return 'deadline' if self.expired else None
+
+    def cancel(self, reason: str = 'cancelled'):
+        """Stop the request at its next check (thread-safe; first reason wins)"""
+        if not self._cancelled.is_set():
+            self._cancel_reason = reason
+            self._cancelled.set()
+
+    def timeout(self, cap: Optional[float] = None) -> Optional[float]:
+        """Timeout for a blocking call: the smaller of cap and the time left"""
+        remaining = self.remaining()
+        if cap is None:
+            return None if math.isinf(remaining) else remaining
+        return min(cap, remaining)
+
+    def check(self, stage: str = 'request'):
+        """Raise DeadlineExceeded if the request is out of time or cancelled"""
+        reason = self.reason
+        if reason is not None:
+            raise DeadlineExceeded(f"{stage}: {reason} after {self.elapsed_ms():.0f} ms", reason)
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started_at) * 1000
+
+    def summary(self) -> dict:
+        remaining = self.remaining()
+        return {
+            'budget_ms': round(self.budget_seconds * 1000) if self.budget_seconds else None,
+            'elapsed_ms': round(self.elapsed_ms()),
+            'remaining_ms': None if math.isinf(remaining) else round(remaining * 1000),
+            'reason': self.reason,
+        }
+
+
+def client_disconnected(environ: dict) -> bool:
+    """
+    True when the HTTP client has closed its connection
+
+    Peeks at the request socket exposed by gunicorn (gunicorn.socket) or the
+    Werkzeug dev server (werkzeug.socket); False when neither is available.
+    """
+    sock = environ.get('gunicorn.socket') or environ.get('werkzeug.socket')
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        # Readable with no data = orderly shutdown by the peer
+        return sock.recv(1, socket.MSG_PEEK) == b''
+    except ValueError:
+        return False   # e.g. TLS sockets do not support MSG_PEEK: cannot tell
+    except OSError:
+        return True    # reset by peer
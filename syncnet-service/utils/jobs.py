@@ -0,0 +1,307 @@
+"""
+Background Job Manager
+Ejecuta análisis de video en un executor acotado (ThreadPoolExecutor)
+El estado de cada job se guarda localmente (JSON en disco) y expira por TTL
+"""
+
+import json
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the executor already holds max_pending jobs"""
+
+
+def _process_alive(pid: int) -> bool:
+    """True if pid exists (or belongs to another user); same check as ScratchManager"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobManager:
+    """
+    Bounded background executor for video scoring jobs
+
+    Características:
+    - max_workers threads ejecutan jobs (1 por defecto; con más, el orquestador
+      igual corre SyncNet y los detectores no thread-safe de a un video por vez)
+    - max_pending limita jobs en cola + en ejecución (rechaza con JobQueueFull)
+    - Estado persistido en store_dir/<job_id>.json (visible para todos los
+      workers de gunicorn en el mismo host)
+    - Jobs terminados expiran ttl_seconds después de terminar (los que están
+      en cola o corriendo nunca expiran)
+    - Cada job guarda el pid del worker dueño: si ese proceso ya no existe
+      (worker muerto o reciclado), el job queda 'failed' con error 'orphaned'
+      y luego expira como cualquier otro
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+
+    def __init__(
+        self,
+        store_dir: str,
+        max_workers: int = 1,
+        max_pending: int = 4,
+        ttl_seconds: int = 900
+    ):
+        """
+        Initialize job manager
+
+        Args:
+            store_dir: Directory where job state files are written
+            max_workers: Number of executor threads
+            max_pending: Maximum queued + running jobs in this process
+            ttl_seconds: Time a job record is kept after it finished
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='score-job'
+        )
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        # purge_expired() reads every state file: at most once per purge_interval
+        self.purge_interval = ttl_seconds / 10
+        self._last_purge = 0.0
+
+        logger.info(
+            f"[JobManager] Initialized (workers={max_workers}, "
+            f"max_pending={max_pending}, ttl={ttl_seconds}s, store={self.store_dir})"
+        )
+
+    def submit(
+        self,
+        fn: Callable[[Callable[[dict], None]], dict],
+        metadata: Optional[dict] = None
+    ) -> str:
+        """
+        Schedule a job
+
+        Args:
+            fn: Callable receiving a report_partial(dict) callback and returning
+                the final result dict
+            metadata: Extra fields stored with the job (session_id, video_path...)
+
+        Returns:
+            job_id
+
+        Raises:
+            JobQueueFull: if max_pending jobs are already queued or running
+        """
+        if time.monotonic() - self._last_purge >= self.purge_interval:
+            self.purge_expired()
+
+        with self._lock:
+            pending = sum(1 for f in self._futures.values() if not f.done())
+            if pending >= self.max_pending:
+                raise JobQueueFull(
+                    f"Job queue full ({pending}/{self.max_pending} pending)"
+                )
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            self._write_state(job_id, {
+                'job_id': job_id,
+                'status': self.STATUS_QUEUED,
+                'created_at': now,
+                'updated_at': now,
+                'expires_at': now + self.ttl_seconds,
+                'owner_pid': os.getpid(),
+                'metadata': metadata or {},
+                'partial': None,
+                'result': None,
+                'error': None,
+            })
+
+            future = self._executor.submit(self._run, job_id, fn)
+            self._futures[job_id] = future
+
+        logger.info(f"[JobManager] Job {job_id} queued")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return job state (None if unknown or expired)"""
+        state = self._read_state(job_id)
+        if state is None:
+            return None
+
+        if self._is_orphaned(job_id, state):
+            state = self._mark_orphaned(job_id, state)
+
+        if self._is_expired(state, time.time()):
+            self._delete(job_id)
+            return None
+
+        return state
+
+    def _is_expired(self, state: dict, now: float) -> bool:
+        """Only finished jobs expire (expires_at = finished_at + ttl_seconds)"""
+        if state.get('status') in (self.STATUS_QUEUED, self.STATUS_RUNNING):
+            return False
+        return state.get('expires_at', 0) < now
+
+    def _is_orphaned(self, job_id: str, state: dict) -> bool:
+        """Queued/running job whose owner process is gone (or this process without its future)"""
+        if state.get('status') not in (self.STATUS_QUEUED, self.STATUS_RUNNING):
+            return False
+        owner_pid = state.get('owner_pid')
+        if owner_pid is None:
+            return False
+        if owner_pid == os.getpid():
+            # Same pid after a restart (e.g. pid 1 in a container): only our futures are live
+            with self._lock:
+                return job_id not in self._futures
+        return not _process_alive(owner_pid)
+
+    def _mark_orphaned(self, job_id: str, state: dict) -> dict:
+        logger.warning(f"[JobManager] Job {job_id} orphaned (owner pid {state.get('owner_pid')} is gone)")
+        finished_at = time.time()
+        fields = {
+            'status': self.STATUS_FAILED,
+            'finished_at': finished_at,
+            'expires_at': finished_at + self.ttl_seconds,
+            'error': {'message': f"Worker {state.get('owner_pid')} exited before the job finished", 'type': 'orphaned'},
+        }
+        self._update_state(job_id, **fields)
+        return {**state, **fields}
+
+    def done(self, job_id: str) -> bool:
+        """True once a job submitted by this process has finished (succeeded or failed)"""
+        with self._lock:
+            future = self._futures.get(job_id)
+        return future is not None and future.done()
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> dict:
+        """
+        Block until a job submitted by this process finishes
+
+        Returns the job result, re-raises the job exception, or raises
+        TimeoutError if it is still running after `timeout` seconds
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+
+        if future is None:
+            raise KeyError(f"Job not owned by this process: {job_id}")
+
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # concurrent.futures.TimeoutError is an alias of TimeoutError (3.11+);
+            # a finished future means the job itself raised it (e.g. DeadlineExceeded)
+            if future.done():
+                raise
+            raise TimeoutError(f"Job {job_id} still running after {timeout}s")
+
+    def purge_expired(self):
+        """Fail orphaned jobs, delete expired job records and forget finished futures"""
+        self._last_purge = time.monotonic()
+        now = time.time()
+
+        for path in self.store_dir.glob('*.json'):
+            try:
+                with open(path, 'r') as f:
+                    state = json.load(f)
+                if self._is_orphaned(path.stem, state):
+                    state = self._mark_orphaned(path.stem, state)
+                if self._is_expired(state, now):
+                    path.unlink(missing_ok=True)
+            except (OSError, ValueError):
+                continue
+
+        with self._lock:
+            for job_id in [j for j, f in self._futures.items() if f.done()]:
+                if not (self.store_dir / f'{job_id}.json').exists():
+                    del self._futures[job_id]
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting jobs"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job_id: str, fn: Callable[[Callable[[dict], None]], dict]) -> dict:
+        """Executor entry point: run fn and persist status transitions"""
+        self._update_state(job_id, status=self.STATUS_RUNNING, started_at=time.time())
+
+        def report_partial(partial: dict):
+            self._update_state(job_id, partial=partial)
+
+        try:
+            result = fn(report_partial)
+        except Exception as e:
+            logger.error(f"[JobManager] Job {job_id} failed: {e}")
+            finished_at = time.time()
+            self._update_state(
+                job_id,
+                status=self.STATUS_FAILED,
+                finished_at=finished_at,
+                expires_at=finished_at + self.ttl_seconds,
+                error={'message': str(e), 'type': type(e).__name__}
+            )
+            raise
+
+        finished_at = time.time()
+        self._update_state(
+            job_id,
+            status=self.STATUS_SUCCEEDED,
+            finished_at=finished_at,
+            expires_at=finished_at + self.ttl_seconds,
+            result=result
+        )
+        logger.info(f"[JobManager] Job {job_id} finished")
+        return result
+
+    def _update_state(self, job_id: str, **fields):
+        with self._lock:
+            state = self._read_state(job_id)
+            if state is None:
+                return
+            state.update(fields)
+            state['updated_at'] = time.time()
+            self._write_state(job_id, state)
+
+    def _read_state(self, job_id: str) -> Optional[dict]:
+        # job_id is used as a file name: only accept our own hex ids
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            return None
+
+        path = self.store_dir / f'{job_id}.json'
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_state(self, job_id: str, state: dict):
+        # Atomic replace so readers in other workers never see half a file
+        path = self.store_dir / f'{job_id}.json'
+        tmp_path = self.store_dir / f'.{job_id}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, default=str)
+        os.replace(tmp_path, path)
+
+    def _delete(self, job_id: str):
+        (self.store_dir / f'{job_id}.json').unlink(missing_ok=True)
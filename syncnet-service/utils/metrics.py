@@ -0,0 +1,580 @@
+"""
+In-process metrics primitives
+Histogramas, counters y gauges thread-safe sin dependencias externas,
+exportados en formato de texto Prometheus por /metrics
+
+Las etiquetas solo toman valores de conjuntos fijos (stage, detector, cache)
+para mantener la cardinalidad acotada
+
+Con varios workers de gunicorn, MultiprocessCollector agrega los registros de
+todos los workers a través de snapshots JSON en un directorio compartido
+"""
+
+import os
+import json
+import math
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Optional span recorder installed by utils.profiling: hook(name) -> context manager
+_span_hook: Optional[Callable[[str], ContextManager]] = None
+
+
+def set_span_hook(hook: Optional[Callable[[str], ContextManager]]):
+    """Route every histogram .time() block through hook (None disables)"""
+    global _span_hook
+    _span_hook = hook
+
+
+class _HistogramChild:
+    """Bucket counts for one label combination"""
+
+    def __init__(self, buckets: Tuple[float, ...], span_name: str = ''):
+        self._buckets = buckets
+        self.span_name = span_name
+        self._counts = [0] * (len(buckets) + 1)  # last slot = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """Cumulative bucket counts (Prometheus semantics)"""
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+            total_count = self._count
+
+        cumulative = []
+        running = 0
+        for bound, count in zip(list(self._buckets) + [float('inf')], counts):
+            running += count
+            cumulative.append((bound, running))
+
+        return {'buckets': cumulative, 'sum': total_sum, 'count': total_count}
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the with-block (seconds)"""
+        span = _span_hook(self.span_name) if _span_hook is not None else nullcontext()
+        start = time.perf_counter()
+        try:
+            with span:
+                yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets and optional labels
+
+    Usage:
+        h = Histogram('batch_size', 'Batch size', buckets=(1, 2, 4), labelnames=('model',))
+        h.labels(model='vit').observe(3)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels) -> _HistogramChild:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                span_name = self.name + _format_labels(list(zip(self.labelnames, key)))
+                child = self._children.setdefault(key, _HistogramChild(self.buckets, span_name))
+        return child
+
+    def observe(self, value: float):
+        """Observe without labels (only valid when labelnames is empty)"""
+        self.labels().observe(value)
+
+    def time(self):
+        """Time a block without labels (only valid when labelnames is empty)"""
+        return self.labels().time()
+
+    def collect(self) -> Dict[Tuple[str, ...], dict]:
+        """Snapshot of every label combination"""
+        with self._lock:
+            children = dict(self._children)
+        return {key: child.snapshot() for key, child in children.items()}
+
+
+class _ValueChild:
+    """Single float value for one label combination"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from a callback at scrape time"""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        with self._lock:
+            return self._value
+
+    @contextmanager
+    def track_inprogress(self):
+        """Increment while the with-block runs"""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _ValueMetric:
+    """Shared label handling for Counter and Gauge"""
+
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _ValueChild] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels) -> _ValueChild:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, _ValueChild())
+        return child
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            children = dict(self._children)
+        return {key: child.get() for key, child in children.items()}
+
+
+class Counter(_ValueMetric):
+    """Monotonic counter (name should end in _total)"""
+
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(_ValueMetric):
+    """Value that can go up and down"""
+
+    type_name = 'gauge'
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def track_inprogress(self):
+        return self.labels().track_inprogress()
+
+
+class MetricsRegistry:
+    """Process-wide registry (one per gunicorn worker)"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Register a metric, returning the existing one if the name is taken"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> dict:
+        """
+        JSON-serializable state of every metric:
+        {name: {'type', 'help', 'labelnames', 'samples': [[label values], value]}}
+        """
+        result = {}
+        for metric in self.metrics():
+            type_name = 'histogram' if isinstance(metric, Histogram) else metric.type_name
+            samples = sorted(metric.collect().items())
+            if type_name == 'histogram':
+                samples = [(key, {**value, 'buckets': [list(b) for b in value['buckets']]}) for key, value in samples]
+            result[metric.name] = {
+                'type': type_name,
+                'help': metric.documentation,
+                'labelnames': list(metric.labelnames),
+                'samples': [[list(key), value] for key, value in samples],
+            }
+        return result
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        return render_snapshot(self.snapshot())
+
+
+def render_snapshot(snapshot: dict) -> str:
+    """Prometheus text exposition format (version 0.0.4) of a registry snapshot"""
+    lines = []
+    for name, metric in snapshot.items():
+        type_name = metric['type']
+        lines.append(f'# HELP {name} {metric["help"]}')
+        lines.append(f'# TYPE {name} {type_name}')
+
+        for key, value in sorted(metric['samples']):
+            labels = list(zip(metric['labelnames'], key))
+
+            if type_name != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                continue
+
+            for bound, count in value['buckets']:
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                lines.append(
+                    f'{name}_bucket{_format_labels(labels + [("le", le)])} {count}'
+                )
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value["sum"])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {value["count"]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def merge_snapshots(snapshots: Dict[str, dict]) -> dict:
+    """
+    Combine per-process snapshots ({source: snapshot})
+
+    Counters and histograms are summed over sources. Gauges describe one
+    process (in-flight requests, model memory, scratch bytes): each source
+    keeps its own series with an extra `pid` label (the source name).
+    """
+    merged: Dict[str, dict] = {}
+    for source, snapshot in sorted(snapshots.items()):
+        for name, metric in snapshot.items():
+            is_gauge = metric['type'] == 'gauge'
+            target = merged.setdefault(name, {
+                'type': metric['type'],
+                'help': metric['help'],
+                'labelnames': metric['labelnames'] + (['pid'] if is_gauge else []),
+                'samples': {},
+            })
+            for key, value in metric['samples']:
+                key = tuple(key) + ((source,) if is_gauge else ())
+                target['samples'][key] = _add_sample(target['samples'].get(key), value)
+
+    for metric in merged.values():
+        metric['samples'] = [[list(key), value] for key, value in metric['samples'].items()]
+    return merged
+
+
+def _add_sample(total, value):
+    if total is None:
+        return value
+    if not isinstance(value, dict):
+        return total + value
+    # Histograms: same buckets in every process (defined in code)
+    return {
+        'buckets': [[bound, a + b] for (bound, a), (_, b) in zip(total['buckets'], value['buckets'])],
+        'sum': total['sum'] + value['sum'],
+        'count': total['count'] + value['count'],
+    }
+
+
+DEAD_WORKERS_FILE = 'dead.json'
+
+
+def _write_json(path: Path, data: dict):
+    # Atomic replace so a scrape in another worker never reads half a file
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class MultiprocessCollector:
+    """
+    Aggregated /metrics across gunicorn workers (no shared memory needed)
+
+    Each worker writes its registry snapshot to <directory>/<pid>.json every
+    `interval` seconds and right before rendering. A scrape merges the files of
+    every worker plus dead.json, where the master folds the counters and
+    histograms of exited workers (mark_process_dead), so totals do not drop
+    when a worker is recycled. Other workers' values are up to `interval` old.
+    """
+
+    def __init__(self, registry: 'MetricsRegistry', directory: str, interval: float = 5.0):
+        self.registry = registry
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def path(self) -> Path:
+        # Evaluated on every write: the pid changes if the process forks later
+        return self.directory / f'{os.getpid()}.json'
+
+    def start(self):
+        """Write a first snapshot and keep it fresh from a daemon thread"""
+        self.flush()
+        self._thread = threading.Thread(target=self._loop, name='metrics-flush', daemon=True)
+        self._thread.start()
+        logger.info(f"[Metrics] Multiprocess mode: {self.directory} (every {self.interval:.0f}s)")
+
+    def stop(self):
+        """Stop the flush thread and write the final snapshot"""
+        self._stop.set()
+        self.flush()
+
+    def flush(self):
+        try:
+            _write_json(self.path, self.registry.snapshot())
+        except OSError as e:
+            logger.warning(f"[Metrics] Could not write {self.path}: {e}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def collect(self) -> dict:
+        """Merged snapshot of every worker (this one read fresh from memory)"""
+        snapshots = {str(os.getpid()): self.registry.snapshot()}
+        for path in self.directory.glob('*.json'):
+            if path.stem in snapshots:
+                continue
+            snapshot = _read_json(path)
+            if snapshot is not None:
+                snapshots[path.stem] = snapshot
+        return merge_snapshots(snapshots)
+
+    def render(self) -> str:
+        self.flush()
+        return render_snapshot(self.collect())
+
+
+def mark_process_dead(pid: int, directory: str):
+    """
+    Fold an exited worker's counters and histograms into dead.json and drop its
+    file (its gauges no longer describe a live process). Called by the gunicorn
+    master (child_exit), the only writer of dead.json.
+    """
+    directory = Path(directory)
+    path = directory / f'{pid}.json'
+    snapshot = _read_json(path)
+    if snapshot is not None:
+        alive = {name: metric for name, metric in snapshot.items() if metric['type'] != 'gauge'}
+        dead = merge_snapshots({'dead': _read_json(directory / DEAD_WORKERS_FILE) or {}, str(pid): alive})
+        _write_json(directory / DEAD_WORKERS_FILE, dead)
+    path.unlink(missing_ok=True)
+
+
+def clear_multiproc_dir(directory: str):
+    """Create the directory and remove snapshots left by a previous server (master start-up)"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob('*.json'):
+        path.unlink(missing_ok=True)
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    escaped = [
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    ]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if not math.isfinite(value):
+        return '+Inf' if value > 0 else ('-Inf' if value < 0 else 'NaN')
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+    labelnames: Sequence[str] = ()
+) -> Histogram:
+    """Get or create a histogram in the global registry"""
+    return REGISTRY.register(Histogram(name, documentation, buckets, labelnames))
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Get or create a counter in the global registry"""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Get or create a gauge in the global registry"""
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+# Service metrics (shared by app, orchestrator, detectors and SyncNet wrapper)
+STAGE_SECONDS = histogram(
+    'stage_duration_seconds',
+    'Duration of pipeline stages (decode, sampling, preprocess, fusion)',
+    labelnames=('stage',)
+)
+
+DETECTOR_INFERENCE_SECONDS = histogram(
+    'detector_inference_seconds',
+    'Forward-pass time per detector and video',
+    labelnames=('detector',)
+)
+
+SYNCNET_SUBPROCESS_SECONDS = histogram(
+    'syncnet_subprocess_seconds',
+    'Wall time of SyncNet subprocess steps (pipeline, analysis)',
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 180.0),
+    labelnames=('step',)
+)
+
+SYNCNET_ENGINE_SECONDS = histogram(
+    'syncnet_engine_seconds',
+    'Wall time of in-process SyncNet engine steps (decode, detect, track, crop, audio, sync)',
+    labelnames=('step',)
+)
+
+DETECTOR_ERRORS = counter(
+    'detector_errors_total',
+    'Detector failures during analysis',
+    labelnames=('detector',)
+)
+
+DETECTOR_SKIPS = counter(
+    'detector_skips_total',
+    'Detectors skipped by a pre-check (e.g. syncnet/no_speech)',
+    labelnames=('detector', 'reason')
+)
+
+DEADLINE_EXCEEDED = counter(
+    'deadline_exceeded_total',
+    'Scoring requests cut short (deadline = processing timeout, client_disconnected, wait_timeout)',
+    labelnames=('reason',)
+)
+
+PREFLIGHT_REJECTIONS = counter(
+    'preflight_rejections_total',
+    'Scoring requests rejected by the face presence preflight',
+    labelnames=('reason',)
+)
+
+DEMO_FALLBACKS = counter(
+    'demo_mode_fallbacks_total',
+    'Responses served with demo data',
+    labelnames=('source',)
+)
+
+CACHE_HITS = counter(
+    'cache_hits_total',
+    'Cache hits',
+    labelnames=('cache',)
+)
+
+CACHE_MISSES = counter(
+    'cache_misses_total',
+    'Cache misses',
+    labelnames=('cache',)
+)
+
+INFLIGHT_REQUESTS = gauge(
+    'inflight_requests',
+    'Scoring requests currently being processed'
+)
+
+MODEL_MEMORY_BYTES = gauge(
+    'model_memory_bytes',
+    'Parameter and buffer memory per loaded detector',
+    labelnames=('detector',)
+)
+
+SCRATCH_BYTES = gauge(
+    'scratch_bytes',
+    'Bytes used by scratch spaces of this worker',
+    labelnames=('state',)
+)
+
+SCRATCH_SPACES = gauge(
+    'scratch_spaces',
+    'Scratch spaces of this worker (active = in use, retained = kept for debugging)',
+    labelnames=('state',)
+)
+
+SCRATCH_RELEASES = counter(
+    'scratch_releases_total',
+    'Scratch spaces released, by request outcome',
+    labelnames=('outcome',)
+)
+
+SCRATCH_EVICTIONS = counter(
+    'scratch_evictions_total',
+    'Retained scratch spaces evicted (quota = LRU over quota, age = older than max age)',
+    labelnames=('reason',)
+)
@@ -0,0 +1,271 @@
+"""
+Opt-in Per-Request Profiling
+Captura dónde se va el tiempo de un request específico:
+- 'sampling': muestreo de stacks del thread del request y de los threads de
+  InferenceServer (collapsed stacks con el thread como raíz, bajo overhead)
+- 'pstats': cProfile determinista (más overhead, callers/callees exactos; solo
+  el thread del request)
+En ambos modos se guarda un árbol de tiempos por etapa (decode, preprocess,
+inferencia, subprocess de SyncNet, fusión) a partir de los timers de utils.metrics
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import cProfile
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Optional
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+PROFILE_MODES = ('sampling', 'pstats')
+
+# Threads that run work on behalf of the request (InferenceServer forward passes)
+SHARED_THREAD_PREFIXES = ('inference-',)
+
+SHARED_THREADS_NOTE = (
+    'inference-* stacks are InferenceServer forward passes shared by every in-flight '
+    'request of this worker; idle samples are dropped'
+)
+PSTATS_NOTE = (
+    'cProfile covers the request thread only: InferenceServer forward passes appear '
+    'as time waiting on their futures'
+)
+
+_active = threading.local()
+
+
+def choose_profile_mode(header_value: Optional[str], sample_rate: float = 0.0) -> Optional[str]:
+    """
+    Decide whether to profile a request
+
+    Args:
+        header_value: X-Profile header ('1', 'true', 'sampling' or 'pstats')
+        sample_rate: Fraction of unflagged requests to profile (0-1)
+
+    Returns:
+        'sampling', 'pstats' or None
+    """
+    value = (header_value or '').strip().lower()
+
+    if value in PROFILE_MODES:
+        return value
+    if value in ('1', 'true', 'yes'):
+        return 'sampling'
+    if sample_rate > 0 and random.random() < sample_rate:
+        return 'sampling'
+    return None
+
+
+class _StackSampler(threading.Thread):
+    """
+    Samples the target thread's Python stack every `interval` seconds, plus
+    the busy InferenceServer threads (work done for the request elsewhere).
+    Stacks are rooted at the thread name.
+    """
+
+    def __init__(self, target_thread_id: int, interval: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.thread_samples: Counter = Counter()
+        self.num_samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = thread_names.get(ident, str(ident))
+                if ident == self.target_thread_id:
+                    self.num_samples += 1
+                elif not name.startswith(SHARED_THREAD_PREFIXES) or _is_idle(frame):
+                    continue
+                self._record(name, frame)
+
+    def _record(self, thread_name: str, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{Path(code.co_filename).name}:{code.co_name}')
+            frame = frame.f_back
+
+        self.stacks[';'.join([thread_name] + names[::-1])] += 1
+        self.thread_samples[thread_name] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=1.0)
+
+
+def _is_idle(frame) -> bool:
+    """Shared thread blocked waiting for work (queue.get -> Condition.wait)"""
+    return Path(frame.f_code.co_filename).name == 'threading.py' and frame.f_code.co_name == 'wait'
+
+
+class ProfileCapture:
+    """
+    Context manager that profiles the current thread (and, when sampling,
+    the InferenceServer threads that run its forward passes)
+
+    Usage:
+        with ProfileCapture('sampling', out_dir) as capture:
+            result = orchestrator.analyze_video(...)
+        result['profile'] = capture.summary()
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        out_dir: str,
+        max_profiles: int = 50,
+        interval_ms: float = 5.0,
+        profile_id: Optional[str] = None
+    ):
+        """
+        Initialize capture
+
+        Args:
+            mode: 'sampling' or 'pstats'
+            out_dir: Directory for artifacts (rotated to the newest max_profiles)
+            max_profiles: Captures kept on disk
+            interval_ms: Sampling interval ('sampling' mode)
+            profile_id: Optional id (random by default)
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+
+        self.mode = mode
+        self.out_dir = Path(out_dir)
+        self.max_profiles = max_profiles
+        self.interval = interval_ms / 1000.0
+        self.profile_id = profile_id or time.strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:8]
+
+        self.stage_tree = {'name': 'request', 'start_ms': 0.0, 'duration_ms': None, 'children': []}
+        self._stack = [self.stage_tree]
+        self._files = {}
+        self._profiler = None
+        self._sampler = None
+        self._start = None
+        self._wall_time_ms = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        _active.capture = self
+
+        if self.mode == 'pstats':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = _StackSampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+        _active.capture = None
+        self._wall_time_ms = (time.perf_counter() - self._start) * 1000
+        self.stage_tree['duration_ms'] = round(self._wall_time_ms, 2)
+
+        try:
+            self._write_artifacts()
+            self._rotate()
+        except OSError as e:
+            logger.error(f"[Profiling] Failed to store profile {self.profile_id}: {e}")
+
+        return False
+
+    @contextmanager
+    def span(self, name: str):
+        """Record a nested stage in the timing tree"""
+        node = {
+            'name': name,
+            'start_ms': round((time.perf_counter() - self._start) * 1000, 2),
+            'duration_ms': None,
+            'children': [],
+        }
+        self._stack[-1]['children'].append(node)
+        self._stack.append(node)
+        span_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            node['duration_ms'] = round((time.perf_counter() - span_start) * 1000, 2)
+            self._stack.pop()
+
+    def summary(self) -> dict:
+        """Profile metadata returned with the response"""
+        return {
+            'profile_id': self.profile_id,
+            'mode': self.mode,
+            'wall_time_ms': round(self._wall_time_ms or 0.0, 2),
+            'files': self._files,
+            'num_samples': self._sampler.num_samples if self._sampler else None,
+            'thread_samples': dict(self._sampler.thread_samples) if self._sampler else None,
+            'note': SHARED_THREADS_NOTE if self._sampler else PSTATS_NOTE,
+            'stage_tree': self.stage_tree,
+        }
+
+    def _write_artifacts(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        if self._profiler is not None:
+            path = self.out_dir / f'{self.profile_id}.pstats'
+            self._profiler.dump_stats(str(path))
+            self._files['pstats'] = str(path)
+
+        if self._sampler is not None:
+            path = self.out_dir / f'{self.profile_id}.collapsed.txt'
+            with open(path, 'w') as f:
+                for stack, count in self._sampler.stacks.most_common():
+                    f.write(f'{stack} {count}\n')
+            self._files['collapsed'] = str(path)
+
+        path = self.out_dir / f'{self.profile_id}.stages.json'
+        with open(path, 'w') as f:
+            json.dump(self.stage_tree, f, indent=2)
+        self._files['stages'] = str(path)
+
+    def _rotate(self):
+        """Keep only the newest max_profiles captures"""
+        captures = {}
+        for path in self.out_dir.iterdir():
+            profile_id = path.name.split('.', 1)[0]
+            mtime = path.stat().st_mtime
+            captures[profile_id] = max(captures.get(profile_id, 0.0), mtime)
+
+        expired = sorted(captures, key=captures.get, reverse=True)[self.max_profiles:]
+        for path in list(self.out_dir.iterdir()):
+            if path.name.split('.', 1)[0] in expired:
+                path.unlink(missing_ok=True)
+
+
+def _span_hook(name: str):
+    """metrics timers -> spans of the capture active in this thread (if any)"""
+    capture = getattr(_active, 'capture', None)
+    if capture is None:
+        return nullcontext()
+    return capture.span(name)
+
+
+def stage(name: str):
+    """Record an ad-hoc stage in the active capture (no-op when not profiling)"""
+    return _span_hook(name)
+
+
+metrics.set_span_hook(_span_hook)
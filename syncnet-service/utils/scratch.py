@@ -0,0 +1,246 @@
+"""
+Scratch Space Manager
+Directorio de trabajo único por request (uploads, pipeline de SyncNet), en
+tmpfs cuando hay espacio, con cuota (evicción LRU de espacios retenidos) y
+limpieza garantizada al terminar bien, con error o por timeout
+"""
+
+import os
+import re
+import time
+import uuid
+import shutil
+import logging
+import threading
+import subprocess
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from utils.metrics import SCRATCH_BYTES, SCRATCH_EVICTIONS, SCRATCH_RELEASES, SCRATCH_SPACES
+
+logger = logging.getLogger(__name__)
+
+
+class ScratchQuotaExceeded(RuntimeError):
+    """Raised when active scratch spaces alone already use the whole quota"""
+
+
+def default_scratch_root(fallback: str, quota_bytes: int) -> str:
+    """Prefer tmpfs (/dev/shm) when it has room for the whole quota"""
+    shm = Path('/dev/shm')
+    try:
+        if shm.is_dir() and os.access(shm, os.W_OK) and shutil.disk_usage(shm).free >= quota_bytes:
+            return str(shm / 'syncnet-scratch')
+    except OSError:
+        pass
+    return fallback
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def release_outcome(exc: Optional[BaseException]) -> str:
+    """'success', 'timeout' or 'error' for the exception that ended a request (None = success)"""
+    if exc is None:
+        return 'success'
+    if isinstance(exc, (TimeoutError, subprocess.TimeoutExpired)):
+        return 'timeout'
+    return 'error'
+
+
+class ScratchSpace:
+    """One request's private working directory"""
+
+    def __init__(self, manager: 'ScratchManager', path: Path, label: str):
+        self.manager = manager
+        self.path = path
+        self.label = label
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.retained = False
+        self.released = False
+
+    def touch(self):
+        self.last_used = time.time()
+
+    def size_bytes(self) -> int:
+        return _dir_size(self.path)
+
+    def release(self, outcome: str = 'success'):
+        """Delete the directory (or keep it, see ScratchManager.keep_on_error); idempotent"""
+        self.manager.release(self, outcome)
+
+
+class ScratchManager:
+    """
+    Allocates per-request scratch directories under one root
+
+    Directory names embed the worker pid so leftovers of a crashed worker are
+    removed at startup without touching other live workers' spaces.
+
+    Usage:
+        scratch = ScratchManager('tmp/scratch', quota_bytes=512 * 1024 * 1024)
+        with scratch.session('syncnet-abc') as space:
+            run_pipeline(data_dir=space.path)
+    """
+
+    def __init__(
+        self,
+        root: str,
+        quota_bytes: int = 1024 * 1024 * 1024,
+        max_age_seconds: float = 900,
+        keep_on_error: bool = False
+    ):
+        """
+        Args:
+            root: Parent directory (see default_scratch_root for tmpfs placement)
+            quota_bytes: Maximum bytes for this worker's spaces
+            max_age_seconds: Retained spaces older than this are evicted
+            keep_on_error: Keep directories of failed requests for inspection
+                (evicted LRU-first when the quota is exceeded)
+        """
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.max_age_seconds = max_age_seconds
+        self.keep_on_error = keep_on_error
+
+        self._active = {}
+        self._retained: 'OrderedDict[Path, ScratchSpace]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._remove_orphans()
+
+        SCRATCH_BYTES.labels(state='active').set_function(lambda: self._bytes(self._active))
+        SCRATCH_BYTES.labels(state='retained').set_function(lambda: self._bytes(self._retained))
+        SCRATCH_SPACES.labels(state='active').set_function(lambda: len(self._active))
+        SCRATCH_SPACES.labels(state='retained').set_function(lambda: len(self._retained))
+
+        logger.info(f"[Scratch] Root {self.root} (quota {quota_bytes / (1024 * 1024):.0f} MB)")
+
+    def _bytes(self, spaces) -> int:
+        with self._lock:
+            paths = [space.path for space in spaces.values()]
+        return sum(_dir_size(path) for path in paths)
+
+    def _remove_orphans(self):
+        """Delete spaces left behind by workers that are no longer running"""
+        for entry in self.root.iterdir():
+            pid = entry.name.split('-', 1)[0]
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                os.kill(int(pid), 0)
+                continue   # owner still alive
+            except ProcessLookupError:
+                pass
+            except PermissionError:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            logger.info(f"[Scratch] Removed orphaned space {entry.name}")
+
+    def usage_bytes(self) -> int:
+        """Bytes used by active and retained spaces of this worker"""
+        return self._bytes(self._active) + self._bytes(self._retained)
+
+    def _evict(self, space: ScratchSpace, reason: str):
+        shutil.rmtree(space.path, ignore_errors=True)
+        SCRATCH_EVICTIONS.labels(reason=reason).inc()
+        logger.info(f"[Scratch] Evicted {space.path.name} ({reason})")
+
+    def enforce_quota(self):
+        """
+        Evict retained spaces (expired first, then least recently used) until
+        usage fits the quota
+
+        Raises:
+            ScratchQuotaExceeded: when active spaces alone exceed the quota
+        """
+        now = time.time()
+        with self._lock:
+            expired = [
+                space for space in self._retained.values()
+                if now - space.last_used > self.max_age_seconds
+            ]
+            for space in expired:
+                del self._retained[space.path]
+        for space in expired:
+            self._evict(space, 'age')
+
+        while self.usage_bytes() > self.quota_bytes:
+            with self._lock:
+                if not self._retained:
+                    break
+                _, space = self._retained.popitem(last=False)
+            self._evict(space, 'quota')
+
+        usage = self.usage_bytes()
+        if usage > self.quota_bytes:
+            raise ScratchQuotaExceeded(
+                f"Scratch quota exceeded: {usage / (1024 * 1024):.1f} MB in use "
+                f"(quota {self.quota_bytes / (1024 * 1024):.0f} MB)"
+            )
+
+    def allocate(self, label: str = 'request') -> ScratchSpace:
+        """Create a new unique directory (after making room under the quota)"""
+        self.enforce_quota()
+
+        safe_label = re.sub(r'[^A-Za-z0-9_.-]', '_', label)[:64]
+        path = self.root / f'{os.getpid()}-{uuid.uuid4().hex[:12]}-{safe_label}'
+        path.mkdir(parents=True)
+
+        space = ScratchSpace(self, path, label)
+        with self._lock:
+            self._active[path] = space
+        return space
+
+    def release(self, space: ScratchSpace, outcome: str = 'success'):
+        """Delete a space, or retain it when keep_on_error and the request failed"""
+        with self._lock:
+            if space.released:
+                return
+            space.released = True
+            self._active.pop(space.path, None)
+            keep = self.keep_on_error and outcome != 'success'
+            if keep:
+                space.retained = True
+                space.touch()
+                self._retained[space.path] = space
+
+        SCRATCH_RELEASES.labels(outcome=outcome).inc()
+        if keep:
+            logger.info(f"[Scratch] Kept {space.path} for inspection ({outcome})")
+        else:
+            shutil.rmtree(space.path, ignore_errors=True)
+
+    @contextmanager
+    def session(self, label: str = 'request'):
+        """Allocate a space for the with-block; always released on exit"""
+        space = self.allocate(label)
+        try:
+            yield space
+        except BaseException as e:
+            space.release(release_outcome(e))
+            raise
+        else:
+            space.release('success')
+
+    def close(self):
+        """Remove every space of this worker (shutdown)"""
+        with self._lock:
+            spaces = list(self._active.values()) + list(self._retained.values())
+            self._active.clear()
+            self._retained.clear()
+        for space in spaces:
+            space.released = True
+            shutil.rmtree(space.path, ignore_errors=True)
@@ -0,0 +1,389 @@
+"""
+Synthetic Video Corpus Generator
+Genera clips deterministas con NumPy (sin loops por pixel) para tests y benchmarks:
+- Resolución, FPS, duración y contenedor (mp4 / webm / avi) configurables
+- WebM con frame count roto (sin Duration, como MediaRecorder del navegador)
+- Sprites tipo rostro en movimiento cuya boca sigue la envolvente del audio
+- Pista de audio tipo voz sincronizada o con offset (audio_offset_ms)
+- SkinColorFaceDetector: detector de los sprites para correr el engine sin S3FD
+
+El audio se muxea con ffmpeg si está instalado; si no, queda como WAV al lado
+del video (metadata['audio_path'], metadata['audio_muxed'] = False)
+"""
+
+import json
+import wave
+import shutil
+import logging
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# container -> (OpenCV fourcc, extension)
+CONTAINERS = {
+    'mp4': ('mp4v', '.mp4'),
+    'webm': ('VP80', '.webm'),
+    'avi': ('MJPG', '.avi'),
+}
+
+SYLLABLE_SECONDS = 0.25  # ~4 syllables/s, typical speech rate
+
+# BGR colors
+SKIN = np.array([140, 170, 220], dtype=np.float32)
+EYE = np.array([40, 40, 40], dtype=np.float32)
+MOUTH = np.array([50, 40, 120], dtype=np.float32)
+
+
+class SkinColorFaceDetector:
+    """
+    Face detector for the corpus' face sprites (skin colour blobs), so tests and
+    benchmarks can run the SyncNet engine without S3FD weights
+    """
+
+    def __init__(self, min_area: int = 400):
+        self.min_area = min_area
+        self.calls = 0
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        self.calls += 1
+        skin = SKIN.astype(np.int16)
+        mask = cv2.inRange(frame, np.clip(skin - 15, 0, 255), np.clip(skin + 15, 0, 255))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        # Face sprites are filled ellipses 0.8x as wide as tall; background gradient bands are not
+        boxes = [
+            (x, y, x + w, y + h, 1.0)
+            for x, y, w, h, area in stats[1:count]
+            if area >= self.min_area and 0.6 <= w / h <= 1.0 and area >= 0.6 * w * h
+        ]
+        return np.array(boxes, dtype=np.float32).reshape(-1, 5)
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which('ffmpeg') is not None
+
+
+def speech_envelope(times: np.ndarray, seed: int = 0) -> np.ndarray:
+    """
+    Syllable-like loudness envelope in [0, 1] evaluated at `times` (seconds)
+
+    Each SYLLABLE_SECONDS slot gets a random amplitude (about a quarter are
+    pauses) shaped by a raised cosine. Times < 0 are silent.
+    """
+    rng = np.random.default_rng(seed)
+    num_slots = int(np.ceil(max(times.max(initial=0.0), 0.0) / SYLLABLE_SECONDS)) + 1
+    # One (amplitude, pause) draw per slot: slot k gets the same values whatever the
+    # time span, so the mouth and an offset audio track share the same syllables
+    draws = rng.random((num_slots, 2))
+    amplitudes = (0.4 + 0.6 * draws[:, 0]) * (draws[:, 1] > 0.25)
+
+    slot = np.floor(times / SYLLABLE_SECONDS).astype(np.int64)
+    frac = times / SYLLABLE_SECONDS - slot
+    envelope = amplitudes[np.clip(slot, 0, num_slots - 1)] * np.sin(np.pi * frac) ** 2
+    envelope[times < 0] = 0.0
+    return envelope
+
+
+def synthesize_speech(
+    duration_sec: float,
+    sample_rate: int = 16000,
+    offset_ms: float = 0.0,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Voiced, speech-like mono audio (float32 in [-1, 1])
+
+    offset_ms > 0 delays the audio relative to the mouth movement
+    """
+    num_samples = int(round(duration_sec * sample_rate))
+    t = np.arange(num_samples) / sample_rate
+    shifted = t - offset_ms / 1000.0
+
+    rng = np.random.default_rng(seed + 1)
+    slot_f0 = rng.uniform(110, 220, int(np.ceil(duration_sec / SYLLABLE_SECONDS)) + 2)
+    f0 = slot_f0[np.clip((shifted / SYLLABLE_SECONDS).astype(np.int64), 0, len(slot_f0) - 1)]
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+
+    harmonics = sum(np.sin(h * phase) / h for h in range(1, 6))
+    noise = rng.normal(0, 0.02, num_samples)
+    audio = speech_envelope(shifted, seed) * harmonics * 0.4 + noise
+    return np.clip(audio, -1.0, 1.0).astype(np.float32)
+
+
+def write_wav(path: Path, audio: np.ndarray, sample_rate: int = 16000):
+    """Write mono float audio as 16-bit PCM WAV"""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+def _gradients(width: int, height: int):
+    """Two background gradients blended over time (float32, BGR)"""
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+
+    start = np.empty((height, width, 3), dtype=np.float32)
+    start[..., 0] = x * 255
+    start[..., 1] = 128
+    start[..., 2] = (x + y) * 127.5
+
+    end = start.copy()
+    end[..., 0] = 128
+    end[..., 1] = y * 255
+    return start, end
+
+
+def face_trajectories(
+    num_frames: int,
+    width: int,
+    height: int,
+    num_faces: int,
+    seed: int = 0
+) -> np.ndarray:
+    """Per-frame face boxes (num_frames, num_faces, 4) as x1, y1, x2, y2"""
+    rng = np.random.default_rng(seed + 2)
+    size = int(min(width, height) * (0.45 if num_faces == 1 else 0.3))
+    t = np.arange(num_frames, dtype=np.float64)[:, None]
+
+    # Faces spread across the frame, swaying slowly
+    base_x = (np.arange(num_faces) + 0.5) / num_faces * width
+    base_y = np.full(num_faces, height / 2.0)
+    amp = 0.08 * min(width, height)
+    phase = rng.uniform(0, 2 * np.pi, num_faces)
+    period = rng.uniform(60, 120, num_faces)
+
+    cx = base_x + amp * np.sin(2 * np.pi * t / period + phase)
+    cy = base_y + 0.5 * amp * np.cos(2 * np.pi * t / period + phase)
+
+    half = size / 2.0
+    cx = np.clip(cx, half, width - half)
+    cy = np.clip(cy, half, height - half)
+    boxes = np.stack([cx - half, cy - half, cx + half, cy + half], axis=-1)
+    return np.round(boxes).astype(np.int32)
+
+
+def _draw_face(frame: np.ndarray, box: np.ndarray, openness: float):
+    """Face-like sprite: skin ellipse, two eyes and a mouth opened by `openness`"""
+    x1, y1, x2, y2 = (int(v) for v in box)
+    h, w = y2 - y1, x2 - x1
+    yy = np.linspace(-1.0, 1.0, h, dtype=np.float32)[:, None]
+    xx = np.linspace(-1.0, 1.0, w, dtype=np.float32)[None, :]
+
+    head = (xx / 0.8) ** 2 + yy ** 2 <= 1.0
+    eyes = ((np.abs(xx) - 0.3) ** 2 + (yy + 0.25) ** 2) <= 0.1 ** 2
+    mouth_h = 0.03 + 0.2 * openness
+    mouth = (xx / 0.3) ** 2 + ((yy - 0.45) / mouth_h) ** 2 <= 1.0
+
+    region = frame[y1:y2, x1:x2]
+    region[head] = SKIN
+    region[eyes & head] = EYE
+    region[mouth & head] = MOUTH
+
+
+def generate_clip(
+    path: str,
+    width: int = 640,
+    height: int = 480,
+    fps: float = 25.0,
+    duration_sec: float = 3.0,
+    container: Optional[str] = None,
+    num_faces: int = 1,
+    audio: bool = True,
+    audio_offset_ms: float = 0.0,
+    sample_rate: int = 16000,
+    broken_frame_count: bool = False,
+    seed: int = 0
+) -> Dict:
+    """
+    Generate one deterministic clip
+
+    Args:
+        path: Output path (extension picks the container unless `container` is set)
+        width, height, fps, duration_sec: Video geometry and length
+        container: 'mp4', 'webm' or 'avi'
+        num_faces: Face-like sprites (0 = background only)
+        audio: Generate a speech-like track driving the mouths
+        audio_offset_ms: Audio delay vs mouth movement (negative = audio leads)
+        sample_rate: Audio sample rate
+        broken_frame_count: Drop the WebM Duration so OpenCV reports no frame count
+        seed: Random seed (same seed -> same clip)
+
+    Returns:
+        dict with path, geometry, audio info, face_boxes (num_frames, num_faces, 4)
+        and mouth_openness (num_frames,)
+    """
+    path = Path(path)
+    container = container or path.suffix.lstrip('.') or 'mp4'
+    if container not in CONTAINERS:
+        raise ValueError(f"Unknown container: {container}")
+    if broken_frame_count and container != 'webm':
+        raise ValueError("broken_frame_count is only supported for webm")
+
+    fourcc, ext = CONTAINERS[container]
+    path = path.with_suffix(ext)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    num_frames = int(round(duration_sec * fps))
+    frame_times = np.arange(num_frames) / fps
+    mouth_openness = speech_envelope(frame_times, seed) if audio else np.zeros(num_frames)
+    boxes = face_trajectories(num_frames, width, height, num_faces, seed)
+    start, end = _gradients(width, height)
+
+    muxing = audio and ffmpeg_available()
+    video_path = path.with_name(path.stem + '.video' + ext) if muxing else path
+
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"OpenCV cannot write {fourcc} ({ext})")
+
+    try:
+        for i in range(num_frames):
+            t = i / max(1, num_frames - 1)
+            frame = start * (1.0 - t) + end * t
+            for face in range(num_faces):
+                _draw_face(frame, boxes[i, face], float(mouth_openness[i]))
+            writer.write(frame.astype(np.uint8))
+    finally:
+        writer.release()
+
+    metadata = {
+        'path': str(path),
+        'container': container,
+        'width': width,
+        'height': height,
+        'fps': fps,
+        'num_frames': num_frames,
+        'duration_sec': num_frames / fps,
+        'num_faces': num_faces,
+        'seed': seed,
+        'audio_path': None,
+        'audio_muxed': False,
+        'audio_offset_ms': audio_offset_ms if audio else None,
+        'sample_rate': sample_rate if audio else None,
+        'broken_frame_count': broken_frame_count,
+        'face_boxes': boxes,
+        'mouth_openness': mouth_openness,
+    }
+
+    if audio:
+        samples = synthesize_speech(num_frames / fps, sample_rate, audio_offset_ms, seed)
+        wav_path = path.with_suffix('.wav')
+        write_wav(wav_path, samples, sample_rate)
+        metadata['audio_path'] = str(wav_path)
+
+        if muxing:
+            _mux(video_path, wav_path, path, container, streamed=broken_frame_count)
+            video_path.unlink(missing_ok=True)
+            metadata['audio_muxed'] = True
+
+    if broken_frame_count and not metadata['audio_muxed']:
+        _strip_webm_duration(path)
+
+    return metadata
+
+
+def _mux(video_path: Path, wav_path: Path, out_path: Path, container: str, streamed: bool = False):
+    """Mux video + WAV with ffmpeg (streamed webm = no Duration/Cues, like MediaRecorder)"""
+    cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-i', str(video_path), '-i', str(wav_path)]
+    if container == 'webm':
+        cmd += ['-c:v', 'copy', '-c:a', 'libopus']
+    elif container == 'mp4':
+        cmd += ['-c:v', 'copy', '-c:a', 'aac']
+    else:
+        cmd += ['-c:v', 'copy', '-c:a', 'pcm_s16le']
+    cmd += ['-shortest']
+
+    if streamed:
+        with open(out_path, 'wb') as f:
+            subprocess.run(cmd + ['-f', 'webm', 'pipe:1'], stdout=f, check=True)
+    else:
+        subprocess.run(cmd + [str(out_path)], check=True)
+
+
+def _strip_webm_duration(path: Path):
+    """
+    Overwrite the Segment Info Duration element with an EBML Void element
+
+    Browsers' MediaRecorder writes WebM without Duration; OpenCV then reports
+    a bogus frame count and FrameExtractor falls back to sequential mode.
+    """
+    data = bytearray(path.read_bytes())
+    idx = data.find(b'\x44\x89')  # Duration element ID
+    while idx != -1:
+        size_byte = data[idx + 2] if idx + 2 < len(data) else 0
+        if size_byte in (0x84, 0x88):  # 4- or 8-byte float
+            payload = size_byte & 0x7F
+            # Void (0xEC) + 1-byte size covering the same 3 + payload bytes
+            data[idx:idx + 3 + payload] = bytes([0xEC, 0x80 | (payload + 1)]) + bytes(payload + 1)
+            path.write_bytes(bytes(data))
+            return
+        idx = data.find(b'\x44\x89', idx + 1)
+
+    logger.warning(f"[SyntheticCorpus] No Duration element found in {path}")
+
+
+def default_corpus_specs() -> List[Dict]:
+    """Small corpus covering the cases the pipeline has to handle"""
+    return [
+        {'name': 'sync_mp4_640', 'container': 'mp4'},
+        {'name': 'sync_webm_640', 'container': 'webm'},
+        {'name': 'broken_count_webm', 'container': 'webm', 'broken_frame_count': True},
+        {'name': 'offset_plus200ms', 'container': 'mp4', 'audio_offset_ms': 200.0},
+        {'name': 'offset_minus120ms', 'container': 'mp4', 'audio_offset_ms': -120.0},
+        {'name': 'two_faces', 'container': 'mp4', 'num_faces': 2},
+        {'name': 'no_face', 'container': 'mp4', 'num_faces': 0},
+        {'name': 'silent', 'container': 'mp4', 'audio': False},
+        {'name': 'hd_30fps', 'container': 'mp4', 'width': 1280, 'height': 720, 'fps': 30.0},
+        {'name': 'low_res_15fps', 'container': 'webm', 'width': 320, 'height': 240, 'fps': 15.0},
+    ]
+
+
+def build_corpus(out_dir: str, specs: Optional[List[Dict]] = None, seed: int = 0) -> List[Dict]:
+    """
+    Generate every spec into out_dir and write manifest.json
+
+    Each spec is a dict of generate_clip kwargs plus a 'name'
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    clips = []
+    for index, spec in enumerate(specs or default_corpus_specs()):
+        spec = dict(spec)
+        name = spec.pop('name', f'clip_{index:03d}')
+        container = spec.get('container', 'mp4')
+        spec.setdefault('seed', seed + index)
+
+        metadata = generate_clip(str(out_dir / f'{name}.{container}'), **spec)
+        metadata['name'] = name
+        clips.append(metadata)
+
+    manifest = [
+        {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in clip.items()}
+        for clip in clips
+    ]
+    (out_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2))
+
+    logger.info(f"[SyntheticCorpus] Built {len(clips)} clips in {out_dir}")
+    return clips
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the synthetic test/benchmark corpus')
+    parser.add_argument('out_dir', nargs='?', default='tmp/corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for clip in build_corpus(args.out_dir, seed=args.seed):
+        print(f"{clip['name']:>20}: {clip['path']} ({clip['num_frames']} frames, muxed={clip['audio_muxed']})")
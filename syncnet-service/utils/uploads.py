@@ -0,0 +1,167 @@
+"""
+Streaming Upload Spooling
+Recibe videos como stream (multipart o raw body), calcula sha256 y tamaño
+mientras escribe, y aborta al superar el límite sin cargar todo en memoria
+"""
+
+import os
+import uuid
+import hashlib
+import logging
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+logger = logging.getLogger(__name__)
+
+
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPE_SUFFIXES = {
+    'video/webm': '.webm',
+    'video/mp4': '.mp4',
+    'video/quicktime': '.mov',
+    'video/x-msvideo': '.avi',
+}
+
+
+class UploadTooLarge(RequestEntityTooLarge):
+    """Raised while streaming when the upload exceeds max_bytes"""
+
+
+def default_spool_dir(fallback: str) -> str:
+    """Prefer tmpfs (/dev/shm) so spooled videos never touch the disk"""
+    shm = Path('/dev/shm')
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return str(shm / 'syncnet-uploads')
+    return fallback
+
+
+def suffix_for(content_type: Optional[str], filename: Optional[str] = None) -> str:
+    """Pick a file extension so OpenCV/ffmpeg can sniff the container"""
+    if filename:
+        ext = Path(filename).suffix.lower()
+        if ext in ('.webm', '.mp4', '.mov', '.avi'):
+            return ext
+
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    return CONTENT_TYPE_SUFFIXES.get(mimetype, '.webm')
+
+
+class SpoolFile:
+    """
+    Writable/readable spool file that hashes and size-checks every write
+
+    Used both as werkzeug's multipart stream factory and for raw bodies.
+    """
+
+    def __init__(self, spool_dir: str, max_bytes: int, suffix: str = '.webm'):
+        Path(spool_dir).mkdir(parents=True, exist_ok=True)
+
+        self.path = Path(spool_dir) / f'upload-{uuid.uuid4().hex}{suffix}'
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._file = open(self.path, 'w+b')
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise UploadTooLarge(
+                f'Video file too large: more than {self.max_bytes / (1024 * 1024):.0f} MB'
+            )
+
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    def finish(self):
+        """Flush and close the spool so decoders can open it by path"""
+        if not self._file.closed:
+            self._file.flush()
+            self._file.close()
+
+    def discard(self):
+        """Close and delete the spooled file"""
+        try:
+            if not self._file.closed:
+                self._file.close()
+        finally:
+            self.path.unlink(missing_ok=True)
+
+    # File-like API expected by werkzeug's FileStorage
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._file.readline(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self.finish()
+
+
+def spool_stream(
+    stream: BinaryIO,
+    spool_dir: str,
+    max_bytes: int,
+    suffix: str = '.webm',
+    chunk_size: int = CHUNK_SIZE
+) -> SpoolFile:
+    """
+    Copy a raw request body into a spool file chunk by chunk
+
+    Raises:
+        UploadTooLarge: as soon as more than max_bytes have been received
+    """
+    spool = SpoolFile(spool_dir, max_bytes, suffix)
+
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except Exception:
+        spool.discard()
+        raise
+
+    spool.finish()
+    return spool
+
+
+class StreamingUploadRequest(Request):
+    """
+    Flask request whose multipart file parts are written straight into a
+    SpoolFile (hash + size limit applied per chunk as the body arrives)
+    """
+
+    spool_dir: str = '/tmp'
+    max_upload_bytes: int = 10 * 1024 * 1024
+
+    def _get_file_stream(
+        self,
+        total_content_length: Optional[int],
+        content_type: Optional[str],
+        filename: Optional[str] = None,
+        content_length: Optional[int] = None
+    ) -> SpoolFile:
+        return SpoolFile(
+            self.spool_dir,
+            self.max_upload_bytes,
+            suffix_for(content_type, filename)
+        )